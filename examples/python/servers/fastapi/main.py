@@ -11,6 +11,7 @@ load_dotenv()
 
 # Get configuration from environment
 ADDRESS = os.getenv("ADDRESS")
+FACILITATOR_URL = os.getenv("FACILITATOR_URL", "https://x402.org/facilitator")
 
 if not ADDRESS:
     raise ValueError("Missing required environment variables")
@@ -24,6 +25,7 @@ app.middleware("http")(
         price="$0.001",
         pay_to_address=ADDRESS,
         network="base-sepolia",
+        facilitator_config={"url": FACILITATOR_URL},
     )
 )
 
@@ -41,6 +43,7 @@ app.middleware("http")(
         ),
         pay_to_address=ADDRESS,
         network="base-sepolia",
+        facilitator_config={"url": FACILITATOR_URL},
     )
 )
 
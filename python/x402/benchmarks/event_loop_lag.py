@@ -0,0 +1,118 @@
+"""Benchmark event-loop lag caused by payment signing in the httpx hooks.
+
+Runs hundreds of concurrent workers, each making a few paid requests against an
+in-memory transport, while
+a ticker coroutine measures how late the loop wakes it up. Compares signing
+inline on the loop (the previous behaviour) with acreate_payment_header, which
+signs in an executor.
+
+Usage:
+    python benchmarks/event_loop_lag.py [--concurrency N] [--backend native]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from eth_account import Account
+
+from x402 import secp256k1
+from x402.clients.httpx import x402HttpxClient
+from x402.types import PaymentRequirements, x402PaymentRequiredResponse
+
+PAYMENT_REQUIRED = x402PaymentRequiredResponse(
+    x402_version=1,
+    accepts=[
+        PaymentRequirements(
+            scheme="exact",
+            network="base-sepolia",
+            asset="0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+            pay_to="0x0000000000000000000000000000000000000000",
+            max_amount_required="10000",
+            resource="https://example.com/paid",
+            description="benchmark",
+            max_timeout_seconds=60,
+            mime_type="application/json",
+            extra={"name": "USDC", "version": "2"},
+        )
+    ],
+    error="No X-PAYMENT header provided",
+).model_dump(by_alias=True)
+
+
+async def handler(request: httpx.Request) -> httpx.Response:
+    # Simulated network and server time
+    await asyncio.sleep(0.005)
+    if "X-Payment" in request.headers:
+        return httpx.Response(200, json={"message": "paid"})
+    return httpx.Response(402, json=PAYMENT_REQUIRED)
+
+
+async def measure_lag(stop: asyncio.Event, interval: float) -> list[float]:
+    lags = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+    return lags
+
+
+async def run(concurrency: int, inline_signing: bool) -> tuple[list[float], float]:
+    async with x402HttpxClient(
+        account=Account.create(), transport=httpx.MockTransport(handler)
+    ) as client:
+        x402_client = client.event_hooks["response"][0].__self__.client
+        if inline_signing:
+
+            async def acreate_payment_header(*args):
+                return x402_client.create_payment_header(*args)
+
+            x402_client.acreate_payment_header = acreate_payment_header
+
+        stop = asyncio.Event()
+        ticker = asyncio.create_task(measure_lag(stop, 0.001))
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        return await ticker, elapsed
+
+
+async def worker(client: httpx.AsyncClient, requests: int = 5) -> None:
+    for _ in range(requests):
+        response = await client.get("https://example.com/paid")
+        assert response.status_code == 200
+
+
+def report(name: str, lags: list[float], elapsed: float) -> None:
+    lags = sorted(lags)
+    p99 = lags[max(int(len(lags) * 0.99) - 1, 0)]
+    print(
+        f"{name:<22} lag mean {statistics.mean(lags) * 1000:7.2f} ms"
+        f"  p99 {p99 * 1000:7.2f} ms  max {lags[-1] * 1000:7.2f} ms"
+        f"  total {elapsed:6.2f} s"
+    )
+
+
+async def main(concurrency: int) -> None:
+    print(f"{concurrency} concurrent workers, {secp256k1.get_backend().name}")
+    report("signing on the loop", *await run(concurrency, inline_signing=True))
+    report("acreate_payment_header", *await run(concurrency, inline_signing=False))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument(
+        "--backend", choices=["coincurve", "eth_keys", "native"], default=None
+    )
+    args = parser.parse_args()
+    if args.backend == "native":
+        secp256k1.set_backend(
+            secp256k1.EthKeysBackend("eth_keys.backends.NativeECCBackend")
+        )
+    elif args.backend:
+        secp256k1.set_backend(secp256k1.load_backend(args.backend))
+    asyncio.run(main(args.concurrency))
@@ -0,0 +1,240 @@
+"""Benchmark the pay-gated gateway against a plain streaming proxy.
+
+Runs an upstream serving a fixed size body, a mock facilitator and the gateway
+in separate processes, then drives them with httpx at the given concurrency:
+
+  direct   requests sent straight to the upstream
+  proxy    requests through a free gateway route, i.e. a plain streaming proxy
+  paid     requests through a paid gateway route, each carrying a fresh
+           payment, so every request is verified and settled
+
+Payment headers are signed before the timed run. Reported per scenario:
+requests per second, p50/p99 latency and, where /proc is available, the
+gateway's CPU time per request.
+
+Usage:
+    python benchmarks/gateway.py [--requests N] [--concurrency 1,16]
+        [--size 1024,1048576]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import List, Optional
+
+import httpx
+from eth_account import Account
+
+from x402.clients.base import x402Client
+from x402.types import PaymentRequirements
+
+PAY_TO = "0x209693Bc6afc0C5328bA36FaF03C514EF312287C"
+SCENARIOS = ("direct", "proxy", "paid")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(port: int, timeout: float = 20.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Nothing listening on port {port}")
+            time.sleep(0.05)
+
+
+def serve_upstream(port: int, size: int) -> None:
+    import uvicorn
+
+    body = b"x" * size
+    chunk = 64 * 1024
+
+    async def app(scope, receive, send):
+        if scope["type"] != "http":
+            return
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"application/octet-stream"),
+                    (b"content-length", str(size).encode()),
+                ],
+            }
+        )
+        for start in range(0, size, chunk):
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": body[start : start + chunk],
+                    "more_body": True,
+                }
+            )
+        await send({"type": "http.response.body", "body": b""})
+
+    uvicorn.run(app, port=port, log_level="warning", lifespan="off")
+
+
+def serve_gateway(port: int, upstream: str, facilitator: str) -> None:
+    import uvicorn
+
+    from x402.gateway import Gateway
+
+    gateway = Gateway(facilitator_config={"url": facilitator})
+    gateway.add("/paid/*", upstream, price="$0.001", pay_to_address=PAY_TO)
+    gateway.add("/free/*", upstream)
+    uvicorn.run(gateway, port=port, log_level="warning")
+
+
+def cpu_seconds(pid: int) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/stat") as stat:
+            fields = stat.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+async def sign_payments(url: str, count: int) -> List[str]:
+    async with httpx.AsyncClient() as client:
+        response = await client.get(url)
+    requirements = PaymentRequirements(**response.json()["accepts"][0])
+    signer = x402Client(Account.create())
+    return [signer.create_payment_header(requirements, 1) for _ in range(count)]
+
+
+async def drive(
+    url: str, requests: int, concurrency: int, headers: Optional[List[str]]
+) -> List[float]:
+    latencies = []
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        queue = iter(range(requests))
+
+        async def worker():
+            for index in queue:
+                extra = {"X-PAYMENT": headers[index]} if headers else None
+                start = time.perf_counter()
+                async with client.stream("GET", url, headers=extra) as response:
+                    async for _ in response.aiter_raw():
+                        pass
+                if response.status_code != 200:
+                    raise RuntimeError(f"{url} answered {response.status_code}")
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def main(requests: int, concurrencies: List[int], sizes: List[int]) -> None:
+    context = multiprocessing.get_context("spawn")
+    facilitator_port = free_port()
+    facilitator = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "x402.testing.facilitator",
+            "--port",
+            str(facilitator_port),
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    print(f"{requests} requests per run, {os.cpu_count()} CPUs")
+    print(
+        f"{'scenario':<8} {'size':>9} {'conc':>5} {'rps':>9} {'p50 ms':>8} "
+        f"{'p99 ms':>8} {'MB/s':>8} {'gw CPU ms/req':>14}"
+    )
+    try:
+        wait_for(facilitator_port)
+        for size in sizes:
+            upstream_port, gateway_port = free_port(), free_port()
+            upstream = context.Process(
+                target=serve_upstream, args=(upstream_port, size), daemon=True
+            )
+            upstream.start()
+            gateway = context.Process(
+                target=serve_gateway,
+                args=(
+                    gateway_port,
+                    f"http://127.0.0.1:{upstream_port}",
+                    f"http://127.0.0.1:{facilitator_port}",
+                ),
+                daemon=True,
+            )
+            gateway.start()
+            try:
+                wait_for(upstream_port)
+                wait_for(gateway_port)
+                urls = {
+                    "direct": f"http://127.0.0.1:{upstream_port}/data",
+                    "proxy": f"http://127.0.0.1:{gateway_port}/free/data",
+                    "paid": f"http://127.0.0.1:{gateway_port}/paid/data",
+                }
+                for concurrency in concurrencies:
+                    for scenario in SCENARIOS:
+                        url = urls[scenario]
+                        warmup = headers = None
+                        if scenario == "paid":
+                            signed = asyncio.run(
+                                sign_payments(url, requests + concurrency)
+                            )
+                            warmup, headers = signed[:concurrency], signed[concurrency:]
+                        # Warm up connections and code paths
+                        asyncio.run(drive(url, concurrency, concurrency, warmup))
+                        cpu = cpu_seconds(gateway.pid)
+                        start = time.perf_counter()
+                        latencies = asyncio.run(
+                            drive(url, requests, concurrency, headers)
+                        )
+                        elapsed = time.perf_counter() - start
+                        gateway_cpu = "-"
+                        if cpu is not None and scenario != "direct":
+                            used = cpu_seconds(gateway.pid) - cpu
+                            gateway_cpu = f"{used / requests * 1000:.3f}"
+                        print(
+                            f"{scenario:<8} {size:>9} {concurrency:>5} "
+                            f"{requests / elapsed:>9.1f} "
+                            f"{percentile(latencies, 0.5) * 1000:>8.2f} "
+                            f"{percentile(latencies, 0.99) * 1000:>8.2f} "
+                            f"{requests * size / elapsed / 1e6:>8.1f} "
+                            f"{gateway_cpu:>14}"
+                        )
+            finally:
+                gateway.terminate()
+                upstream.terminate()
+                gateway.join()
+                upstream.join()
+    finally:
+        facilitator.terminate()
+        facilitator.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", default="1,16")
+    parser.add_argument("--size", default="1024,1048576")
+    args = parser.parse_args()
+    main(
+        args.requests,
+        [int(value) for value in args.concurrency.split(",")],
+        [int(value) for value in args.size.split(",")],
+    )
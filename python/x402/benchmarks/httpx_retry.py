@@ -0,0 +1,110 @@
+"""Benchmark paid-request latency of the httpx client.
+
+Compares sending the paid retry through a fresh AsyncClient (the previous
+behaviour, still used when the hooks are not bound to a client) with sending it
+through the originating x402HttpxClient and its connection pool.
+
+Usage:
+    python benchmarks/httpx_retry.py [--requests N]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+from eth_account import Account
+
+from x402.clients.httpx import x402_payment_hooks, x402HttpxClient
+from x402.types import PaymentRequirements, x402PaymentRequiredResponse
+
+PAYMENT_REQUIRED = json.dumps(
+    x402PaymentRequiredResponse(
+        x402_version=1,
+        accepts=[
+            PaymentRequirements(
+                scheme="exact",
+                network="base-sepolia",
+                asset="0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+                pay_to="0x0000000000000000000000000000000000000000",
+                max_amount_required="10000",
+                resource="http://127.0.0.1/paid",
+                description="benchmark",
+                max_timeout_seconds=60,
+                mime_type="application/json",
+                extra={"name": "USDC", "version": "2"},
+            )
+        ],
+        error="No X-PAYMENT header provided",
+    ).model_dump(by_alias=True)
+).encode()
+
+
+class PaidHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        if self.headers.get("X-Payment"):
+            status, body = 200, b'{"message": "paid"}'
+        else:
+            status, body = 402, PAYMENT_REQUIRED
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+async def run(client: httpx.AsyncClient, url: str, count: int) -> list[float]:
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        response = await client.get(url)
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.status_code
+    return latencies
+
+
+def report(name: str, latencies: list[float]) -> None:
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"{name:<28} mean {statistics.mean(latencies) * 1000:7.3f} ms"
+        f"  p50 {statistics.median(latencies) * 1000:7.3f} ms"
+        f"  p95 {p95 * 1000:7.3f} ms"
+    )
+
+
+async def main(count: int) -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PaidHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/paid"
+    account = Account.create()
+
+    try:
+        # Hooks without a bound client open a new AsyncClient for every retry
+        async with httpx.AsyncClient() as client:
+            client.event_hooks = x402_payment_hooks(account)
+            await run(client, url, 5)
+            report("new AsyncClient per retry", await run(client, url, count))
+
+        async with x402HttpxClient(account=account) as client:
+            await run(client, url, 5)
+            report("pooled x402HttpxClient", await run(client, url, count))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
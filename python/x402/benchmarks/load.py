@@ -0,0 +1,446 @@
+"""End-to-end load test of the paid request cycle.
+
+Starts the FastAPI and Flask example servers (examples/python/servers) in-process
+against a local mock facilitator and drives them with x402HttpxClient and
+x402_requests at the given concurrency levels. Every request goes through the
+full cycle: 402, signing, the paid retry and the server's verify and settle
+calls.
+
+Each scenario runs in a fresh subprocess so memory high-water marks are not
+shared. Results are printed, or written with --output, as JSON with:
+  rps                 completed requests per second
+  latency_ms          mean/p50/p95/p99/max per phase:
+                        total            whole paid request as seen by the client
+                        payment_required first request up to the 402 response
+                        sign             creating the X-PAYMENT header
+                        paid_request     paid retry up to its response
+                        verify, settle   facilitator calls made by the server
+  cpu_ms_per_request  process CPU time per request. Client, server and mock
+                      facilitator share the process, so this is the whole cycle.
+  rss_mb              resident set size after startup and its high-water mark
+
+Usage:
+    python benchmarks/load.py [--servers fastapi,flask] [--clients httpx,requests]
+        [--concurrency 1,8] [--requests N] [--facilitator-latency fixed:5]
+        [--output results.json]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import functools
+import importlib.util
+import itertools
+import json
+import logging
+import math
+import os
+import platform
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import uvicorn
+from eth_account import Account
+from werkzeug.serving import make_server
+
+from x402.clients.base import x402Client
+from x402.clients.httpx import x402HttpxClient
+from x402.clients.requests import x402_requests
+from x402.facilitator import FacilitatorClient
+from x402.testing.facilitator import (
+    Latency,
+    MockFacilitatorConfig,
+    MockFacilitatorServer,
+)
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[3] / "examples" / "python" / "servers"
+PAY_TO = "0x209693Bc6afc0C5328bA36FaF03C514EF312287C"
+PHASES = ("total", "payment_required", "sign", "paid_request", "verify", "settle")
+
+# Timestamps of the request being driven in the current task or thread
+_cycle: ContextVar[Optional[Dict[str, float]]] = ContextVar("cycle", default=None)
+
+
+class Recorder:
+    """Collects phase durations in seconds."""
+
+    def __init__(self):
+        self.phases: Dict[str, List[float]] = {phase: [] for phase in PHASES}
+        self.errors = 0
+
+    def clear(self) -> None:
+        for durations in self.phases.values():
+            durations.clear()
+        self.errors = 0
+
+    def start(self) -> Dict[str, float]:
+        cycle = {"start": time.perf_counter()}
+        _cycle.set(cycle)
+        return cycle
+
+    def finish(self, cycle: Dict[str, float], ok: bool) -> None:
+        end = time.perf_counter()
+        if not ok or "sign_end" not in cycle:
+            self.errors += 1
+            return
+        self.phases["total"].append(end - cycle["start"])
+        self.phases["payment_required"].append(cycle["sign_start"] - cycle["start"])
+        self.phases["sign"].append(cycle["sign_end"] - cycle["sign_start"])
+        self.phases["paid_request"].append(end - cycle["sign_end"])
+
+
+def _mark_signing(cycle: Optional[Dict[str, float]], start: float) -> None:
+    if cycle is not None:
+        cycle["sign_start"] = start
+        cycle["sign_end"] = time.perf_counter()
+
+
+def instrument(recorder: Recorder) -> Callable[[], None]:
+    """Time signing in the clients and facilitator calls in the servers.
+
+    Returns:
+        A function undoing the instrumentation
+    """
+    create = x402Client.create_payment_header
+    acreate = x402Client.acreate_payment_header
+    verify = FacilitatorClient.verify_wire
+    settle = FacilitatorClient.settle_wire
+
+    @functools.wraps(create)
+    def timed_create(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return create(*args, **kwargs)
+        finally:
+            _mark_signing(_cycle.get(), start)
+
+    @functools.wraps(acreate)
+    async def timed_acreate(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await acreate(*args, **kwargs)
+        finally:
+            _mark_signing(_cycle.get(), start)
+
+    def timed_call(fn, phase):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                recorder.phases[phase].append(time.perf_counter() - start)
+
+        return wrapper
+
+    x402Client.create_payment_header = timed_create
+    x402Client.acreate_payment_header = timed_acreate
+    FacilitatorClient.verify_wire = timed_call(verify, "verify")
+    FacilitatorClient.settle_wire = timed_call(settle, "settle")
+
+    def restore():
+        x402Client.create_payment_header = create
+        x402Client.acreate_payment_header = acreate
+        FacilitatorClient.verify_wire = verify
+        FacilitatorClient.settle_wire = settle
+
+    return restore
+
+
+def load_example(server: str, examples_dir: Path, facilitator_url: str) -> Any:
+    """Import an example server's app, configured through its environment."""
+    os.environ["ADDRESS"] = PAY_TO
+    os.environ["FACILITATOR_URL"] = facilitator_url
+    path = examples_dir / server / "main.py"
+    spec = importlib.util.spec_from_file_location(f"x402_example_{server}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.app
+
+
+class ServerThread:
+    """Serves an ASGI (FastAPI) or WSGI (Flask) app on a background thread."""
+
+    def __init__(self, server: str, app: Any):
+        if server == "fastapi":
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._socket.bind(("127.0.0.1", 0))
+            self.port = self._socket.getsockname()[1]
+            self._uvicorn = uvicorn.Server(
+                uvicorn.Config(app, log_level="warning", lifespan="off")
+            )
+            target, kwargs = self._uvicorn.run, {"sockets": [self._socket]}
+        else:
+            self._uvicorn = None
+            self._wsgi = make_server("127.0.0.1", 0, app, threaded=True)
+            self.port = self._wsgi.server_port
+            target, kwargs = self._wsgi.serve_forever, {}
+        self._thread = threading.Thread(target=target, kwargs=kwargs, daemon=True)
+
+    def __enter__(self) -> "ServerThread":
+        self._thread.start()
+        while self._uvicorn is not None and not self._uvicorn.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._uvicorn is not None:
+            self._uvicorn.should_exit = True
+        else:
+            self._wsgi.shutdown()
+        self._thread.join()
+
+
+async def drive_httpx(
+    url: str, account: Any, total: int, concurrency: int, recorder: Recorder
+) -> None:
+    remaining = itertools.count()
+
+    async def worker():
+        # One client per worker: the payment hooks keep per-client retry state
+        async with x402HttpxClient(account=account, timeout=60) as client:
+            while next(remaining) < total:
+                cycle = recorder.start()
+                try:
+                    response = await client.get(url)
+                    ok = response.status_code == 200
+                except Exception:
+                    ok = False
+                recorder.finish(cycle, ok)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+def drive_requests(
+    url: str, account: Any, total: int, concurrency: int, recorder: Recorder
+) -> None:
+    remaining = itertools.count()
+    lock = threading.Lock()
+
+    def worker():
+        session = x402_requests(account)
+        while True:
+            with lock:
+                if next(remaining) >= total:
+                    break
+            cycle = recorder.start()
+            try:
+                ok = session.get(url, timeout=60).status_code == 200
+            except Exception:
+                ok = False
+            recorder.finish(cycle, ok)
+        session.close()
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        for future in [pool.submit(worker) for _ in range(concurrency)]:
+            future.result()
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    index = max(0, math.ceil(q * len(sorted_values)) - 1)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+def summarize(durations: List[float]) -> Optional[Dict[str, float]]:
+    if not durations:
+        return None
+    values = sorted(durations)
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values) * 1000, 3),
+        "p50": round(percentile(values, 0.50) * 1000, 3),
+        "p95": round(percentile(values, 0.95) * 1000, 3),
+        "p99": round(percentile(values, 0.99) * 1000, 3),
+        "max": round(values[-1] * 1000, 3),
+    }
+
+
+def max_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_scenario(args: argparse.Namespace, server: str, client: str, concurrency: int):
+    recorder = Recorder()
+    config = MockFacilitatorConfig(
+        latency=args.facilitator_latency,
+        settle_latency=args.settle_latency,
+        verify_signatures=args.verify_signatures,
+    )
+    account = Account.create()
+    drive = drive_httpx if client == "httpx" else drive_requests
+
+    def run(total: int) -> None:
+        if client == "httpx":
+            asyncio.run(drive(url, account, total, concurrency, recorder))
+        else:
+            drive(url, account, total, concurrency, recorder)
+
+    with MockFacilitatorServer(config) as facilitator:
+        app = load_example(server, args.examples_dir, facilitator.url)
+        restore = instrument(recorder)
+        try:
+            with ServerThread(server, app) as server_thread:
+                url = f"http://127.0.0.1:{server_thread.port}{args.path}"
+                run(args.warmup)
+                recorder.clear()
+                baseline_rss = max_rss_mb()
+
+                cpu_start = sum(os.times()[:2])
+                start = time.perf_counter()
+                run(args.requests)
+                elapsed = time.perf_counter() - start
+                cpu = sum(os.times()[:2]) - cpu_start
+        finally:
+            restore()
+
+    completed = len(recorder.phases["total"])
+    return {
+        "server": server,
+        "client": client,
+        "concurrency": concurrency,
+        "requests": args.requests,
+        "completed": completed,
+        "errors": recorder.errors,
+        "duration_s": round(elapsed, 3),
+        "rps": round(completed / elapsed, 2) if elapsed else None,
+        "latency_ms": {
+            phase: summarize(durations) for phase, durations in recorder.phases.items()
+        },
+        "cpu_ms_per_request": round(cpu / max(args.requests, 1) * 1000, 3),
+        "rss_mb": {"baseline": baseline_rss, "max": max_rss_mb()},
+    }
+
+
+def metadata(args: argparse.Namespace) -> Dict[str, Any]:
+    try:
+        from importlib.metadata import version
+
+        x402_version = version("x402")
+    except Exception:
+        x402_version = None
+    return {
+        "x402_version": x402_version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "requests": args.requests,
+        "warmup": args.warmup,
+        "path": args.path,
+        "facilitator_latency": args.facilitator_latency_spec,
+        "settle_latency": args.settle_latency_spec,
+        "verify_signatures": args.verify_signatures,
+    }
+
+
+def run_in_subprocess(
+    argv: List[str], server: str, client: str, concurrency: int
+) -> Dict[str, Any]:
+    scenario = f"{server}:{client}:{concurrency}"
+    completed = subprocess.run(
+        [sys.executable, __file__, *argv, "--scenario", scenario],
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        return {
+            "server": server,
+            "client": client,
+            "concurrency": concurrency,
+            "error": completed.stderr.strip().splitlines()[-1:],
+        }
+    return json.loads(completed.stdout)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--servers", default="fastapi,flask")
+    parser.add_argument("--clients", default="httpx,requests")
+    parser.add_argument(
+        "--concurrency", default="1,8", help="comma separated concurrency levels"
+    )
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--path", default="/weather")
+    parser.add_argument(
+        "--facilitator-latency",
+        dest="facilitator_latency_spec",
+        default="fixed:5",
+        help="mock facilitator latency spec, see x402.testing.facilitator",
+    )
+    parser.add_argument("--settle-latency", dest="settle_latency_spec", default=None)
+    parser.add_argument(
+        "--no-verify-signatures", dest="verify_signatures", action="store_false"
+    )
+    parser.add_argument("--examples-dir", type=Path, default=EXAMPLES_DIR)
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument(
+        "--in-process",
+        action="store_true",
+        help="run every scenario in this process instead of one subprocess each",
+    )
+    parser.add_argument("--scenario", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    args.facilitator_latency = Latency.parse(args.facilitator_latency_spec)
+    args.settle_latency = (
+        Latency.parse(args.settle_latency_spec) if args.settle_latency_spec else None
+    )
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    args = parse_args(argv)
+
+    if args.scenario:
+        server, client, concurrency = args.scenario.split(":")
+        # Keep stdout for the result, the example servers log to it
+        logging.getLogger("werkzeug").setLevel(logging.WARNING)
+        with contextlib.redirect_stdout(sys.stderr):
+            result = run_scenario(args, server, client, int(concurrency))
+        print(json.dumps(result))
+        return
+
+    results = []
+    for server in args.servers.split(","):
+        for client in args.clients.split(","):
+            for concurrency in map(int, args.concurrency.split(",")):
+                if args.in_process:
+                    result = run_scenario(args, server, client, concurrency)
+                else:
+                    result = run_in_subprocess(argv, server, client, concurrency)
+                results.append(result)
+                total = (result.get("latency_ms") or {}).get("total") or {}
+                print(
+                    f"{server:>8} {client:>9} c={concurrency:<3} "
+                    f"{result.get('rps')} rps, p50 {total.get('p50')} ms, "
+                    f"p99 {total.get('p99')} ms, errors {result.get('errors')}",
+                    file=sys.stderr,
+                )
+
+    report = json.dumps({"meta": metadata(args), "results": results}, indent=2)
+    if args.output:
+        args.output.write_text(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
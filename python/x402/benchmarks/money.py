@@ -0,0 +1,77 @@
+"""Benchmark converting money amounts to atomic token units.
+
+Compares the original Decimal based conversion with x402.money.parse_amount,
+with its cache cold and warm, and converts a price catalog with parse_amounts.
+Catalog prices are drawn from a limited set, as real price lists repeat.
+
+Usage:
+    python benchmarks/money.py [--iterations N] [--catalog-size N]
+"""
+
+import argparse
+import random
+import time
+from decimal import Decimal
+from typing import Callable, List
+
+from x402.money import _parse_cached, parse_amount, parse_amounts
+
+DECIMALS = 6
+
+
+def legacy_parse(amount: str, decimals: int) -> int:
+    if amount.startswith("$"):
+        amount = amount[1:]
+    return int(Decimal(amount) * Decimal(10**decimals))
+
+
+def catalog(size: int) -> List[str]:
+    rng = random.Random(402)
+    prices = [f"${rng.randrange(1, 100000) / 100:.2f}" for _ in range(2000)]
+    return [rng.choice(prices) for _ in range(size)]
+
+
+def us_per_op(fn: Callable[[], object], iterations: int) -> float:
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter_ns() - start) / iterations / 1000
+
+
+def main(iterations: int, catalog_size: int) -> None:
+    amount = "$0.01"
+    print(
+        f"{'legacy Decimal':<28} "
+        f"{us_per_op(lambda: legacy_parse(amount, DECIMALS), iterations):>8.2f} us/op"
+    )
+
+    def cold():
+        _parse_cached.cache_clear()
+        parse_amount(amount, DECIMALS)
+
+    print(f"{'parse_amount, cold cache':<28} {us_per_op(cold, iterations):>8.2f} us/op")
+    print(
+        f"{'parse_amount, warm cache':<28} "
+        f"{us_per_op(lambda: parse_amount(amount, DECIMALS), iterations):>8.2f} us/op"
+    )
+
+    prices = catalog(catalog_size)
+    assert parse_amounts(prices, DECIMALS) == [
+        legacy_parse(price, DECIMALS) for price in prices
+    ]
+    for name, fn in [
+        ("legacy Decimal", lambda: [legacy_parse(p, DECIMALS) for p in prices]),
+        ("parse_amounts", lambda: parse_amounts(prices, DECIMALS)),
+    ]:
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        print(f"{name + f' x {catalog_size}':<28} {elapsed * 1000:>8.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=100000)
+    parser.add_argument("--catalog-size", type=int, default=50000)
+    args = parser.parse_args()
+    main(args.iterations, args.catalog_size)
@@ -0,0 +1,128 @@
+"""Benchmark X-PAYMENT header encoding and decoding.
+
+Compares the original encode_payment/decode_payment implementation (json with a
+default hook, round-tripped through str) with the current one, on the standard
+library json module and on orjson when installed, and the compact binary encoding.
+Reports header sizes, ns/op and the peak memory traced by tracemalloc while
+running a single operation.
+
+Usage:
+    python benchmarks/payment_codec.py [--iterations N]
+"""
+
+import argparse
+import json
+import secrets
+import time
+import tracemalloc
+from typing import Any, Callable, Dict
+
+from x402 import encoding
+from x402.encoding import safe_base64_decode, safe_base64_encode
+from x402.exact import decode_payment, encode_payment, encode_payment_compact
+
+
+def legacy_encode_payment(payment_payload: Dict[str, Any]) -> str:
+    from hexbytes import HexBytes
+
+    def default(obj):
+        if isinstance(obj, HexBytes):
+            return obj.hex()
+        if hasattr(obj, "to_dict"):
+            return obj.to_dict()
+        if hasattr(obj, "hex"):
+            return obj.hex()
+        raise TypeError(
+            f"Object of type {obj.__class__.__name__} is not JSON serializable"
+        )
+
+    return safe_base64_encode(json.dumps(payment_payload, default=default))
+
+
+def legacy_decode_payment(encoded_payment: str) -> Dict[str, Any]:
+    return json.loads(safe_base64_decode(encoded_payment))
+
+
+def sample_payload() -> Dict[str, Any]:
+    return {
+        "x402Version": 1,
+        "scheme": "exact",
+        "network": "base-sepolia",
+        "payload": {
+            "signature": f"0x{secrets.token_hex(65)}",
+            "authorization": {
+                "from": "0x857b06519E91e3A54538791bDbb0E22373e36b66",
+                "to": "0x209693Bc6afc0C5328bA36FaF03C514EF312287C",
+                "value": "10000",
+                "validAfter": "1740672089",
+                "validBefore": "1740672154",
+                "nonce": f"0x{secrets.token_hex(32)}",
+            },
+        },
+    }
+
+
+def ns_per_op(fn: Callable[[], object], iterations: int) -> float:
+    for _ in range(min(iterations, 1000)):
+        fn()
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter_ns() - start) / iterations
+
+
+def peak_bytes_per_op(fn: Callable[[], object]) -> int:
+    fn()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - baseline
+
+
+def report(name: str, fn: Callable[[], object], iterations: int) -> None:
+    print(
+        f"{name:<28} {ns_per_op(fn, iterations):>10.0f} ns/op "
+        f"{peak_bytes_per_op(fn):>8} peak bytes/op"
+    )
+
+
+def main(iterations: int) -> None:
+    payload = sample_payload()
+    header = encode_payment(payload)
+    compact_header = encode_payment_compact(payload)
+    assert legacy_decode_payment(header) == decode_payment(header) == payload
+    assert decode_payment(compact_header) == payload
+
+    print(f"legacy header: {len(legacy_encode_payment(payload))} bytes")
+    print(f"json header:   {len(header)} bytes")
+    print(f"compact header: {len(compact_header)} bytes")
+
+    report("legacy encode", lambda: legacy_encode_payment(payload), iterations)
+    report("legacy decode", lambda: legacy_decode_payment(header), iterations)
+
+    orjson = encoding.orjson
+    backends = [("json", None)] + ([("orjson", orjson)] if orjson else [])
+    for name, module in backends:
+        encoding.orjson = module
+        report(f"encode_payment ({name})", lambda: encode_payment(payload), iterations)
+        report(f"decode_payment ({name})", lambda: decode_payment(header), iterations)
+    encoding.orjson = orjson
+
+    report(
+        "encode_payment (compact)", lambda: encode_payment_compact(payload), iterations
+    )
+    report(
+        "decode_payment (compact)", lambda: decode_payment(compact_header), iterations
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=100000)
+    args = parser.parse_args()
+    main(args.iterations)
@@ -0,0 +1,100 @@
+"""Benchmark per-request payment requirements handling in the server middlewares.
+
+Compares building the requirements on every request, as the middlewares did
+before, with a PaymentRequirementsTemplate compiled at registration. Each
+iteration renders a 402 body, selects the requirements matching a payment and
+produces the pydantic model exposed to handlers, for a configured resource and
+for one taken from the request URL. Reports us/request.
+
+Usage:
+    python benchmarks/payment_requirements.py [--iterations N]
+"""
+
+import argparse
+import time
+from typing import Callable
+
+from x402.common import x402_VERSION
+from x402.encoding import json_dumps
+from x402.templates import PaymentRequirementsTemplate
+from x402.types import PaymentRequirements
+from x402.wire import WirePaymentRequirements
+
+CONFIG = {
+    "scheme": "exact",
+    "network": "base-sepolia",
+    "asset": "0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+    "max_amount_required": "10000",
+    "description": "Weather report",
+    "mime_type": "application/json",
+    "pay_to": "0x209693Bc6afc0C5328bA36FaF03C514EF312287C",
+    "max_timeout_seconds": 60,
+    "output_schema": {},
+    "extra": {"name": "USDC", "version": "2"},
+}
+RESOURCE = "https://api.example.com/weather"
+REQUEST_URL = "https://api.example.com/weather?city=paris"
+
+
+def per_request(resource: str) -> Callable[[], object]:
+    def request():
+        payment_requirements = [WirePaymentRequirements(resource=resource, **CONFIG)]
+        body = json_dumps(
+            {
+                "x402Version": x402_VERSION,
+                "accepts": [req.to_dict() for req in payment_requirements],
+                "error": "No X-PAYMENT header provided",
+            }
+        )
+        selected = next(
+            req
+            for req in payment_requirements
+            if req.scheme == "exact" and req.network == "base-sepolia"
+        )
+        return body, selected, selected.to_model()
+
+    return request
+
+
+def templated(template: PaymentRequirementsTemplate, resource: str):
+    def request():
+        body = template.payment_required_body(resource, "No X-PAYMENT header provided")
+        index = template.select("exact", "base-sepolia")
+        return (
+            body,
+            template.requirements(index, resource),
+            template.model(index, resource),
+        )
+
+    return request
+
+
+def us_per_op(fn: Callable[[], object], iterations: int) -> float:
+    for _ in range(min(iterations, 1000)):
+        fn()
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter_ns() - start) / iterations / 1000
+
+
+def main(iterations: int) -> None:
+    static = PaymentRequirementsTemplate(
+        [PaymentRequirements(resource=RESOURCE, **CONFIG)]
+    )
+    dynamic = PaymentRequirementsTemplate([PaymentRequirements(resource="", **CONFIG)])
+    cases = [
+        ("per-request, resource", per_request(RESOURCE)),
+        ("template, resource", templated(static, RESOURCE)),
+        ("per-request, request URL", per_request(REQUEST_URL)),
+        ("template, request URL", templated(dynamic, REQUEST_URL)),
+    ]
+    for name, fn in cases:
+        print(f"{name:<26} {us_per_op(fn, iterations):>8.2f} us/request")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50000)
+    args = parser.parse_args()
+    main(args.iterations)
@@ -0,0 +1,140 @@
+"""Benchmark per-request protocol object handling in the server middlewares.
+
+Compares the pydantic models in x402.types with the slotted x402.wire types on
+the work a middleware does for one paid request: building the payment
+requirements, validating the decoded X-PAYMENT payload, serialising both for the
+facilitator, validating its verify and settle responses and encoding the
+X-PAYMENT-RESPONSE header. Reports ns/op, peak traced bytes/op and the memory
+retained by one set of objects.
+
+Usage:
+    python benchmarks/protocol_objects.py [--iterations N]
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import Any, Callable, Dict
+
+from x402.encoding import json_dumps
+from x402.types import (
+    PaymentPayload,
+    PaymentRequirements,
+    SettleResponse,
+    VerifyResponse,
+)
+from x402.wire import (
+    WirePaymentPayload,
+    WirePaymentRequirements,
+    WireSettleResponse,
+    WireVerifyResponse,
+)
+
+REQUIREMENTS = {
+    "scheme": "exact",
+    "network": "base-sepolia",
+    "asset": "0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+    "max_amount_required": "10000",
+    "resource": "https://api.example.com/weather",
+    "description": "Weather report",
+    "mime_type": "application/json",
+    "pay_to": "0x209693Bc6afc0C5328bA36FaF03C514EF312287C",
+    "max_timeout_seconds": 60,
+    "output_schema": {},
+    "extra": {"name": "USDC", "version": "2"},
+}
+PAYMENT = {
+    "x402Version": 1,
+    "scheme": "exact",
+    "network": "base-sepolia",
+    "payload": {
+        "signature": "0x" + "11" * 65,
+        "authorization": {
+            "from": "0x857b06519E91e3A54538791bDbb0E22373e36b66",
+            "to": "0x209693Bc6afc0C5328bA36FaF03C514EF312287C",
+            "value": "10000",
+            "validAfter": "1740672089",
+            "validBefore": "1740672154",
+            "nonce": "0x" + "22" * 32,
+        },
+    },
+}
+VERIFY = {"isValid": True, "invalidReason": None, "payer": "0x857b0651"}
+SETTLE = {"success": True, "transaction": "0x" + "33" * 32, "network": "base-sepolia"}
+
+
+def pydantic_request() -> Dict[str, Any]:
+    requirements = PaymentRequirements(**REQUIREMENTS)
+    payment = PaymentPayload(**PAYMENT)
+    body = {
+        "paymentPayload": payment.model_dump(by_alias=True),
+        "paymentRequirements": requirements.model_dump(by_alias=True),
+    }
+    verify = VerifyResponse(**VERIFY)
+    settle = SettleResponse(**SETTLE)
+    header = settle.model_dump_json().encode("utf-8")
+    return {"objects": (requirements, payment, verify, settle), "out": (body, header)}
+
+
+def wire_request() -> Dict[str, Any]:
+    requirements = WirePaymentRequirements(**REQUIREMENTS)
+    payment = WirePaymentPayload.from_dict(PAYMENT)
+    body = {
+        "paymentPayload": payment.to_dict(),
+        "paymentRequirements": requirements.to_dict(),
+    }
+    verify = WireVerifyResponse.from_dict(VERIFY)
+    settle = WireSettleResponse.from_dict(SETTLE)
+    header = json_dumps(settle.to_dict())
+    # The middlewares expose pydantic models to handlers
+    state = (requirements.to_model(), verify.to_model())
+    return {
+        "objects": (requirements, payment, verify, settle),
+        "out": (body, header, state),
+    }
+
+
+def ns_per_op(fn: Callable[[], object], iterations: int) -> float:
+    for _ in range(min(iterations, 1000)):
+        fn()
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter_ns() - start) / iterations
+
+
+def traced_bytes(fn: Callable[[], Any]) -> tuple[int, int]:
+    """Return peak bytes while running fn and bytes retained by its objects."""
+    fn()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = fn()["objects"]
+        retained, peak = tracemalloc.get_traced_memory()
+        del result
+    finally:
+        tracemalloc.stop()
+    return peak - baseline, retained - baseline
+
+
+def report(name: str, fn: Callable[[], Any], iterations: int) -> None:
+    peak, retained = traced_bytes(fn)
+    print(
+        f"{name:<10} {ns_per_op(fn, iterations) / 1000:>8.1f} us/request "
+        f"{peak:>8} peak bytes {retained:>6} retained bytes"
+    )
+
+
+def main(iterations: int) -> None:
+    report("pydantic", pydantic_request, iterations)
+    report("wire", wire_request, iterations)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+    main(args.iterations)
@@ -0,0 +1,67 @@
+"""Benchmark secp256k1 backends used for payment signing and signer recovery.
+
+Reports signs/sec and recovers/sec for every available backend, plus
+eth_account's own unsafe_sign_hash as a baseline.
+
+Usage:
+    python benchmarks/secp256k1.py [--seconds S]
+"""
+
+import argparse
+import secrets
+import time
+from typing import Callable
+
+from eth_account import Account
+
+from x402.secp256k1 import CoincurveBackend, EthKeysBackend, public_key_to_address
+
+
+def ops_per_second(fn: Callable[[], object], seconds: float) -> float:
+    for _ in range(10):
+        fn()
+    count = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(20):
+            fn()
+        count += 20
+    return count / (time.perf_counter() - start)
+
+
+def main(seconds: float) -> None:
+    account = Account.create()
+    private_key = bytes(account.key)
+    digest = secrets.token_bytes(32)
+    signature = bytes(account.unsafe_sign_hash(digest).signature)
+
+    backends = [
+        EthKeysBackend("eth_keys.backends.NativeECCBackend"),
+        EthKeysBackend(),
+    ]
+    try:
+        backends.append(CoincurveBackend())
+    except ImportError:
+        print("coincurve not installed, skipping its backend")
+
+    print(f"{'backend':<36} {'signs/sec':>12} {'recovers/sec':>14}")
+    baseline = ops_per_second(lambda: account.unsafe_sign_hash(digest), seconds)
+    print(f"{'eth_account unsafe_sign_hash':<36} {baseline:>12,.0f} {'-':>14}")
+    for backend in backends:
+        key = backend.load_private_key(private_key)
+        signs = ops_per_second(lambda: backend.sign_digest(key, digest), seconds)
+        recovers = ops_per_second(
+            lambda: public_key_to_address(
+                backend.recover_public_key(digest, signature)
+            ),
+            seconds,
+        )
+        print(f"{backend.name:<36} {signs:>12,.0f} {recovers:>14,.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+    main(args.seconds)
@@ -0,0 +1,138 @@
+"""Benchmark the cross-worker shared cache against per-process caches.
+
+Simulates a server with N worker processes behind a load balancer that spreads
+requests at random. Each payment is presented a few times (a first attempt and
+client retries). Reports the hit rate of retries with a per-process dict, as
+every worker would keep on its own, and with one SharedCache file, then the
+CPU cost of shared lookups and stores and their combined throughput while all
+workers hammer the same file.
+
+Usage:
+    python benchmarks/shared_cache.py [--workers 16] [--payments N] [--ops N]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+from x402.sharedcache import SharedCache
+
+SLOTS = 1 << 18
+VALUE = b'{"isValid":true,"invalidReason":null,"payer":"0x' + b"0" * 40 + b'"}'
+
+
+def schedule(workers: int, payments: int, attempts: int) -> List[List[List[bytes]]]:
+    """Assign every attempt of every payment to a random worker, by round."""
+    rng = random.Random(402)
+    rounds = [[[] for _ in range(workers)] for _ in range(attempts)]
+    for payment in range(payments):
+        key = b"payment-%d" % payment
+        for attempt in range(attempts):
+            rounds[attempt][rng.randrange(workers)].append(key)
+    return rounds
+
+
+def hit_rate_worker(path, shared, rounds, index, barrier, results) -> None:
+    cache = SharedCache(path, slots=SLOTS) if shared else None
+    local: Dict[bytes, bytes] = {}
+    hits = lookups = 0
+    for number, keys in enumerate(rounds):
+        barrier.wait()
+        for key in keys[index]:
+            value = cache.get(key) if shared else local.get(key)
+            if number:
+                lookups += 1
+                hits += value is not None
+            if value is None:
+                if shared:
+                    cache.set(key, VALUE, ttl=60)
+                else:
+                    local[key] = VALUE
+    results.put((hits, lookups))
+
+
+def timing_worker(path, ops, keys, barrier, results) -> None:
+    rng = random.Random(os.getpid())
+    cache = SharedCache(path, slots=SLOTS)
+    sample = [rng.choice(keys) for _ in range(ops)]
+    misses = [b"miss-%d-%d" % (os.getpid(), i) for i in range(ops)]
+    barrier.wait()
+
+    timings = []
+    for operation, operation_keys in (
+        (cache.get, sample),
+        (cache.get, misses),
+        (lambda key: cache.add(key, VALUE, ttl=60), misses),
+    ):
+        wall, cpu = time.perf_counter(), time.process_time()
+        for key in operation_keys:
+            operation(key)
+        timings.append((time.perf_counter() - wall, time.process_time() - cpu))
+    results.put(timings)
+
+
+def run(target, workers: int, args_for) -> List[Tuple]:
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=target, args=args_for(index) + (barrier, results))
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return collected
+
+
+def main(workers: int, payments: int, attempts: int, ops: int) -> None:
+    rounds = schedule(workers, payments, attempts)
+    print(
+        f"{workers} workers, {payments} payments x {attempts} attempts, "
+        f"{os.cpu_count()} CPUs"
+    )
+    with tempfile.TemporaryDirectory(
+        dir="/dev/shm" if os.path.isdir("/dev/shm") else None
+    ) as directory:
+        for shared in (False, True):
+            path = os.path.join(directory, f"hits-{shared}")
+            SharedCache(path, slots=SLOTS).close()
+            counts = run(
+                hit_rate_worker,
+                workers,
+                lambda index: (path, shared, rounds, index),
+            )
+            hits = sum(hit for hit, _ in counts)
+            lookups = sum(lookup for _, lookup in counts)
+            name = "shared mmap" if shared else "per-process dict"
+            print(f"{name:<18} retry hit rate {hits / lookups:7.1%}")
+
+        path = os.path.join(directory, "timing")
+        keys = [b"payment-%d" % payment for payment in range(payments)]
+        with SharedCache(path, slots=SLOTS) as cache:
+            for key in keys:
+                cache.set(key, VALUE, ttl=600)
+        timings = run(timing_worker, workers, lambda index: (path, ops, keys))
+        for column, name in enumerate(("get (hit)", "get (miss)", "add")):
+            wall = max(timing[column][0] for timing in timings)
+            cpu = sum(timing[column][1] for timing in timings)
+            print(
+                f"{name:<18} {cpu / (workers * ops) * 1e6:7.2f} us CPU/op, "
+                f"{workers * ops / wall / 1000:8.1f}k ops/s across workers"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--payments", type=int, default=20000)
+    parser.add_argument("--attempts", type=int, default=2)
+    parser.add_argument("--ops", type=int, default=20000)
+    args = parser.parse_args()
+    main(args.workers, args.payments, args.attempts, args.ops)
@@ -0,0 +1,134 @@
+"""Benchmark EIP-3009 payment signing throughput.
+
+Compares eth_account's generic typed data signing with the specialised
+TransferWithAuthorization encoder in x402.exact, reporting operations/sec for
+hashing alone and for hashing plus signing. Batch signing is then measured
+in-process and across a signing process pool.
+
+Usage:
+    python benchmarks/signing.py [--seconds S] [--batch N] [--processes P]
+"""
+
+import argparse
+import secrets
+import time
+from typing import Callable
+
+from eth_account import Account
+from eth_account.messages import encode_typed_data
+
+from x402.clients.base import x402Client
+from x402.exact import (
+    create_signing_pool,
+    get_domain_separator,
+    hash_transfer_with_authorization,
+)
+from x402.types import PaymentRequirements
+
+ASSET = "0x036CbD53842c5426634e7929541eC2318f3dCF7e"
+PAY_TO = "0x209693Bc6afc0C5328bA36FaF03C514EF312287C"
+
+DOMAIN = {
+    "name": "USDC",
+    "version": "2",
+    "chainId": 84532,
+    "verifyingContract": ASSET,
+}
+TYPES = {
+    "TransferWithAuthorization": [
+        {"name": "from", "type": "address"},
+        {"name": "to", "type": "address"},
+        {"name": "value", "type": "uint256"},
+        {"name": "validAfter", "type": "uint256"},
+        {"name": "validBefore", "type": "uint256"},
+        {"name": "nonce", "type": "bytes32"},
+    ]
+}
+
+
+def ops_per_second(fn: Callable[[], object], seconds: float) -> float:
+    for _ in range(10):
+        fn()
+    count = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(20):
+            fn()
+        count += 20
+    return count / (time.perf_counter() - start)
+
+
+def batch_headers_per_second(
+    client: x402Client, batch: list[PaymentRequirements], executor=None
+) -> float:
+    start = time.perf_counter()
+    results = client.create_payment_headers(batch, executor=executor)
+    elapsed = time.perf_counter() - start
+    assert all(isinstance(result, str) for result in results)
+    return len(batch) / elapsed
+
+
+def main(seconds: float, batch_size: int, processes: int | None) -> None:
+    account = Account.create()
+    nonce = secrets.token_bytes(32)
+    message = {
+        "from": account.address,
+        "to": PAY_TO,
+        "value": 10000,
+        "validAfter": 1700000000,
+        "validBefore": 1700000600,
+        "nonce": nonce,
+    }
+
+    def fast_digest() -> bytes:
+        return hash_transfer_with_authorization(
+            get_domain_separator("USDC", "2", 84532, ASSET),
+            account.address,
+            PAY_TO,
+            10000,
+            1700000000,
+            1700000600,
+            nonce,
+        )
+
+    results = {
+        "typed data hash": lambda: encode_typed_data(DOMAIN, TYPES, message),
+        "fast hash": fast_digest,
+        "typed data sign": lambda: account.sign_typed_data(DOMAIN, TYPES, message),
+        "fast hash + sign": lambda: account.unsafe_sign_hash(fast_digest()),
+    }
+    for name, fn in results.items():
+        print(f"{name:<20} {ops_per_second(fn, seconds):>10,.0f} ops/sec")
+
+    client = x402Client(account)
+    batch = [
+        PaymentRequirements(
+            scheme="exact",
+            network="base-sepolia",
+            asset=ASSET,
+            pay_to=PAY_TO,
+            max_amount_required="10000",
+            resource="https://example.com",
+            description="",
+            mime_type="",
+            max_timeout_seconds=60,
+            extra={"name": "USDC", "version": "2"},
+        )
+    ] * batch_size
+    inline = batch_headers_per_second(client, batch)
+    print(f"{'batch in-process':<20} {inline:>10,.0f} headers/sec")
+    with create_signing_pool(account, processes) as executor:
+        # Warm up the workers so process start-up is not measured
+        client.create_payment_headers(batch[:256], executor=executor)
+        pooled = batch_headers_per_second(client, batch, executor)
+    print(f"{'batch process pool':<20} {pooled:>10,.0f} headers/sec")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--batch", type=int, default=4000)
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+    main(args.seconds, args.batch, args.processes)
@@ -1,2 +1,47 @@
+from importlib import import_module
+from typing import Any
+
+# Submodules are imported on first attribute access, so `import x402` stays cheap
+# and e.g. x402.encoding does not pull in the web frameworks or eth_account
+_SUBMODULES = frozenset(
+    {
+        "aggregates",
+        "chains",
+        "clients",
+        "common",
+        "encoding",
+        "events",
+        "exact",
+        "facilitator",
+        "fastapi",
+        "flask",
+        "gate",
+        "gateway",
+        "journal",
+        "metrics",
+        "money",
+        "networks",
+        "path",
+        "registry",
+        "secp256k1",
+        "sharedcache",
+        "templates",
+        "testing",
+        "types",
+        "wire",
+    }
+)
+
+
 def hello() -> str:
     return "Hello from x402!"
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _SUBMODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return import_module(f"{__name__}.{name}")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | _SUBMODULES)
@@ -0,0 +1,352 @@
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+
+from x402.events import SETTLED, EventBus, PaymentEvent
+
+# Rolling revenue and usage aggregates of settled payments.
+#
+# Totals are kept per route, payer and network in a ring of fixed-size time
+# buckets. Each bucket cell holds a count, amounts per asset in atomic units
+# and a latency histogram with logarithmic bins, so cells from several worker
+# processes can be merged by adding them.
+
+DIMENSIONS = ("route", "payer", "network")
+
+# Latency bin i holds durations up to _LATENCY_MIN_MS * _LATENCY_GROWTH ** i,
+# so percentiles are accurate to within 10%
+_LATENCY_MIN_MS = 0.1
+_LATENCY_GROWTH = 1.1
+_LATENCY_BINS = 150
+
+
+def _latency_bin(seconds: float) -> int:
+    ms = seconds * 1000
+    if ms <= _LATENCY_MIN_MS:
+        return 0
+    index = math.ceil(math.log(ms / _LATENCY_MIN_MS, _LATENCY_GROWTH))
+    return min(index, _LATENCY_BINS)
+
+
+def _bin_upper_ms(index: int) -> float:
+    return _LATENCY_MIN_MS * _LATENCY_GROWTH**index
+
+
+class _Cell:
+    """Totals of one key in one time bucket."""
+
+    __slots__ = ("count", "amounts", "latency")
+
+    def __init__(self):
+        self.count = 0
+        self.amounts: Dict[str, int] = {}
+        self.latency: Dict[int, int] = {}
+
+    def add(self, asset: str, amount: int, latency: Optional[float]) -> None:
+        self.count += 1
+        self.amounts[asset] = self.amounts.get(asset, 0) + amount
+        if latency is not None:
+            index = _latency_bin(latency)
+            self.latency[index] = self.latency.get(index, 0) + 1
+
+    def merge(self, other: "_Cell") -> None:
+        self.count += other.count
+        for asset, amount in other.amounts.items():
+            self.amounts[asset] = self.amounts.get(asset, 0) + amount
+        for index, count in other.latency.items():
+            self.latency[index] = self.latency.get(index, 0) + count
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            # Amounts can exceed the integers JSON parsers handle exactly
+            "amounts": {asset: str(amount) for asset, amount in self.amounts.items()},
+            "latency": {str(index): count for index, count in self.latency.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "_Cell":
+        cell = cls()
+        cell.count = int(data["count"])
+        cell.amounts = {asset: int(amount) for asset, amount in data["amounts"].items()}
+        cell.latency = {
+            min(int(index), _LATENCY_BINS): int(count)
+            for index, count in data.get("latency", {}).items()
+        }
+        return cell
+
+    def percentile_ms(self, q: float) -> Optional[float]:
+        total = sum(self.latency.values())
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for index in sorted(self.latency):
+            seen += self.latency[index]
+            if seen >= rank:
+                return round(_bin_upper_ms(index), 3)
+        return None
+
+
+class _Bucket:
+    __slots__ = ("epoch", "cells")
+
+    def __init__(self, epoch: int):
+        self.epoch = epoch
+        self.cells: Dict[str, Dict[str, _Cell]] = {
+            dimension: {} for dimension in DIMENSIONS
+        }
+
+
+def _url_path(resource: str) -> str:
+    return urlsplit(resource).path or "/"
+
+
+class PaymentAggregates:
+    """Rolling per-route, per-payer and per-network settlement totals.
+
+    Settlements are added to the time bucket of their timestamp. The ring
+    keeps `buckets` buckets of `bucket_seconds` each, so totals cover at most
+    the last buckets * bucket_seconds seconds and memory does not grow with
+    traffic beyond the number of distinct keys per bucket.
+
+    Feed it from a middleware's EventBus with subscribe(). Aggregates of
+    several worker processes combine with merge() over their snapshot()s:
+
+        combined = PaymentAggregates.merged([worker1_snapshot, worker2_snapshot])
+        combined.query("route")
+    """
+
+    def __init__(
+        self,
+        bucket_seconds: int = 60,
+        buckets: int = 60,
+        route: Optional[Callable[[str], str]] = None,
+    ):
+        """Initialize the aggregates.
+
+        Args:
+            bucket_seconds: Width of a time bucket
+            buckets: Number of buckets kept
+            route: Optional function mapping a resource URL to its route, e.g.
+                collapsing "/items/42" to "/items/{id}". Defaults to the URL path.
+        """
+        if bucket_seconds < 1 or buckets < 1:
+            raise ValueError("bucket_seconds and buckets must be positive")
+        self.bucket_seconds = int(bucket_seconds)
+        self.buckets = int(buckets)
+        self.route = route or _url_path
+        self._ring: List[Optional[_Bucket]] = [None] * self.buckets
+        self._lock = threading.Lock()
+
+    def _bucket(self, epoch: int) -> Optional[_Bucket]:
+        """Return the bucket of an epoch for writing, or None if it is too old."""
+        slot = epoch % self.buckets
+        bucket = self._ring[slot]
+        if bucket is None or bucket.epoch < epoch:
+            bucket = self._ring[slot] = _Bucket(epoch)
+        elif bucket.epoch > epoch:
+            return None
+        return bucket
+
+    def add(
+        self,
+        route: str,
+        payer: str,
+        network: str,
+        asset: str,
+        amount: int,
+        latency: Optional[float] = None,
+        timestamp: Optional[float] = None,
+    ) -> None:
+        """Add a settlement.
+
+        Args:
+            route: Route the payment was for
+            payer: Paying address
+            network: Network the payment settled on
+            asset: Token contract address
+            amount: Amount in atomic token units
+            latency: Optional seconds the request took
+            timestamp: Unix time of the settlement. Defaults to now.
+        """
+        epoch = int((time.time() if timestamp is None else timestamp)) // (
+            self.bucket_seconds
+        )
+        keys = (route, payer.lower(), network)
+        asset = asset.lower()
+        with self._lock:
+            bucket = self._bucket(epoch)
+            if bucket is None:
+                return
+            for dimension, key in zip(DIMENSIONS, keys):
+                cells = bucket.cells[dimension]
+                cell = cells.get(key)
+                if cell is None:
+                    cell = cells[key] = _Cell()
+                cell.add(asset, amount, latency)
+
+    def record_event(self, event: PaymentEvent) -> None:
+        """EventBus subscriber adding settled events."""
+        if event.type != SETTLED or event.requirements is None:
+            return
+        requirements = event.requirements
+        self.add(
+            route=self.route(event.resource),
+            payer=event.payer or "",
+            network=requirements.network,
+            asset=requirements.asset,
+            amount=int(requirements.max_amount_required),
+            latency=event.duration,
+            timestamp=event.timestamp,
+        )
+
+    def subscribe(self, events: EventBus):
+        """Aggregate the settled events of a bus.
+
+        Returns:
+            A function removing the subscription
+        """
+        return events.subscribe(self.record_event, types=[SETTLED])
+
+    def _live(self, now: Optional[float], window: Optional[float]) -> List[_Bucket]:
+        current = int(time.time() if now is None else now) // self.bucket_seconds
+        count = self.buckets
+        # Larger windows, including inf, cover every bucket kept
+        if window is not None and window < count * self.bucket_seconds:
+            count = max(1, math.ceil(window / self.bucket_seconds))
+        return [
+            bucket
+            for bucket in self._ring
+            if bucket is not None and current - count < bucket.epoch <= current
+        ]
+
+    def query(
+        self,
+        dimension: str,
+        window: Optional[float] = None,
+        now: Optional[float] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Return totals per key of a dimension.
+
+        Args:
+            dimension: "route", "payer" or "network"
+            window: Optional number of seconds to cover, rounded up to whole
+                buckets. Defaults to all buckets kept.
+            now: Unix time the window ends at. Defaults to now.
+
+        Returns:
+            A mapping of key to count, amounts per asset (as decimal strings)
+            and the p50 and p95 latency in milliseconds
+        """
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"Unknown dimension: {dimension}")
+        totals: Dict[str, _Cell] = {}
+        with self._lock:
+            for bucket in self._live(now, window):
+                for key, cell in bucket.cells[dimension].items():
+                    total = totals.get(key)
+                    if total is None:
+                        total = totals[key] = _Cell()
+                    total.merge(cell)
+        return {
+            key: {
+                "count": cell.count,
+                "amounts": {
+                    asset: str(amount) for asset, amount in cell.amounts.items()
+                },
+                "latency_p50_ms": cell.percentile_ms(0.5),
+                "latency_p95_ms": cell.percentile_ms(0.95),
+            }
+            for key, cell in sorted(totals.items())
+        }
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Return the live buckets in a JSON serialisable form for merge()."""
+        with self._lock:
+            return {
+                "bucket_seconds": self.bucket_seconds,
+                "buckets": [
+                    {
+                        "epoch": bucket.epoch,
+                        "cells": {
+                            dimension: {
+                                key: cell.to_dict() for key, cell in cells.items()
+                            }
+                            for dimension, cells in bucket.cells.items()
+                        },
+                    }
+                    for bucket in sorted(
+                        self._live(now, None), key=lambda bucket: bucket.epoch
+                    )
+                ],
+            }
+
+    def merge(self, snapshot: Mapping[str, Any]) -> None:
+        """Add the buckets of another instance's snapshot to this one.
+
+        Buckets older than the ones kept here are ignored.
+        """
+        if int(snapshot["bucket_seconds"]) != self.bucket_seconds:
+            raise ValueError("Cannot merge aggregates with different bucket sizes")
+        with self._lock:
+            for data in snapshot["buckets"]:
+                bucket = self._bucket(int(data["epoch"]))
+                if bucket is None:
+                    continue
+                for dimension in DIMENSIONS:
+                    cells = bucket.cells[dimension]
+                    for key, cell_data in data["cells"].get(dimension, {}).items():
+                        cell = _Cell.from_dict(cell_data)
+                        existing = cells.get(key)
+                        if existing is None:
+                            cells[key] = cell
+                        else:
+                            existing.merge(cell)
+
+    @classmethod
+    def merged(
+        cls, snapshots: Iterable[Mapping[str, Any]], buckets: int = 60
+    ) -> "PaymentAggregates":
+        """Combine the snapshots of several workers into new aggregates."""
+        snapshots = list(snapshots)
+        if not snapshots:
+            return cls(buckets=buckets)
+        aggregates = cls(bucket_seconds=snapshots[0]["bucket_seconds"], buckets=buckets)
+        for snapshot in snapshots:
+            aggregates.merge(snapshot)
+        return aggregates
+
+
+def query_params(
+    aggregates: PaymentAggregates, params: Mapping[str, str]
+) -> Tuple[int, Dict[str, Any]]:
+    """Answer an aggregates endpoint request from its query parameters.
+
+    Supported parameters are `dimension` (route, payer or network, default
+    route), `window` in seconds, and `snapshot=1` for the mergeable snapshot.
+
+    Returns:
+        HTTP status code and JSON body
+    """
+    if params.get("snapshot") in ("1", "true"):
+        return 200, aggregates.snapshot()
+    dimension = params.get("dimension", "route")
+    window = params.get("window")
+    try:
+        window_seconds = float(window) if window is not None else None
+        if window_seconds is not None and not (
+            window_seconds > 0 and math.isfinite(window_seconds)
+        ):
+            raise ValueError("window must be a positive number of seconds")
+        totals = aggregates.query(dimension, window_seconds)
+    except ValueError as e:
+        return 400, {"error": str(e)}
+    return 200, {
+        "dimension": dimension,
+        "window": window_seconds,
+        "bucket_seconds": aggregates.bucket_seconds,
+        "totals": totals,
+    }
@@ -1,8 +1,15 @@
+from x402.registry import BUILTIN_REGISTRY, get_registry
+
+# Built-in tables, kept for compatibility. Lookups go through the process-wide
+# registry in x402.registry, which also holds networks and tokens loaded from a
+# config file.
 NETWORK_TO_ID = {
-    "base-sepolia": "84532",
-    "base": "8453",
-    "avalanche-fuji": "43113",
-    "avalanche": "43114",
+    network: str(chain_id) for network, chain_id in BUILTIN_REGISTRY["networks"].items()
+}
+
+KNOWN_TOKENS = {
+    chain_id: [dict(token) for token in tokens]
+    for chain_id, tokens in BUILTIN_REGISTRY["tokens"].items()
 }
 
 
@@ -15,70 +22,19 @@ def get_chain_id(network: str) -> str:
         return network
     except ValueError:
         pass
-    if network not in NETWORK_TO_ID:
-        raise ValueError(f"Unsupported network: {network}")
-    return NETWORK_TO_ID[network]
-
-
-KNOWN_TOKENS = {
-    "84532": [
-        {
-            "human_name": "usdc",
-            "address": "0x036CbD53842c5426634e7929541eC2318f3dCF7e",
-            "name": "USDC",
-            "decimals": 6,
-            "version": "2",
-        }
-    ],
-    "8453": [
-        {
-            "human_name": "usdc",
-            "address": "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913",
-            "name": "USD Coin",  # needs to be exactly what is returned by name() on contract
-            "decimals": 6,
-            "version": "2",
-        }
-    ],
-    "43113": [
-        {
-            "human_name": "usdc",
-            "address": "0x5425890298aed601595a70AB815c96711a31Bc65",
-            "name": "USD Coin",
-            "decimals": 6,
-            "version": "2",
-        }
-    ],
-    "43114": [
-        {
-            "human_name": "usdc",
-            "address": "0xB97EF9Ef8734C71904D8002F8b6Bc66Dd9c48a6E",
-            "name": "USDC",
-            "decimals": 6,
-            "version": "2",
-        }
-    ],
-}
+    return str(get_registry().chain_id(network))
 
 
 def get_token_name(chain_id: str, address: str) -> str:
     """Get the token name for a given chain and address"""
-    for token in KNOWN_TOKENS[chain_id]:
-        if token["address"] == address:
-            return token["name"]
-    raise ValueError(f"Token not found for chain {chain_id} and address {address}")
+    return get_registry().token(chain_id, address).name
 
 
 def get_token_version(chain_id: str, address: str) -> str:
     """Get the token version for a given chain and address"""
-    for token in KNOWN_TOKENS[chain_id]:
-        if token["address"] == address:
-            return token["version"]
-    raise ValueError(f"Token not found for chain {chain_id} and address {address}")
+    return get_registry().token(chain_id, address).version
 
 
 def get_token_decimals(chain_id: str, address: str) -> int:
     """Get the token decimals for a given chain and address"""
-    for token in KNOWN_TOKENS[chain_id]:
-        if token["address"] == address:
-            return token["decimals"]
-    raise ValueError(f"Token not found for chain {chain_id} and address {address}")
+    return get_registry().token(chain_id, address).decimals
@@ -1,16 +1,41 @@
-from x402.clients.base import x402Client, decode_x_payment_response
-from x402.clients.httpx import (
-    x402_payment_hooks,
-    x402HttpxClient,
-)
-from x402.clients.requests import (
-    x402HTTPAdapter,
-    x402_http_adapter,
-    x402_requests,
-)
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+# Exports are imported on first access so that e.g. an httpx client does not pay
+# for importing requests, and the reverse
+
+if TYPE_CHECKING:
+    from x402.clients.base import Signer, x402Client, decode_x_payment_response
+    from x402.clients.cache import PaymentRequirementsCache
+    from x402.clients.presign import PresignedPaymentPool
+    from x402.clients.httpx import (
+        x402_payment_hooks,
+        x402HttpxClient,
+    )
+    from x402.clients.requests import (
+        x402HTTPAdapter,
+        x402_http_adapter,
+        x402_requests,
+    )
+
+_EXPORTS = {
+    "x402Client": "x402.clients.base",
+    "Signer": "x402.clients.base",
+    "PaymentRequirementsCache": "x402.clients.cache",
+    "PresignedPaymentPool": "x402.clients.presign",
+    "decode_x_payment_response": "x402.clients.base",
+    "x402_payment_hooks": "x402.clients.httpx",
+    "x402HttpxClient": "x402.clients.httpx",
+    "x402HTTPAdapter": "x402.clients.requests",
+    "x402_http_adapter": "x402.clients.requests",
+    "x402_requests": "x402.clients.requests",
+}
 
 __all__ = [
     "x402Client",
+    "Signer",
+    "PaymentRequirementsCache",
+    "PresignedPaymentPool",
     "decode_x_payment_response",
     "x402_payment_hooks",
     "x402HttpxClient",
@@ -18,3 +43,16 @@ __all__ = [
     "x402_http_adapter",
     "x402_requests",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -1,15 +1,49 @@
+import asyncio
 import time
-from typing import Optional, Callable, Dict, Any, List, Union
-from eth_account import Account
-from x402.exact import sign_payment_header
+from concurrent.futures import Executor
+from typing import (
+    TYPE_CHECKING,
+    Optional,
+    Awaitable,
+    Callable,
+    Dict,
+    Any,
+    List,
+    Mapping,
+    Protocol,
+    Sequence,
+    Tuple,
+    Union,
+    runtime_checkable,
+)
+from x402.clients.cache import PaymentRequirementsCache
+from x402.clients.presign import PresignedPaymentPool
+from x402.exact import (
+    PaymentHeader,
+    decode_payment,
+    encode_payment,
+    sign_payment_header,
+    sign_payment_headers,
+)
 from x402.types import (
     PaymentRequirements,
     UnsupportedSchemeException,
+    x402PaymentRequiredResponse,
 )
 from x402.common import x402_VERSION
+from x402.metrics import NULL_METRICS, MetricsHook
 import secrets
-from x402.encoding import safe_base64_decode
-import json
+from x402.encoding import (
+    COMPACT_PAYMENT_ENCODING,
+    JSON_PAYMENT_ENCODING,
+    PAYMENT_ENCODINGS_HEADER,
+    json_loads,
+    parse_payment_encodings,
+)
+import base64
+
+if TYPE_CHECKING:
+    from eth_account import Account
 
 # Define type for the payment requirements selector
 PaymentRequirementsType = Union[Dict[str, Any], PaymentRequirements]
@@ -19,6 +53,28 @@ PaymentSelectorCallable = Callable[
 ]
 
 
+@runtime_checkable
+class Signer(Protocol):
+    """Signs payment digests on behalf of x402Client without exposing a private key.
+
+    Implementations can keep the key in another process or device, see
+    x402.clients.remote_signer.UnixSocketSigner.
+    """
+
+    @property
+    def address(self) -> str:
+        """Checksummed address of the signing key."""
+        ...
+
+    def sign_hash(self, digest: bytes) -> bytes:
+        """Sign a 32-byte digest, returning a 65-byte r || s || v signature."""
+        ...
+
+
+# Async function creating a signed payment header for (requirements, x402_version)
+AsyncPaymentSigner = Callable[[PaymentRequirements, int], Awaitable[str]]
+
+
 def decode_x_payment_response(header: str) -> Dict[str, Any]:
     """Decode the X-PAYMENT-RESPONSE header.
 
@@ -32,9 +88,7 @@ def decode_x_payment_response(header: str) -> Dict[str, Any]:
         - network: str
         - payer: str (address)
     """
-    decoded = safe_base64_decode(header)
-    result = json.loads(decoded)
-    return result
+    return json_loads(base64.b64decode(header))
 
 
 class PaymentError(Exception):
@@ -66,19 +120,45 @@ class x402Client:
 
     def __init__(
         self,
-        account: Account,
+        account: Union["Account", Signer],
         max_value: Optional[int] = None,
         payment_requirements_selector: Optional[PaymentSelectorCallable] = None,
+        requirements_cache: Optional[PaymentRequirementsCache] = None,
+        presigned_pool: Optional[PresignedPaymentPool] = None,
+        signing_executor: Optional[Executor] = None,
+        async_signer: Optional[AsyncPaymentSigner] = None,
+        compact_payments: bool = True,
+        metrics: Optional[MetricsHook] = None,
     ):
         """Initialize the x402 client.
 
         Args:
-            account: eth_account.Account instance for signing payments
+            account: eth_account.Account instance or Signer for signing payments
             max_value: Optional maximum allowed payment amount in base units
             payment_requirements_selector: Optional custom selector for payment requirements
+            requirements_cache: Optional cache of 402 requirements. When set, repeat
+                calls to a known endpoint send X-PAYMENT on the first attempt.
+            presigned_pool: Optional pool of headers signed ahead of time in a
+                background thread for frequently paid requirements.
+            signing_executor: Optional executor acreate_payment_header signs in.
+                Defaults to the event loop's default executor.
+            async_signer: Optional async function acreate_payment_header awaits
+                instead of signing in an executor.
+            compact_payments: Whether to send compact X-PAYMENT headers to servers
+                that advertise support for them. JSON is used otherwise.
+            metrics: Optional hook receiving the duration of the 402 round trip,
+                signing and the paid retry, and the outcome of each payment.
         """
         self.account = account
         self.max_value = max_value
+        self.requirements_cache = requirements_cache
+        self.presigned_pool = presigned_pool
+        self.signing_executor = signing_executor
+        self.async_signer = async_signer
+        self.compact_payments = compact_payments
+        self.metrics = metrics or NULL_METRICS
+        if presigned_pool is not None:
+            presigned_pool.bind(self._sign_payment_header)
         self._payment_requirements_selector = (
             payment_requirements_selector or self.default_payment_requirements_selector
         )
@@ -166,17 +246,124 @@ class x402Client:
         self,
         payment_requirements: PaymentRequirements,
         x402_version: int = x402_VERSION,
+        encoding: str = JSON_PAYMENT_ENCODING,
     ) -> str:
         """Create a payment header for the given requirements.
 
         Args:
             payment_requirements: Selected payment requirements
             x402_version: x402 protocol version
+            encoding: Payment encoding, see select_payment_encoding
 
         Returns:
             Signed payment header
         """
-        unsigned_header = {
+        if self.presigned_pool is not None:
+            payment_header = self.presigned_pool.pop(payment_requirements, x402_version)
+            if payment_header is not None:
+                return self._reencode_payment_header(payment_header, encoding)
+
+        return self._sign_payment_header(payment_requirements, x402_version, encoding)
+
+    def _sign_payment_header(
+        self,
+        payment_requirements: PaymentRequirements,
+        x402_version: int = x402_VERSION,
+        encoding: str = JSON_PAYMENT_ENCODING,
+    ) -> str:
+        """Sign a new payment header with a fresh nonce and validity window.
+
+        Args:
+            payment_requirements: Selected payment requirements
+            x402_version: x402 protocol version
+            encoding: Payment encoding
+
+        Returns:
+            Signed payment header
+        """
+        return sign_payment_header(
+            self.account,
+            payment_requirements,
+            self._prepare_payment_header(payment_requirements, x402_version),
+            encoding,
+        )
+
+    @staticmethod
+    def _reencode_payment_header(payment_header: str, encoding: str) -> str:
+        """Convert a JSON payment header, as pooled or signed remotely, to an encoding."""
+        if encoding == JSON_PAYMENT_ENCODING:
+            return payment_header
+        return encode_payment(decode_payment(payment_header), encoding)
+
+    async def acreate_payment_header(
+        self,
+        payment_requirements: PaymentRequirements,
+        x402_version: int = x402_VERSION,
+        encoding: str = JSON_PAYMENT_ENCODING,
+    ) -> str:
+        """Create a payment header without blocking the event loop.
+
+        Signing is awaited from the async_signer when configured, and otherwise
+        runs in signing_executor (or the loop's default executor).
+
+        Args:
+            payment_requirements: Selected payment requirements
+            x402_version: x402 protocol version
+            encoding: Payment encoding, see select_payment_encoding
+
+        Returns:
+            Signed payment header
+        """
+        if self.async_signer is None:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.signing_executor,
+                self.create_payment_header,
+                payment_requirements,
+                x402_version,
+                encoding,
+            )
+
+        payment_header = None
+        if self.presigned_pool is not None:
+            payment_header = self.presigned_pool.pop(payment_requirements, x402_version)
+        if payment_header is None:
+            payment_header = await self.async_signer(payment_requirements, x402_version)
+        return self._reencode_payment_header(payment_header, encoding)
+
+    def create_payment_headers(
+        self,
+        requirements_list: Sequence[PaymentRequirements],
+        x402_version: int = x402_VERSION,
+        executor: Optional[Executor] = None,
+    ) -> List[Union[str, Exception]]:
+        """Create payment headers for many requirements at once.
+
+        Args:
+            requirements_list: Selected payment requirements, one per header
+            x402_version: x402 protocol version
+            executor: Optional pool from x402.exact.create_signing_pool, created
+                for the same account, used to spread large batches across
+                processes
+
+        Returns:
+            Signed payment headers in the order of requirements_list. Items that
+            could not be signed hold the exception instead of a header.
+        """
+        items = [
+            (
+                payment_requirements,
+                self._prepare_payment_header(payment_requirements, x402_version),
+            )
+            for payment_requirements in requirements_list
+        ]
+        return sign_payment_headers(self.account, items, executor=executor)
+
+    def _prepare_payment_header(
+        self, payment_requirements: PaymentRequirements, x402_version: int
+    ) -> PaymentHeader:
+        """Build an unsigned payment header with a fresh nonce and validity window."""
+        return {
             "x402Version": x402_version,
             "scheme": payment_requirements.scheme,
             "network": payment_requirements.network,
@@ -195,12 +382,110 @@ class x402Client:
             },
         }
 
-        signed_header = sign_payment_header(
-            self.account,
-            payment_requirements,
-            unsigned_header,
+    def create_preemptive_payment_header(self, method: str, url: str) -> Optional[str]:
+        """Create a payment header from cached requirements, before any 402 is seen.
+
+        Args:
+            method: HTTP method of the outgoing request
+            url: URL of the outgoing request
+
+        Returns:
+            Signed payment header, or None if no usable requirements are cached
+        """
+        cached = self._select_cached_requirements(method, url)
+        if cached is None:
+            return None
+        return self.create_payment_header(*cached)
+
+    async def acreate_preemptive_payment_header(
+        self, method: str, url: str
+    ) -> Optional[str]:
+        """Async variant of create_preemptive_payment_header, see acreate_payment_header."""
+        cached = self._select_cached_requirements(method, url)
+        if cached is None:
+            return None
+        return await self.acreate_payment_header(*cached)
+
+    def _select_cached_requirements(
+        self, method: str, url: str
+    ) -> Optional[Tuple[PaymentRequirements, int, str]]:
+        """Select payment requirements for a request from the requirements cache."""
+        if self.requirements_cache is None:
+            return None
+
+        cached = self.requirements_cache.get(method, url)
+        if cached is None:
+            return None
+
+        try:
+            selected_requirements = self.select_payment_requirements(cached.accepts)
+        except (PaymentError, UnsupportedSchemeException):
+            # Let the regular 402 flow surface the error
+            self.requirements_cache.invalidate(method, url)
+            return None
+
+        return (
+            selected_requirements,
+            cached.x402_version,
+            self._select_payment_encoding(cached.payment_encodings),
+        )
+
+    def select_payment_encoding(self, headers: Mapping[str, str]) -> str:
+        """Choose the X-PAYMENT encoding for a server from its 402 response headers.
+
+        Args:
+            headers: Headers of the 402 response
+
+        Returns:
+            "compact" if enabled and advertised in X-PAYMENT-ENCODINGS, else "json"
+        """
+        return self._select_payment_encoding(
+            parse_payment_encodings(headers.get(PAYMENT_ENCODINGS_HEADER))
         )
-        return signed_header
+
+    def _select_payment_encoding(self, encodings: Sequence[str]) -> str:
+        if self.compact_payments and COMPACT_PAYMENT_ENCODING in encodings:
+            return COMPACT_PAYMENT_ENCODING
+        return JSON_PAYMENT_ENCODING
+
+    def parse_payment_required(
+        self,
+        method: str,
+        url: str,
+        headers: Mapping[str, str],
+        read_body: Callable[[], Dict[str, Any]],
+    ) -> x402PaymentRequiredResponse:
+        """Parse a 402 response, using and updating the requirements cache.
+
+        Args:
+            method: HTTP method of the request that received the 402
+            url: URL of the request that received the 402
+            headers: Response headers
+            read_body: Callable returning the decoded JSON body of the response
+
+        Returns:
+            The payment required response
+        """
+        if self.requirements_cache is not None:
+            cached = self.requirements_cache.revalidate(method, url, headers)
+            if cached is not None:
+                return x402PaymentRequiredResponse(
+                    x402_version=cached.x402_version,
+                    accepts=cached.accepts,
+                    error="",
+                )
+
+        payment_response = x402PaymentRequiredResponse(**read_body())
+
+        if self.requirements_cache is not None:
+            self.requirements_cache.store(
+                method,
+                url,
+                payment_response.x402_version,
+                payment_response.accepts,
+                headers,
+            )
+        return payment_response
 
     def generate_nonce(self):
         # Generate a random nonce (32 bytes = 64 hex chars)
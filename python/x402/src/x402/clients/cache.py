@@ -0,0 +1,183 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, List, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+
+from x402.encoding import (
+    JSON_PAYMENT_ENCODING,
+    PAYMENT_ENCODINGS_HEADER,
+    parse_payment_encodings,
+)
+from x402.types import PaymentRequirements
+
+CacheKey = Tuple[str, str, str]
+
+_MAX_AGE_RE = re.compile(r"max-age\s*=\s*\"?(\d+)\"?", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class CachedPaymentRequirements:
+    """Payment requirements remembered from a previous 402 response."""
+
+    x402_version: int
+    accepts: List[PaymentRequirements]
+    expires_at: float
+    etag: Optional[str] = None
+    payment_encodings: Tuple[str, ...] = (JSON_PAYMENT_ENCODING,)
+
+
+class PaymentRequirementsCache:
+    """Client-side cache of 402 `accepts` lists keyed by (method, origin, path).
+
+    When an endpoint's requirements are cached, clients can sign and attach the
+    X-PAYMENT header on the first attempt instead of waiting for a 402. If the
+    server rejects the preemptive payment it answers 402 again and the client
+    falls back to the regular flow, refreshing the cache entry.
+
+    Freshness follows the 402 response's caching hints: `Cache-Control: no-store`,
+    `no-cache` or `max-age=0` disable caching, `max-age=N` sets the lifetime and a
+    repeated `ETag` revalidates the existing entry without re-parsing it.
+    """
+
+    def __init__(
+        self,
+        default_ttl: float = 300.0,
+        max_entries: int = 1024,
+        path_template: Optional[Callable[[str], str]] = None,
+    ):
+        """Initialize the cache.
+
+        Args:
+            default_ttl: Lifetime in seconds when the 402 response has no max-age
+            max_entries: Maximum number of endpoints kept, least recently used first out
+            path_template: Optional function mapping a request path to the template
+                used in the cache key, e.g. collapsing "/items/42" to "/items/{id}"
+        """
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.path_template = path_template
+        self._entries: "OrderedDict[CacheKey, CachedPaymentRequirements]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def key(self, method: str, url: str) -> CacheKey:
+        """Build the cache key for a request. Query strings are ignored."""
+        parts = urlsplit(str(url))
+        origin = f"{parts.scheme.lower()}://{parts.netloc.lower()}"
+        path = parts.path or "/"
+        if self.path_template is not None:
+            path = self.path_template(path)
+        return method.upper(), origin, path
+
+    def get(self, method: str, url: str) -> Optional[CachedPaymentRequirements]:
+        """Return the fresh cached requirements for a request, if any."""
+        key = self.key(method, url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def revalidate(
+        self, method: str, url: str, headers: Mapping[str, str]
+    ) -> Optional[CachedPaymentRequirements]:
+        """Refresh and return the cached entry if the 402 response carries its ETag.
+
+        Returns None when the response must be parsed, i.e. when nothing is cached
+        for the request or the ETag is missing or different.
+        """
+        etag = headers.get("etag")
+        if not etag:
+            return None
+        key = self.key(method, url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.etag != etag:
+                return None
+            ttl = self._ttl(headers)
+            if ttl is None:
+                del self._entries[key]
+                return entry
+            entry = CachedPaymentRequirements(
+                x402_version=entry.x402_version,
+                accepts=entry.accepts,
+                expires_at=time.monotonic() + ttl,
+                etag=etag,
+                payment_encodings=parse_payment_encodings(
+                    headers.get(PAYMENT_ENCODINGS_HEADER)
+                ),
+            )
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            return entry
+
+    def store(
+        self,
+        method: str,
+        url: str,
+        x402_version: int,
+        accepts: List[PaymentRequirements],
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        """Remember the requirements from a 402 response.
+
+        Args:
+            method: HTTP method of the request that received the 402
+            url: URL of the request that received the 402
+            x402_version: x402 version announced by the server
+            accepts: Parsed payment requirements from the response
+            headers: Response headers, used for Cache-Control and ETag hints and
+                the accepted payment encodings
+        """
+        headers = headers or {}
+        key = self.key(method, url)
+        ttl = self._ttl(headers)
+        with self._lock:
+            if ttl is None:
+                self._entries.pop(key, None)
+                return
+            self._entries[key] = CachedPaymentRequirements(
+                x402_version=x402_version,
+                accepts=list(accepts),
+                expires_at=time.monotonic() + ttl,
+                etag=headers.get("etag"),
+                payment_encodings=parse_payment_encodings(
+                    headers.get(PAYMENT_ENCODINGS_HEADER)
+                ),
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, method: str, url: str) -> None:
+        """Forget the cached requirements for a request."""
+        with self._lock:
+            self._entries.pop(self.key(method, url), None)
+
+    def clear(self) -> None:
+        """Forget all cached requirements."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _ttl(self, headers: Mapping[str, str]) -> Optional[float]:
+        """Return the entry lifetime for a response, or None if it must not be cached."""
+        cache_control = headers.get("cache-control", "")
+        directives = cache_control.lower()
+        if "no-store" in directives or "no-cache" in directives:
+            return None
+        match = _MAX_AGE_RE.search(cache_control)
+        if match:
+            max_age = int(match.group(1))
+            return float(max_age) if max_age > 0 else None
+        return self.default_ttl
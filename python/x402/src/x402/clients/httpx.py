@@ -1,29 +1,88 @@
-from typing import Optional, Dict, List
+from typing import TYPE_CHECKING, Optional, Dict, List, Union
 from httpx import Request, Response, AsyncClient
-from eth_account import Account
 from x402.clients.base import (
     x402Client,
     MissingRequestConfigError,
     PaymentError,
     PaymentSelectorCallable,
+    Signer,
 )
-from x402.types import x402PaymentRequiredResponse
+from x402.clients.cache import PaymentRequirementsCache
+from x402.metrics import MetricsHook, PhaseTimer
+
+if TYPE_CHECKING:
+    from eth_account import Account
+
+
+# Request extension used to mark paid retries so the hooks never pay twice
+RETRY_EXTENSION = "x402_retry"
+
+# Request extension holding the PhaseTimer started when the request was sent
+TIMER_EXTENSION = "x402_timer"
+
+# Request extension set when the request was paid from cached requirements
+PREEMPTIVE_EXTENSION = "x402_preemptive"
 
 
 class HttpxHooks:
-    def __init__(self, client: x402Client):
+    def __init__(self, client: x402Client, http_client: Optional[AsyncClient] = None):
+        """Initialize the hooks.
+
+        Args:
+            client: x402Client instance for handling payments
+            http_client: Optional AsyncClient used to send the paid retry. When set,
+                the retry reuses its connection pool, transport and configuration.
+                When not set, a temporary AsyncClient is created for each retry.
+        """
         self.client = client
+        self.http_client = http_client
         self._is_retry = False
 
     async def on_request(self, request: Request):
-        """Handle request before it is sent."""
-        pass
+        """Handle request before it is sent.
+
+        Attaches a payment header up front when the client has cached
+        requirements for the endpoint.
+        """
+        if request.extensions.get(RETRY_EXTENSION) or "X-Payment" in request.headers:
+            return
+
+        timer = PhaseTimer(self.client.metrics, "client")
+        request.extensions = {**request.extensions, TIMER_EXTENSION: timer}
+
+        try:
+            payment_header = await self.client.acreate_preemptive_payment_header(
+                request.method, str(request.url)
+            )
+        except PaymentError:
+            timer.finish("error")
+            raise
+        except Exception as e:
+            timer.finish("error")
+            raise PaymentError(f"Failed to handle payment: {str(e)}") from e
+        if payment_header is not None:
+            timer.lap("sign")
+            request.headers["X-Payment"] = payment_header
+            request.headers["Access-Control-Expose-Headers"] = "X-Payment-Response"
+            request.extensions = {**request.extensions, PREEMPTIVE_EXTENSION: True}
+
+    def _finish_preemptive(self, response: Response) -> None:
+        """Report a request paid from cached requirements that was accepted."""
+        try:
+            extensions = response.request.extensions
+        except RuntimeError:  # Response created without a request
+            return
+        if extensions.get(PREEMPTIVE_EXTENSION) and not extensions.get(RETRY_EXTENSION):
+            timer = extensions[TIMER_EXTENSION]
+            timer.lap("paid_request")
+            timer.finish("preemptive_paid")
 
     async def on_response(self, response: Response) -> Response:
         """Handle response after it is received."""
 
         # If this is not a 402, just return the response
         if response.status_code != 402:
+            self._finish_preemptive(response)
             return response
 
         # If this is a retry response, just return it
@@ -34,61 +93,98 @@ class HttpxHooks:
             if not response.request:
                 raise MissingRequestConfigError("Missing request configuration")
 
+            if response.request.extensions.get(RETRY_EXTENSION):
+                return response
+
             # Read the response content before parsing
             await response.aread()
 
-            data = response.json()
-
-            payment_response = x402PaymentRequiredResponse(**data)
+            timer = response.request.extensions.get(TIMER_EXTENSION)
+            if timer is None:
+                timer = PhaseTimer(self.client.metrics, "client")
+            else:
+                timer.lap("payment_required")
+
+            payment_response = self.client.parse_payment_required(
+                response.request.method,
+                str(response.request.url),
+                response.headers,
+                response.json,
+            )
 
             # Select payment requirements
             selected_requirements = self.client.select_payment_requirements(
                 payment_response.accepts
             )
 
-            # Create payment header
-            payment_header = self.client.create_payment_header(
-                selected_requirements, payment_response.x402_version
+            # Create payment header without blocking the event loop
+            payment_header = await self.client.acreate_payment_header(
+                selected_requirements,
+                payment_response.x402_version,
+                self.client.select_payment_encoding(response.headers),
             )
+            timer.lap("sign")
 
             # Mark as retry and add payment header
-            self._is_retry = True
             request = response.request
-
             request.headers["X-Payment"] = payment_header
             request.headers["Access-Control-Expose-Headers"] = "X-Payment-Response"
+            request.extensions = {**request.extensions, RETRY_EXTENSION: True}
 
             # Retry the request
-            async with AsyncClient() as client:
-                retry_response = await client.send(request)
-
-                # Copy the retry response data to the original response
-                response.status_code = retry_response.status_code
-                response.headers = retry_response.headers
-                response._content = retry_response._content
-                return response
+            if self.http_client is not None:
+                # The retry runs through the same hooks, which skip it thanks to
+                # the retry extension, so concurrent requests never share state
+                retry_response = await self.http_client.send(request)
+            else:
+                self._is_retry = True
+                try:
+                    async with AsyncClient() as client:
+                        retry_response = await client.send(request)
+                finally:
+                    self._is_retry = False
+            timer.lap("paid_request")
+            timer.finish("rejected" if retry_response.status_code == 402 else "paid")
+
+            # Copy the retry response data to the original response
+            response.status_code = retry_response.status_code
+            response.headers = retry_response.headers
+            response._content = retry_response._content
+            return response
 
         except PaymentError as e:
             self._is_retry = False
+            self.client.metrics.count("client", "error")
             raise e
         except Exception as e:
             self._is_retry = False
+            self.client.metrics.count("client", "error")
             raise PaymentError(f"Failed to handle payment: {str(e)}") from e
 
 
 def x402_payment_hooks(
-    account: Account,
+    account: Union["Account", Signer],
     max_value: Optional[int] = None,
     payment_requirements_selector: Optional[PaymentSelectorCallable] = None,
+    http_client: Optional[AsyncClient] = None,
+    requirements_cache: Optional[PaymentRequirementsCache] = None,
+    metrics: Optional[MetricsHook] = None,
 ) -> Dict[str, List]:
     """Create httpx event hooks dictionary for handling 402 Payment Required responses.
 
     Args:
-        account: eth_account.Account instance for signing payments
+        account: eth_account.Account instance or Signer for signing payments
         max_value: Optional maximum allowed payment amount in base units
         payment_requirements_selector: Optional custom selector for payment requirements.
             Should be a callable that takes (accepts, network_filter, scheme_filter, max_value)
             and returns a PaymentRequirements object.
+        http_client: Optional AsyncClient the hooks are installed on. When provided,
+            paid retries are sent through it instead of a new AsyncClient, keeping
+            its connection pool, proxies, TLS and timeout settings.
+        requirements_cache: Optional cache of 402 requirements used to pay known
+            endpoints on the first attempt.
+        metrics: Optional hook receiving the duration of the 402 round trip,
+            signing and the paid retry.
 
     Returns:
         Dictionary of event hooks that can be directly assigned to client.event_hooks
@@ -98,10 +194,12 @@ def x402_payment_hooks(
         account,
         max_value=max_value,
         payment_requirements_selector=payment_requirements_selector,
+        requirements_cache=requirements_cache,
+        metrics=metrics,
     )
 
     # Create hooks
-    hooks = HttpxHooks(client)
+    hooks = HttpxHooks(client, http_client=http_client)
 
     # Return event hooks dictionary
     return {
@@ -115,22 +213,33 @@ class x402HttpxClient(AsyncClient):
 
     def __init__(
         self,
-        account: Account,
+        account: Union["Account", Signer],
         max_value: Optional[int] = None,
         payment_requirements_selector: Optional[PaymentSelectorCallable] = None,
+        requirements_cache: Optional[PaymentRequirementsCache] = None,
+        metrics: Optional[MetricsHook] = None,
         **kwargs,
     ):
         """Initialize an AsyncClient with x402 payment handling.
 
         Args:
-            account: eth_account.Account instance for signing payments
+            account: eth_account.Account instance or Signer for signing payments
             max_value: Optional maximum allowed payment amount in base units
             payment_requirements_selector: Optional custom selector for payment requirements.
                 Should be a callable that takes (accepts, network_filter, scheme_filter, max_value)
                 and returns a PaymentRequirements object.
+            requirements_cache: Optional cache of 402 requirements used to pay known
+                endpoints on the first attempt.
+            metrics: Optional hook receiving the duration of the 402 round trip,
+                signing and the paid retry.
             **kwargs: Additional arguments to pass to AsyncClient
         """
         super().__init__(**kwargs)
         self.event_hooks = x402_payment_hooks(
-            account, max_value, payment_requirements_selector
+            account,
+            max_value,
+            payment_requirements_selector,
+            http_client=self,
+            requirements_cache=requirements_cache,
+            metrics=metrics,
         )
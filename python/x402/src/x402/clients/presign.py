@@ -0,0 +1,246 @@
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Hashable, Optional, Tuple
+
+from x402.types import PaymentRequirements
+
+# Signs a payment header for (payment_requirements, x402_version)
+SignPaymentHeaderCallable = Callable[[PaymentRequirements, int], str]
+
+
+@dataclass(frozen=True)
+class PresignedPoolStats:
+    """Snapshot of PresignedPaymentPool counters."""
+
+    hits: int
+    misses: int
+    signed: int
+    expired: int
+    pooled: int
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of requests served from the pool."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @property
+    def expiry_waste(self) -> float:
+        """Fraction of pre-signed headers evicted before being used."""
+        return self.expired / self.signed if self.signed else 0.0
+
+
+@dataclass
+class _HotRequirements:
+    payment_requirements: PaymentRequirements
+    x402_version: int
+    last_used: float
+    headers: Deque[Tuple[float, str]]
+
+
+class PresignedPaymentPool:
+    """Bounded pool of ready-signed payment headers for frequently paid requirements.
+
+    Requirements become hot the first time they are paid. A background worker
+    thread then keeps up to `size` headers signed ahead of time for them, each with
+    its own nonce and validity window, so paying is just popping a header. Headers
+    are evicted once less than `min_validity_seconds` remain before `validBefore`,
+    and requirements unused for `idle_seconds` stop being refilled.
+
+    Usage:
+        pool = PresignedPaymentPool(size=8)
+        client = x402Client(account, presigned_pool=pool)
+        ...
+        pool.stats().hit_rate
+        pool.close()
+    """
+
+    def __init__(
+        self,
+        size: int = 4,
+        min_validity_seconds: int = 15,
+        idle_seconds: float = 300.0,
+        max_hot_requirements: int = 64,
+        refresh_interval: float = 1.0,
+    ):
+        """Initialize the pool.
+
+        Args:
+            size: Number of headers kept signed per hot requirements
+            min_validity_seconds: Minimum remaining validity for a header to be handed out
+            idle_seconds: Time after which unused requirements stop being refilled
+            max_hot_requirements: Maximum number of requirements tracked at once
+            refresh_interval: Seconds between background eviction passes
+        """
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        self.size = size
+        self.min_validity_seconds = min_validity_seconds
+        self.idle_seconds = idle_seconds
+        self.max_hot_requirements = max_hot_requirements
+        self.refresh_interval = refresh_interval
+
+        self._sign: Optional[SignPaymentHeaderCallable] = None
+        self._hot: Dict[Hashable, _HotRequirements] = {}
+        self._condition = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
+
+        self._hits = 0
+        self._misses = 0
+        self._signed = 0
+        self._expired = 0
+
+    def bind(self, sign: SignPaymentHeaderCallable) -> None:
+        """Set the function used to sign headers. Called by x402Client."""
+        with self._condition:
+            if self._sign is not None and self._sign != sign:
+                raise ValueError("PresignedPaymentPool is already bound to a client")
+            self._sign = sign
+
+    @staticmethod
+    def key(payment_requirements: PaymentRequirements, x402_version: int) -> Hashable:
+        """Return the pool key: every requirement field that ends up signed."""
+        extra = payment_requirements.extra or {}
+        return (
+            x402_version,
+            payment_requirements.scheme,
+            payment_requirements.network,
+            payment_requirements.asset.lower(),
+            payment_requirements.pay_to.lower(),
+            payment_requirements.max_amount_required,
+            payment_requirements.max_timeout_seconds,
+            extra.get("name"),
+            extra.get("version"),
+        )
+
+    def pop(
+        self, payment_requirements: PaymentRequirements, x402_version: int
+    ) -> Optional[str]:
+        """Take a pre-signed header for the requirements, if one is ready.
+
+        A miss marks the requirements as hot so the worker starts filling them.
+        """
+        key = self.key(payment_requirements, x402_version)
+        now = time.time()
+        with self._condition:
+            hot = self._hot.get(key)
+            if hot is not None:
+                hot.last_used = now
+                self._evict_stale(hot, now)
+                if hot.headers:
+                    _, header = hot.headers.popleft()
+                    self._hits += 1
+                    self._condition.notify()
+                    return header
+
+            self._misses += 1
+            if hot is None and self._accepts(payment_requirements):
+                self._track(key, payment_requirements, x402_version, now)
+            return None
+
+    def stats(self) -> PresignedPoolStats:
+        """Return a snapshot of the pool counters."""
+        with self._condition:
+            return PresignedPoolStats(
+                hits=self._hits,
+                misses=self._misses,
+                signed=self._signed,
+                expired=self._expired,
+                pooled=sum(len(hot.headers) for hot in self._hot.values()),
+            )
+
+    def close(self) -> None:
+        """Stop the background worker and drop all pre-signed headers."""
+        with self._condition:
+            self._closed = True
+            self._hot.clear()
+            self._condition.notify_all()
+            worker = self._worker
+        if worker is not None and worker is not threading.current_thread():
+            worker.join()
+
+    def _accepts(self, payment_requirements: PaymentRequirements) -> bool:
+        """Whether headers for the requirements stay valid long enough to pool."""
+        return (
+            not self._closed
+            and self._sign is not None
+            and payment_requirements.max_timeout_seconds > self.min_validity_seconds
+        )
+
+    def _track(
+        self,
+        key: Hashable,
+        payment_requirements: PaymentRequirements,
+        x402_version: int,
+        now: float,
+    ) -> None:
+        if len(self._hot) >= self.max_hot_requirements:
+            coldest = min(self._hot, key=lambda k: self._hot[k].last_used)
+            self._expired += len(self._hot.pop(coldest).headers)
+        self._hot[key] = _HotRequirements(
+            payment_requirements=payment_requirements,
+            x402_version=x402_version,
+            last_used=now,
+            headers=deque(),
+        )
+        if self._worker is None:
+            self._worker = threading.Thread(
+                target=self._run, name="x402-presigner", daemon=True
+            )
+            self._worker.start()
+        self._condition.notify()
+
+    def _evict_stale(self, hot: _HotRequirements, now: float) -> None:
+        # Headers are appended in signing order, so the oldest expire first
+        while hot.headers and hot.headers[0][0] - now < self.min_validity_seconds:
+            hot.headers.popleft()
+            self._expired += 1
+
+    def _next_job(self) -> Optional[Tuple[Hashable, _HotRequirements]]:
+        """Evict stale headers and idle requirements, then pick one to refill."""
+        now = time.time()
+        job = None
+        for key, hot in list(self._hot.items()):
+            self._evict_stale(hot, now)
+            if now - hot.last_used > self.idle_seconds:
+                self._expired += len(hot.headers)
+                del self._hot[key]
+            elif job is None and len(hot.headers) < self.size:
+                job = (key, hot)
+        return job
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                job = None
+                while not self._closed:
+                    job = self._next_job()
+                    if job is not None:
+                        break
+                    self._condition.wait(self.refresh_interval)
+                if self._closed:
+                    return
+                key, hot = job
+                sign = self._sign
+
+            signed_at = time.time()
+            try:
+                header = sign(hot.payment_requirements, hot.x402_version)
+            except Exception:
+                # Stop pre-signing requirements that cannot be signed; the
+                # request path will surface the error when it signs itself
+                with self._condition:
+                    self._hot.pop(key, None)
+                continue
+
+            # validBefore is derived from the signing time truncated to seconds
+            expires_at = int(signed_at) + hot.payment_requirements.max_timeout_seconds
+            with self._condition:
+                self._signed += 1
+                if self._hot.get(key) is hot and not self._closed:
+                    hot.headers.append((expires_at, header))
+                else:
+                    self._expired += 1
@@ -0,0 +1,453 @@
+import argparse
+import json
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, InvalidStateError
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional, Tuple
+
+from x402.clients.base import PaymentError
+from x402.secp256k1 import Secp256k1Backend, get_backend
+
+if TYPE_CHECKING:
+    from eth_account.signers.local import LocalAccount
+
+# Wire protocol: newline-delimited JSON over a Unix stream socket.
+#   -> {"id": 1, "method": "address"}
+#   <- {"id": 1, "address": "0x..."}
+#   -> {"id": 2, "method": "sign", "digests": ["<hex>", ...]}
+#   <- {"id": 2, "signatures": ["<hex>", ...]}
+# Any request can instead be answered with {"id": n, "error": "..."}. Requests are
+# pipelined: clients may send several before reading the responses, which the
+# daemon returns in request order.
+
+
+class RemoteSignerError(PaymentError):
+    """Raised when the signing daemon fails or cannot be reached."""
+
+    pass
+
+
+def _fail(future: Future, error: Exception) -> None:
+    # The future may have been abandoned by sign_hash in the meantime
+    try:
+        future.set_exception(error)
+    except InvalidStateError:
+        pass
+
+
+@dataclass(frozen=True)
+class RemoteSignerStats:
+    """Snapshot of UnixSocketSigner activity.
+
+    Latencies are measured from sign_hash being called to the signature arriving,
+    over the most recent requests.
+    """
+
+    requests: int
+    batches: int
+    errors: int
+    queue_depth: int
+    in_flight: int
+    latency_mean: float
+    latency_p50: float
+    latency_p99: float
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.requests / self.batches if self.batches else 0.0
+
+
+class UnixSocketSigner:
+    """Signer that delegates signing to a daemon holding the key, over a Unix socket.
+
+    Concurrent sign_hash calls are queued and sent in batches of up to max_batch
+    digests, and batches are pipelined on one connection without waiting for the
+    previous response. Use it as the account of an x402Client; combined with
+    acreate_payment_header, concurrent payments are batched automatically.
+
+    Usage:
+        signer = UnixSocketSigner("/run/x402-signer.sock")
+        client = x402Client(signer)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_batch: int = 64,
+        timeout: float = 10.0,
+        latency_window: int = 1024,
+    ):
+        """Connect to the signing daemon and fetch its address.
+
+        Args:
+            path: Path of the daemon's Unix socket
+            max_batch: Maximum number of digests sent in one request
+            timeout: Seconds to wait for a signature before failing
+            latency_window: Number of recent latencies kept for stats
+        """
+        self.path = path
+        self.max_batch = max_batch
+        self.timeout = timeout
+
+        self._queue: "queue.Queue[Optional[Tuple[bytes, Future, float]]]" = (
+            queue.Queue()
+        )
+        self._in_flight: Dict[int, List[Tuple[Future, float]]] = {}
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._closed = False
+        self._socket: Optional[socket.socket] = None
+
+        self._requests = 0
+        self._batches = 0
+        self._errors = 0
+        self._latencies: Deque[float] = deque(maxlen=latency_window)
+
+        self._address = self._call_address()
+        self._writer = threading.Thread(
+            target=self._write_loop, name="x402-signer-writer", daemon=True
+        )
+        self._writer.start()
+
+    @property
+    def address(self) -> str:
+        return self._address
+
+    def sign_hash(self, digest: bytes) -> bytes:
+        """Sign a 32-byte digest, blocking until the daemon answers.
+
+        Raises:
+            RemoteSignerError: If the daemon fails or does not answer within
+                timeout seconds
+        """
+        future = self.sign_hash_future(digest)
+        try:
+            return future.result(self.timeout)
+        except FutureTimeoutError:
+            self._abandon(future)
+            raise RemoteSignerError(
+                f"Signer did not answer within {self.timeout} seconds"
+            )
+
+    def sign_hash_future(self, digest: bytes) -> "Future[bytes]":
+        """Queue a digest for signing and return a future for its signature."""
+        if len(digest) != 32:
+            raise ValueError("digest must be 32 bytes")
+        if self._closed:
+            raise RemoteSignerError("Signer is closed")
+        future: "Future[bytes]" = Future()
+        self._queue.put((digest, future, time.perf_counter()))
+        return future
+
+    def stats(self) -> RemoteSignerStats:
+        """Return a snapshot of request counters, queue depth and latencies."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            in_flight = sum(len(batch) for batch in self._in_flight.values())
+            requests, batches, errors = self._requests, self._batches, self._errors
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(int(len(latencies) * p), len(latencies) - 1)]
+
+        return RemoteSignerStats(
+            requests=requests,
+            batches=batches,
+            errors=errors,
+            queue_depth=self._queue.qsize(),
+            in_flight=in_flight,
+            latency_mean=sum(latencies) / len(latencies) if latencies else 0.0,
+            latency_p50=percentile(0.5),
+            latency_p99=percentile(0.99),
+        )
+
+    def close(self) -> None:
+        """Stop the background threads and fail any pending request."""
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+        self._disconnect(RemoteSignerError("Signer is closed"))
+
+    def __enter__(self) -> "UnixSocketSigner":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _call_address(self) -> str:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.path)
+                sock.sendall(b'{"id": 0, "method": "address"}\n')
+                response = json.loads(sock.makefile("rb").readline())
+            except (OSError, ValueError) as e:
+                raise RemoteSignerError(f"Failed to reach signer at {self.path}: {e}")
+        if not isinstance(response, dict):
+            raise RemoteSignerError(f"Unexpected response from signer: {response!r}")
+        if "error" in response:
+            raise RemoteSignerError(response["error"])
+        return response["address"]
+
+    def _abandon(self, future: Future) -> None:
+        """Stop waiting for a request, whether it is still queued or sent."""
+        future.cancel()
+        with self._lock:
+            self._errors += 1
+            for request_id, batch in list(self._in_flight.items()):
+                remaining = [entry for entry in batch if entry[0] is not future]
+                if len(remaining) == len(batch):
+                    continue
+                if remaining:
+                    self._in_flight[request_id] = remaining
+                else:
+                    del self._in_flight[request_id]
+                break
+
+    def _connect(self) -> socket.socket:
+        if self._socket is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.path)
+            except OSError:
+                sock.close()
+                raise
+            self._socket = sock
+            threading.Thread(
+                target=self._read_loop,
+                args=(sock,),
+                name="x402-signer-reader",
+                daemon=True,
+            ).start()
+        return self._socket
+
+    def _disconnect(self, error: Exception, sock: Optional[socket.socket] = None):
+        """Close the connection and fail every request waiting on it."""
+        with self._lock:
+            if sock is not None and sock is not self._socket:
+                return
+            if self._socket is not None:
+                try:
+                    self._socket.close()
+                except OSError:
+                    pass
+                self._socket = None
+            pending = [f for batch in self._in_flight.values() for f, _ in batch]
+            self._errors += len(pending)
+            self._in_flight.clear()
+        for future in pending:
+            _fail(future, error)
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+            self._send_batch(batch)
+
+    def _send_batch(self, batch: List[Tuple[bytes, Future, float]]) -> None:
+        # Requests abandoned by sign_hash while queued are cancelled
+        batch = [item for item in batch if not item[1].cancelled()]
+        if not batch:
+            return
+        with self._lock:
+            self._next_id += 1
+            request_id = self._next_id
+            self._in_flight[request_id] = [
+                (future, start) for _, future, start in batch
+            ]
+            self._requests += len(batch)
+            self._batches += 1
+        line = json.dumps(
+            {
+                "id": request_id,
+                "method": "sign",
+                "digests": [digest.hex() for digest, _, _ in batch],
+            }
+        ).encode()
+        try:
+            self._connect().sendall(line + b"\n")
+        except OSError as e:
+            self._disconnect(RemoteSignerError(f"Failed to send to signer: {e}"))
+
+    def _read_loop(self, sock: socket.socket) -> None:
+        reader = sock.makefile("rb")
+        batch = []
+        try:
+            for line in reader:
+                batch = []
+                response = json.loads(line)
+                if not isinstance(response, dict):
+                    raise ValueError("response is not a JSON object")
+                with self._lock:
+                    batch = self._in_flight.pop(response.get("id"), [])
+                now = time.perf_counter()
+                if "error" in response:
+                    error = RemoteSignerError(response["error"])
+                    with self._lock:
+                        self._errors += len(batch)
+                    for future, _ in batch:
+                        _fail(future, error)
+                    continue
+                signatures = response.get("signatures")
+                if not isinstance(signatures, list):
+                    signatures = []
+                if len(signatures) != len(batch):
+                    # Signatures are matched to digests by position, so none of
+                    # them can be trusted
+                    error = RemoteSignerError(
+                        f"Signer returned {len(signatures)} signatures "
+                        f"for {len(batch)} digests"
+                    )
+                    with self._lock:
+                        self._errors += len(batch)
+                    for future, _ in batch:
+                        _fail(future, error)
+                    continue
+                with self._lock:
+                    self._latencies.extend(now - start for _, start in batch)
+                for (future, _), signature in zip(batch, signatures):
+                    try:
+                        future.set_result(bytes.fromhex(signature))
+                    except InvalidStateError:
+                        pass
+        except (OSError, ValueError, TypeError) as e:
+            # TypeError: fields of the wrong type, e.g. an unhashable id
+            error = RemoteSignerError(f"Signer connection failed: {e}")
+            # The batch being answered is no longer in flight
+            with self._lock:
+                self._errors += len(batch)
+            for future, _ in batch:
+                _fail(future, error)
+            self._disconnect(error, sock)
+            return
+        self._disconnect(RemoteSignerError("Signer closed the connection"), sock)
+
+
+class _SigningRequestHandler(socketserver.StreamRequestHandler):
+    server: "SigningDaemon"
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                self.wfile.write(b'{"id": null, "error": "Invalid JSON"}\n')
+                continue
+            response = self.server.handle_request(request)
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class SigningDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Minimal signing daemon holding a private key, serving UnixSocketSigner.
+
+    Intended as a local stand-in for a real isolated signer in tests and
+    development; it signs any digest it is sent.
+
+    Usage:
+        daemon = SigningDaemon("/tmp/x402-signer.sock", Account.from_key(key))
+        daemon.start()
+        ...
+        daemon.close()
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path: str, account: "LocalAccount"):
+        if os.path.exists(path):
+            os.unlink(path)
+        super().__init__(path, _SigningRequestHandler)
+        self.path = path
+        self._private_key = bytes(account.key)
+        self._loaded_key: Optional[Tuple[Secp256k1Backend, Any]] = None
+        self._address = account.address
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> str:
+        return self._address
+
+    def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        request_id = request.get("id")
+        try:
+            if request.get("method") == "address":
+                return {"id": request_id, "address": self._address}
+            if request.get("method") == "sign":
+                backend = get_backend()
+                loaded = self._loaded_key
+                if loaded is None or loaded[0] is not backend:
+                    loaded = (backend, backend.load_private_key(self._private_key))
+                    self._loaded_key = loaded
+                signatures = []
+                for digest in request["digests"]:
+                    signature = backend.sign_digest(loaded[1], bytes.fromhex(digest))
+                    signatures.append(signature.hex())
+                return {"id": request_id, "signatures": signatures}
+            return {
+                "id": request_id,
+                "error": f"Unknown method {request.get('method')}",
+            }
+        except Exception as e:
+            return {"id": request_id, "error": str(e)}
+
+    def start(self) -> None:
+        """Serve requests in a background thread."""
+        self._thread = threading.Thread(
+            target=self.serve_forever, name="x402-signing-daemon", daemon=True
+        )
+        self._thread.start()
+
+    def close(self) -> None:
+        """Stop serving and remove the socket file."""
+        if self._thread is not None:
+            self.shutdown()
+            self._thread.join()
+        self.server_close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Run a local x402 signing daemon. The private key is read "
+        "from the X402_SIGNER_PRIVATE_KEY environment variable."
+    )
+    parser.add_argument("--socket", required=True, help="Unix socket path")
+    args = parser.parse_args()
+
+    from eth_account import Account
+
+    private_key = os.environ.get("X402_SIGNER_PRIVATE_KEY")
+    if not private_key:
+        raise SystemExit("X402_SIGNER_PRIVATE_KEY is not set")
+
+    daemon = SigningDaemon(args.socket, Account.from_key(private_key))
+    print(f"Signing for {daemon.address} on {args.socket}")
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,20 @@
-from typing import Optional
+from typing import TYPE_CHECKING, Optional, Union
 import requests
 import json
 from requests.adapters import HTTPAdapter
-from eth_account import Account
 from x402.clients.base import (
     x402Client,
     PaymentError,
     PaymentSelectorCallable,
+    Signer,
 )
-from x402.types import x402PaymentRequiredResponse
+from x402.clients.cache import PaymentRequirementsCache
+from x402.metrics import MetricsHook, PhaseTimer
 import copy
 
+if TYPE_CHECKING:
+    from eth_account import Account
+
 
 class x402HTTPAdapter(HTTPAdapter):
     """HTTP adapter for handling x402 payment required responses."""
@@ -40,18 +44,47 @@ class x402HTTPAdapter(HTTPAdapter):
             self._is_retry = False
             return super().send(request, **kwargs)
 
+        timer = PhaseTimer(self.client.metrics, "client")
+
+        # Pay up front when the requirements for this endpoint are cached
+        preemptive = False
+        if "X-Payment" not in request.headers:
+            try:
+                payment_header = self.client.create_preemptive_payment_header(
+                    request.method, request.url
+                )
+            except PaymentError:
+                timer.finish("error")
+                raise
+            except Exception as e:
+                timer.finish("error")
+                raise PaymentError(f"Failed to handle payment: {str(e)}") from e
+            if payment_header is not None:
+                preemptive = True
+                timer.lap("sign")
+                request.headers["X-Payment"] = payment_header
+                request.headers["Access-Control-Expose-Headers"] = "X-Payment-Response"
+
         response = super().send(request, **kwargs)
 
         if response.status_code != 402:
+            if preemptive:
+                timer.lap("paid_request")
+                timer.finish("preemptive_paid")
             return response
 
         try:
             # Save the content before we parse it to avoid consuming it
             content = copy.deepcopy(response.content)
+            timer.lap("payment_required")
 
             # Parse the JSON content without using response.json() which consumes it
-            data = json.loads(content.decode("utf-8"))
-            payment_response = x402PaymentRequiredResponse(**data)
+            payment_response = self.client.parse_payment_required(
+                request.method,
+                request.url,
+                response.headers,
+                lambda: json.loads(content.decode("utf-8")),
+            )
 
             # Select payment requirements
             selected_requirements = self.client.select_payment_requirements(
@@ -60,15 +93,23 @@ class x402HTTPAdapter(HTTPAdapter):
 
             # Create payment header
             payment_header = self.client.create_payment_header(
-                selected_requirements, payment_response.x402_version
+                selected_requirements,
+                payment_response.x402_version,
+                self.client.select_payment_encoding(response.headers),
             )
+            timer.lap("sign")
 
             # Mark as retry and add payment header
             self._is_retry = True
             request.headers["X-Payment"] = payment_header
             request.headers["Access-Control-Expose-Headers"] = "X-Payment-Response"
 
-            retry_response = super().send(request, **kwargs)
+            try:
+                retry_response = super().send(request, **kwargs)
+            finally:
+                self._is_retry = False
+            timer.lap("paid_request")
+            timer.finish("rejected" if retry_response.status_code == 402 else "paid")
 
             # Copy the retry response data to the original response
             response.status_code = retry_response.status_code
@@ -78,26 +119,34 @@ class x402HTTPAdapter(HTTPAdapter):
 
         except PaymentError as e:
             self._is_retry = False
+            timer.finish("error")
             raise e
         except Exception as e:
             self._is_retry = False
+            timer.finish("error")
             raise PaymentError(f"Failed to handle payment: {str(e)}") from e
 
 
 def x402_http_adapter(
-    account: Account,
+    account: Union["Account", Signer],
     max_value: Optional[int] = None,
     payment_requirements_selector: Optional[PaymentSelectorCallable] = None,
+    requirements_cache: Optional[PaymentRequirementsCache] = None,
+    metrics: Optional[MetricsHook] = None,
     **kwargs,
 ) -> x402HTTPAdapter:
     """Create an HTTP adapter that handles 402 Payment Required responses.
 
     Args:
-        account: eth_account.Account instance for signing payments
+        account: eth_account.Account instance or Signer for signing payments
         max_value: Optional maximum allowed payment amount in base units
         payment_requirements_selector: Optional custom selector for payment requirements.
             Should be a callable that takes (accepts, network_filter, scheme_filter, max_value)
             and returns a PaymentRequirements object.
+        requirements_cache: Optional cache of 402 requirements used to pay known
+            endpoints on the first attempt.
+        metrics: Optional hook receiving the duration of the 402 round trip,
+            signing and the paid retry.
         **kwargs: Additional arguments to pass to HTTPAdapter
 
     Returns:
@@ -107,24 +156,32 @@ def x402_http_adapter(
         account,
         max_value=max_value,
         payment_requirements_selector=payment_requirements_selector,
+        requirements_cache=requirements_cache,
+        metrics=metrics,
     )
     return x402HTTPAdapter(client, **kwargs)
 
 
 def x402_requests(
-    account: Account,
+    account: Union["Account", Signer],
     max_value: Optional[int] = None,
     payment_requirements_selector: Optional[PaymentSelectorCallable] = None,
+    requirements_cache: Optional[PaymentRequirementsCache] = None,
+    metrics: Optional[MetricsHook] = None,
     **kwargs,
 ) -> requests.Session:
     """Create a requests session with x402 payment handling.
 
     Args:
-        account: eth_account.Account instance for signing payments
+        account: eth_account.Account instance or Signer for signing payments
         max_value: Optional maximum allowed payment amount in base units
         payment_requirements_selector: Optional custom selector for payment requirements.
             Should be a callable that takes (accepts, network_filter, scheme_filter, max_value)
             and returns a PaymentRequirements object.
+        requirements_cache: Optional cache of 402 requirements used to pay known
+            endpoints on the first attempt.
+        metrics: Optional hook receiving the duration of the 402 round trip,
+            signing and the paid retry.
         **kwargs: Additional arguments to pass to HTTPAdapter
 
     Returns:
@@ -135,6 +192,8 @@ def x402_requests(
         account,
         max_value=max_value,
         payment_requirements_selector=payment_requirements_selector,
+        requirements_cache=requirements_cache,
+        metrics=metrics,
         **kwargs,
     )
 
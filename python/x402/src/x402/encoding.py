@@ -1,5 +1,18 @@
 import base64
-from typing import Union
+import json
+from functools import lru_cache
+from typing import Any, Callable, Optional, Tuple, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Response header listing the X-PAYMENT encodings a server accepts, most preferred
+# first, e.g. "compact, json". Servers that do not send it only accept JSON.
+PAYMENT_ENCODINGS_HEADER = "X-PAYMENT-ENCODINGS"
+JSON_PAYMENT_ENCODING = "json"
+COMPACT_PAYMENT_ENCODING = "compact"
 
 
 def safe_base64_encode(data: Union[str, bytes]) -> str:
@@ -26,3 +39,70 @@ def safe_base64_decode(data: str) -> str:
         Decoded utf-8 string
     """
     return base64.b64decode(data).decode("utf-8")
+
+
+def json_dumps(obj: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """Serialize an object to compact UTF-8 JSON bytes.
+
+    Uses orjson when installed (`pip install x402[fast]`) and the standard library
+    otherwise, which both produce the same compact output. orjson only handles
+    64-bit integers, so objects it refuses, such as uint256 values, are
+    serialized with the standard library instead.
+
+    Args:
+        obj: Object to serialize
+        default: Optional function converting objects JSON cannot serialize
+
+    Returns:
+        JSON encoded bytes
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=default)
+        except orjson.JSONEncodeError:
+            pass
+    return _json_encoder(default).encode(obj).encode("utf-8")
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """Deserialize JSON from a string or UTF-8 bytes, with orjson when installed.
+
+    orjson decodes integers beyond 64 bits as floats, losing precision; x402
+    payloads carry amounts as strings.
+
+    Args:
+        data: JSON document
+
+    Returns:
+        Decoded object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, bytes):
+        data = data.decode("utf-8")
+    return _JSON_DECODER.decode(data)
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+@lru_cache(maxsize=16)
+def _json_encoder(default: Optional[Callable[[Any], Any]]) -> json.JSONEncoder:
+    # json.dumps builds a new encoder on every call with non-default options
+    return json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=default)
+
+
+def parse_payment_encodings(value: Optional[str]) -> Tuple[str, ...]:
+    """Parse an X-PAYMENT-ENCODINGS header value.
+
+    Args:
+        value: Comma-separated encoding names, or None if the header is missing
+
+    Returns:
+        Lowercased encoding names in the order given, JSON only if the header is
+        missing or empty
+    """
+    encodings = tuple(
+        name.strip().lower() for name in (value or "").split(",") if name.strip()
+    )
+    return encodings or (JSON_PAYMENT_ENCODING,)
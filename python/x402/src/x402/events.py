@@ -0,0 +1,274 @@
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, FrozenSet, Iterable, Literal, Optional, Tuple
+
+from x402.wire import WirePaymentRequirements
+
+# Payment lifecycle events. Middlewares emit them into an EventBus, which hands
+# them to subscribers (logging, analytics, accounting) on a background thread so
+# subscribers never add latency to the request path.
+
+logger = logging.getLogger(__name__)
+
+EventType = Literal[
+    "payment_required",
+    "verified",
+    "verify_failed",
+    "settled",
+    "settle_failed",
+]
+
+PAYMENT_REQUIRED: EventType = "payment_required"
+VERIFIED: EventType = "verified"
+VERIFY_FAILED: EventType = "verify_failed"
+SETTLED: EventType = "settled"
+SETTLE_FAILED: EventType = "settle_failed"
+
+EVENT_TYPES: Tuple[EventType, ...] = (
+    PAYMENT_REQUIRED,
+    VERIFIED,
+    VERIFY_FAILED,
+    SETTLED,
+    SETTLE_FAILED,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class PaymentEvent:
+    """Something that happened to a payment for a protected resource.
+
+    Attributes:
+        type: What happened
+        resource: URL of the resource being paid for
+        requirements: Requirements the payment was checked against, once selected
+        payer: Paying address, when known
+        transaction: Settlement transaction hash, for settled events
+        error: Why the payment was rejected or failed to settle
+        duration: Seconds the middleware had spent on the request, for settled
+            and settle_failed events
+        timestamp: Unix time the event was created
+    """
+
+    type: EventType
+    resource: str
+    requirements: Optional[WirePaymentRequirements] = None
+    payer: Optional[str] = None
+    transaction: Optional[str] = None
+    error: Optional[str] = None
+    duration: Optional[float] = None
+    timestamp: float = field(default_factory=time.time)
+
+
+Subscriber = Callable[[PaymentEvent], None]
+
+# Buses living in this process, reset in forked children
+_buses: "weakref.WeakSet[EventBus]" = weakref.WeakSet()
+
+
+def _reset_buses_after_fork() -> None:
+    for bus in list(_buses):
+        bus._reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_buses_after_fork)
+
+
+class EventBus:
+    """Delivers payment events to subscribers on a background thread.
+
+    emit() never blocks: events are appended to a bounded queue that a daemon
+    thread drains in batches. When the queue is full the event is dropped and
+    counted, and a warning with the number of dropped events is logged at most
+    once per drop_log_interval. Subscribers run one at a time on the consumer
+    thread; an exception in one is logged and does not affect the others.
+
+    The same bus can be shared by several middlewares, across threads and event
+    loops. A bus created before a fork, e.g. with gunicorn --preload, keeps
+    working in the children: each starts its own consumer thread, and events
+    queued before the fork are left to the parent.
+    """
+
+    def __init__(self, max_queue: int = 10000, drop_log_interval: float = 10.0):
+        """Initialize the bus.
+
+        Args:
+            max_queue: Maximum number of undelivered events kept
+            drop_log_interval: Minimum seconds between warnings about dropped events
+        """
+        if max_queue < 1:
+            raise ValueError("max_queue must be positive")
+        self.max_queue = max_queue
+        self.drop_log_interval = drop_log_interval
+        self._subscribers: Tuple[Tuple[Subscriber, Optional[FrozenSet[str]]], ...] = ()
+        self._events: Deque[PaymentEvent] = deque()
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._emitted = 0
+        self._delivered = 0
+        self._dropped = 0
+        self._subscriber_errors = 0
+        self._last_drop_log = float("-inf")
+        _buses.add(self)
+
+    def _reset_after_fork(self) -> None:
+        # The consumer thread did not survive the fork and the lock may have
+        # been held by another thread of the parent
+        self._condition = threading.Condition()
+        self._thread = None
+        self._events.clear()
+        self._in_flight = 0
+
+    def subscribe(
+        self, callback: Subscriber, types: Optional[Iterable[EventType]] = None
+    ) -> Callable[[], None]:
+        """Call a function with every event, or only with events of some types.
+
+        Args:
+            callback: Function called with each event on the consumer thread
+            types: Optional event types to receive. Defaults to all.
+
+        Returns:
+            A function removing the subscription
+        """
+        if types is not None:
+            types = frozenset(types)
+            unknown = types.difference(EVENT_TYPES)
+            if unknown:
+                raise ValueError(f"Unknown event types: {sorted(unknown)}")
+        subscription = (callback, types)
+        with self._condition:
+            self._subscribers = self._subscribers + (subscription,)
+
+        def unsubscribe() -> None:
+            with self._condition:
+                self._subscribers = tuple(
+                    s for s in self._subscribers if s is not subscription
+                )
+
+        return unsubscribe
+
+    def emit(self, event: PaymentEvent) -> bool:
+        """Queue an event for delivery without blocking.
+
+        Returns:
+            False if the event was dropped because the queue is full or the bus
+            is closed
+        """
+        with self._condition:
+            if self._closed:
+                return False
+            # Events handed to subscribers still count until delivered
+            if len(self._events) + self._in_flight >= self.max_queue:
+                self._dropped += 1
+                dropped = self._dropped
+                now = time.monotonic()
+                log_drop = now - self._last_drop_log >= self.drop_log_interval
+                if log_drop:
+                    self._last_drop_log = now
+            else:
+                self._events.append(event)
+                self._emitted += 1
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="x402-events", daemon=True
+                    )
+                    self._thread.start()
+                self._condition.notify_all()
+                return True
+
+        if log_drop:
+            logger.warning(
+                "x402 event queue is full, %d events dropped so far", dropped
+            )
+        return False
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued event has been delivered.
+
+        Returns:
+            False if the timeout expired first
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._events and not self._in_flight, timeout
+            )
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Stop accepting events and wait for the queued ones to be delivered."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def stats(self) -> Dict[str, int]:
+        """Return event counters.
+
+        Returns:
+            emitted, delivered and dropped events, subscriber exceptions and
+            the number of events currently queued
+        """
+        with self._condition:
+            return {
+                "emitted": self._emitted,
+                "delivered": self._delivered,
+                "dropped": self._dropped,
+                "subscriber_errors": self._subscriber_errors,
+                "queued": len(self._events) + self._in_flight,
+            }
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._events or self._closed)
+                if not self._events:
+                    return
+                batch = list(self._events)
+                self._events.clear()
+                self._in_flight = len(batch)
+                subscribers = self._subscribers
+
+            errors = 0
+            for event in batch:
+                for callback, types in subscribers:
+                    if types is not None and event.type not in types:
+                        continue
+                    try:
+                        callback(event)
+                    except Exception:
+                        errors += 1
+                        logger.exception("x402 event subscriber %r failed", callback)
+
+            with self._condition:
+                self._in_flight = 0
+                self._delivered += len(batch)
+                self._subscriber_errors += errors
+                self._condition.notify_all()
+
+
+def log_event(event: PaymentEvent) -> None:
+    """Subscriber logging events, failures as warnings and the rest as info."""
+    level = (
+        logging.WARNING
+        if event.type in (VERIFY_FAILED, SETTLE_FAILED)
+        else logging.INFO
+    )
+    if logger.isEnabledFor(level):
+        logger.log(
+            level,
+            "%s %s payer=%s transaction=%s error=%s",
+            event.type,
+            event.resource,
+            event.payer,
+            event.transaction,
+            event.error,
+        )
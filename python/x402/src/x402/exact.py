@@ -1,13 +1,49 @@
 import time
 import secrets
-from typing import Dict, Any, TypedDict
-from eth_account import Account
-from x402.encoding import safe_base64_encode, safe_base64_decode
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import lru_cache
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Any,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypedDict,
+    Union,
+)
+from eth_utils import keccak, to_checksum_address
+from x402.encoding import (
+    COMPACT_PAYMENT_ENCODING,
+    JSON_PAYMENT_ENCODING,
+    json_dumps,
+    json_loads,
+)
 from x402.types import (
     PaymentRequirements,
 )
 from x402.chains import get_chain_id
-import json
+from x402.secp256k1 import Secp256k1Backend, get_backend, recover_address
+import base64
+import binascii
+import struct
+import weakref
+
+# eth_account takes most of a second to import; it is only needed for type hints
+# and to load keys in signing pool workers
+if TYPE_CHECKING:
+    from eth_account import Account
+
+EIP712_DOMAIN_TYPEHASH = keccak(
+    text="EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)"
+)
+TRANSFER_WITH_AUTHORIZATION_TYPEHASH = keccak(
+    text="TransferWithAuthorization(address from,address to,uint256 value,"
+    "uint256 validAfter,uint256 validBefore,bytes32 nonce)"
+)
+
+_UINT256_MAX = 2**256 - 1
 
 
 def create_nonce() -> bytes:
@@ -48,80 +84,462 @@ class PaymentHeader(TypedDict):
     payload: dict[str, Any]
 
 
+def _encode_address(address: str) -> bytes:
+    """ABI-encode an address as a 32-byte word."""
+    raw = bytes.fromhex(address[2:] if address[:2] in ("0x", "0X") else address)
+    if len(raw) != 20:
+        raise ValueError(f"Invalid address: {address}")
+    return raw.rjust(32, b"\x00")
+
+
+def _encode_uint256(value: int) -> bytes:
+    """ABI-encode an unsigned integer as a 32-byte word."""
+    if not 0 <= value <= _UINT256_MAX:
+        raise ValueError(f"Value out of uint256 range: {value}")
+    return value.to_bytes(32, "big")
+
+
+@lru_cache(maxsize=256)
+def get_domain_separator(
+    name: str, version: str, chain_id: int, verifying_contract: str
+) -> bytes:
+    """Get the EIP-712 domain separator for a token, cached per domain."""
+    return keccak(
+        EIP712_DOMAIN_TYPEHASH
+        + keccak(text=name)
+        + keccak(text=version)
+        + _encode_uint256(chain_id)
+        + _encode_address(verifying_contract)
+    )
+
+
+def hash_transfer_with_authorization(
+    domain_separator: bytes,
+    from_address: str,
+    to_address: str,
+    value: int,
+    valid_after: int,
+    valid_before: int,
+    nonce: bytes,
+) -> bytes:
+    """Hash an EIP-3009 TransferWithAuthorization message into its EIP-712 digest.
+
+    Produces the same digest as eth_account's generic typed data encoder, but only
+    encodes the six message fields on each call.
+    """
+    if len(nonce) > 32:
+        raise ValueError("nonce must be at most 32 bytes")
+    struct_hash = keccak(
+        TRANSFER_WITH_AUTHORIZATION_TYPEHASH
+        + _encode_address(from_address)
+        + _encode_address(to_address)
+        + _encode_uint256(value)
+        + _encode_uint256(valid_after)
+        + _encode_uint256(valid_before)
+        + nonce.ljust(32, b"\x00")
+    )
+    return keccak(b"\x19\x01" + domain_separator + struct_hash)
+
+
+# Keys prepared by the secp256k1 backend, kept only as long as their account
+_loaded_keys: "weakref.WeakKeyDictionary[Any, Tuple[Secp256k1Backend, Any]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _loaded_key(account: "Account", key: bytes) -> Tuple[Secp256k1Backend, Any]:
+    backend = get_backend()
+    try:
+        loaded = _loaded_keys.get(account)
+    except TypeError:  # accounts that cannot be weakly referenced
+        return backend, key
+    if loaded is None or loaded[0] is not backend:
+        loaded = (backend, backend.load_private_key(key))
+        _loaded_keys[account] = loaded
+    return loaded
+
+
+def _sign_digest(account: "Account", digest: bytes) -> bytes:
+    """Sign a digest, using the secp256k1 backend when the private key is available.
+
+    Accounts without a local key are either an x402.clients.base.Signer, which
+    exposes sign_hash, or an eth_account signer exposing unsafe_sign_hash.
+    """
+    key = getattr(account, "key", None)
+    if key is not None:
+        backend, loaded = _loaded_key(account, bytes(key))
+        return backend.sign_digest(loaded, digest)
+    if hasattr(account, "sign_hash"):
+        return bytes(account.sign_hash(digest))
+    return bytes(account.unsafe_sign_hash(digest).signature)
+
+
+def recover_authorization_signer(
+    payment_requirements: PaymentRequirements,
+    authorization: Dict[str, Any],
+    signature: str,
+) -> str:
+    """Recover the address that signed an EIP-3009 authorization.
+
+    Args:
+        payment_requirements: Requirements providing the token's EIP-712 domain
+        authorization: The payload's authorization, as sent in the X-PAYMENT header
+        signature: The payload's hex encoded signature
+
+    Returns:
+        Checksummed address of the signer
+    """
+    domain_separator = get_domain_separator(
+        payment_requirements.extra["name"],
+        payment_requirements.extra["version"],
+        int(get_chain_id(payment_requirements.network)),
+        payment_requirements.asset,
+    )
+    digest = hash_transfer_with_authorization(
+        domain_separator,
+        authorization["from"],
+        authorization["to"],
+        int(authorization["value"]),
+        int(authorization["validAfter"]),
+        int(authorization["validBefore"]),
+        bytes.fromhex(authorization["nonce"].removeprefix("0x")),
+    )
+    return recover_address(digest, bytes.fromhex(signature.removeprefix("0x")))
+
+
 def sign_payment_header(
-    account: Account, payment_requirements: PaymentRequirements, header: PaymentHeader
+    account: "Account",
+    payment_requirements: PaymentRequirements,
+    header: PaymentHeader,
+    encoding: str = JSON_PAYMENT_ENCODING,
 ) -> str:
-    """Sign a payment header using the account's private key."""
+    """Sign a payment header using the account's private key.
+
+    The signed header is encoded with encode_payment in the given encoding.
+    """
     try:
         auth = header["payload"]["authorization"]
 
         nonce_bytes = bytes.fromhex(auth["nonce"])
 
-        typed_data = {
-            "types": {
-                "TransferWithAuthorization": [
-                    {"name": "from", "type": "address"},
-                    {"name": "to", "type": "address"},
-                    {"name": "value", "type": "uint256"},
-                    {"name": "validAfter", "type": "uint256"},
-                    {"name": "validBefore", "type": "uint256"},
-                    {"name": "nonce", "type": "bytes32"},
-                ]
-            },
-            "primaryType": "TransferWithAuthorization",
-            "domain": {
-                "name": payment_requirements.extra["name"],
-                "version": payment_requirements.extra["version"],
-                "chainId": int(get_chain_id(payment_requirements.network)),
-                "verifyingContract": payment_requirements.asset,
-            },
-            "message": {
-                "from": auth["from"],
-                "to": auth["to"],
-                "value": int(auth["value"]),
-                "validAfter": int(auth["validAfter"]),
-                "validBefore": int(auth["validBefore"]),
-                "nonce": nonce_bytes,
-            },
-        }
-
-        signed_message = account.sign_typed_data(
-            domain_data=typed_data["domain"],
-            message_types=typed_data["types"],
-            message_data=typed_data["message"],
+        domain_separator = get_domain_separator(
+            payment_requirements.extra["name"],
+            payment_requirements.extra["version"],
+            int(get_chain_id(payment_requirements.network)),
+            payment_requirements.asset,
+        )
+        digest = hash_transfer_with_authorization(
+            domain_separator,
+            auth["from"],
+            auth["to"],
+            int(auth["value"]),
+            int(auth["validAfter"]),
+            int(auth["validBefore"]),
+            nonce_bytes,
         )
-        signature = signed_message.signature.hex()
-        if not signature.startswith("0x"):
-            signature = f"0x{signature}"
+
+        signature = f"0x{_sign_digest(account, digest).hex()}"
 
         header["payload"]["signature"] = signature
 
         header["payload"]["authorization"]["nonce"] = f"0x{auth['nonce']}"
 
-        encoded = encode_payment(header)
+        encoded = encode_payment(header, encoding)
         return encoded
     except Exception:
         raise
 
 
-def encode_payment(payment_payload: Dict[str, Any]) -> str:
-    """Encode a payment payload into a base64 string, handling HexBytes and other non-serializable types."""
-    from hexbytes import HexBytes
+# Account loaded once per signing pool worker process
+_worker_account: Optional["Account"] = None
 
-    def default(obj):
-        if isinstance(obj, HexBytes):
-            return obj.hex()
-        if hasattr(obj, "to_dict"):
-            return obj.to_dict()
-        if hasattr(obj, "hex"):
-            return obj.hex()
-        raise TypeError(
-            f"Object of type {obj.__class__.__name__} is not JSON serializable"
-        )
 
-    return safe_base64_encode(json.dumps(payment_payload, default=default))
+def _init_signing_worker(private_key: bytes) -> None:
+    global _worker_account
+    from eth_account import Account
+
+    _worker_account = Account.from_key(private_key)
+
+
+def _sign_batch(
+    account: "Account",
+    items: Sequence[Tuple[PaymentRequirements, PaymentHeader]],
+) -> List[Union[str, Exception]]:
+    results: List[Union[str, Exception]] = []
+    for payment_requirements, header in items:
+        try:
+            results.append(sign_payment_header(account, payment_requirements, header))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+def _sign_batch_in_worker(
+    items: Sequence[Tuple[PaymentRequirements, PaymentHeader]],
+) -> List[Union[str, Exception]]:
+    if _worker_account is None:
+        raise RuntimeError("Signing worker was not initialized with an account")
+    return _sign_batch(_worker_account, items)
+
+
+def create_signing_pool(
+    account: "Account", processes: Optional[int] = None
+) -> ProcessPoolExecutor:
+    """Create a process pool for sign_payment_headers.
+
+    The account's private key is loaded once in each worker process.
+
+    Args:
+        account: Local account whose key signs the payments
+        processes: Number of worker processes, defaults to the number of CPUs
+
+    Returns:
+        ProcessPoolExecutor to pass to sign_payment_headers. The caller owns it and
+        should shut it down when done. Its x402_address attribute holds the
+        address of the account it signs for.
+    """
+    key = getattr(account, "key", None)
+    if key is None:
+        raise ValueError("Signing pools require an account with a local private key")
+    pool = ProcessPoolExecutor(
+        max_workers=processes,
+        initializer=_init_signing_worker,
+        initargs=(bytes(key),),
+    )
+    pool.x402_address = account.address
+    return pool
+
+
+def sign_payment_headers(
+    account: "Account",
+    items: Sequence[Tuple[PaymentRequirements, PaymentHeader]],
+    executor: Optional[Executor] = None,
+    chunk_size: int = 64,
+) -> List[Union[str, Exception]]:
+    """Sign many payment headers at once.
+
+    Args:
+        account: Account signing the payments
+        items: Pairs of payment requirements and unsigned payment headers, with the
+            nonce as a hex string as for sign_payment_header
+        executor: Optional pool from create_signing_pool, created for the same
+            account. Batches larger than chunk_size are split into chunks signed
+            in parallel by its workers.
+        chunk_size: Number of headers signed per task
+
+    Returns:
+        Encoded payment headers in the order of items. An item that fails to sign
+        holds its exception instead, without aborting the rest of the batch.
+
+    Raises:
+        ValueError: If the executor was not created by create_signing_pool for
+            the same account
+    """
+    if executor is not None:
+        pool_address = getattr(executor, "x402_address", None)
+        if pool_address is None:
+            raise ValueError("executor must be created with create_signing_pool")
+        if pool_address.lower() != account.address.lower():
+            raise ValueError(
+                f"Signing pool signs for {pool_address}, not {account.address}"
+            )
+
+    if executor is None or len(items) <= chunk_size:
+        return _sign_batch(account, items)
+
+    futures = [
+        executor.submit(_sign_batch_in_worker, items[i : i + chunk_size])
+        for i in range(0, len(items), chunk_size)
+    ]
+    results: List[Union[str, Exception]] = []
+    for future, start in zip(futures, range(0, len(items), chunk_size)):
+        try:
+            results.extend(future.result())
+        except Exception as e:
+            # The whole chunk failed, e.g. because a worker process died
+            results.extend(e for _ in items[start : start + chunk_size])
+    return results
+
+
+def _json_default(obj: Any) -> Any:
+    """Convert HexBytes and other non-JSON types found in payment payloads."""
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    if hasattr(obj, "hex"):
+        return obj.hex()
+    raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
+
+
+def encode_payment(
+    payment_payload: Dict[str, Any], encoding: str = JSON_PAYMENT_ENCODING
+) -> str:
+    """Encode a payment payload into a base64 string, handling HexBytes and other non-serializable types.
+
+    Args:
+        payment_payload: Payment payload to encode
+        encoding: "json" for base64 JSON, understood by every server, or "compact"
+            for the binary layout of encode_payment_compact
+
+    Raises:
+        ValueError: If the encoding is unknown or cannot represent the payload
+    """
+    if encoding == COMPACT_PAYMENT_ENCODING:
+        return encode_payment_compact(payment_payload)
+    if encoding != JSON_PAYMENT_ENCODING:
+        raise ValueError(f"Unknown payment encoding: {encoding}")
+    return base64.b64encode(json_dumps(payment_payload, default=_json_default)).decode(
+        "ascii"
+    )
 
 
 def decode_payment(encoded_payment: str) -> Dict[str, Any]:
-    """Decode a base64 encoded payment string back into a PaymentPayload object."""
-    return json.loads(safe_base64_decode(encoded_payment))
+    """Decode a base64 encoded payment string back into a PaymentPayload object.
+
+    Both JSON and compact encoded payments are accepted.
+    """
+    if encoded_payment.startswith(COMPACT_PAYMENT_PREFIX):
+        return decode_payment_compact(encoded_payment)
+    return json_loads(base64.b64decode(encoded_payment))
+
+
+# X-PAYMENT-ENCODINGS value for servers decoding payments with decode_payment
+ACCEPTED_PAYMENT_ENCODINGS = f"{COMPACT_PAYMENT_ENCODING}, {JSON_PAYMENT_ENCODING}"
+
+# Compact payments start with a prefix outside the base64 alphabet, so they can
+# never be mistaken for base64 JSON
+COMPACT_PAYMENT_PREFIX = "c1."
+
+_COMPACT_SCHEMES = ("exact",)
+
+# x402Version, scheme id, network length
+_COMPACT_HEAD = struct.Struct(">BBB")
+# signature length
+_COMPACT_SIGNATURE_LENGTH = struct.Struct(">H")
+# from, to, value length
+_COMPACT_ADDRESSES = struct.Struct(">20s20sB")
+# validAfter, validBefore, nonce
+_COMPACT_TAIL = struct.Struct(">QQ32s")
+
+
+def encode_payment_compact(payment_payload: Dict[str, Any]) -> str:
+    """Encode an exact scheme payment payload in the compact binary layout.
+
+    The payload is packed big-endian as x402Version (u8), scheme id (u8), network
+    length (u8) and ASCII name, signature length (u16) and bytes, from and to
+    (20 bytes each), value length (u8) and minimal bytes, validAfter and
+    validBefore (u64 each) and nonce (32 bytes), then base64url encoded without
+    padding behind COMPACT_PAYMENT_PREFIX. This is about a third of the JSON size.
+
+    Args:
+        payment_payload: Signed payment payload, as produced by sign_payment_header
+
+    Returns:
+        Compact encoded payment
+
+    Raises:
+        ValueError: If the payload is not an exact scheme payment or a field does
+            not fit the layout
+    """
+    try:
+        scheme_id = _COMPACT_SCHEMES.index(payment_payload["scheme"])
+        network = payment_payload["network"].encode("ascii")
+        payload = payment_payload["payload"]
+        authorization = payload["authorization"]
+        signature = _hex_to_bytes(payload["signature"])
+        value = int(authorization["value"])
+        value_bytes = value.to_bytes((value.bit_length() + 7) // 8, "big")
+        nonce = _hex_to_bytes(authorization["nonce"])
+        if len(nonce) != 32:
+            raise ValueError("nonce must be 32 bytes")
+        packed = b"".join(
+            (
+                _COMPACT_HEAD.pack(
+                    payment_payload["x402Version"], scheme_id, len(network)
+                ),
+                network,
+                _COMPACT_SIGNATURE_LENGTH.pack(len(signature)),
+                signature,
+                _COMPACT_ADDRESSES.pack(
+                    _address_to_bytes(authorization["from"]),
+                    _address_to_bytes(authorization["to"]),
+                    len(value_bytes),
+                ),
+                value_bytes,
+                _COMPACT_TAIL.pack(
+                    int(authorization["validAfter"]),
+                    int(authorization["validBefore"]),
+                    nonce,
+                ),
+            )
+        )
+    except (KeyError, TypeError, AttributeError, OverflowError, struct.error) as e:
+        raise ValueError(f"Payment cannot be compact encoded: {e}") from e
+    return COMPACT_PAYMENT_PREFIX + base64.urlsafe_b64encode(packed).rstrip(
+        b"="
+    ).decode("ascii")
+
+
+def decode_payment_compact(encoded_payment: str) -> Dict[str, Any]:
+    """Decode a payment encoded with encode_payment_compact into its JSON form.
+
+    Addresses are returned checksummed and hex fields 0x-prefixed.
+
+    Raises:
+        ValueError: If the payment is malformed
+    """
+    if not encoded_payment.startswith(COMPACT_PAYMENT_PREFIX):
+        raise ValueError("Not a compact encoded payment")
+    body = encoded_payment[len(COMPACT_PAYMENT_PREFIX) :]
+    try:
+        data = base64.urlsafe_b64decode(body + "=" * (-len(body) % 4))
+        x402_version, scheme_id, network_length = _COMPACT_HEAD.unpack_from(data)
+        offset = _COMPACT_HEAD.size
+        network = data[offset : offset + network_length].decode("ascii")
+        offset += network_length
+        (signature_length,) = _COMPACT_SIGNATURE_LENGTH.unpack_from(data, offset)
+        offset += _COMPACT_SIGNATURE_LENGTH.size
+        signature = data[offset : offset + signature_length]
+        offset += signature_length
+        from_, to, value_length = _COMPACT_ADDRESSES.unpack_from(data, offset)
+        offset += _COMPACT_ADDRESSES.size
+        value = int.from_bytes(data[offset : offset + value_length], "big")
+        offset += value_length
+        valid_after, valid_before, nonce = _COMPACT_TAIL.unpack_from(data, offset)
+        offset += _COMPACT_TAIL.size
+        scheme = _COMPACT_SCHEMES[scheme_id]
+    except (binascii.Error, struct.error, IndexError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid compact payment: {e}") from e
+    if offset != len(data) or len(signature) != signature_length:
+        raise ValueError("Invalid compact payment: unexpected length")
+
+    return {
+        "x402Version": x402_version,
+        "scheme": scheme,
+        "network": network,
+        "payload": {
+            "signature": f"0x{signature.hex()}",
+            "authorization": {
+                "from": _checksum_address(from_),
+                "to": _checksum_address(to),
+                "value": str(value),
+                "validAfter": str(valid_after),
+                "validBefore": str(valid_before),
+                "nonce": f"0x{nonce.hex()}",
+            },
+        },
+    }
+
+
+# Checksumming costs a keccak per address; payers and payees repeat across requests
+_checksum_address = lru_cache(maxsize=4096)(to_checksum_address)
+
+
+def _hex_to_bytes(value: str) -> bytes:
+    return bytes.fromhex(value[2:] if value.startswith(("0x", "0X")) else value)
+
+
+def _address_to_bytes(address: str) -> bytes:
+    address_bytes = _hex_to_bytes(address)
+    if len(address_bytes) != 20:
+        raise ValueError(f"Invalid address: {address}")
+    return address_bytes
@@ -1,4 +1,19 @@
-from typing import Callable, Optional, TypedDict
+import asyncio
+import os
+import threading
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Optional,
+    Tuple,
+    TypedDict,
+    TypeVar,
+    Union,
+)
 import httpx
 from x402.types import (
     PaymentPayload,
@@ -6,6 +21,12 @@ from x402.types import (
     VerifyResponse,
     SettleResponse,
 )
+from x402.wire import (
+    WirePaymentPayload,
+    WirePaymentRequirements,
+    WireSettleResponse,
+    WireVerifyResponse,
+)
 
 
 class FacilitatorConfig(TypedDict, total=False):
@@ -38,50 +59,141 @@ class FacilitatorClient:
         self, payment: PaymentPayload, payment_requirements: PaymentRequirements
     ) -> VerifyResponse:
         """Verify a payment header is valid and a request should be processed"""
-        headers = {"Content-Type": "application/json"}
-
-        if self.config.get("create_headers"):
-            custom_headers = await self.config["create_headers"]()
-            headers.update(custom_headers.get("verify", {}))
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.config['url']}/verify",
-                json={
-                    "x402Version": payment.x402_version,
-                    "paymentPayload": payment.model_dump(by_alias=True),
-                    "paymentRequirements": payment_requirements.model_dump(
-                        by_alias=True
-                    ),
-                },
-                headers=headers,
-                follow_redirects=True,
-            )
-
-            data = response.json()
-            return VerifyResponse(**data)
+        data = await self._post("verify", payment, payment_requirements)
+        return VerifyResponse(**data)
 
     async def settle(
         self, payment: PaymentPayload, payment_requirements: PaymentRequirements
     ) -> SettleResponse:
+        data = await self._post("settle", payment, payment_requirements)
+        return SettleResponse(**data)
+
+    async def verify_wire(
+        self,
+        payment: WirePaymentPayload,
+        payment_requirements: WirePaymentRequirements,
+    ) -> WireVerifyResponse:
+        """Variant of verify taking and returning the slotted x402.wire types"""
+        data = await self._post("verify", payment, payment_requirements)
+        return WireVerifyResponse.from_dict(data)
+
+    async def settle_wire(
+        self,
+        payment: WirePaymentPayload,
+        payment_requirements: WirePaymentRequirements,
+    ) -> WireSettleResponse:
+        """Variant of settle taking and returning the slotted x402.wire types"""
+        data = await self._post("settle", payment, payment_requirements)
+        return WireSettleResponse.from_dict(data)
+
+    async def _post(
+        self,
+        endpoint: str,
+        payment: Union[PaymentPayload, WirePaymentPayload],
+        payment_requirements: Union[PaymentRequirements, WirePaymentRequirements],
+    ) -> Dict[str, Any]:
         headers = {"Content-Type": "application/json"}
 
         if self.config.get("create_headers"):
             custom_headers = await self.config["create_headers"]()
-            headers.update(custom_headers.get("settle", {}))
+            headers.update(custom_headers.get(endpoint, {}))
 
-        async with httpx.AsyncClient() as client:
+        async with self._http_client() as client:
             response = await client.post(
-                f"{self.config['url']}/settle",
+                f"{self.config['url']}/{endpoint}",
                 json={
                     "x402Version": payment.x402_version,
-                    "paymentPayload": payment.model_dump(by_alias=True),
-                    "paymentRequirements": payment_requirements.model_dump(
-                        by_alias=True
-                    ),
+                    "paymentPayload": _to_json(payment),
+                    "paymentRequirements": _to_json(payment_requirements),
                 },
                 headers=headers,
                 follow_redirects=True,
             )
-            data = response.json()
-            return SettleResponse(**data)
+            return response.json()
+
+    @asynccontextmanager
+    async def _http_client(self) -> AsyncIterator[httpx.AsyncClient]:
+        async with httpx.AsyncClient() as client:
+            yield client
+
+
+T = TypeVar("T")
+
+# Event loop shared by the pooled clients of a process, running on a daemon
+# thread. Recreated in a forked child, where the parent's thread does not exist.
+_loop: Optional[Tuple[int, asyncio.AbstractEventLoop]] = None
+_pooled: Dict[Tuple[Any, ...], "PooledFacilitatorClient"] = {}
+_lock = threading.Lock()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _lock:
+        if _loop is None or _loop[0] != os.getpid():
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, name="x402-facilitator", daemon=True
+            ).start()
+            _loop = (os.getpid(), loop)
+            _pooled.clear()
+        return _loop[1]
+
+
+class PooledFacilitatorClient(FacilitatorClient):
+    """FacilitatorClient reusing one connection pool for all requests.
+
+    FacilitatorClient opens a new HTTP client, and so new connections, for
+    every call. This one keeps a single httpx.AsyncClient on a background event
+    loop shared by the process. Its coroutines must run on that loop, which
+    synchronous code such as Flask views does with run():
+
+        facilitator = pooled_facilitator(config)
+        verify_response = facilitator.run(facilitator.verify_wire(payment, requirements))
+    """
+
+    def __init__(self, config: Optional[FacilitatorConfig] = None):
+        super().__init__(config)
+        self._client: Optional[Tuple[int, httpx.AsyncClient]] = None
+
+    @asynccontextmanager
+    async def _http_client(self) -> AsyncIterator[httpx.AsyncClient]:
+        # A client created before a fork belongs to the parent's loop
+        if self._client is None or self._client[0] != os.getpid():
+            self._client = (os.getpid(), httpx.AsyncClient())
+        yield self._client[1]
+
+    def run(self, coroutine: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """Run a coroutine on the background loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, _background_loop()).result(
+            timeout
+        )
+
+    def close(self) -> None:
+        """Close the connection pool. The client reopens it when used again."""
+        if self._client is not None and self._client[0] == os.getpid():
+            self.run(self._client[1].aclose())
+        self._client = None
+
+
+def pooled_facilitator(
+    config: Optional[FacilitatorConfig] = None,
+) -> PooledFacilitatorClient:
+    """Return the process-wide pooled client for a facilitator configuration."""
+    config = config or {}
+    key = (config.get("url"), config.get("create_headers"))
+    _background_loop()
+    with _lock:
+        client = _pooled.get(key)
+        if client is None:
+            client = _pooled[key] = PooledFacilitatorClient(config or None)
+        return client
+
+
+def _to_json(
+    value: Union[
+        PaymentPayload, PaymentRequirements, WirePaymentPayload, WirePaymentRequirements
+    ],
+) -> Dict[str, Any]:
+    if isinstance(value, (WirePaymentPayload, WirePaymentRequirements)):
+        return value.to_dict()
+    return value.model_dump(by_alias=True)
@@ -0,0 +1,32 @@
+from typing import Callable
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from x402.aggregates import PaymentAggregates, query_params
+from x402.encoding import json_dumps
+
+
+def aggregates_endpoint(aggregates: PaymentAggregates) -> Callable:
+    """Generate a read-only FastAPI endpoint serving payment aggregates.
+
+    Usage:
+        app.get("/x402/aggregates")(aggregates_endpoint(aggregates))
+
+    Query parameters are `dimension` (route, payer or network), `window` in
+    seconds, and `snapshot=1` for a snapshot other workers can merge.
+
+    Args:
+        aggregates (PaymentAggregates): Aggregates to serve
+
+    Returns:
+        Callable: Endpoint function
+    """
+
+    async def endpoint(request: Request) -> Response:
+        status, body = query_params(aggregates, request.query_params)
+        return Response(
+            content=json_dumps(body), status_code=status, media_type="application/json"
+        )
+
+    return endpoint
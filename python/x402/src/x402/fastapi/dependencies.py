@@ -0,0 +1,224 @@
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import Header, Request
+from fastapi.dependencies.models import Dependant
+from fastapi.responses import Response
+from fastapi.routing import APIRoute
+from pydantic import ConfigDict, validate_call
+
+from x402.encoding import json_loads
+from x402.events import EventBus
+from x402.gate import (
+    PAYMENT_HEADER,
+    PAYMENT_RESPONSE_HEADER,
+    PaymentAttempt,
+    PaymentGate,
+)
+from x402.metrics import SERVER_TIMING_HEADER, MetricsHook
+from x402.sharedcache import PaymentCache
+from x402.types import Price, VerifyResponse
+
+# Route level payment gating for FastAPI. A paid() dependency verifies the
+# payment before the endpoint runs and PaidRoute settles it once the endpoint
+# has produced a successful response. Requirements are compiled when paid() is
+# called and routes without a paid() dependency run unchanged, so unlike the
+# require_payment middleware unpaid routes pay nothing.
+
+# ASGI scope key under which PaidRoute hands the request's attempt around
+_ATTEMPT = "x402.attempt"
+
+
+class _PaymentRejected(Exception):
+    def __init__(self, response: Response):
+        self.response = response
+
+
+def _payment_required(gate: PaymentGate, attempt: PaymentAttempt) -> Response:
+    return Response(
+        content=gate.payment_required_body(attempt),
+        status_code=402,
+        headers=dict(gate.payment_required_headers(attempt)),
+        media_type="application/json",
+    )
+
+
+class PaymentDependency:
+    """FastAPI dependency requiring a verified payment, created by paid().
+
+    The route must be a PaidRoute. The dependency's value is the facilitator's
+    VerifyResponse; like the middleware it also sets request.state.payment_details
+    and request.state.verify_response.
+    """
+
+    def __init__(self, gate: PaymentGate):
+        self.gate = gate
+
+    async def __call__(
+        self,
+        request: Request,
+        x_payment: str = Header(
+            "",
+            alias=PAYMENT_HEADER,
+            description="Base64 encoded x402 payment payload",
+        ),
+    ) -> VerifyResponse:
+        if _ATTEMPT not in request.scope:
+            raise RuntimeError(
+                "paid() dependencies must be used on routes created with "
+                "route_class=PaidRoute"
+            )
+        gate = self.gate
+        attempt = gate.begin(str(request.url))
+        if not await gate.verify(attempt, x_payment):
+            raise _PaymentRejected(_payment_required(gate, attempt))
+        request.scope[_ATTEMPT] = (gate, attempt)
+
+        request.state.payment_details = gate.payment_details(attempt)
+        request.state.verify_response = gate.verify_model(attempt)
+        return request.state.verify_response
+
+
+@validate_call(config=ConfigDict(arbitrary_types_allowed=True))
+def paid(
+    price: Price,
+    pay_to_address: str,
+    description: str = "",
+    mime_type: str = "",
+    max_deadline_seconds: int = 60,
+    output_schema: Any = None,
+    facilitator_config: Optional[Dict[str, Any]] = None,
+    network: str = "base-sepolia",
+    resource: Optional[str] = None,
+    metrics: Optional[MetricsHook] = None,
+    server_timing: bool = False,
+    events: Optional[EventBus] = None,
+    payment_cache: Optional[PaymentCache] = None,
+) -> PaymentDependency:
+    """Generate a FastAPI dependency that gates payments for the routes using it.
+
+    Usage:
+        router = APIRouter(route_class=PaidRoute)
+
+        @router.get("/weather", dependencies=[Depends(paid("$0.001", "0x..."))])
+        async def weather(): ...
+
+    Args:
+        price (Price): Payment price. Can be:
+            - Money: USD amount as string/int (e.g., "$3.10", 0.10, "0.001") - defaults to USDC
+            - TokenAmount: Custom token amount with asset information
+        pay_to_address (str): Ethereum address to receive the payment
+        description (str, optional): Description of what is being purchased. Defaults to "".
+        mime_type (str, optional): MIME type of the resource. Defaults to "".
+        max_deadline_seconds (int, optional): Maximum time allowed for payment. Defaults to 60.
+        output_schema (Any, optional): JSON schema for the response. Defaults to None.
+        facilitator_config (Optional[Dict[str, Any]], optional): Configuration for the payment facilitator.
+            If not provided, defaults to the public x402.org facilitator.
+        network (str, optional): Ethereum network ID. Defaults to "base-sepolia" (Base Sepolia testnet).
+        resource (Optional[str], optional): Resource URL. Defaults to None (uses request URL).
+        metrics (Optional[MetricsHook], optional): Hook receiving phase durations and
+            payment outcomes. Defaults to None.
+        server_timing (bool, optional): Whether to report the phase durations in a
+            Server-Timing response header. Defaults to False.
+        events (Optional[EventBus], optional): Bus receiving payment lifecycle events.
+            Defaults to None.
+        payment_cache (Optional[PaymentCache], optional): Cache of verify results and
+            seen nonces shared by the server's worker processes. Defaults to None.
+
+    Returns:
+        PaymentDependency: Dependency to pass to Depends
+    """
+    return PaymentDependency(
+        PaymentGate(
+            price,
+            pay_to_address,
+            description=description,
+            mime_type=mime_type,
+            max_deadline_seconds=max_deadline_seconds,
+            output_schema=output_schema,
+            facilitator_config=facilitator_config,
+            network=network,
+            resource=resource,
+            metrics=metrics,
+            server_timing=server_timing,
+            events=events,
+            payment_cache=payment_cache,
+        )
+    )
+
+
+def _payment_dependencies(dependant: Dependant) -> List[PaymentDependency]:
+    found = []
+    for dependency in dependant.dependencies:
+        if isinstance(dependency.call, PaymentDependency):
+            found.append(dependency.call)
+        found.extend(_payment_dependencies(dependency))
+    return found
+
+
+class PaidRoute(APIRoute):
+    """APIRoute settling the payments verified by its paid() dependency.
+
+    Routes without a paid() dependency get the plain APIRoute handler. Paid
+    routes document the X-PAYMENT header and their 402 response, including
+    the accepted payment requirements, in the OpenAPI schema.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        super().__init__(path, endpoint, **kwargs)
+        if self.payment_dependency is None:
+            return
+        template = self.payment_dependency.gate.template
+        body = json_loads(
+            template.payment_required_body(
+                template.resource or self.path_format, "No X-PAYMENT header provided"
+            )
+        )
+        self.responses = {
+            **self.responses,
+            402: {
+                "description": "Payment Required",
+                "content": {"application/json": {"example": body}},
+            },
+        }
+        self.openapi_extra = {
+            **(self.openapi_extra or {}),
+            "x-x402-accepts": body["accepts"],
+        }
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        dependencies = _payment_dependencies(self.dependant)
+        if len(dependencies) > 1:
+            raise ValueError(f"Route {self.path} has more than one paid() dependency")
+        self.payment_dependency = dependencies[0] if dependencies else None
+        if self.payment_dependency is None:
+            return handler
+
+        async def paid_handler(request: Request) -> Response:
+            request.scope[_ATTEMPT] = None
+            try:
+                response = await handler(request)
+            except _PaymentRejected as rejection:
+                return rejection.response
+            except BaseException:
+                if request.scope[_ATTEMPT] is not None:
+                    gate, attempt = request.scope[_ATTEMPT]
+                    gate.not_settled(attempt)
+                raise
+            if request.scope[_ATTEMPT] is None:
+                return response
+
+            gate, attempt = request.scope[_ATTEMPT]
+            if response.status_code < 200 or response.status_code >= 300:
+                gate.not_settled(attempt)
+            else:
+                header = await gate.settle(attempt)
+                if header is None:
+                    return _payment_required(gate, attempt)
+                response.headers[PAYMENT_RESPONSE_HEADER] = header
+            timing = gate.timing_header(attempt)
+            if timing is not None:
+                response.headers.append(SERVER_TIMING_HEADER, timing)
+            return response
+
+        return paid_handler
@@ -1,24 +1,23 @@
-import base64
-import json
 from typing import Any, Callable, Dict, Optional
 
 from fastapi import Request
-from fastapi.responses import JSONResponse
-from pydantic import validate_call
-
-from x402.common import process_price_to_atomic_amount, x402_VERSION
-from x402.encoding import safe_base64_decode
-from x402.facilitator import FacilitatorClient
-from x402.path import path_is_match
-from x402.types import (
-    PaymentPayload,
-    PaymentRequirements,
-    Price,
-    x402PaymentRequiredResponse,
+from fastapi.responses import Response
+from pydantic import ConfigDict, validate_call
+
+from x402.events import EventBus
+from x402.gate import (
+    PAYMENT_HEADER,
+    PAYMENT_RESPONSE_HEADER,
+    PaymentAttempt,
+    PaymentGate,
 )
+from x402.metrics import SERVER_TIMING_HEADER, MetricsHook
+from x402.path import compile_path
+from x402.sharedcache import PaymentCache
+from x402.types import Price
 
 
-@validate_call
+@validate_call(config=ConfigDict(arbitrary_types_allowed=True))
 def require_payment(
     price: Price,
     pay_to_address: str,
@@ -30,6 +29,10 @@ def require_payment(
     facilitator_config: Optional[Dict[str, Any]] = None,
     network: str = "base-sepolia",
     resource: Optional[str] = None,
+    metrics: Optional[MetricsHook] = None,
+    server_timing: bool = False,
+    events: Optional[EventBus] = None,
+    payment_cache: Optional[PaymentCache] = None,
 ):
     """Generate a FastAPI middleware that gates payments for an endpoint.
 
@@ -47,117 +50,76 @@ def require_payment(
             If not provided, defaults to the public x402.org facilitator.
         network (str, optional): Ethereum network ID. Defaults to "base-sepolia" (Base Sepolia testnet).
         resource (Optional[str], optional): Resource URL. Defaults to None (uses request URL).
+        metrics (Optional[MetricsHook], optional): Hook receiving the duration of each
+            phase (match, decode, select, verify, handler, settle) and the outcome of
+            each payment. Defaults to None.
+        server_timing (bool, optional): Whether to report the phase durations in a
+            Server-Timing response header. Defaults to False.
+        events (Optional[EventBus], optional): Bus receiving payment_required, verified,
+            verify_failed, settled and settle_failed events. Defaults to None.
+        payment_cache (Optional[PaymentCache], optional): Cache of verify results and
+            seen nonces shared by the server's worker processes. Defaults to None.
 
     Returns:
         Callable: FastAPI middleware function that checks for valid payment before processing requests
     """
 
-    try:
-        max_amount_required, asset_address, eip712_domain = (
-            process_price_to_atomic_amount(price, network)
+    gate = PaymentGate(
+        price,
+        pay_to_address,
+        description=description,
+        mime_type=mime_type,
+        max_deadline_seconds=max_deadline_seconds,
+        output_schema=output_schema,
+        facilitator_config=facilitator_config,
+        network=network,
+        resource=resource,
+        metrics=metrics,
+        server_timing=server_timing,
+        events=events,
+        payment_cache=payment_cache,
+    )
+    path_matches = compile_path(path)
+
+    def payment_required(attempt: PaymentAttempt) -> Response:
+        return Response(
+            content=gate.payment_required_body(attempt),
+            status_code=402,
+            headers=dict(gate.payment_required_headers(attempt)),
+            media_type="application/json",
         )
-    except Exception as e:
-        raise ValueError(f"Invalid price: {price}. Error: {e}")
-
-    facilitator = FacilitatorClient(facilitator_config)
 
     async def middleware(request: Request, call_next: Callable):
         # Skip if the path is not the same as the path in the middleware
-        if not path_is_match(path, request.url.path):
+        if not path_matches(request.url.path):
             return await call_next(request)
 
-        # Get resource URL if not explicitly provided
-        resource_url = resource or str(request.url)
-
-        # Ensure output_schema and extra are objects, not null
-        output_schema_obj = {} if output_schema is None else output_schema
-
-        # Construct payment details
-        payment_requirements = [
-            PaymentRequirements(
-                scheme="exact",
-                network=network,
-                asset=asset_address,
-                max_amount_required=max_amount_required,
-                resource=resource_url,
-                description=description,
-                mime_type=mime_type,
-                pay_to=pay_to_address,
-                max_timeout_seconds=max_deadline_seconds,
-                output_schema=output_schema_obj,
-                extra=eip712_domain,
-            )
-        ]
-
-        def x402_response(error: str):
-            return JSONResponse(
-                content=x402PaymentRequiredResponse(
-                    x402_version=x402_VERSION,
-                    accepts=payment_requirements,
-                    error=error,
-                ).model_dump(by_alias=True),
-                status_code=402,
-            )
+        # TODO: add support for html paywall
+        attempt = gate.begin(str(request.url))
+        if not await gate.verify(attempt, request.headers.get(PAYMENT_HEADER, "")):
+            return payment_required(attempt)
 
-        # Check for payment header
-        payment_header = request.headers.get("X-PAYMENT", "")
-
-        if payment_header == "":  # Return JSON response for API requests
-            # TODO: add support for html paywall
-            return x402_response("No X-PAYMENT header provided")
-
-        # Decode payment header
-        try:
-            payment_dict = json.loads(safe_base64_decode(payment_header))
-            payment = PaymentPayload(**payment_dict)
-        except Exception as e:
-            return x402_response(f"Invalid payment header format: {str(e)}")
-
-        # Find matching payment requirements
-        selected_payment_requirements = next(
-            (
-                req
-                for req in payment_requirements
-                if req.scheme == payment.scheme and req.network == payment.network
-            ),
-            None,
-        )
-
-        if not selected_payment_requirements:
-            return x402_response("No matching payment requirements found")
-
-        # Verify payment
-        verify_response = await facilitator.verify(
-            payment, selected_payment_requirements
-        )
-
-        if not verify_response.is_valid:
-            return x402_response("Invalid payment: " + verify_response.invalid_reason)
-
-        request.state.payment_details = selected_payment_requirements
-        request.state.verify_response = verify_response
+        request.state.payment_details = gate.payment_details(attempt)
+        request.state.verify_response = gate.verify_model(attempt)
 
         # Process the request
-        response = await call_next(request)
-
-        # Early return without settling if the response is not a 2xx
-        if response.status_code < 200 or response.status_code >= 300:
-            return response
-
-        # Settle the payment
         try:
-            settle_response = await facilitator.settle(
-                payment, selected_payment_requirements
-            )
-            if settle_response.success:
-                response.headers["X-PAYMENT-RESPONSE"] = base64.b64encode(
-                    settle_response.model_dump_json().encode("utf-8")
-                ).decode("utf-8")
-            else:
-                return x402_response("Settle failed: " + settle_response.error)
-        except Exception:
-            return x402_response("Settle failed")
+            response = await call_next(request)
+        except BaseException:
+            gate.not_settled(attempt)
+            raise
 
+        # Settle the payment only if the response is a 2xx
+        if response.status_code < 200 or response.status_code >= 300:
+            gate.not_settled(attempt)
+        else:
+            header = await gate.settle(attempt)
+            if header is None:
+                return payment_required(attempt)
+            response.headers[PAYMENT_RESPONSE_HEADER] = header
+        timing = gate.timing_header(attempt)
+        if timing is not None:
+            response.headers.append(SERVER_TIMING_HEADER, timing)
         return response
 
     return middleware
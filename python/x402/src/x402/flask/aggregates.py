@@ -0,0 +1,30 @@
+from typing import Callable
+
+from flask import Response, request
+
+from x402.aggregates import PaymentAggregates, query_params
+from x402.encoding import json_dumps
+
+
+def aggregates_view(aggregates: PaymentAggregates) -> Callable:
+    """Generate a read-only Flask view serving payment aggregates.
+
+    Usage:
+        app.add_url_rule("/x402/aggregates", view_func=aggregates_view(aggregates))
+
+    Query parameters are `dimension` (route, payer or network), `window` in
+    seconds, and `snapshot=1` for a snapshot other workers can merge.
+
+    Args:
+        aggregates (PaymentAggregates): Aggregates to serve
+
+    Returns:
+        Callable: View function
+    """
+
+    def view():
+        status, body = query_params(aggregates, request.args)
+        return Response(json_dumps(body), status=status, mimetype="application/json")
+
+    view.__name__ = "x402_aggregates"
+    return view
@@ -0,0 +1,130 @@
+import functools
+from typing import Any, Callable, Dict, Optional
+
+from flask import Response, current_app, g, request
+
+from x402.events import EventBus
+from x402.facilitator import pooled_facilitator
+from x402.gate import (
+    PAYMENT_HEADER,
+    PAYMENT_RESPONSE_HEADER,
+    PaymentAttempt,
+    PaymentGate,
+)
+from x402.metrics import SERVER_TIMING_HEADER, MetricsHook
+from x402.sharedcache import PaymentCache
+from x402.types import Price
+
+# View level payment gating for Flask. Unlike PaymentMiddleware, which wraps
+# the whole WSGI app and checks every request against every configuration,
+# x402_paid compiles the requirements when the view is decorated and only runs
+# for the views it decorates. Facilitator calls go through the process-wide
+# pooled client instead of a new event loop and HTTP client per call.
+
+
+def _payment_required(gate: PaymentGate, attempt: PaymentAttempt) -> Response:
+    response = Response(
+        gate.payment_required_body(attempt), status=402, mimetype="application/json"
+    )
+    for name, value in gate.payment_required_headers(attempt):
+        response.headers[name] = value
+    return response
+
+
+def x402_paid(
+    price: Price,
+    pay_to_address: str,
+    description: str = "",
+    mime_type: str = "",
+    max_deadline_seconds: int = 60,
+    output_schema: Any = None,
+    facilitator_config: Optional[Dict[str, Any]] = None,
+    network: str = "base-sepolia",
+    resource: Optional[str] = None,
+    metrics: Optional[MetricsHook] = None,
+    server_timing: bool = False,
+    events: Optional[EventBus] = None,
+    payment_cache: Optional[PaymentCache] = None,
+) -> Callable[[Callable], Callable]:
+    """Decorate a Flask view to require a payment.
+
+    Usage:
+        @app.route("/weather")
+        @x402_paid(price="$0.001", pay_to_address="0x...")
+        def weather(): ...
+
+    The payment is verified before the view runs and settled once it returned a
+    2xx response; if settling fails the client gets a 402 instead. Like the
+    middleware, the view finds the payment in g.payment_details and
+    g.verify_response.
+
+    Args:
+        price (Price): Payment price (USD or TokenAmount)
+        pay_to_address (str): Ethereum address to receive payment
+        description (str, optional): Description of the resource
+        mime_type (str, optional): MIME type of the resource
+        max_deadline_seconds (int, optional): Max time for payment
+        output_schema (Any, optional): JSON schema for response
+        facilitator_config (dict, optional): Facilitator config
+        network (str, optional): Network ID
+        resource (str, optional): Resource URL
+        metrics (MetricsHook, optional): Hook receiving phase durations and
+            payment outcomes
+        server_timing (bool, optional): Report phase durations in a
+            Server-Timing response header
+        events (EventBus, optional): Bus receiving payment lifecycle events
+        payment_cache (PaymentCache, optional): Cache of verify results and
+            seen nonces shared by the server's worker processes
+
+    Raises:
+        ValueError: If the price is invalid
+    """
+    facilitator = pooled_facilitator(facilitator_config)
+    gate = PaymentGate(
+        price,
+        pay_to_address,
+        description=description,
+        mime_type=mime_type,
+        max_deadline_seconds=max_deadline_seconds,
+        output_schema=output_schema,
+        network=network,
+        resource=resource,
+        metrics=metrics,
+        server_timing=server_timing,
+        events=events,
+        payment_cache=payment_cache,
+        facilitator=facilitator,
+    )
+
+    def decorator(view: Callable) -> Callable:
+        @functools.wraps(view)
+        def paid_view(*args, **kwargs):
+            attempt = gate.begin(request.url)
+            header = request.headers.get(PAYMENT_HEADER, "")
+            if not facilitator.run(gate.verify(attempt, header)):
+                return _payment_required(gate, attempt)
+
+            g.payment_details = gate.payment_details(attempt)
+            g.verify_response = gate.verify_model(attempt)
+            try:
+                response = current_app.make_response(view(*args, **kwargs))
+            except BaseException:
+                gate.not_settled(attempt)
+                raise
+
+            if response.status_code < 200 or response.status_code >= 300:
+                gate.not_settled(attempt)
+            else:
+                settlement = facilitator.run(gate.settle(attempt))
+                if settlement is None:
+                    return _payment_required(gate, attempt)
+                response.headers[PAYMENT_RESPONSE_HEADER] = settlement
+            timing = gate.timing_header(attempt)
+            if timing is not None:
+                response.headers.add(SERVER_TIMING_HEADER, timing)
+            return response
+
+        paid_view.x402_gate = gate
+        return paid_view
+
+    return decorator
@@ -0,0 +1,343 @@
+import base64
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from x402.common import process_price_to_atomic_amount
+from x402.encoding import PAYMENT_ENCODINGS_HEADER, json_dumps
+from x402.events import (
+    PAYMENT_REQUIRED,
+    SETTLE_FAILED,
+    SETTLED,
+    VERIFIED,
+    VERIFY_FAILED,
+    EventBus,
+    EventType,
+    PaymentEvent,
+)
+from x402.exact import ACCEPTED_PAYMENT_ENCODINGS, decode_payment
+from x402.facilitator import FacilitatorClient
+from x402.metrics import SERVER_TIMING_HEADER, MetricsHook, PhaseTimer
+from x402.sharedcache import PaymentCache
+from x402.templates import PaymentRequirementsTemplate
+from x402.types import PaymentRequirements, Price, VerifyResponse
+from x402.wire import WirePaymentPayload, WirePaymentRequirements, WireVerifyResponse
+
+# Framework independent payment checks for a single paid resource. Every
+# server integration (the FastAPI and Flask middlewares, FastAPI dependencies,
+# Flask view decorators, the gateway) compiles a PaymentGate when a route is
+# registered and drives one PaymentAttempt per request through verify and then
+# settle or not_settled.
+
+logger = logging.getLogger(__name__)
+
+PAYMENT_HEADER = "X-PAYMENT"
+PAYMENT_RESPONSE_HEADER = "X-PAYMENT-RESPONSE"
+
+
+@dataclass(slots=True)
+class PaymentAttempt:
+    """State of the payment for one request.
+
+    Attributes:
+        resource: URL of the resource being paid for
+        timer: Phase timer of the request
+        payment: Decoded payment, once the header is valid
+        index: Index of the selected requirements
+        requirements: Requirements the payment is checked against
+        verify_response: Facilitator verify result, once verified
+        error: Why the payment was rejected, for the 402 response
+        claimed: Whether the payment's nonce is claimed in the payment cache
+    """
+
+    resource: str
+    timer: PhaseTimer
+    payment: Optional[WirePaymentPayload] = None
+    index: Optional[int] = None
+    requirements: Optional[WirePaymentRequirements] = None
+    verify_response: Optional[WireVerifyResponse] = None
+    error: Optional[str] = None
+    claimed: bool = False
+
+
+class PaymentGate:
+    """Payment requirements and checks for one paid resource.
+
+    Price processing and requirement validation happen once, in the
+    constructor. Per request:
+
+        attempt = gate.begin(resource_url)
+        if not await gate.verify(attempt, request_headers.get("X-PAYMENT", "")):
+            return 402 with gate.payment_required_body(attempt)
+                and gate.payment_required_headers(attempt)
+        ... run the handler ...
+        if the response is a 2xx:
+            header = await gate.settle(attempt)
+            None: return the 402 response, else add X-PAYMENT-RESPONSE: header
+        else:
+            gate.not_settled(attempt)
+    """
+
+    def __init__(
+        self,
+        price: Price,
+        pay_to_address: str,
+        description: str = "",
+        mime_type: str = "",
+        max_deadline_seconds: int = 60,
+        output_schema: Any = None,
+        facilitator_config: Optional[Dict[str, Any]] = None,
+        network: str = "base-sepolia",
+        resource: Optional[str] = None,
+        metrics: Optional[MetricsHook] = None,
+        server_timing: bool = False,
+        events: Optional[EventBus] = None,
+        payment_cache: Optional[PaymentCache] = None,
+        facilitator: Optional[FacilitatorClient] = None,
+    ):
+        """Compile the payment requirements of a resource.
+
+        Takes the same options as the FastAPI require_payment middleware,
+        except for path matching, plus facilitator: a client to use instead of
+        creating one from facilitator_config.
+
+        Raises:
+            ValueError: If the price is invalid
+        """
+        try:
+            max_amount_required, asset_address, eip712_domain = (
+                process_price_to_atomic_amount(price, network)
+            )
+        except Exception as e:
+            raise ValueError(f"Invalid price: {price}. Error: {e}")
+
+        self.template = PaymentRequirementsTemplate(
+            [
+                PaymentRequirements(
+                    scheme="exact",
+                    network=network,
+                    asset=asset_address,
+                    max_amount_required=max_amount_required,
+                    resource=resource or "",
+                    description=description,
+                    mime_type=mime_type,
+                    pay_to=pay_to_address,
+                    max_timeout_seconds=max_deadline_seconds,
+                    # Ensure output_schema and extra are objects, not null
+                    output_schema={} if output_schema is None else output_schema,
+                    extra=eip712_domain,
+                )
+            ]
+        )
+        self.resource = resource
+        self.facilitator = facilitator or FacilitatorClient(facilitator_config)
+        self.metrics = metrics
+        self.server_timing = server_timing
+        self.events = events
+        self.payment_cache = payment_cache
+
+    def begin(self, resource: str) -> PaymentAttempt:
+        """Start the payment of a request for a resource URL.
+
+        The configured resource, if any, takes precedence over resource.
+        """
+        timer = PhaseTimer(self.metrics, "server")
+        timer.lap("match")
+        return PaymentAttempt(self.resource or resource, timer)
+
+    def _emit(self, attempt: PaymentAttempt, event_type: EventType, **fields) -> None:
+        if self.events is not None:
+            self.events.emit(PaymentEvent(event_type, attempt.resource, **fields))
+
+    def _release(self, attempt: PaymentAttempt) -> None:
+        if attempt.claimed:
+            attempt.claimed = False
+            self.payment_cache.release(attempt.payment, attempt.requirements)
+
+    def _reject(
+        self,
+        attempt: PaymentAttempt,
+        message: str,
+        outcome: str,
+        event_type: EventType = VERIFY_FAILED,
+        **fields,
+    ) -> bool:
+        """Record why a payment is refused; the event error defaults to message."""
+        attempt.error = message
+        attempt.timer.finish(outcome)
+        self._release(attempt)
+        fields.setdefault("error", message)
+        self._emit(attempt, event_type, **fields)
+        return False
+
+    async def verify(self, attempt: PaymentAttempt, header: str) -> bool:
+        """Decode and verify the X-PAYMENT header of a request.
+
+        Returns:
+            False if the request must be answered with a 402, with the reason in
+            attempt.error
+        """
+        if header == "":
+            attempt.error = "No X-PAYMENT header provided"
+            attempt.timer.finish("payment_required")
+            self._emit(attempt, PAYMENT_REQUIRED)
+            return False
+
+        try:
+            payment = WirePaymentPayload.from_dict(decode_payment(header))
+        except Exception as e:
+            return self._reject(
+                attempt, f"Invalid payment header format: {str(e)}", "invalid_header"
+            )
+        attempt.timer.lap("decode")
+        attempt.payment = payment
+
+        index = self.template.select(payment.scheme, payment.network)
+        if index is None:
+            return self._reject(
+                attempt,
+                "No matching payment requirements found",
+                "no_matching_requirements",
+                payer=payment.authorization.from_,
+            )
+        requirements = self.template.requirements(index, attempt.resource)
+        attempt.index = index
+        attempt.requirements = requirements
+        attempt.timer.lap("select")
+
+        # Reject a payment that another request is processing or has settled
+        cache = self.payment_cache
+        if cache is not None:
+            if not cache.claim(payment, requirements):
+                return self._reject(
+                    attempt,
+                    "Payment already used",
+                    "duplicate_payment",
+                    requirements=requirements,
+                    payer=payment.authorization.from_,
+                )
+            attempt.claimed = True
+
+        # Verify payment, reusing a result another worker got for it
+        try:
+            verify_response = None
+            if cache is not None:
+                verify_response = cache.verify_result(payment, requirements)
+            if verify_response is None:
+                verify_response = await self.facilitator.verify_wire(
+                    payment, requirements
+                )
+                if cache is not None:
+                    cache.store_verify_result(payment, requirements, verify_response)
+        except BaseException:
+            self._release(attempt)
+            raise
+        attempt.timer.lap("verify")
+
+        if not verify_response.is_valid:
+            return self._reject(
+                attempt,
+                "Invalid payment: " + (verify_response.invalid_reason or ""),
+                "invalid_payment",
+                error=verify_response.invalid_reason,
+                requirements=requirements,
+                payer=verify_response.payer,
+            )
+        attempt.verify_response = verify_response
+        self._emit(
+            attempt, VERIFIED, requirements=requirements, payer=verify_response.payer
+        )
+        return True
+
+    def payment_details(self, attempt: PaymentAttempt) -> PaymentRequirements:
+        """Return the validated requirements a verified payment was checked against."""
+        return self.template.model(attempt.index, attempt.resource)
+
+    def verify_model(self, attempt: PaymentAttempt) -> VerifyResponse:
+        """Return the verify result of a verified payment as a VerifyResponse."""
+        return attempt.verify_response.to_model()
+
+    async def settle(self, attempt: PaymentAttempt) -> Optional[str]:
+        """Settle a verified payment after its handler succeeded.
+
+        Returns:
+            The X-PAYMENT-RESPONSE header value, or None if settling failed and
+            the request must be answered with a 402
+        """
+        attempt.timer.lap("handler")
+        try:
+            settle_response = await self.facilitator.settle_wire(
+                attempt.payment, attempt.requirements
+            )
+        except Exception as e:
+            attempt.timer.lap("settle")
+            logger.exception("Settle failed for %s", attempt.resource)
+            self._reject(
+                attempt,
+                "Settle failed",
+                "settle_failed",
+                SETTLE_FAILED,
+                error=str(e),
+                requirements=attempt.requirements,
+                payer=attempt.verify_response.payer,
+                duration=attempt.timer.elapsed(),
+            )
+            return None
+        attempt.timer.lap("settle")
+
+        if not settle_response.success:
+            logger.warning(
+                "Settle failed for %s: %s",
+                attempt.resource,
+                settle_response.error_reason,
+            )
+            self._reject(
+                attempt,
+                "Settle failed: " + (settle_response.error_reason or ""),
+                "settle_failed",
+                SETTLE_FAILED,
+                error=settle_response.error_reason,
+                requirements=attempt.requirements,
+                payer=attempt.verify_response.payer,
+                duration=attempt.timer.elapsed(),
+            )
+            return None
+
+        if attempt.claimed:
+            attempt.claimed = False
+            self.payment_cache.settled(attempt.payment, attempt.requirements)
+        attempt.timer.finish("settled")
+        self._emit(
+            attempt,
+            SETTLED,
+            requirements=attempt.requirements,
+            payer=settle_response.payer or attempt.verify_response.payer,
+            transaction=settle_response.transaction,
+            duration=attempt.timer.elapsed(),
+        )
+        return base64.b64encode(json_dumps(settle_response.to_dict())).decode("utf-8")
+
+    def not_settled(self, attempt: PaymentAttempt) -> None:
+        """Give up on a verified payment whose handler did not succeed."""
+        attempt.timer.lap("handler")
+        attempt.timer.finish("not_settled")
+        self._release(attempt)
+
+    def payment_required_body(self, attempt: PaymentAttempt) -> bytes:
+        """Return the 402 response body of a rejected payment."""
+        return self.template.payment_required_body(attempt.resource, attempt.error)
+
+    def payment_required_headers(
+        self, attempt: PaymentAttempt
+    ) -> List[Tuple[str, str]]:
+        """Return the headers of the 402 response, besides Content-Type."""
+        headers = [(PAYMENT_ENCODINGS_HEADER, ACCEPTED_PAYMENT_ENCODINGS)]
+        if self.server_timing:
+            headers.append((SERVER_TIMING_HEADER, attempt.timer.server_timing()))
+        return headers
+
+    def timing_header(self, attempt: PaymentAttempt) -> Optional[str]:
+        """Return the Server-Timing header value, if enabled."""
+        if self.server_timing:
+            return attempt.timer.server_timing()
+        return None
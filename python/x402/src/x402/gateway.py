@@ -0,0 +1,477 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+from urllib.parse import quote
+
+import httpx
+from starlette.datastructures import URL
+
+from x402.events import EventBus
+from x402.facilitator import FacilitatorClient, FacilitatorConfig
+from x402.gate import PAYMENT_RESPONSE_HEADER, PaymentAttempt, PaymentGate
+from x402.metrics import SERVER_TIMING_HEADER, MetricsHook
+from x402.path import compile_path
+from x402.sharedcache import PaymentCache
+from x402.types import Price
+
+# Pay-gated reverse proxy for HTTP services that cannot embed the middleware.
+# The gateway matches each request against its routes in order, verifies the
+# payment of paid routes before contacting the upstream and settles it once
+# the upstream answered with a 2xx status, before the response body is
+# forwarded. Bodies are streamed chunk by chunk between the ASGI server and a
+# pooled httpx.AsyncClient, without buffering or decoding them.
+
+logger = logging.getLogger(__name__)
+
+Scope = Dict[str, Any]
+Message = Dict[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+
+# Headers describing a single connection, which a proxy must not forward
+_HOP_BY_HOP = frozenset(
+    (
+        b"connection",
+        b"keep-alive",
+        b"proxy-authenticate",
+        b"proxy-authorization",
+        b"proxy-connection",
+        b"te",
+        b"trailer",
+        b"transfer-encoding",
+        b"upgrade",
+    )
+)
+_PAYMENT_HEADER = b"x-payment"
+_PAYMENT_RESPONSE_HEADER = PAYMENT_RESPONSE_HEADER.lower().encode()
+_SERVER_TIMING_HEADER = SERVER_TIMING_HEADER.lower().encode()
+
+
+class _ClientDisconnected(Exception):
+    pass
+
+
+class _LoopClient:
+    """httpx.AsyncClient kept for as long as requests arrive on the same loop.
+
+    Connections belong to the event loop that opened them, so a client is
+    replaced when the gateway is served by another loop.
+    """
+
+    def __init__(self, **options: Any):
+        self._options = options
+        self._client: Optional[Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = (
+            None
+        )
+
+    def get(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client[0] is not loop:
+            self._client = (loop, httpx.AsyncClient(**self._options))
+        return self._client[1]
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            client = self._client[1]
+            self._client = None
+            await client.aclose()
+
+
+class _GatewayFacilitator(FacilitatorClient):
+    """FacilitatorClient reusing the gateway's connection pool to the facilitator."""
+
+    def __init__(self, config: Optional[FacilitatorConfig], client: _LoopClient):
+        super().__init__(config)
+        self._client = client
+
+    @asynccontextmanager
+    async def _http_client(self) -> AsyncIterator[httpx.AsyncClient]:
+        yield self._client.get()
+
+
+@dataclass(frozen=True)
+class GatewayRoute:
+    """Requests forwarded to one upstream.
+
+    Attributes:
+        path: Path pattern(s), as accepted by x402.path.path_is_match
+        upstream: Base URL of the upstream. The request path and query are
+            appended to it.
+        gate: Payment requirements of the route, None if it is free
+    """
+
+    path: Union[str, List[str]]
+    upstream: str
+    gate: Optional[PaymentGate] = None
+    match: Callable[[str], bool] = field(default=None, repr=False, compare=False)
+
+
+def _header(scope: Scope, name: bytes) -> str:
+    for key, value in scope["headers"]:
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return ""
+
+
+def _has_dot_segment(path: str) -> bool:
+    """Whether a decoded request path contains "." or ".." segments."""
+    return any(segment in (".", "..") for segment in path.split("/"))
+
+
+def _forward_headers(headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+    """Drop hop-by-hop headers, including those listed in Connection."""
+    drop = _HOP_BY_HOP
+    for key, value in headers:
+        if key.lower() == b"connection":
+            drop = drop | {
+                token.strip().lower() for token in value.split(b",") if token.strip()
+            }
+    return [(key, value) for key, value in headers if key.lower() not in drop]
+
+
+async def _send_response(
+    send: Send, status: int, body: bytes, headers: List[Tuple[bytes, bytes]]
+) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": headers + [(b"content-length", str(len(body)).encode())],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_error(send: Send, status: int, message: str) -> None:
+    await _send_response(
+        send, status, message.encode(), [(b"content-type", b"text/plain")]
+    )
+
+
+async def _payment_required(
+    send: Send, gate: PaymentGate, attempt: PaymentAttempt
+) -> None:
+    headers = [(b"content-type", b"application/json")]
+    headers.extend(
+        (name.lower().encode("latin-1"), value.encode("latin-1"))
+        for name, value in gate.payment_required_headers(attempt)
+    )
+    await _send_response(send, 402, gate.payment_required_body(attempt), headers)
+
+
+async def _request_body(receive: Receive) -> AsyncIterator[bytes]:
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise _ClientDisconnected()
+        body = message.get("body", b"")
+        if body:
+            yield body
+        if not message.get("more_body", False):
+            return
+
+
+class Gateway:
+    """ASGI app proxying requests to upstreams and charging for paid routes.
+
+    Usage:
+        gateway = Gateway(facilitator_config={"url": "https://x402.org/facilitator"})
+        gateway.add("/weather/*", "http://weather.internal:8080",
+                    price="$0.001", pay_to_address="0x...")
+        gateway.add("/status", "http://weather.internal:8080")
+
+        uvicorn.run(gateway)
+
+    Requests are matched against the routes in the order they were added;
+    unmatched requests get a 404 and paths with "." or ".." segments, plain
+    or percent-encoded, a 400. Upstreams receive the request without its
+    hop-by-hop headers and, on paid routes, without its X-PAYMENT header, plus
+    X-Forwarded-For, X-Forwarded-Host and X-Forwarded-Proto. Unreachable
+    upstreams get a 502 and timeouts a 504; payments are not settled for
+    those, nor for non-2xx upstream responses.
+
+    Args:
+        upstreams (dict, optional): Free routes, as path patterns mapped to
+            upstream URLs. More routes are added with add().
+        facilitator_config (dict, optional): Facilitator config
+        metrics (MetricsHook, optional): Hook receiving phase durations and
+            payment outcomes
+        server_timing (bool, optional): Report phase durations in a
+            Server-Timing response header
+        events (EventBus, optional): Bus receiving payment lifecycle events
+        payment_cache (PaymentCache, optional): Cache of verify results and
+            seen nonces shared by the server's worker processes
+        timeout (float, optional): Upstream timeout in seconds
+        limits (httpx.Limits, optional): Upstream connection pool limits
+        transport (httpx.AsyncBaseTransport, optional): Transport for upstream
+            requests, instead of connecting over the network
+    """
+
+    def __init__(
+        self,
+        upstreams: Optional[Dict[str, str]] = None,
+        facilitator_config: Optional[FacilitatorConfig] = None,
+        metrics: Optional[MetricsHook] = None,
+        server_timing: bool = False,
+        events: Optional[EventBus] = None,
+        payment_cache: Optional[PaymentCache] = None,
+        timeout: float = 30.0,
+        limits: Optional[httpx.Limits] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.routes: List[GatewayRoute] = []
+        self.metrics = metrics
+        self.server_timing = server_timing
+        self.events = events
+        self.payment_cache = payment_cache
+        self._upstream = _LoopClient(
+            timeout=timeout,
+            limits=limits or httpx.Limits(max_connections=None),
+            transport=transport,
+        )
+        self._facilitator_client = _LoopClient()
+        self.facilitator = _GatewayFacilitator(
+            facilitator_config, self._facilitator_client
+        )
+        for path, upstream in (upstreams or {}).items():
+            self.add(path, upstream)
+
+    def add(
+        self,
+        path: Union[str, List[str]],
+        upstream: str,
+        price: Optional[Price] = None,
+        pay_to_address: Optional[str] = None,
+        description: str = "",
+        mime_type: str = "",
+        max_deadline_seconds: int = 60,
+        output_schema: Any = None,
+        network: str = "base-sepolia",
+        resource: Optional[str] = None,
+    ) -> GatewayRoute:
+        """Forward requests matching path to upstream, for a price if given.
+
+        Args:
+            path (str | list[str]): Path pattern(s), as accepted by
+                x402.path.path_is_match
+            upstream (str): Base URL of the upstream
+            price (Price, optional): Payment price (USD or TokenAmount). The
+                route is free without one.
+            pay_to_address (str, optional): Ethereum address to receive payment,
+                required with a price
+            description (str, optional): Description of the resource
+            mime_type (str, optional): MIME type of the resource
+            max_deadline_seconds (int, optional): Max time for payment
+            output_schema (Any, optional): JSON schema for response
+            network (str, optional): Network ID
+            resource (str, optional): Resource URL
+
+        Returns:
+            GatewayRoute: The added route
+
+        Raises:
+            ValueError: If the upstream URL or the price is invalid, or a price
+                is given without pay_to_address
+        """
+        if not upstream.startswith(("http://", "https://")):
+            raise ValueError(
+                f"Invalid upstream {upstream}, must start with http:// or https://"
+            )
+        gate = None
+        if price is not None:
+            if not pay_to_address:
+                raise ValueError("pay_to_address is required for a paid route")
+            gate = PaymentGate(
+                price,
+                pay_to_address,
+                description=description,
+                mime_type=mime_type,
+                max_deadline_seconds=max_deadline_seconds,
+                output_schema=output_schema,
+                network=network,
+                resource=resource,
+                metrics=self.metrics,
+                server_timing=self.server_timing,
+                events=self.events,
+                payment_cache=self.payment_cache,
+                facilitator=self.facilitator,
+            )
+        route = GatewayRoute(
+            path=path,
+            upstream=upstream.rstrip("/"),
+            gate=gate,
+            match=compile_path(path),
+        )
+        self.routes.append(route)
+        return route
+
+    def route_for(self, path: str) -> Optional[GatewayRoute]:
+        """Return the first route matching a request path."""
+        for route in self.routes:
+            if route.match(path):
+                return route
+        return None
+
+    async def aclose(self) -> None:
+        """Close the connection pools. They reopen when the gateway is used again."""
+        await self._upstream.aclose()
+        await self._facilitator_client.aclose()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            if scope["type"] == "websocket":
+                await send({"type": "websocket.close", "code": 1003})
+            return
+
+        # Routes match the decoded path but upstreams get the raw one, which
+        # httpx would resolve, so /free/../paid could skip the payment
+        if _has_dot_segment(scope["path"]):
+            await _send_error(send, 400, "Bad Request")
+            return
+
+        route = self.route_for(scope["path"])
+        if route is None:
+            await _send_error(send, 404, "Not Found")
+            return
+
+        gate = route.gate
+        if gate is None:
+            await self._proxy(route, scope, receive, send, None)
+            return
+
+        attempt = gate.begin(str(URL(scope=scope)))
+        if not await gate.verify(attempt, _header(scope, _PAYMENT_HEADER)):
+            await _payment_required(send, gate, attempt)
+            return
+        await self._proxy(route, scope, receive, send, attempt)
+
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.aclose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def _upstream_request(
+        self, route: GatewayRoute, scope: Scope, receive: Receive, paid: bool
+    ) -> httpx.Request:
+        path = scope.get("raw_path") or quote(scope["path"]).encode()
+        url = route.upstream + path.decode("latin-1")
+        if scope.get("query_string"):
+            url += "?" + scope["query_string"].decode("latin-1")
+
+        # Chunked bodies lose Transfer-Encoding with the other hop-by-hop
+        # headers; httpx frames the streamed body again
+        has_body = False
+        for key, _ in scope["headers"]:
+            if key.lower() in (b"content-length", b"transfer-encoding"):
+                has_body = True
+                break
+
+        forwarded_for = scope["client"][0] if scope.get("client") else None
+        host = None
+        headers = []
+        for key, value in _forward_headers(scope["headers"]):
+            key = key.lower()
+            if key == b"host":
+                host = value
+            elif key == b"x-forwarded-for":
+                if forwarded_for is not None:
+                    forwarded_for = value.decode("latin-1") + ", " + forwarded_for
+            elif key != _PAYMENT_HEADER or not paid:
+                headers.append((key, value))
+        if forwarded_for is not None:
+            headers.append((b"x-forwarded-for", forwarded_for.encode("latin-1")))
+        if host is not None:
+            headers.append((b"x-forwarded-host", host))
+        headers.append((b"x-forwarded-proto", scope.get("scheme", "http").encode()))
+
+        return self._upstream.get().build_request(
+            scope["method"],
+            url,
+            headers=headers,
+            content=_request_body(receive) if has_body else None,
+        )
+
+    async def _proxy(
+        self,
+        route: GatewayRoute,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        attempt: Optional[PaymentAttempt],
+    ) -> None:
+        gate = route.gate
+        # Whether a verified payment still awaits settle or not_settled
+        pending = attempt is not None
+        try:
+            request = self._upstream_request(route, scope, receive, pending)
+            try:
+                response = await self._upstream.get().send(request, stream=True)
+            except _ClientDisconnected:
+                return
+            except httpx.TimeoutException:
+                logger.warning("Upstream timed out: %s", request.url)
+                await _send_error(send, 504, "Gateway Timeout")
+                return
+            except httpx.RequestError as e:
+                logger.warning("Upstream request failed: %s: %s", request.url, e)
+                await _send_error(send, 502, "Bad Gateway")
+                return
+
+            try:
+                headers = [
+                    (key.lower(), value)
+                    for key, value in _forward_headers(response.headers.raw)
+                ]
+                if attempt is not None:
+                    pending = False
+                    if response.status_code < 200 or response.status_code >= 300:
+                        gate.not_settled(attempt)
+                    else:
+                        settlement = await gate.settle(attempt)
+                        if settlement is None:
+                            await _payment_required(send, gate, attempt)
+                            return
+                        headers.append(
+                            (_PAYMENT_RESPONSE_HEADER, settlement.encode("latin-1"))
+                        )
+                    timing = gate.timing_header(attempt)
+                    if timing is not None:
+                        headers.append((_SERVER_TIMING_HEADER, timing.encode()))
+
+                await send(
+                    {
+                        "type": "http.response.start",
+                        "status": response.status_code,
+                        "headers": headers,
+                    }
+                )
+                async for chunk in response.aiter_raw():
+                    await send(
+                        {"type": "http.response.body", "body": chunk, "more_body": True}
+                    )
+                await send({"type": "http.response.body", "body": b""})
+            finally:
+                await response.aclose()
+        finally:
+            if pending:
+                gate.not_settled(attempt)
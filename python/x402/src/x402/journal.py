@@ -0,0 +1,556 @@
+import csv
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Iterator, Optional, Tuple, Union
+
+from x402.events import SETTLED, EventBus, PaymentEvent
+
+# Append-only journal of settled payments.
+#
+# The journal file starts with an 8 byte magic followed by records:
+#
+#     u32 body length | body | u32 CRC-32 of body
+#     body = f64 timestamp | u64 previous record of the same payer + 1 (0: none)
+#            | 7 x (u16 length | UTF-8): transaction, payer, amount, asset,
+#                                       network, pay_to, resource
+#
+# A torn or corrupt tail left by a crash is truncated when the journal is
+# opened. Records of a payer are chained newest to oldest through the previous
+# record offset.
+#
+# The index is a separate memory-mapped file holding two open addressing hash
+# tables of (64-bit key hash, record offset + 1) slots: transaction hash to its
+# record and payer to their latest record. Records without a transaction hash
+# are only in the payer table. It is derived data: it is not synced
+# and is rebuilt from the journal whenever it does not cover exactly the valid
+# journal.
+
+_JOURNAL_MAGIC = b"X402JRN1"
+_INDEX_MAGIC = b"X402IDX1"
+
+_LENGTH = struct.Struct("<I")
+_CRC = struct.Struct("<I")
+_FIXED = struct.Struct("<dQ")
+_STR_LEN = struct.Struct("<H")
+# magic, slots per table, records indexed, journal bytes indexed
+_INDEX_HEADER = struct.Struct("<8sQQQ")
+_SLOT = struct.Struct("<QQ")
+
+_FIELDS = ("transaction", "payer", "amount", "asset", "network", "pay_to", "resource")
+_TX_TABLE = 0
+_PAYER_TABLE = 1
+_MIN_CAPACITY = 1024
+
+CSV_COLUMNS = ("timestamp",) + _FIELDS
+
+
+@dataclass(frozen=True, slots=True)
+class SettlementRecord:
+    """A settled payment.
+
+    Attributes:
+        transaction: Settlement transaction hash
+        payer: Paying address
+        amount: Amount paid in atomic token units
+        asset: Token contract address
+        network: Network the payment settled on
+        pay_to: Receiving address
+        resource: URL of the resource paid for
+        timestamp: Unix time of the settlement
+    """
+
+    transaction: str
+    payer: str
+    amount: str
+    asset: str
+    network: str
+    pay_to: str
+    resource: str
+    timestamp: float = field(default_factory=time.time)
+
+    @classmethod
+    def from_event(cls, event: PaymentEvent) -> "SettlementRecord":
+        """Build a record from a settled event."""
+        if event.type != SETTLED or event.requirements is None:
+            raise ValueError(f"Not a settled payment event: {event.type}")
+        requirements = event.requirements
+        return cls(
+            transaction=event.transaction or "",
+            payer=event.payer or "",
+            amount=requirements.max_amount_required,
+            asset=requirements.asset,
+            network=requirements.network,
+            pay_to=requirements.pay_to,
+            resource=event.resource,
+            timestamp=event.timestamp,
+        )
+
+
+def _key_hash(key: str) -> int:
+    digest = hashlib.blake2b(key.lower().encode(), digest_size=8).digest()
+    # 0 never appears as a hash so that it can mark empty slots in checks
+    return int.from_bytes(digest, "little") or 1
+
+
+def _encode(record: SettlementRecord, previous: int) -> bytes:
+    parts = [_FIXED.pack(record.timestamp, previous)]
+    for name in _FIELDS:
+        data = getattr(record, name).encode()
+        if len(data) > 0xFFFF:
+            raise ValueError(f"{name} is too long")
+        parts.append(_STR_LEN.pack(len(data)))
+        parts.append(data)
+    body = b"".join(parts)
+    return _LENGTH.pack(len(body)) + body + _CRC.pack(zlib.crc32(body))
+
+
+def _decode(body: bytes) -> Tuple[SettlementRecord, int]:
+    timestamp, previous = _FIXED.unpack_from(body)
+    position = _FIXED.size
+    values = []
+    for _ in _FIELDS:
+        (length,) = _STR_LEN.unpack_from(body, position)
+        position += _STR_LEN.size
+        values.append(body[position : position + length].decode())
+        position += length
+    if position != len(body):
+        raise ValueError("Record length mismatch")
+    return SettlementRecord(*values, timestamp=timestamp), previous
+
+
+class SettlementJournal:
+    """Append-only journal of settled payments with indexed lookups.
+
+    Records are written to the OS on every append and fsynced in batches,
+    after sync_every records or sync_interval seconds, whichever comes first.
+    Lookups by transaction hash and by payer go through a memory-mapped hash
+    index and take constant time.
+
+    To journal settlements from a middleware without touching the request path,
+    subscribe it to the middleware's EventBus:
+
+        events = EventBus()
+        journal = SettlementJournal("settlements.x402j")
+        journal.subscribe(events)
+        app.middleware("http")(require_payment(..., events=events))
+
+    Appends and lookups are thread-safe. The journal supports one writing
+    process at a time.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        sync_every: int = 256,
+        sync_interval: float = 1.0,
+        index_path: Optional[Union[str, Path]] = None,
+    ):
+        """Open or create a journal.
+
+        Args:
+            path: Journal file
+            sync_every: Number of appended records that triggers an fsync
+            sync_interval: Maximum seconds an appended record stays unsynced
+            index_path: Index file. Defaults to the journal path with ".idx" added.
+        """
+        self.path = Path(path)
+        self.index_path = (
+            Path(index_path)
+            if index_path
+            else self.path.with_name(self.path.name + ".idx")
+        )
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self._lock = threading.RLock()
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._closed = False
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._file = open(fd, "r+b")
+        self._end = self._recover()
+
+        self._index_file: Optional[IO[bytes]] = None
+        self._index: Optional[mmap.mmap] = None
+        self._open_index()
+
+    # Journal file
+
+    def _recover(self) -> int:
+        """Check the journal, truncating a torn tail, and return its valid size."""
+        self._file.seek(0)
+        magic = self._file.read(len(_JOURNAL_MAGIC))
+        if not magic:
+            self._file.write(_JOURNAL_MAGIC)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            return len(_JOURNAL_MAGIC)
+        if magic != _JOURNAL_MAGIC:
+            raise ValueError(f"{self.path} is not a settlement journal")
+
+        end = len(_JOURNAL_MAGIC)
+        for offset, size, _, _ in self._scan(end):
+            end = offset + size
+        if end != self._file.seek(0, os.SEEK_END):
+            self._file.truncate(end)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        return end
+
+    def _scan(self, offset: int) -> Iterator[Tuple[int, int, SettlementRecord, int]]:
+        """Yield (offset, size, record, previous) for valid records from an offset."""
+        self._file.seek(offset)
+        reader = self._file
+        while True:
+            header = reader.read(_LENGTH.size)
+            if len(header) < _LENGTH.size:
+                return
+            (length,) = _LENGTH.unpack(header)
+            body = reader.read(length)
+            crc = reader.read(_CRC.size)
+            if len(body) < length or len(crc) < _CRC.size:
+                return
+            if _CRC.unpack(crc)[0] != zlib.crc32(body):
+                return
+            try:
+                record, previous = _decode(body)
+            except (ValueError, UnicodeDecodeError, struct.error):
+                return
+            size = _LENGTH.size + length + _CRC.size
+            yield offset, size, record, previous
+            offset += size
+
+    def _read(self, offset: int) -> Tuple[SettlementRecord, int]:
+        self._file.seek(offset)
+        (length,) = _LENGTH.unpack(self._file.read(_LENGTH.size))
+        record, previous = _decode(self._file.read(length))
+        return record, previous
+
+    # Index file
+
+    def _open_index(self) -> None:
+        try:
+            index_file = open(self.index_path, "r+b")
+        except FileNotFoundError:
+            self._build_index(_MIN_CAPACITY)
+            return
+        try:
+            index = mmap.mmap(index_file.fileno(), 0)
+        except ValueError:  # empty file
+            index_file.close()
+            self._build_index(_MIN_CAPACITY)
+            return
+        self._index_file, self._index = index_file, index
+        try:
+            magic, capacity, count, covered = _INDEX_HEADER.unpack_from(index)
+        except struct.error:
+            magic = None
+        if (
+            magic != _INDEX_MAGIC
+            or covered != self._end
+            or len(index) != _INDEX_HEADER.size + 2 * capacity * _SLOT.size
+        ):
+            self._build_index(_MIN_CAPACITY)
+            return
+        self._capacity, self._count = capacity, count
+
+    def _build_index(self, capacity: int) -> None:
+        """Rebuild the index from the journal."""
+        entries = [
+            (offset, record.transaction, record.payer)
+            for offset, _, record, _ in self._scan(len(_JOURNAL_MAGIC))
+        ]
+        while len(entries) * 2 > capacity:
+            capacity *= 2
+        self._create_index(capacity)
+        for offset, transaction, payer in entries:
+            self._index_record(offset, transaction, payer)
+        self._set_header(count=len(entries))
+
+    def _create_index(self, capacity: int) -> None:
+        if self._index is not None:
+            self._index.close()
+            self._index_file.close()
+        size = _INDEX_HEADER.size + 2 * capacity * _SLOT.size
+        temporary = self.index_path.with_name(self.index_path.name + ".tmp")
+        with open(temporary, "wb") as f:
+            f.truncate(size)
+        os.replace(temporary, self.index_path)
+        self._index_file = open(self.index_path, "r+b")
+        self._index = mmap.mmap(self._index_file.fileno(), size)
+        self._capacity = capacity
+        _INDEX_HEADER.pack_into(self._index, 0, _INDEX_MAGIC, capacity, 0, 0)
+
+    def _grow(self) -> None:
+        """Double the index capacity, rehashing the occupied slots."""
+        slots = []
+        for table in (_TX_TABLE, _PAYER_TABLE):
+            for slot in range(self._capacity):
+                key_hash, stored = _SLOT.unpack_from(
+                    self._index, self._slot_position(table, slot)
+                )
+                if stored:
+                    slots.append((table, key_hash, stored))
+        count = self._count
+        self._create_index(self._capacity * 2)
+        mask = self._capacity - 1
+        for table, key_hash, stored in slots:
+            slot = key_hash & mask
+            while _SLOT.unpack_from(self._index, self._slot_position(table, slot))[1]:
+                slot = (slot + 1) & mask
+            _SLOT.pack_into(
+                self._index, self._slot_position(table, slot), key_hash, stored
+            )
+        self._set_header(count)
+
+    def _set_header(self, count: int) -> None:
+        self._count = count
+        _INDEX_HEADER.pack_into(
+            self._index, 0, _INDEX_MAGIC, self._capacity, count, self._end
+        )
+
+    def _slot_position(self, table: int, slot: int) -> int:
+        return _INDEX_HEADER.size + (table * self._capacity + slot) * _SLOT.size
+
+    def _find(self, table: int, key: str) -> Tuple[int, Optional[int]]:
+        """Return the slot holding a key, or the empty slot for it, and its record offset."""
+        key_hash = _key_hash(key)
+        mask = self._capacity - 1
+        slot = key_hash & mask
+        while True:
+            stored_hash, stored = _SLOT.unpack_from(
+                self._index, self._slot_position(table, slot)
+            )
+            if stored == 0:
+                return slot, None
+            if stored_hash == key_hash:
+                record, _ = self._read(stored - 1)
+                value = record.transaction if table == _TX_TABLE else record.payer
+                if value.lower() == key.lower():
+                    return slot, stored - 1
+            slot = (slot + 1) & mask
+
+    def _store(self, table: int, slot: int, key: str, offset: int) -> None:
+        _SLOT.pack_into(
+            self._index, self._slot_position(table, slot), _key_hash(key), offset + 1
+        )
+
+    def _index_record(self, offset: int, transaction: str, payer: str) -> None:
+        if transaction:
+            slot, existing = self._find(_TX_TABLE, transaction)
+            if existing is None:
+                self._store(_TX_TABLE, slot, transaction, offset)
+        slot, _ = self._find(_PAYER_TABLE, payer)
+        self._store(_PAYER_TABLE, slot, payer, offset)
+
+    # Public API
+
+    def append(self, record: SettlementRecord) -> bool:
+        """Append a settlement.
+
+        Settlements without a transaction hash cannot be deduplicated; they are
+        always appended and only indexed by payer.
+
+        Returns:
+            False if the transaction is already journaled
+        """
+        with self._lock:
+            if self._closed:
+                raise ValueError("Journal is closed")
+            tx_slot = None
+            if record.transaction:
+                tx_slot, existing = self._find(_TX_TABLE, record.transaction)
+                if existing is not None:
+                    return False
+            payer_slot, latest = self._find(_PAYER_TABLE, record.payer)
+            data = _encode(record, 0 if latest is None else latest + 1)
+
+            offset = self._end
+            self._file.seek(offset)
+            self._file.write(data)
+            self._end += len(data)
+            if tx_slot is not None:
+                self._store(_TX_TABLE, tx_slot, record.transaction, offset)
+            self._store(_PAYER_TABLE, payer_slot, record.payer, offset)
+            self._set_header(self._count + 1)
+            if self._count * 2 > self._capacity:
+                self._grow()
+
+            self._pending += 1
+            if (
+                self._pending >= self.sync_every
+                or time.monotonic() - self._last_sync >= self.sync_interval
+            ):
+                self._sync()
+            elif self._flusher is None:
+                self._flusher = threading.Thread(
+                    target=self._flush_periodically, name="x402-journal", daemon=True
+                )
+                self._flusher.start()
+            return True
+
+    def record_event(self, event: PaymentEvent) -> None:
+        """EventBus subscriber appending settled events."""
+        if event.type == SETTLED:
+            self.append(SettlementRecord.from_event(event))
+
+    def subscribe(self, events: EventBus):
+        """Journal the settled events of a bus.
+
+        Returns:
+            A function removing the subscription
+        """
+        return events.subscribe(self.record_event, types=[SETTLED])
+
+    def by_transaction(self, transaction: str) -> Optional[SettlementRecord]:
+        """Return the settlement of a transaction hash, if journaled."""
+        if not transaction:
+            return None
+        with self._lock:
+            _, offset = self._find(_TX_TABLE, transaction)
+            return None if offset is None else self._read(offset)[0]
+
+    def by_payer(self, payer: str) -> Iterator[SettlementRecord]:
+        """Yield the settlements of a payer, newest first."""
+        with self._lock:
+            _, offset = self._find(_PAYER_TABLE, payer)
+        while offset is not None:
+            with self._lock:
+                record, previous = self._read(offset)
+            yield record
+            offset = previous - 1 if previous else None
+
+    def __iter__(self) -> Iterator[SettlementRecord]:
+        """Yield all settlements in journal order, up to the current end."""
+        offset = len(_JOURNAL_MAGIC)
+        with self._lock:
+            end = self._end
+        while offset < end:
+            with self._lock:
+                self._file.seek(offset)
+                (length,) = _LENGTH.unpack(self._file.read(_LENGTH.size))
+                record, _ = _decode(self._file.read(length))
+            yield record
+            offset += _LENGTH.size + length + _CRC.size
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._count
+
+    def sync(self) -> None:
+        """Write pending records to disk now."""
+        with self._lock:
+            if not self._closed:
+                self._sync()
+
+    def _sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def _flush_periodically(self) -> None:
+        while not self._stop.wait(self.sync_interval):
+            with self._lock:
+                if self._closed:
+                    return
+                if self._pending:
+                    self._sync()
+
+    def close(self) -> None:
+        """Sync and close the journal and its index."""
+        self._stop.set()
+        with self._lock:
+            if self._closed:
+                return
+            self._sync()
+            self._closed = True
+            self._index.flush()
+            self._index.close()
+            self._index_file.close()
+            self._file.close()
+
+    def __enter__(self) -> "SettlementJournal":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # Export
+
+    def export_csv(self, destination: Union[str, Path, IO[str]]) -> int:
+        """Stream all settlements to a CSV file.
+
+        Args:
+            destination: File path or text file object
+
+        Returns:
+            The number of settlements written
+        """
+        if isinstance(destination, (str, Path)):
+            with open(destination, "w", newline="") as f:
+                return self.export_csv(f)
+        writer = csv.writer(destination)
+        writer.writerow(CSV_COLUMNS)
+        count = 0
+        for record in self:
+            writer.writerow(
+                (repr(record.timestamp),) + tuple(getattr(record, n) for n in _FIELDS)
+            )
+            count += 1
+        return count
+
+    def export_parquet(
+        self, destination: Union[str, Path], batch_size: int = 65536
+    ) -> int:
+        """Stream all settlements to a Parquet file in batches.
+
+        Requires pyarrow, installed with the `parquet` extra.
+
+        Args:
+            destination: File path
+            batch_size: Number of settlements per row group
+
+        Returns:
+            The number of settlements written
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError(
+                'Parquet export requires pyarrow: pip install "x402[parquet]"'
+            ) from e
+
+        schema = pa.schema(
+            [("timestamp", pa.timestamp("us", tz="UTC"))]
+            + [(name, pa.string()) for name in _FIELDS]
+        )
+        count = 0
+        with pq.ParquetWriter(str(destination), schema) as writer:
+            batch = []
+            for record in self:
+                batch.append(record)
+                if len(batch) == batch_size:
+                    writer.write_batch(_arrow_batch(pa, schema, batch))
+                    count += len(batch)
+                    batch = []
+            if batch or not count:
+                writer.write_batch(_arrow_batch(pa, schema, batch))
+                count += len(batch)
+        return count
+
+
+def _arrow_batch(pa, schema, records):
+    columns = [[round(r.timestamp * 1_000_000) for r in records]]
+    columns += [[getattr(r, name) for r in records] for name in _FIELDS]
+    return pa.record_batch(columns, schema=schema)
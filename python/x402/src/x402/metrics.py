@@ -0,0 +1,229 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Phase timings of payment handling. Middlewares and client adapters report the
+# duration of each phase and the outcome of each payment to a MetricsHook.
+# InMemoryMetrics aggregates them into Prometheus style counters and histograms.
+
+SERVER_PHASES = ("match", "decode", "select", "verify", "handler", "settle")
+CLIENT_PHASES = ("payment_required", "sign", "paid_request")
+
+SERVER_OUTCOMES = (
+    "payment_required",
+    "invalid_header",
+    "no_matching_requirements",
+    "duplicate_payment",
+    "invalid_payment",
+    "not_settled",
+    "settle_failed",
+    "settled",
+)
+CLIENT_OUTCOMES = ("paid", "preemptive_paid", "rejected", "error")
+
+# Histogram bucket upper bounds in seconds
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+SERVER_TIMING_HEADER = "Server-Timing"
+
+
+class MetricsHook:
+    """Receives phase durations and outcomes of payment handling.
+
+    The base class discards everything. Subclass it to forward measurements to
+    a metrics library, or use InMemoryMetrics.
+    """
+
+    def observe(self, side: str, phase: str, seconds: float) -> None:
+        """Record the duration of a phase.
+
+        Args:
+            side: "server" for middlewares, "client" for client adapters
+            phase: One of SERVER_PHASES or CLIENT_PHASES
+            seconds: Duration of the phase
+        """
+
+    def count(self, side: str, outcome: str) -> None:
+        """Count a handled payment by outcome.
+
+        Args:
+            side: "server" for middlewares, "client" for client adapters
+            outcome: One of SERVER_OUTCOMES or CLIENT_OUTCOMES
+        """
+
+
+NULL_METRICS = MetricsHook()
+
+
+class PhaseTimer:
+    """Times consecutive phases of a single request.
+
+    Each call to lap ends the running phase, reports it to the hook and starts
+    the next one.
+    """
+
+    __slots__ = ("hook", "side", "durations", "_start", "_mark")
+
+    def __init__(self, hook: Optional[MetricsHook], side: str):
+        self.hook = hook or NULL_METRICS
+        self.side = side
+        self.durations: Dict[str, float] = {}
+        self._start = self._mark = time.perf_counter()
+
+    def elapsed(self) -> float:
+        """Return the seconds since the timer was created."""
+        return time.perf_counter() - self._start
+
+    def lap(self, phase: str) -> float:
+        """End the running phase, returning its duration in seconds."""
+        now = time.perf_counter()
+        seconds = now - self._mark
+        self._mark = now
+        self.durations[phase] = seconds
+        self.hook.observe(self.side, phase, seconds)
+        return seconds
+
+    def finish(self, outcome: str) -> None:
+        """Report the outcome of the request."""
+        self.hook.count(self.side, outcome)
+
+    def server_timing(self) -> str:
+        """Format the recorded phases as a Server-Timing header value."""
+        return ", ".join(
+            f"x402-{phase};dur={seconds * 1000:.3f}"
+            for phase, seconds in self.durations.items()
+        )
+
+
+class Histogram:
+    """Cumulative histogram over fixed bucket upper bounds."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets: Tuple[float, ...] = tuple(buckets)
+        # One count per bucket plus the +Inf bucket, not cumulative
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """Return (upper bound, observations at or below it) pairs, ending with +Inf."""
+        total = 0
+        pairs = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+
+class InMemoryMetrics(MetricsHook):
+    """Thread-safe MetricsHook keeping counters and histograms in memory.
+
+    render() produces the Prometheus text exposition format, for serving from
+    a metrics endpoint:
+
+        metrics = InMemoryMetrics()
+        app.middleware("http")(require_payment(..., metrics=metrics))
+
+        @app.get("/metrics")
+        async def prometheus():
+            return PlainTextResponse(metrics.render())
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS, prefix="x402"):
+        """Initialize the metrics.
+
+        Args:
+            buckets: Histogram bucket upper bounds in seconds
+            prefix: Prefix of the rendered metric names
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.prefix = prefix
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._counters: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, side: str, phase: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get((side, phase))
+            if histogram is None:
+                histogram = self._histograms[(side, phase)] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def count(self, side: str, outcome: str) -> None:
+        with self._lock:
+            self._counters[(side, outcome)] = self._counters.get((side, outcome), 0) + 1
+
+    def counter(self, side: str, outcome: str) -> int:
+        """Return the number of payments counted with an outcome."""
+        with self._lock:
+            return self._counters.get((side, outcome), 0)
+
+    def histogram(self, side: str, phase: str) -> Optional[Histogram]:
+        """Return a copy of the histogram of a phase, if it was observed."""
+        with self._lock:
+            histogram = self._histograms.get((side, phase))
+            if histogram is None:
+                return None
+            copy = Histogram(histogram.buckets)
+            copy.counts = list(histogram.counts)
+            copy.sum = histogram.sum
+            copy.count = histogram.count
+            return copy
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+            # Copy the values so formatting happens outside the lock
+            histograms = [
+                (key, histogram.cumulative(), histogram.sum, histogram.count)
+                for key, histogram in histograms
+            ]
+
+        duration = f"{self.prefix}_phase_duration_seconds"
+        payments = f"{self.prefix}_payments_total"
+        lines = [
+            f"# HELP {duration} Duration of x402 payment handling phases.",
+            f"# TYPE {duration} histogram",
+        ]
+        for (side, phase), buckets, total, count in histograms:
+            labels = f'side="{side}",phase="{phase}"'
+            for bound, cumulative in buckets:
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append(f'{duration}_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"{duration}_sum{{{labels}}} {total!r}")
+            lines.append(f"{duration}_count{{{labels}}} {count}")
+        lines.append(f"# HELP {payments} Payments handled by outcome.")
+        lines.append(f"# TYPE {payments} counter")
+        for (side, outcome), value in counters:
+            lines.append(f'{payments}{{side="{side}",outcome="{outcome}"}} {value}')
+        return "\n".join(lines) + "\n"
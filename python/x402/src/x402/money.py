@@ -0,0 +1,139 @@
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Literal, Union, get_args
+
+# Exact conversion of decimal money amounts to atomic token units. Amounts are
+# scaled as integers, never through floats or a Decimal context, and rounding is
+# explicit: by default an amount with more precision than the token has is
+# rejected rather than silently truncated.
+
+Rounding = Literal["exact", "down", "up", "half_up", "half_even"]
+ROUNDING_MODES = frozenset(get_args(Rounding))
+
+Amount = Union[str, int, float]
+
+# Optional dollar sign, digits with an optional fraction and an optional exponent,
+# e.g. "$0.01", "10", ".5", "1e-3"
+_AMOUNT = re.compile(r"\$?(\d*)(?:\.(\d*))?(?:[eE]([+-]?\d{1,3}))?")
+
+# Bounds exponents and decimals, so a malformed config cannot ask for 10**1000000
+_MAX_SCALE = 255
+
+
+def _check(decimals: int, rounding: str) -> None:
+    if type(decimals) is not int or not 0 <= decimals <= _MAX_SCALE:
+        raise ValueError(f"decimals must be an integer in [0, {_MAX_SCALE}]")
+    if rounding not in ROUNDING_MODES:
+        raise ValueError(f"Unknown rounding mode: {rounding}")
+
+
+def _parse(amount: str, decimals: int, rounding: str) -> int:
+    match = _AMOUNT.fullmatch(amount.strip())
+    if match is None:
+        raise ValueError(f"Invalid amount: {amount!r}")
+    whole, fraction, exponent = match.groups()
+    fraction = fraction or ""
+    if not whole and not fraction:
+        raise ValueError(f"Invalid amount: {amount!r}")
+    scale = decimals - len(fraction)
+    if exponent:
+        if abs(int(exponent)) > _MAX_SCALE:
+            raise ValueError(f"Amount exponent out of range: {amount!r}")
+        scale += int(exponent)
+
+    digits = int(whole + fraction)
+    if scale >= 0:
+        return digits * 10**scale
+
+    divisor = 10**-scale
+    atomic, remainder = divmod(digits, divisor)
+    if not remainder or rounding == "down":
+        return atomic
+    if rounding == "exact":
+        raise ValueError(
+            f"Amount {amount!r} has more precision than the token's {decimals} decimals"
+        )
+    if rounding == "up":
+        return atomic + 1
+    twice = 2 * remainder
+    if twice > divisor or (
+        twice == divisor and (rounding == "half_up" or atomic % 2 == 1)
+    ):
+        return atomic + 1
+    return atomic
+
+
+# Prices are configured once and converted again for every route and network
+# they are used with, so conversions repeat
+_parse_cached = lru_cache(maxsize=4096)(_parse)
+
+
+def _to_str(amount: Amount) -> str:
+    if isinstance(amount, str):
+        return amount
+    if isinstance(amount, float):
+        # repr is the shortest string that round-trips, e.g. 0.1 -> "0.1"
+        return repr(amount)
+    raise ValueError(f"Invalid amount type: {type(amount).__name__}")
+
+
+def parse_amount(amount: Amount, decimals: int, rounding: Rounding = "exact") -> int:
+    """Convert a decimal money amount into atomic token units.
+
+    Args:
+        amount: Amount in whole tokens, e.g. "$0.01", "0.001", 1 or 0.5. A
+            leading "$" and an exponent are accepted. Floats are converted
+            through their shortest representation.
+        decimals: Token decimals
+        rounding: What to do when the amount is more precise than the token:
+            "exact" rejects it, "down" and "up" round towards zero and away
+            from it, "half_up" and "half_even" round to the nearest unit,
+            breaking ties away from zero or to the even unit.
+
+    Returns:
+        The amount in atomic units
+
+    Raises:
+        ValueError: If the amount is invalid or negative, or cannot be
+            represented exactly and rounding is "exact"
+    """
+    _check(decimals, rounding)
+    if type(amount) is int:
+        if amount < 0:
+            raise ValueError(f"Invalid amount: {amount!r}")
+        return amount * 10**decimals
+    return _parse_cached(_to_str(amount), decimals, rounding)
+
+
+def parse_amounts(
+    amounts: Iterable[Amount], decimals: int, rounding: Rounding = "exact"
+) -> List[int]:
+    """Convert many amounts for the same token, e.g. a price catalog at startup.
+
+    Equivalent to calling parse_amount on each amount, but repeated prices are
+    converted once and the conversions do not churn parse_amount's cache.
+
+    Raises:
+        ValueError: If an amount cannot be converted. The message includes its
+            index.
+    """
+    _check(decimals, rounding)
+    scale = 10**decimals
+    converted: Dict[str, int] = {}
+    atomic: List[int] = []
+    append = atomic.append
+    for index, amount in enumerate(amounts):
+        try:
+            if type(amount) is int:
+                if amount < 0:
+                    raise ValueError(f"Invalid amount: {amount!r}")
+                append(amount * scale)
+                continue
+            key = _to_str(amount)
+            value = converted.get(key)
+            if value is None:
+                value = converted[key] = _parse(key, decimals, rounding)
+            append(value)
+        except ValueError as e:
+            raise ValueError(f"Amount at index {index}: {e}") from None
+    return atomic
@@ -1,11 +1,9 @@
 from typing import Literal
 
+from x402.registry import BUILTIN_REGISTRY
 
+# The built-in networks. PaymentRequirements accepts any network in the
+# process-wide registry, see x402.registry.
 SupportedNetworks = Literal["base", "base-sepolia", "avalanche-fuji", "avalanche"]
 
-EVM_NETWORK_TO_CHAIN_ID = {
-    "base-sepolia": 84532,
-    "base": 8453,
-    "avalanche-fuji": 43113,
-    "avalanche": 43114,
-}
+EVM_NETWORK_TO_CHAIN_ID = dict(BUILTIN_REGISTRY["networks"])
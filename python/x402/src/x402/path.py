@@ -1,6 +1,12 @@
 import fnmatch
+import functools
 import re
-from typing import Union
+from typing import Callable, Pattern, Union
+
+
+@functools.lru_cache(maxsize=256)
+def _glob_regex(pattern: str) -> Pattern[str]:
+    return re.compile(fnmatch.translate(pattern))
 
 
 def path_is_match(path: Union[str, list[str]], request_path: str) -> bool:
@@ -29,7 +35,7 @@ def path_is_match(path: Union[str, list[str]], request_path: str) -> bool:
 
         # Glob pattern (contains * or ?)
         elif "*" in pattern or "?" in pattern:
-            return fnmatch.fnmatch(request_path, pattern)
+            return _glob_regex(pattern).match(request_path) is not None
 
         # Exact match
         else:
@@ -41,3 +47,42 @@ def path_is_match(path: Union[str, list[str]], request_path: str) -> bool:
         return any(single_path_match(p) for p in path)
 
     return False
+
+
+def compile_path(path: Union[str, list[str]]) -> Callable[[str], bool]:
+    """
+    Compile path pattern(s) into a matcher, for checking many request paths.
+
+    Takes the same patterns as path_is_match, which middlewares should use
+    once per configuration rather than calling path_is_match per request.
+
+    Args:
+        path: Path pattern(s) to compile. Can be a string or list of strings.
+
+    Returns:
+        Callable[[str], bool]: Function returning True if a request path
+        matches any of the patterns.
+    """
+
+    def compile_single(pattern: str) -> Callable[[str], bool]:
+        # Regex pattern
+        if pattern.startswith("regex:"):
+            regex = re.compile(pattern[6:])  # Remove 'regex:' prefix
+            return lambda request_path: regex.match(request_path) is not None
+
+        # Glob pattern (contains * or ?)
+        elif "*" in pattern or "?" in pattern:
+            glob = _glob_regex(pattern)
+            return lambda request_path: glob.match(request_path) is not None
+
+        # Exact match
+        else:
+            return pattern.__eq__
+
+    if isinstance(path, str):
+        return compile_single(path)
+    elif isinstance(path, list):
+        matchers = [compile_single(p) for p in path]
+        return lambda request_path: any(match(request_path) for match in matchers)
+
+    return lambda request_path: False
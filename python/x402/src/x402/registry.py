@@ -0,0 +1,387 @@
+import json
+import os
+import re
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple, Union
+
+# Networks and the tokens payments can be made in. Registries are immutable once
+# built; extending one returns a new registry and the process-wide registry is
+# swapped in with a single assignment, so lookups need no locking.
+#
+# The config file format mirrors BUILTIN_REGISTRY:
+#
+#     {
+#         "networks": {"sei-testnet": 1328},
+#         "tokens": {
+#             "1328": [
+#                 {
+#                     "human_name": "usdc",
+#                     "address": "0x...",
+#                     "name": "USDC",
+#                     "decimals": 6,
+#                     "version": "2"
+#                 }
+#             ]
+#         }
+#     }
+#
+# Token names and versions must be exactly what the contract uses in its
+# EIP-712 domain.
+
+REGISTRY_FILE_ENV = "X402_REGISTRY_FILE"
+
+BUILTIN_REGISTRY: Dict[str, Any] = {
+    "networks": {
+        "base-sepolia": 84532,
+        "base": 8453,
+        "avalanche-fuji": 43113,
+        "avalanche": 43114,
+    },
+    "tokens": {
+        "84532": [
+            {
+                "human_name": "usdc",
+                "address": "0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+                "name": "USDC",
+                "decimals": 6,
+                "version": "2",
+            }
+        ],
+        "8453": [
+            {
+                "human_name": "usdc",
+                "address": "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913",
+                "name": "USD Coin",
+                "decimals": 6,
+                "version": "2",
+            }
+        ],
+        "43113": [
+            {
+                "human_name": "usdc",
+                "address": "0x5425890298aed601595a70AB815c96711a31Bc65",
+                "name": "USD Coin",
+                "decimals": 6,
+                "version": "2",
+            }
+        ],
+        "43114": [
+            {
+                "human_name": "usdc",
+                "address": "0xB97EF9Ef8734C71904D8002F8b6Bc66Dd9c48a6E",
+                "name": "USDC",
+                "decimals": 6,
+                "version": "2",
+            }
+        ],
+    },
+}
+
+_ADDRESS = re.compile(r"^0x[0-9a-fA-F]{40}$")
+
+
+@dataclass(frozen=True, slots=True)
+class TokenInfo:
+    """A token payments can be made in.
+
+    Attributes:
+        chain_id: Chain the token contract is deployed on
+        address: Token contract address, as configured
+        human_name: Short symbol, e.g. "usdc"
+        name: Name in the contract's EIP-712 domain
+        decimals: Token decimals
+        version: Version in the contract's EIP-712 domain
+    """
+
+    chain_id: int
+    address: str
+    human_name: str
+    name: str
+    decimals: int
+    version: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the config file form of the token."""
+        return {
+            "human_name": self.human_name,
+            "address": self.address,
+            "name": self.name,
+            "decimals": self.decimals,
+            "version": self.version,
+        }
+
+
+def _chain_id(value: Union[int, str]) -> int:
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"Invalid chain ID: {value!r}")
+    try:
+        chain_id = int(value)
+    except ValueError:
+        raise ValueError(f"Invalid chain ID: {value!r}")
+    if chain_id <= 0:
+        raise ValueError(f"Invalid chain ID: {value!r}")
+    return chain_id
+
+
+def _token(chain_id: int, data: Mapping[str, Any]) -> TokenInfo:
+    try:
+        token = TokenInfo(
+            chain_id=chain_id,
+            address=data["address"],
+            human_name=data["human_name"],
+            name=data["name"],
+            decimals=data["decimals"],
+            version=data["version"],
+        )
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Invalid token for chain {chain_id}: {e}")
+    if not isinstance(token.address, str) or not _ADDRESS.match(token.address):
+        raise ValueError(f"Invalid token address for chain {chain_id}: {token.address}")
+    for field in ("human_name", "name", "version"):
+        if not isinstance(getattr(token, field), str):
+            raise ValueError(f"Token {token.address} {field} must be a string")
+    if type(token.decimals) is not int or not 0 <= token.decimals <= 77:
+        raise ValueError(
+            f"Token {token.address} decimals must be an integer in [0, 77]"
+        )
+    return token
+
+
+class TokenRegistry:
+    """Immutable index of networks and tokens.
+
+    Tokens are indexed by (chain ID, address), with addresses matched case
+    insensitively, and by (chain ID, human name). Lookups are dict reads.
+
+    Args:
+        networks: Network names and their chain IDs
+        tokens: Tokens to register. A later token with the same chain and
+            address, or the same chain and human name, replaces an earlier one
+            in that index.
+
+    Raises:
+        ValueError: If a network or token is invalid
+    """
+
+    __slots__ = (
+        "_network_ids",
+        "_networks_by_chain",
+        "_tokens",
+        "_tokens_by_name",
+        "_chain_tokens",
+        "_registered",
+    )
+
+    def __init__(
+        self,
+        networks: Mapping[str, Union[int, str]],
+        tokens: Iterable[TokenInfo] = (),
+    ):
+        network_ids: Dict[str, int] = {}
+        networks_by_chain: Dict[int, str] = {}
+        for name, chain_id in networks.items():
+            if not isinstance(name, str) or not name:
+                raise ValueError(f"Invalid network name: {name!r}")
+            network_ids[name] = _chain_id(chain_id)
+            networks_by_chain.setdefault(network_ids[name], name)
+
+        by_address: Dict[Tuple[int, str], TokenInfo] = {}
+        by_name: Dict[Tuple[int, str], TokenInfo] = {}
+        registered = tuple(tokens)
+        for token in registered:
+            by_address[(token.chain_id, token.address.lower())] = token
+            # The last token registered under a name is the one used for prices
+            by_name[(token.chain_id, token.human_name.lower())] = token
+
+        chain_tokens: Dict[int, Tuple[TokenInfo, ...]] = {}
+        for token in by_address.values():
+            chain_tokens[token.chain_id] = chain_tokens.get(token.chain_id, ()) + (
+                token,
+            )
+
+        self._network_ids = MappingProxyType(network_ids)
+        self._networks_by_chain = MappingProxyType(networks_by_chain)
+        self._tokens = MappingProxyType(by_address)
+        self._tokens_by_name = MappingProxyType(by_name)
+        self._chain_tokens = MappingProxyType(chain_tokens)
+        # Tokens in registration order, so that extending keeps the precedence
+        self._registered = registered
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "TokenRegistry":
+        """Build a registry from the config file format.
+
+        Raises:
+            ValueError: If the data is not in the config file format
+        """
+        return cls.empty().extend(data)
+
+    @classmethod
+    def from_file(cls, path: Union[str, "os.PathLike[str]"]) -> "TokenRegistry":
+        """Build a registry from a JSON config file.
+
+        Raises:
+            OSError: If the file cannot be read
+            ValueError: If the file is not in the config file format
+        """
+        return cls.from_dict(_read_file(path))
+
+    @classmethod
+    def empty(cls) -> "TokenRegistry":
+        return cls({})
+
+    def extend(self, data: Mapping[str, Any]) -> "TokenRegistry":
+        """Return a new registry with the networks and tokens in data added.
+
+        Entries in data replace existing networks and tokens with the same name
+        or chain and address.
+
+        Raises:
+            ValueError: If the data is not in the config file format
+        """
+        if not isinstance(data, Mapping):
+            raise ValueError("Registry config must be an object")
+        networks = data.get("networks", {})
+        chain_tokens = data.get("tokens", {})
+        if not isinstance(networks, Mapping) or not isinstance(chain_tokens, Mapping):
+            raise ValueError("Registry networks and tokens must be objects")
+
+        tokens = list(self._registered)
+        for key, entries in chain_tokens.items():
+            chain_id = _chain_id(key)
+            if not isinstance(entries, list):
+                raise ValueError(f"Tokens for chain {chain_id} must be a list")
+            tokens.extend(_token(chain_id, entry) for entry in entries)
+        return TokenRegistry({**self._network_ids, **networks}, tokens)
+
+    def extend_from_file(self, path: Union[str, "os.PathLike[str]"]) -> "TokenRegistry":
+        """Return a new registry extended with a JSON config file.
+
+        Raises:
+            OSError: If the file cannot be read
+            ValueError: If the file is not in the config file format
+        """
+        return self.extend(_read_file(path))
+
+    @property
+    def networks(self) -> Mapping[str, int]:
+        """Read-only mapping of network names to chain IDs."""
+        return self._network_ids
+
+    def has_network(self, network: str) -> bool:
+        return network in self._network_ids
+
+    def chain_id(self, network: str) -> int:
+        """Get the chain ID of a network.
+
+        Raises:
+            ValueError: If the network is not registered
+        """
+        try:
+            return self._network_ids[network]
+        except KeyError:
+            raise ValueError(f"Unsupported network: {network}")
+
+    def network(self, chain_id: Union[int, str]) -> str:
+        """Get the name of the first network registered for a chain ID.
+
+        Raises:
+            ValueError: If no network is registered for the chain ID
+        """
+        try:
+            return self._networks_by_chain[int(chain_id)]
+        except (KeyError, ValueError):
+            raise ValueError(f"Unsupported chain ID: {chain_id}")
+
+    def token(self, chain_id: Union[int, str], address: str) -> TokenInfo:
+        """Get a token by chain ID and contract address, in any case.
+
+        Raises:
+            ValueError: If the token is not registered
+        """
+        token = self._tokens.get((int(chain_id), address.lower()))
+        if token is None:
+            raise ValueError(
+                f"Token not found for chain {chain_id} and address {address}"
+            )
+        return token
+
+    def token_by_name(self, chain_id: Union[int, str], human_name: str) -> TokenInfo:
+        """Get a token by chain ID and human name, e.g. "usdc", in any case.
+
+        Raises:
+            ValueError: If the token is not registered
+        """
+        token = self._tokens_by_name.get((int(chain_id), human_name.lower()))
+        if token is None:
+            raise ValueError(f"No {human_name} token registered for chain {chain_id}")
+        return token
+
+    def tokens(self, chain_id: Union[int, str]) -> Tuple[TokenInfo, ...]:
+        """Get the tokens registered for a chain ID, in registration order."""
+        return self._chain_tokens.get(int(chain_id), ())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the registry in the config file format."""
+        return {
+            "networks": dict(self._network_ids),
+            "tokens": {
+                str(chain_id): [token.to_dict() for token in tokens]
+                for chain_id, tokens in self._chain_tokens.items()
+            },
+        }
+
+
+def _read_file(path: Union[str, "os.PathLike[str]"]) -> Any:
+    with open(path, "rb") as f:
+        try:
+            return json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid registry config file {path}: {e}")
+
+
+def _load_default_registry() -> TokenRegistry:
+    registry = TokenRegistry.from_dict(BUILTIN_REGISTRY)
+    path = os.environ.get(REGISTRY_FILE_ENV)
+    if path:
+        registry = registry.extend_from_file(path)
+    return registry
+
+
+_registry: Optional[TokenRegistry] = None
+
+
+def get_registry() -> TokenRegistry:
+    """Get the process-wide registry.
+
+    It holds the built-in networks and tokens, extended with the config file
+    named by the X402_REGISTRY_FILE environment variable when set. The registry
+    is loaded on first use.
+    """
+    global _registry
+    if _registry is None:
+        _registry = _load_default_registry()
+    return _registry
+
+
+def set_registry(registry: TokenRegistry) -> None:
+    """Replace the process-wide registry.
+
+    Middlewares resolve prices when they are registered, so the registry should
+    be set before adding them.
+    """
+    global _registry
+    _registry = registry
+
+
+def load_registry_file(path: Union[str, "os.PathLike[str]"]) -> TokenRegistry:
+    """Extend the process-wide registry with a JSON config file and return it.
+
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If the file is not in the config file format
+    """
+    registry = get_registry().extend_from_file(path)
+    set_registry(registry)
+    return registry
@@ -0,0 +1,171 @@
+import os
+from typing import Any, Optional, Protocol
+
+from eth_utils import keccak, to_checksum_address
+
+
+class Secp256k1Backend(Protocol):
+    """Signs 32-byte digests and recovers public keys from 65-byte signatures.
+
+    Signatures are laid out as r || s || v with v in {27, 28}, the format used in
+    x402 payment payloads. Public keys are 64-byte uncompressed points without the
+    0x04 prefix.
+
+    sign_digest takes either a raw 32-byte private key or a key prepared once
+    with load_private_key, which saves deriving it again on every signature.
+    Backends do not keep keys themselves; callers own prepared keys.
+    """
+
+    name: str
+
+    def load_private_key(self, private_key: bytes) -> Any: ...
+
+    def sign_digest(self, private_key: Any, digest: bytes) -> bytes: ...
+
+    def recover_public_key(self, digest: bytes, signature: bytes) -> bytes: ...
+
+
+def public_key_to_address(public_key: bytes) -> str:
+    """Derive the checksummed Ethereum address of a 64-byte public key."""
+    if len(public_key) != 64:
+        raise ValueError("public key must be 64 bytes")
+    return to_checksum_address(keccak(public_key)[-20:])
+
+
+def _validate(digest: bytes, signature: Optional[bytes] = None) -> None:
+    if len(digest) != 32:
+        raise ValueError("digest must be 32 bytes")
+    if signature is not None:
+        if len(signature) != 65:
+            raise ValueError("signature must be 65 bytes")
+        if signature[64] not in (0, 1, 27, 28):
+            raise ValueError(f"Invalid signature recovery id: {signature[64]}")
+
+
+class EthKeysBackend:
+    """Backend built on eth_keys, always available."""
+
+    def __init__(self, ecc_backend: Optional[str] = None):
+        """Initialize the backend.
+
+        Args:
+            ecc_backend: Optional eth_keys backend import path, e.g.
+                "eth_keys.backends.NativeECCBackend" to force the pure Python one.
+                Defaults to eth_keys' own choice.
+        """
+        from eth_keys import KeyAPI
+
+        self._keys = KeyAPI(ecc_backend)
+        self.name = (
+            "eth_keys"
+            if ecc_backend is None
+            else f"eth_keys[{ecc_backend.rsplit('.', 1)[-1]}]"
+        )
+
+    def load_private_key(self, private_key: bytes) -> Any:
+        return self._keys.PrivateKey(private_key)
+
+    def sign_digest(self, private_key: Any, digest: bytes) -> bytes:
+        _validate(digest)
+        if isinstance(private_key, (bytes, bytearray)):
+            private_key = self.load_private_key(bytes(private_key))
+        signature = private_key.sign_msg_hash(digest)
+        return (
+            signature.r.to_bytes(32, "big")
+            + signature.s.to_bytes(32, "big")
+            + bytes([signature.v + 27])
+        )
+
+    def recover_public_key(self, digest: bytes, signature: bytes) -> bytes:
+        _validate(digest, signature)
+        v = signature[64] - 27 if signature[64] >= 27 else signature[64]
+        eth_signature = self._keys.Signature(signature[:64] + bytes([v]))
+        return eth_signature.recover_public_key_from_msg_hash(digest).to_bytes()
+
+
+class CoincurveBackend:
+    """Backend calling libsecp256k1 through coincurve."""
+
+    name = "coincurve"
+
+    def __init__(self):
+        import coincurve
+
+        self._coincurve = coincurve
+
+    def load_private_key(self, private_key: bytes) -> Any:
+        return self._coincurve.PrivateKey(private_key)
+
+    def sign_digest(self, private_key: Any, digest: bytes) -> bytes:
+        _validate(digest)
+        if isinstance(private_key, (bytes, bytearray)):
+            private_key = self.load_private_key(bytes(private_key))
+        signature = private_key.sign_recoverable(digest, hasher=None)
+        return signature[:64] + bytes([signature[64] + 27])
+
+    def recover_public_key(self, digest: bytes, signature: bytes) -> bytes:
+        _validate(digest, signature)
+        v = signature[64] - 27 if signature[64] >= 27 else signature[64]
+        public_key = self._coincurve.PublicKey.from_signature_and_message(
+            signature[:64] + bytes([v]), digest, hasher=None
+        )
+        return public_key.format(compressed=False)[1:]
+
+
+_BACKENDS = {
+    "coincurve": CoincurveBackend,
+    "eth_keys": EthKeysBackend,
+}
+
+_backend: Optional[Secp256k1Backend] = None
+
+
+def load_backend(name: Optional[str] = None) -> Secp256k1Backend:
+    """Create a backend by name, or the fastest available one if no name is given.
+
+    Raises:
+        ValueError: If the backend name is unknown
+        ImportError: If the named backend's library is not installed
+    """
+    if name is not None:
+        if name not in _BACKENDS:
+            raise ValueError(f"Unknown secp256k1 backend: {name}")
+        return _BACKENDS[name]()
+    try:
+        return CoincurveBackend()
+    except ImportError:
+        return EthKeysBackend()
+
+
+def get_backend() -> Secp256k1Backend:
+    """Get the process-wide backend.
+
+    The coincurve backend binds libsecp256k1 directly and is preferred when
+    coincurve is installed (`pip install x402[fast]`); eth_keys, which eth_account
+    signs with, is the fallback. The backend is chosen on first use and can be
+    forced with the X402_SECP256K1_BACKEND environment variable ("coincurve" or
+    "eth_keys").
+    """
+    global _backend
+    if _backend is None:
+        _backend = load_backend(os.environ.get("X402_SECP256K1_BACKEND") or None)
+    return _backend
+
+
+def set_backend(backend: Optional[Secp256k1Backend]) -> None:
+    """Set the process-wide backend. Pass None to select it again on next use."""
+    global _backend
+    _backend = backend
+
+
+def sign_digest(private_key: Any, digest: bytes) -> bytes:
+    """Sign a 32-byte digest with the process-wide backend.
+
+    private_key is a raw key or one from the backend's load_private_key.
+    """
+    return get_backend().sign_digest(private_key, digest)
+
+
+def recover_address(digest: bytes, signature: bytes) -> str:
+    """Recover the checksummed address that signed a digest."""
+    return public_key_to_address(get_backend().recover_public_key(digest, signature))
@@ -0,0 +1,417 @@
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+from x402.encoding import json_dumps, json_loads
+from x402.wire import WirePaymentPayload, WirePaymentRequirements, WireVerifyResponse
+
+try:
+    import fcntl
+except ImportError:  # Windows: the cache is only shared between threads
+    fcntl = None
+
+# Fixed-size hash table in a memory-mapped file, shared by every process on a
+# host that opens the same path, e.g. the workers of a gunicorn or uvicorn
+# server.
+#
+# The file starts with a 64 byte header followed by the slots:
+#
+#     header = 8 byte magic | u32 slots | u32 stripes | u32 value size
+#     slot   = 16 byte key digest | f64 expiry (Unix time, 0: empty)
+#              | u16 value length | value
+#
+# Slots are split into stripes of equal size, each guarded by a thread lock and
+# an advisory fcntl lock on the byte at the stripe's index, so operations on
+# different stripes never contend. A key hashes to a stripe and a home slot
+# within it and lives in one of the _PROBES slots from there. When they are all
+# taken by live entries, the one expiring first is evicted, so the file never
+# grows.
+
+_MAGIC = b"X402SHC1"
+_HEADER = struct.Struct("<8sIII")
+_HEADER_SIZE = 64
+_SLOT = struct.Struct("<16sdH")
+_EXPIRES = struct.Struct("<d")
+_DIGEST_PREFIX = struct.Struct("<II")
+_PROBES = 8
+_EMPTY_DIGEST = bytes(16)
+
+
+def _digest(key: bytes) -> bytes:
+    return hashlib.blake2b(key, digest_size=16).digest()
+
+
+class SharedCache:
+    """Fixed-size, TTL-aware hash table shared between processes through mmap.
+
+    Keys are arbitrary bytes, stored as 128-bit digests. Values are bytes of at
+    most value_size. All processes opening the same path must use the same
+    slots, stripes and value_size; the file is created by the first one.
+
+    Statistics returned by stats() are those of this process.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        slots: int = 65536,
+        stripes: int = 64,
+        value_size: int = 96,
+    ):
+        """Open or create a shared cache file.
+
+        Args:
+            path: Cache file, typically on a tmpfs such as /dev/shm
+            slots: Number of entries the table holds
+            stripes: Number of independently locked slot ranges
+            value_size: Maximum value length in bytes
+
+        Raises:
+            ValueError: If the sizes are invalid or the file was created with
+                different ones
+        """
+        if stripes < 1:
+            raise ValueError("stripes must be positive")
+        if slots < stripes * _PROBES:
+            raise ValueError("slots must be at least stripes * 8")
+        if not 0 < value_size <= 0xFFFF:
+            raise ValueError("value_size must be between 1 and 65535")
+        self.path = Path(path)
+        self.slots = slots - slots % stripes
+        self.stripes = stripes
+        self.value_size = value_size
+        self._slot_size = _SLOT.size + value_size
+        self._stripe_slots = self.slots // stripes
+        self._homes = self._stripe_slots - _PROBES + 1
+        size = _HEADER_SIZE + self.slots * self._slot_size
+
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            # Serialise creation with the other processes opening the file
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(self._fd).st_size == 0:
+                    os.ftruncate(self._fd, size)
+                    os.pwrite(
+                        self._fd,
+                        _HEADER.pack(_MAGIC, self.slots, stripes, value_size),
+                        0,
+                    )
+                header = os.pread(self._fd, _HEADER.size, 0)
+                if header != _HEADER.pack(_MAGIC, self.slots, stripes, value_size):
+                    raise ValueError(
+                        f"{self.path} is not a shared cache with {self.slots} slots, "
+                        f"{stripes} stripes and {value_size} byte values"
+                    )
+                if os.fstat(self._fd).st_size != size:
+                    raise ValueError(f"{self.path} has an unexpected size")
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+            self._map = mmap.mmap(self._fd, size)
+        except BaseException:
+            os.close(self._fd)
+            raise
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._stats_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _lock(self, stripe: int) -> None:
+        self._locks[stripe].acquire()
+        if fcntl is not None:
+            try:
+                fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, stripe)
+            except BaseException:
+                self._locks[stripe].release()
+                raise
+
+    def _unlock(self, stripe: int) -> None:
+        if fcntl is not None:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, stripe)
+        self._locks[stripe].release()
+
+    def _locate(self, digest: bytes) -> Tuple[int, range]:
+        """Return the stripe of a key digest and the offsets of its probe slots.
+
+        The probe slots are contiguous and never wrap around the stripe, so a
+        lookup searches a single range of the map.
+        """
+        stripe, home = _DIGEST_PREFIX.unpack_from(digest)
+        stripe %= self.stripes
+        home %= self._homes
+        start = _HEADER_SIZE + (stripe * self._stripe_slots + home) * self._slot_size
+        return stripe, range(start, start + _PROBES * self._slot_size, self._slot_size)
+
+    def _find(self, digest: bytes, offsets: range, now: float) -> Optional[int]:
+        """Return the offset of a key's live entry, or None."""
+        position = self._map.find(digest, offsets.start, offsets.stop)
+        while position != -1:
+            # The digest may also occur inside a value; only slot starts count
+            if (position - offsets.start) % self._slot_size == 0:
+                if _EXPIRES.unpack_from(self._map, position + 16)[0] > now:
+                    return position
+            position = self._map.find(digest, position + 1, offsets.stop)
+        return None
+
+    def get(self, key: bytes, now: Optional[float] = None) -> Optional[bytes]:
+        """Return the value of a key, or None if it is missing or expired."""
+        now = time.time() if now is None else now
+        digest = _digest(key)
+        stripe, offsets = self._locate(digest)
+        self._lock(stripe)
+        try:
+            offset = self._find(digest, offsets, now)
+            if offset is not None:
+                length = _SLOT.unpack_from(self._map, offset)[2]
+                start = offset + _SLOT.size
+                value = self._map[start : start + length]
+        finally:
+            self._unlock(stripe)
+        with self._stats_lock:
+            if offset is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+        return value
+
+    def _store(
+        self,
+        key: bytes,
+        value: bytes,
+        ttl: float,
+        now: Optional[float],
+        replace: bool,
+    ) -> bool:
+        if len(value) > self.value_size:
+            raise ValueError(f"Value is longer than {self.value_size} bytes")
+        now = time.time() if now is None else now
+        digest = _digest(key)
+        stripe, offsets = self._locate(digest)
+        evicted = False
+        self._lock(stripe)
+        try:
+            target = self._find(digest, offsets, now)
+            if target is not None and not replace:
+                return False
+            if target is None:
+                # The first free or expired slot, else the live entry expiring first
+                earliest = None
+                for offset in offsets:
+                    expires = _EXPIRES.unpack_from(self._map, offset + 16)[0]
+                    if expires <= now:
+                        target = offset
+                        break
+                    if earliest is None or expires < earliest:
+                        earliest, target = expires, offset
+                else:
+                    evicted = True
+            start = target + _SLOT.size
+            self._map[start : start + len(value)] = value
+            _SLOT.pack_into(self._map, target, digest, now + ttl, len(value))
+        finally:
+            self._unlock(stripe)
+        if evicted:
+            with self._stats_lock:
+                self._evictions += 1
+        return True
+
+    def set(
+        self, key: bytes, value: bytes, ttl: float, now: Optional[float] = None
+    ) -> None:
+        """Store a value for ttl seconds, replacing any existing one."""
+        self._store(key, value, ttl, now, replace=True)
+
+    def add(
+        self, key: bytes, value: bytes, ttl: float, now: Optional[float] = None
+    ) -> bool:
+        """Store a value unless the key has a live entry, atomically across processes.
+
+        Returns:
+            False if the key already had a live entry
+        """
+        return self._store(key, value, ttl, now, replace=False)
+
+    def delete(self, key: bytes) -> bool:
+        """Remove a key.
+
+        Returns:
+            False if the key had no live entry
+        """
+        digest = _digest(key)
+        stripe, offsets = self._locate(digest)
+        self._lock(stripe)
+        try:
+            offset = self._find(digest, offsets, time.time())
+            if offset is None:
+                return False
+            _SLOT.pack_into(self._map, offset, _EMPTY_DIGEST, 0.0, 0)
+            return True
+        finally:
+            self._unlock(stripe)
+
+    def clear(self) -> None:
+        """Remove every entry, for all processes sharing the file."""
+        for stripe in range(self.stripes):
+            self._lock(stripe)
+            try:
+                start = _HEADER_SIZE + stripe * self._stripe_slots * self._slot_size
+                end = start + self._stripe_slots * self._slot_size
+                self._map[start:end] = bytes(end - start)
+            finally:
+                self._unlock(stripe)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hits, misses and evictions of this process."""
+        with self._stats_lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
+
+    def close(self) -> None:
+        if self._map.closed:
+            return
+        self._map.close()
+        os.close(self._fd)
+
+    def __enter__(self) -> "SharedCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+# Values of nonce entries
+_IN_FLIGHT = b"in-flight"
+_SETTLED = b"settled"
+
+# Upper bound on how long a settled nonce is remembered. Authorizations past
+# their validBefore are rejected on chain, so later entries would only take space.
+_MAX_NONCE_TTL = 86400.0
+
+
+class PaymentCache:
+    """Verify results and seen nonces shared by all workers on a host.
+
+    Pass it to a middleware so that a client retrying a payment on another
+    worker does not cost a second facilitator verify call, and so that a payment
+    header already being processed or settled is rejected before it reaches
+    the facilitator or the handler:
+
+        cache = PaymentCache("/dev/shm/x402-cache")
+        app.middleware("http")(require_payment(..., payment_cache=cache))
+
+    Verify results are kept for verify_ttl seconds. Nonces are claimed for the
+    duration of a request and, once settled, remembered until the authorization
+    expires.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        slots: int = 65536,
+        verify_ttl: float = 10.0,
+        **options,
+    ):
+        """Open or create the cache file.
+
+        Args:
+            path: Cache file shared by the workers, typically on a tmpfs
+            slots: Number of verify results and nonces kept
+            verify_ttl: Seconds a verify result is reused for
+            **options: Further SharedCache options (stripes, value_size)
+        """
+        self.verify_ttl = verify_ttl
+        self.cache = SharedCache(path, slots=slots, **options)
+
+    @staticmethod
+    def _verify_key(
+        payment: WirePaymentPayload, requirements: WirePaymentRequirements
+    ) -> bytes:
+        return b"v" + json_dumps([payment.to_dict(), requirements.to_dict()])
+
+    @staticmethod
+    def _nonce_key(
+        payment: WirePaymentPayload, requirements: WirePaymentRequirements
+    ) -> bytes:
+        authorization = payment.authorization
+        return (
+            (
+                f"n{payment.network}:{requirements.asset}:"
+                f"{authorization.from_}:{authorization.nonce}"
+            )
+            .lower()
+            .encode()
+        )
+
+    def verify_result(
+        self, payment: WirePaymentPayload, requirements: WirePaymentRequirements
+    ) -> Optional[WireVerifyResponse]:
+        """Return the cached verify result of a payment, if any."""
+        value = self.cache.get(self._verify_key(payment, requirements))
+        if value is None:
+            return None
+        return WireVerifyResponse.from_dict(json_loads(value))
+
+    def store_verify_result(
+        self,
+        payment: WirePaymentPayload,
+        requirements: WirePaymentRequirements,
+        response: WireVerifyResponse,
+    ) -> None:
+        """Cache a verify result, unless it is too large for a slot."""
+        value = json_dumps(response.to_dict())
+        if len(value) <= self.cache.value_size:
+            self.cache.set(
+                self._verify_key(payment, requirements), value, self.verify_ttl
+            )
+
+    def claim(
+        self, payment: WirePaymentPayload, requirements: WirePaymentRequirements
+    ) -> bool:
+        """Mark a payment's nonce as being processed.
+
+        The claim lasts at most the requirements' max_timeout_seconds.
+
+        Returns:
+            False if another request is processing or has settled the nonce
+        """
+        return self.cache.add(
+            self._nonce_key(payment, requirements),
+            _IN_FLIGHT,
+            max(requirements.max_timeout_seconds, 1),
+        )
+
+    def release(
+        self, payment: WirePaymentPayload, requirements: WirePaymentRequirements
+    ) -> None:
+        """Drop the claim on a nonce whose payment was not settled."""
+        self.cache.delete(self._nonce_key(payment, requirements))
+
+    def settled(
+        self, payment: WirePaymentPayload, requirements: WirePaymentRequirements
+    ) -> None:
+        """Remember a settled nonce until its authorization expires."""
+        now = time.time()
+        try:
+            ttl = int(payment.authorization.valid_before) - now
+        except ValueError:
+            ttl = _MAX_NONCE_TTL
+        self.cache.set(
+            self._nonce_key(payment, requirements),
+            _SETTLED,
+            min(max(ttl, 1.0), _MAX_NONCE_TTL),
+            now,
+        )
+
+    def close(self) -> None:
+        self.cache.close()
@@ -0,0 +1,131 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from x402.common import x402_VERSION
+from x402.encoding import json_dumps
+from x402.types import PaymentRequirements
+from x402.wire import WirePaymentRequirements
+
+# Route-level payment requirements compiled once when a middleware is
+# registered. Everything except `resource` is fixed per route, so requests reuse
+# the validated objects and the serialised 402 body and only fill in the
+# resource URL, copying on write when it differs from the compiled one.
+
+# Placeholders spliced out of the serialised 402 body. They cannot occur in a
+# URL or be produced by a caller's JSON, as both contain escaped NUL characters.
+_RESOURCE_PLACEHOLDER = "\x00x402-resource\x00"
+_ERROR_PLACEHOLDER = "\x00x402-error\x00"
+
+
+class PaymentRequirementsTemplate:
+    """Payment requirements for a route, validated and serialised once.
+
+    Args:
+        accepts: Validated payment requirements offered by the route. Their
+            resource is used as is when it matches the per-request resource and
+            replaced otherwise.
+        x402_version: Protocol version advertised in 402 responses
+    """
+
+    __slots__ = (
+        "_models",
+        "_requirements",
+        "_selection",
+        "_resource",
+        "_resource_json",
+        "_body_parts",
+        "_body_tail",
+    )
+
+    def __init__(
+        self,
+        accepts: Sequence[PaymentRequirements],
+        x402_version: int = x402_VERSION,
+    ):
+        if not accepts:
+            raise ValueError("At least one payment requirement is required")
+        resources = {model.resource for model in accepts}
+        if len(resources) != 1:
+            raise ValueError("Payment requirements must share a resource")
+
+        self._models: Tuple[PaymentRequirements, ...] = tuple(
+            model.model_copy(deep=True) for model in accepts
+        )
+        self._requirements: Tuple[WirePaymentRequirements, ...] = tuple(
+            WirePaymentRequirements.from_model(model) for model in self._models
+        )
+        self._resource: str = resources.pop()
+        self._resource_json = json_dumps(self._resource)
+
+        # First requirement wins for a (scheme, network), as a linear scan would
+        self._selection: Dict[Tuple[str, str], int] = {}
+        for index, model in enumerate(self._models):
+            self._selection.setdefault((model.scheme, model.network), index)
+
+        accepts_json = []
+        for requirements in self._requirements:
+            accept = requirements.to_dict()
+            accept["resource"] = _RESOURCE_PLACEHOLDER
+            accepts_json.append(accept)
+        body = json_dumps(
+            {
+                "x402Version": x402_version,
+                "accepts": accepts_json,
+                "error": _ERROR_PLACEHOLDER,
+            }
+        )
+        head, self._body_tail = body.split(json_dumps(_ERROR_PLACEHOLDER))
+        self._body_parts: List[bytes] = head.split(json_dumps(_RESOURCE_PLACEHOLDER))
+
+    @property
+    def resource(self) -> str:
+        """The resource the template was compiled with."""
+        return self._resource
+
+    def select(self, scheme: str, network: str) -> Optional[int]:
+        """Return the index of the requirements matching a payment, if any."""
+        return self._selection.get((scheme, network))
+
+    def requirements(self, index: int, resource: str) -> WirePaymentRequirements:
+        """Return the requirements at index for resource.
+
+        The compiled instance is shared when resource matches and must not be
+        mutated.
+        """
+        requirements = self._requirements[index]
+        if resource == self._resource:
+            return requirements
+        return WirePaymentRequirements(
+            requirements.scheme,
+            requirements.network,
+            requirements.max_amount_required,
+            resource,
+            requirements.description,
+            requirements.mime_type,
+            requirements.pay_to,
+            requirements.max_timeout_seconds,
+            requirements.asset,
+            requirements.output_schema,
+            requirements.extra,
+        )
+
+    def model(self, index: int, resource: str) -> PaymentRequirements:
+        """Return a copy of the validated requirements at index for resource."""
+        model = self._models[index]
+        # Deep, as handlers may mutate extra or output_schema in place
+        if resource == self._resource:
+            return model.model_copy(deep=True)
+        return model.model_copy(update={"resource": resource}, deep=True)
+
+    def payment_required_body(self, resource: str, error: str) -> bytes:
+        """Return the serialised 402 response body for resource."""
+        if resource == self._resource:
+            resource_json = self._resource_json
+        else:
+            resource_json = json_dumps(resource)
+        return b"".join(
+            (
+                resource_json.join(self._body_parts),
+                json_dumps(error),
+                self._body_tail,
+            )
+        )
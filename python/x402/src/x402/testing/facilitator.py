@@ -0,0 +1,418 @@
+import argparse
+import asyncio
+import math
+import random
+import secrets
+import socket
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+from pydantic import ValidationError
+
+from x402.exact import recover_authorization_signer
+from x402.types import PaymentPayload, PaymentRequirements
+
+# Local stand-in for a facilitator's /verify and /settle endpoints, for load
+# testing FacilitatorClient and the middlewares offline. Verification mirrors
+# the reference exact/EVM facilitator without touching a chain: the signature,
+# recipient, amount and validity window are checked locally and balances are
+# assumed sufficient. Settlement returns a random transaction hash and rejects
+# reused nonces.
+#
+# Run with `python -m x402.testing.facilitator --help`, or in-process with
+# MockFacilitatorServer.
+
+_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal", "exponential")
+
+
+@dataclass(frozen=True)
+class Latency:
+    """A latency distribution in milliseconds.
+
+    Parsed from specs such as "fixed:10", "uniform:5,20" (min, max),
+    "normal:20,5" (mean, standard deviation), "lognormal:20,0.5" (median,
+    sigma) and "exponential:20" (mean). "0" or "" means no latency. Samples
+    are never negative.
+    """
+
+    distribution: str = "fixed"
+    params: Tuple[float, ...] = (0.0,)
+
+    @classmethod
+    def parse(cls, spec: str) -> "Latency":
+        """Parse a latency spec.
+
+        Raises:
+            ValueError: If the spec is invalid
+        """
+        spec = spec.strip()
+        if spec in ("", "0"):
+            return cls()
+        distribution, _, values = spec.partition(":")
+        arity = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+        if distribution not in _DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {distribution}")
+        try:
+            params = tuple(float(value) for value in values.split(","))
+        except ValueError:
+            raise ValueError(f"Invalid latency spec: {spec}")
+        if len(params) != arity.get(distribution, 1) or any(
+            not math.isfinite(p) or p < 0 for p in params
+        ):
+            raise ValueError(f"Invalid latency spec: {spec}")
+        return cls(distribution, params)
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw a latency in seconds."""
+        if self.distribution == "fixed":
+            ms = self.params[0]
+        elif self.distribution == "uniform":
+            ms = rng.uniform(*self.params)
+        elif self.distribution == "normal":
+            ms = rng.gauss(*self.params)
+        elif self.distribution == "lognormal":
+            median, sigma = self.params
+            ms = median * math.exp(rng.gauss(0.0, sigma))
+        else:
+            ms = rng.expovariate(1.0 / self.params[0]) if self.params[0] else 0.0
+        return max(ms, 0.0) / 1000
+
+
+# Typical block confirmation time, used by slow settle mode
+SLOW_SETTLE_LATENCY = Latency("uniform", (1000.0, 5000.0))
+
+
+@dataclass
+class MockFacilitatorConfig:
+    """Behaviour of the mock facilitator.
+
+    Attributes:
+        latency: Latency added to every verify and settle call
+        settle_latency: Latency of settle calls, replacing latency when set
+        error_rate: Fraction of calls answered with HTTP 500
+        timeout_rate: Fraction of calls that hang for timeout_seconds and then
+            answer HTTP 504
+        timeout_seconds: How long timed out calls hang
+        malformed_rate: Fraction of calls answered with a malformed body: not
+            JSON, the wrong JSON type or a response missing required fields
+        verify_signatures: Check payment signatures and authorizations. When
+            disabled every well-formed payment is valid.
+        seed: Random seed, for reproducible fault injection
+    """
+
+    latency: Latency = field(default_factory=Latency)
+    settle_latency: Optional[Latency] = None
+    error_rate: float = 0.0
+    timeout_rate: float = 0.0
+    timeout_seconds: float = 30.0
+    malformed_rate: float = 0.0
+    verify_signatures: bool = True
+    seed: Optional[int] = None
+
+    def __post_init__(self):
+        for name in ("error_rate", "timeout_rate", "malformed_rate"):
+            rate = getattr(self, name)
+            if not 0.0 <= rate <= 1.0:
+                raise ValueError(f"{name} must be between 0 and 1")
+        if self.timeout_seconds < 0:
+            raise ValueError("timeout_seconds must not be negative")
+
+
+_MALFORMED: Sequence[Tuple[str, str]] = (
+    ("not json", "application/json"),
+    ("[]", "application/json"),
+    ('{"unexpected": true}', "application/json"),
+    ("<html>Bad Gateway</html>", "text/html"),
+)
+
+
+def verify_payment(
+    payment: PaymentPayload,
+    requirements: PaymentRequirements,
+    verify_signatures: bool = True,
+    now: Optional[int] = None,
+) -> Optional[str]:
+    """Check an exact/EVM payment locally.
+
+    Returns:
+        None if the payment is valid, otherwise the x402 invalid reason
+    """
+    if payment.scheme != "exact" or requirements.scheme != "exact":
+        return "unsupported_scheme"
+    if payment.x402_version != 1:
+        return "invalid_x402_version"
+    if payment.network != requirements.network:
+        return "invalid_network"
+    if not verify_signatures:
+        return None
+
+    authorization = payment.payload.authorization
+    try:
+        signer = recover_authorization_signer(
+            requirements,
+            authorization.model_dump(by_alias=True),
+            payment.payload.signature,
+        )
+    except (ValueError, KeyError, TypeError):
+        return "invalid_exact_evm_payload_signature"
+    if signer.lower() != authorization.from_.lower():
+        return "invalid_exact_evm_payload_signature"
+    if authorization.to.lower() != requirements.pay_to.lower():
+        return "invalid_exact_evm_payload_recipient_mismatch"
+    now = int(time.time()) if now is None else now
+    # Allow a few seconds for the settlement transaction, as the reference does
+    if int(authorization.valid_before) < now + 6:
+        return "invalid_exact_evm_payload_authorization_valid_before"
+    if int(authorization.valid_after) > now:
+        return "invalid_exact_evm_payload_authorization_valid_after"
+    if int(authorization.value) < int(requirements.max_amount_required):
+        return "invalid_exact_evm_payload_authorization_value"
+    return None
+
+
+def create_app(config: Optional[MockFacilitatorConfig] = None) -> FastAPI:
+    """Create the mock facilitator ASGI app.
+
+    Besides /verify and /settle it serves GET /stats, counting calls by
+    endpoint and outcome, and POST /reset, which clears the counts and the
+    settled nonces.
+    """
+    config = config or MockFacilitatorConfig()
+    rng = random.Random(config.seed)
+    stats: Counter = Counter()
+    settled_nonces: Set[str] = set()
+    app = FastAPI(title="x402 mock facilitator")
+
+    async def inject_faults(endpoint: str) -> Optional[Response]:
+        stats[f"{endpoint}.requests"] += 1
+        if config.timeout_rate and rng.random() < config.timeout_rate:
+            stats[f"{endpoint}.timeouts"] += 1
+            await asyncio.sleep(config.timeout_seconds)
+            return JSONResponse({"error": "timeout"}, status_code=504)
+
+        latency = config.latency
+        if endpoint == "settle" and config.settle_latency is not None:
+            latency = config.settle_latency
+        delay = latency.sample(rng)
+        if delay:
+            await asyncio.sleep(delay)
+
+        if config.error_rate and rng.random() < config.error_rate:
+            stats[f"{endpoint}.errors"] += 1
+            return JSONResponse({"error": "internal error"}, status_code=500)
+        if config.malformed_rate and rng.random() < config.malformed_rate:
+            stats[f"{endpoint}.malformed"] += 1
+            body, media_type = rng.choice(_MALFORMED)
+            return Response(body, media_type=media_type)
+        return None
+
+    async def read_request(
+        request: Request,
+    ) -> Tuple[Optional[PaymentPayload], Optional[PaymentRequirements], str]:
+        try:
+            body = await request.json()
+            payment = PaymentPayload.model_validate(body["paymentPayload"])
+            requirements = PaymentRequirements.model_validate(
+                body["paymentRequirements"]
+            )
+        except (ValueError, KeyError, TypeError, ValidationError):
+            return None, None, "invalid_payload"
+        return payment, requirements, ""
+
+    @app.post("/verify")
+    async def verify(request: Request) -> Response:
+        fault = await inject_faults("verify")
+        if fault is not None:
+            return fault
+        payment, requirements, error = await read_request(request)
+        if payment is None:
+            stats["verify.invalid"] += 1
+            return JSONResponse(
+                {"isValid": False, "invalidReason": error, "payer": None}, 400
+            )
+        reason = verify_payment(payment, requirements, config.verify_signatures)
+        payer = payment.payload.authorization.from_
+        stats["verify.valid" if reason is None else "verify.invalid"] += 1
+        return JSONResponse(
+            {"isValid": reason is None, "invalidReason": reason, "payer": payer}
+        )
+
+    @app.post("/settle")
+    async def settle(request: Request) -> Response:
+        fault = await inject_faults("settle")
+        if fault is not None:
+            return fault
+        payment, requirements, error = await read_request(request)
+        if payment is None:
+            stats["settle.failed"] += 1
+            return JSONResponse({"success": False, "errorReason": error}, 400)
+        payer = payment.payload.authorization.from_
+        reason = verify_payment(payment, requirements, config.verify_signatures)
+        nonce = payment.payload.authorization.nonce.lower()
+        if reason is None and nonce in settled_nonces:
+            reason = "invalid_transaction_state"
+        if reason is not None:
+            stats["settle.failed"] += 1
+            return JSONResponse(
+                {
+                    "success": False,
+                    "errorReason": reason,
+                    "network": payment.network,
+                    "payer": payer,
+                }
+            )
+        settled_nonces.add(nonce)
+        stats["settle.success"] += 1
+        return JSONResponse(
+            {
+                "success": True,
+                "transaction": f"0x{secrets.token_hex(32)}",
+                "network": payment.network,
+                "payer": payer,
+            }
+        )
+
+    @app.get("/stats")
+    async def get_stats() -> Dict[str, int]:
+        return dict(stats)
+
+    @app.post("/reset")
+    async def reset() -> Dict[str, int]:
+        stats.clear()
+        settled_nonces.clear()
+        return {}
+
+    return app
+
+
+class MockFacilitatorServer:
+    """Run the mock facilitator with uvicorn on a background thread.
+
+    Usage:
+        with MockFacilitatorServer(MockFacilitatorConfig(latency=...)) as server:
+            facilitator = FacilitatorClient({"url": server.url})
+
+    Args:
+        config: Mock facilitator behaviour
+        host: Interface to listen on
+        port: Port to listen on, 0 for a free one
+    """
+
+    def __init__(
+        self,
+        config: Optional[MockFacilitatorConfig] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind((host, port))
+        self.host, self.port = self._socket.getsockname()[:2]
+        self._server = uvicorn.Server(
+            uvicorn.Config(create_app(config), log_level="warning", lifespan="off")
+        )
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self, timeout: float = 10.0) -> "MockFacilitatorServer":
+        """Start serving and wait until the server accepts connections.
+
+        Raises:
+            RuntimeError: If the server does not start within timeout seconds
+        """
+        self._thread = threading.Thread(
+            target=self._server.run,
+            kwargs={"sockets": [self._socket]},
+            name="x402-mock-facilitator",
+            daemon=True,
+        )
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if not self._thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError("Mock facilitator failed to start")
+            time.sleep(0.01)
+        return self
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._socket.close()
+
+    def __enter__(self) -> "MockFacilitatorServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def _parse_args(argv: Optional[List[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m x402.testing.facilitator",
+        description="Run a local mock x402 facilitator for offline load testing.",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4020)
+    parser.add_argument(
+        "--latency",
+        type=Latency.parse,
+        default=Latency(),
+        help='latency of every call, e.g. "fixed:10", "uniform:5,20", '
+        '"normal:20,5", "lognormal:20,0.5" or "exponential:20" (ms)',
+    )
+    parser.add_argument(
+        "--settle-latency",
+        type=Latency.parse,
+        default=None,
+        help="latency of settle calls, replacing --latency",
+    )
+    parser.add_argument(
+        "--slow-settle",
+        action="store_true",
+        help="settle after 1-5s, like waiting for a block confirmation",
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-seconds", type=float, default=30.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--no-verify-signatures",
+        dest="verify_signatures",
+        action="store_false",
+        help="accept every well-formed payment without checking it",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = _parse_args(argv)
+    settle_latency = args.settle_latency
+    if settle_latency is None and args.slow_settle:
+        settle_latency = SLOW_SETTLE_LATENCY
+    config = MockFacilitatorConfig(
+        latency=args.latency,
+        settle_latency=settle_latency,
+        error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate,
+        timeout_seconds=args.timeout_seconds,
+        malformed_rate=args.malformed_rate,
+        verify_signatures=args.verify_signatures,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="info")
+
+
+if __name__ == "__main__":
+    main()
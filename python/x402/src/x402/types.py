@@ -5,7 +5,7 @@ from typing import Any, Optional, Union
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 from pydantic.alias_generators import to_camel
 
-from x402.networks import SupportedNetworks
+from x402.registry import get_registry
 
 
 class TokenAmount(BaseModel):
@@ -51,7 +51,7 @@ Price = Union[Money, TokenAmount]
 
 class PaymentRequirements(BaseModel):
     scheme: str
-    network: SupportedNetworks
+    network: str
     max_amount_required: str
     resource: str
     description: str
@@ -69,6 +69,12 @@ class PaymentRequirements(BaseModel):
         from_attributes=True,
     )
 
+    @field_validator("network")
+    def validate_network(cls, v):
+        if not get_registry().has_network(v):
+            raise ValueError(f"Unsupported network: {v}")
+        return v
+
     @field_validator("max_amount_required")
     def validate_max_amount_required(cls, v):
         try:
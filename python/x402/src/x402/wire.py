@@ -0,0 +1,334 @@
+import copy
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from x402.registry import get_registry
+from x402.types import (
+    EIP3009Authorization,
+    PaymentPayload,
+    PaymentRequirements,
+    SettleResponse,
+    VerifyResponse,
+)
+
+# Slotted, hand-validated counterparts of the pydantic protocol models, used by
+# the server middlewares on the per-request path. They read and write the
+# camelCase JSON form directly. The pydantic models in x402.types remain the
+# public API and from_model/to_model convert at the edges. to_model validates
+# from the JSON form, which pydantic-core does faster than model_construct.
+
+# JSON key, accepted types (empty for any) and whether the field is required, in
+# dataclass order
+_Fields = Tuple[Tuple[str, Tuple[type, ...], bool], ...]
+
+
+def _read(data: Any, fields: _Fields, name: str) -> List[Any]:
+    """Read and type check fields from decoded JSON in a single pass.
+
+    Types are matched exactly, so e.g. a bool is not accepted as an int.
+
+    Raises:
+        ValueError: If data is not an object or a field is missing or invalid
+    """
+    if not isinstance(data, Mapping):
+        raise ValueError(f"{name} must be an object")
+    values = []
+    for key, types, required in fields:
+        value = data.get(key)
+        if value is None:
+            if required:
+                raise ValueError(f"{key} is required")
+        elif types and type(value) not in types:
+            raise ValueError(f"{key} has an invalid type {type(value).__name__}")
+        values.append(value)
+    return values
+
+
+def _check_int_string(value: str, key: str) -> None:
+    try:
+        int(value)
+    except ValueError:
+        raise ValueError(f"{key} must be an integer encoded as a string")
+
+
+_STR = (str,)
+_INT = (int,)
+_BOOL = (bool,)
+_DICT = (dict,)
+_ANY = ()
+
+_REQUIREMENTS_FIELDS: _Fields = (
+    ("scheme", _STR, True),
+    ("network", _STR, True),
+    ("maxAmountRequired", _STR, True),
+    ("resource", _STR, True),
+    ("description", _STR, True),
+    ("mimeType", _STR, True),
+    ("payTo", _STR, True),
+    ("maxTimeoutSeconds", _INT, True),
+    ("asset", _STR, True),
+    ("outputSchema", _ANY, False),
+    ("extra", _DICT, False),
+)
+_AUTHORIZATION_FIELDS: _Fields = (
+    ("from", _STR, True),
+    ("to", _STR, True),
+    ("value", _STR, True),
+    ("validAfter", _STR, True),
+    ("validBefore", _STR, True),
+    ("nonce", _STR, True),
+)
+_PAYMENT_FIELDS: _Fields = (
+    ("x402Version", _INT, True),
+    ("scheme", _STR, True),
+    ("network", _STR, True),
+    ("payload", _DICT, True),
+)
+_EXACT_PAYLOAD_FIELDS: _Fields = (
+    ("signature", _STR, True),
+    ("authorization", _DICT, True),
+)
+_VERIFY_FIELDS: _Fields = (
+    ("isValid", _BOOL, True),
+    ("invalidReason", _STR, False),
+    ("payer", _STR, False),
+)
+_SETTLE_FIELDS: _Fields = (
+    ("success", _BOOL, True),
+    ("errorReason", _STR, False),
+    ("transaction", _STR, False),
+    ("network", _STR, False),
+    ("payer", _STR, False),
+)
+
+
+@dataclass(slots=True)
+class WirePaymentRequirements:
+    """Slotted counterpart of PaymentRequirements."""
+
+    scheme: str
+    network: str
+    max_amount_required: str
+    resource: str
+    description: str
+    mime_type: str
+    pay_to: str
+    max_timeout_seconds: int
+    asset: str
+    output_schema: Any = None
+    extra: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "WirePaymentRequirements":
+        """Validate camelCase JSON payment requirements.
+
+        Raises:
+            ValueError: If a field is missing or invalid
+        """
+        requirements = cls(*_read(data, _REQUIREMENTS_FIELDS, "payment requirements"))
+        if not get_registry().has_network(requirements.network):
+            raise ValueError(f"Unsupported network: {requirements.network}")
+        _check_int_string(requirements.max_amount_required, "maxAmountRequired")
+        return requirements
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the camelCase JSON form, as PaymentRequirements.model_dump(by_alias=True)."""
+        return {
+            "scheme": self.scheme,
+            "network": self.network,
+            "maxAmountRequired": self.max_amount_required,
+            "resource": self.resource,
+            "description": self.description,
+            "mimeType": self.mime_type,
+            "outputSchema": self.output_schema,
+            "payTo": self.pay_to,
+            "maxTimeoutSeconds": self.max_timeout_seconds,
+            "asset": self.asset,
+            "extra": self.extra,
+        }
+
+    @classmethod
+    def from_model(cls, model: PaymentRequirements) -> "WirePaymentRequirements":
+        """Convert a model, copying its extra and output_schema objects."""
+        return cls(
+            scheme=model.scheme,
+            network=model.network,
+            max_amount_required=model.max_amount_required,
+            resource=model.resource,
+            description=model.description,
+            mime_type=model.mime_type,
+            pay_to=model.pay_to,
+            max_timeout_seconds=model.max_timeout_seconds,
+            asset=model.asset,
+            output_schema=copy.deepcopy(model.output_schema),
+            extra=copy.deepcopy(model.extra),
+        )
+
+    def to_model(self) -> PaymentRequirements:
+        return PaymentRequirements.model_validate(self.to_dict())
+
+
+@dataclass(slots=True)
+class WireAuthorization:
+    """Slotted counterpart of EIP3009Authorization."""
+
+    from_: str
+    to: str
+    value: str
+    valid_after: str
+    valid_before: str
+    nonce: str
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "WireAuthorization":
+        """Validate a camelCase JSON authorization.
+
+        Raises:
+            ValueError: If a field is missing or invalid
+        """
+        authorization = cls(*_read(data, _AUTHORIZATION_FIELDS, "authorization"))
+        _check_int_string(authorization.value, "value")
+        return authorization
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "from": self.from_,
+            "to": self.to,
+            "value": self.value,
+            "validAfter": self.valid_after,
+            "validBefore": self.valid_before,
+            "nonce": self.nonce,
+        }
+
+    @classmethod
+    def from_model(cls, model: EIP3009Authorization) -> "WireAuthorization":
+        return cls(
+            from_=model.from_,
+            to=model.to,
+            value=model.value,
+            valid_after=model.valid_after,
+            valid_before=model.valid_before,
+            nonce=model.nonce,
+        )
+
+    def to_model(self) -> EIP3009Authorization:
+        return EIP3009Authorization.model_validate(self.to_dict())
+
+
+@dataclass(slots=True)
+class WirePaymentPayload:
+    """Slotted counterpart of PaymentPayload for the exact scheme.
+
+    The scheme payload is flattened into signature and authorization.
+    """
+
+    x402_version: int
+    scheme: str
+    network: str
+    signature: str
+    authorization: WireAuthorization
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "WirePaymentPayload":
+        """Validate a decoded X-PAYMENT header.
+
+        Raises:
+            ValueError: If a field is missing or invalid
+        """
+        x402_version, scheme, network, payload = _read(
+            data, _PAYMENT_FIELDS, "payment payload"
+        )
+        signature, authorization = _read(payload, _EXACT_PAYLOAD_FIELDS, "payload")
+        return cls(
+            x402_version,
+            scheme,
+            network,
+            signature,
+            WireAuthorization.from_dict(authorization),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the camelCase JSON form, as PaymentPayload.model_dump(by_alias=True)."""
+        return {
+            "x402Version": self.x402_version,
+            "scheme": self.scheme,
+            "network": self.network,
+            "payload": {
+                "signature": self.signature,
+                "authorization": self.authorization.to_dict(),
+            },
+        }
+
+    @classmethod
+    def from_model(cls, model: PaymentPayload) -> "WirePaymentPayload":
+        return cls(
+            x402_version=model.x402_version,
+            scheme=model.scheme,
+            network=model.network,
+            signature=model.payload.signature,
+            authorization=WireAuthorization.from_model(model.payload.authorization),
+        )
+
+    def to_model(self) -> PaymentPayload:
+        return PaymentPayload.model_validate(self.to_dict())
+
+
+@dataclass(slots=True)
+class WireVerifyResponse:
+    """Slotted counterpart of VerifyResponse."""
+
+    is_valid: bool
+    invalid_reason: Optional[str] = None
+    payer: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "WireVerifyResponse":
+        """Validate a facilitator /verify response.
+
+        Raises:
+            ValueError: If a field is missing or invalid
+        """
+        return cls(*_read(data, _VERIFY_FIELDS, "verify response"))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "isValid": self.is_valid,
+            "invalidReason": self.invalid_reason,
+            "payer": self.payer,
+        }
+
+    def to_model(self) -> VerifyResponse:
+        return VerifyResponse.model_validate(self.to_dict())
+
+
+@dataclass(slots=True)
+class WireSettleResponse:
+    """Slotted counterpart of SettleResponse."""
+
+    success: bool
+    error_reason: Optional[str] = None
+    transaction: Optional[str] = None
+    network: Optional[str] = None
+    payer: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "WireSettleResponse":
+        """Validate a facilitator /settle response.
+
+        Raises:
+            ValueError: If a field is missing or invalid
+        """
+        return cls(*_read(data, _SETTLE_FIELDS, "settle response"))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the camelCase JSON form, as SettleResponse.model_dump(by_alias=True)."""
+        return {
+            "success": self.success,
+            "errorReason": self.error_reason,
+            "transaction": self.transaction,
+            "network": self.network,
+            "payer": self.payer,
+        }
+
+    def to_model(self) -> SettleResponse:
+        return SettleResponse.model_validate(self.to_dict())
@@ -1,6 +1,9 @@
 import pytest
 import json
 import base64
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from eth_account import Account
 from x402.clients.base import (
     x402Client,
@@ -8,6 +11,8 @@ from x402.clients.base import (
     UnsupportedSchemeException,
     decode_x_payment_response,
 )
+from x402.clients.cache import PaymentRequirementsCache
+from x402.clients.presign import PresignedPaymentPool
 from x402.types import PaymentRequirements
 from x402.exact import decode_payment
 
@@ -192,3 +197,106 @@ def test_payment_requirements_sorting(client):
     # Test both networks are equal
     selected = client.select_payment_requirements([other_req, base_req])
     assert selected.network == "base-sepolia"
+
+
+def test_create_payment_headers(client, payment_requirements):
+    other_requirements = payment_requirements.model_copy(
+        update={"pay_to": "0x1111111111111111111111111111111111111111"}
+    )
+    bad_requirements = payment_requirements.model_copy(update={"extra": {}})
+
+    headers = client.create_payment_headers(
+        [payment_requirements, bad_requirements, other_requirements], 1
+    )
+
+    assert len(headers) == 3
+    assert isinstance(headers[1], KeyError)
+    first = decode_payment(headers[0])["payload"]["authorization"]
+    last = decode_payment(headers[2])["payload"]["authorization"]
+    assert first["to"] == payment_requirements.pay_to
+    assert last["to"] == other_requirements.pay_to
+    assert first["nonce"] != last["nonce"]
+
+
+async def test_acreate_payment_header_uses_executor(account, payment_requirements):
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        client = x402Client(account, signing_executor=executor)
+        main_thread = threading.get_ident()
+        signing_threads = []
+        create_payment_header = client.create_payment_header
+
+        def recording_create_payment_header(*args):
+            signing_threads.append(threading.get_ident())
+            return create_payment_header(*args)
+
+        client.create_payment_header = recording_create_payment_header
+        header = await client.acreate_payment_header(payment_requirements, 1)
+
+    assert signing_threads and signing_threads[0] != main_thread
+    decoded = decode_payment(header)
+    assert decoded["payload"]["authorization"]["from"] == account.address
+
+
+async def test_acreate_payment_header_uses_async_signer(account, payment_requirements):
+    calls = []
+
+    async def async_signer(requirements, x402_version):
+        calls.append((requirements, x402_version))
+        return "signed-elsewhere"
+
+    client = x402Client(account, async_signer=async_signer)
+    header = await client.acreate_payment_header(payment_requirements, 1)
+
+    assert header == "signed-elsewhere"
+    assert calls == [(payment_requirements, 1)]
+
+
+def test_select_payment_encoding(account):
+    client = x402Client(account)
+    assert client.select_payment_encoding({}) == "json"
+    assert client.select_payment_encoding({"X-PAYMENT-ENCODINGS": "json"}) == "json"
+    assert (
+        client.select_payment_encoding({"X-PAYMENT-ENCODINGS": "compact, json"})
+        == "compact"
+    )
+
+    client = x402Client(account, compact_payments=False)
+    assert (
+        client.select_payment_encoding({"X-PAYMENT-ENCODINGS": "compact, json"})
+        == "json"
+    )
+
+
+def test_create_payment_header_compact(account, payment_requirements):
+    pool = PresignedPaymentPool(size=1)
+    client = x402Client(account, presigned_pool=pool)
+    try:
+        header = client.create_payment_header(payment_requirements, 1, "compact")
+        assert header.startswith("c1.")
+
+        # Pooled headers are signed as JSON and converted on the way out
+        deadline = time.time() + 5
+        while pool.stats().pooled == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        header = client.create_payment_header(payment_requirements, 1, "compact")
+        assert pool.stats().hits == 1
+    finally:
+        pool.close()
+
+    assert header.startswith("c1.")
+    decoded = decode_payment(header)
+    assert decoded["payload"]["authorization"]["from"] == account.address
+
+
+def test_preemptive_payment_uses_cached_encoding(account, payment_requirements):
+    cache = PaymentRequirementsCache()
+    client = x402Client(account, requirements_cache=cache)
+    url = "https://example.com/paid"
+
+    cache.store("GET", url, 1, [payment_requirements], {})
+    assert not client.create_preemptive_payment_header("GET", url).startswith("c1.")
+
+    cache.store(
+        "GET", url, 1, [payment_requirements], {"X-PAYMENT-ENCODINGS": "compact, json"}
+    )
+    assert client.create_preemptive_payment_header("GET", url).startswith("c1.")
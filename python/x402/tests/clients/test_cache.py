@@ -0,0 +1,107 @@
+import pytest
+from x402.clients.cache import PaymentRequirementsCache
+from x402.types import PaymentRequirements
+
+
+@pytest.fixture
+def payment_requirements():
+    return PaymentRequirements(
+        scheme="exact",
+        network="base-sepolia",
+        asset="0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+        pay_to="0x0000000000000000000000000000000000000000",
+        max_amount_required="10000",
+        resource="https://example.com",
+        description="test",
+        max_timeout_seconds=1000,
+        mime_type="text/plain",
+        output_schema=None,
+        extra={
+            "name": "USD Coin",
+            "version": "2",
+        },
+    )
+
+
+def test_cache_key():
+    cache = PaymentRequirementsCache()
+    assert cache.key("get", "HTTPS://Example.com/items?id=1") == (
+        "GET",
+        "https://example.com",
+        "/items",
+    )
+    assert cache.key("GET", "https://example.com") == (
+        "GET",
+        "https://example.com",
+        "/",
+    )
+
+    # Path templates collapse different concrete paths into one entry
+    cache = PaymentRequirementsCache(
+        path_template=lambda path: "/items/{id}" if path.startswith("/items/") else path
+    )
+    assert cache.key("GET", "https://example.com/items/1") == cache.key(
+        "GET", "https://example.com/items/2"
+    )
+
+
+def test_cache_store_and_get(payment_requirements):
+    cache = PaymentRequirementsCache()
+    assert cache.get("GET", "https://example.com/paid") is None
+
+    cache.store("GET", "https://example.com/paid", 1, [payment_requirements])
+    cached = cache.get("GET", "https://example.com/paid?x=1")
+    assert cached.x402_version == 1
+    assert cached.accepts == [payment_requirements]
+
+    # Different method or path is a miss
+    assert cache.get("POST", "https://example.com/paid") is None
+    assert cache.get("GET", "https://example.com/other") is None
+
+    cache.invalidate("GET", "https://example.com/paid")
+    assert cache.get("GET", "https://example.com/paid") is None
+
+
+def test_cache_honors_cache_control(payment_requirements, monkeypatch):
+    cache = PaymentRequirementsCache(default_ttl=300)
+    url = "https://example.com/paid"
+
+    for cache_control in ("no-store", "no-cache", "max-age=0"):
+        cache.store(
+            "GET", url, 1, [payment_requirements], {"cache-control": cache_control}
+        )
+        assert cache.get("GET", url) is None
+
+    now = 1000.0
+    monkeypatch.setattr("x402.clients.cache.time.monotonic", lambda: now)
+    cache.store("GET", url, 1, [payment_requirements], {"cache-control": "max-age=10"})
+    assert cache.get("GET", url) is not None
+
+    now = 1011.0
+    assert cache.get("GET", url) is None
+    assert len(cache) == 0
+
+
+def test_cache_revalidates_etag(payment_requirements):
+    cache = PaymentRequirementsCache()
+    url = "https://example.com/paid"
+    cache.store("GET", url, 1, [payment_requirements], {"etag": '"v1"'})
+
+    assert cache.revalidate("GET", url, {}) is None
+    assert cache.revalidate("GET", url, {"etag": '"v2"'}) is None
+
+    cached = cache.revalidate("GET", url, {"etag": '"v1"'})
+    assert cached.accepts == [payment_requirements]
+    assert cached.etag == '"v1"'
+
+
+def test_cache_evicts_least_recently_used(payment_requirements):
+    cache = PaymentRequirementsCache(max_entries=2)
+    cache.store("GET", "https://example.com/a", 1, [payment_requirements])
+    cache.store("GET", "https://example.com/b", 1, [payment_requirements])
+    cache.get("GET", "https://example.com/a")
+    cache.store("GET", "https://example.com/c", 1, [payment_requirements])
+
+    assert cache.get("GET", "https://example.com/a") is not None
+    assert cache.get("GET", "https://example.com/b") is None
+    assert cache.get("GET", "https://example.com/c") is not None
@@ -2,12 +2,16 @@ import pytest
 import json
 import base64
 from unittest.mock import AsyncMock, MagicMock, patch
-from httpx import Request, Response
+from httpx import MockTransport, Request, Response
 from eth_account import Account
 from x402.clients.httpx import HttpxHooks, x402_payment_hooks, x402HttpxClient
 from x402.clients.base import (
     PaymentError,
+    x402Client,
 )
+from x402.clients.cache import PaymentRequirementsCache
+from x402.exact import decode_payment
+from x402.metrics import CLIENT_PHASES, InMemoryMetrics
 from x402.types import PaymentRequirements, x402PaymentRequiredResponse
 
 
@@ -134,7 +138,7 @@ async def test_on_response_payment_flow(hooks, payment_requirements):
             [payment_requirements]
         )
         hooks.client.create_payment_header.assert_called_once_with(
-            payment_requirements, 1
+            payment_requirements, 1, "json"
         )
 
 
@@ -237,3 +241,215 @@ def test_x402_httpx_client(account):
         hooks_instance.client.select_payment_requirements
         != hooks_instance.client.__class__.select_payment_requirements
     )
+
+
+async def test_on_response_retries_through_http_client(account, payment_requirements):
+    payment_response = x402PaymentRequiredResponse(
+        x402_version=1,
+        accepts=[payment_requirements],
+        error="Payment Required",
+    )
+    seen_requests = []
+
+    def handler(request):
+        seen_requests.append(dict(request.headers))
+        if "X-Payment" in request.headers:
+            return Response(200, json={"message": "paid"})
+        return Response(402, json=payment_response.model_dump(by_alias=True))
+
+    transport = MockTransport(handler)
+    async with x402HttpxClient(
+        account=account, transport=transport, base_url="https://example.com"
+    ) as client:
+        hooks_instance = client.event_hooks["response"][0].__self__
+        assert hooks_instance.http_client is client
+
+        with patch("x402.clients.httpx.AsyncClient") as mock_async_client:
+            response = await client.get("/paid")
+            mock_async_client.assert_not_called()
+
+    assert response.status_code == 200
+    assert response.json() == {"message": "paid"}
+    assert len(seen_requests) == 2
+    assert "x-payment" not in seen_requests[0]
+    assert "x-payment" in seen_requests[1]
+    assert not hooks_instance._is_retry
+
+
+async def test_on_response_retry_through_http_client_does_not_loop(
+    account, payment_requirements
+):
+    payment_response = x402PaymentRequiredResponse(
+        x402_version=1,
+        accepts=[payment_requirements],
+        error="Payment Required",
+    )
+    seen_requests = []
+
+    def handler(request):
+        seen_requests.append(request)
+        return Response(402, json=payment_response.model_dump(by_alias=True))
+
+    async with x402HttpxClient(
+        account=account, transport=MockTransport(handler)
+    ) as client:
+        response = await client.get("https://example.com/paid")
+
+    # The paid retry is sent once and its 402 is returned to the caller
+    assert response.status_code == 402
+    assert len(seen_requests) == 2
+
+
+async def test_requirements_cache_pays_on_first_attempt(account, payment_requirements):
+    payment_response = x402PaymentRequiredResponse(
+        x402_version=1,
+        accepts=[payment_requirements],
+        error="Payment Required",
+    )
+    seen_requests = []
+
+    def handler(request):
+        seen_requests.append(dict(request.headers))
+        if "X-Payment" in request.headers:
+            return Response(200, json={"message": "paid"})
+        return Response(402, json=payment_response.model_dump(by_alias=True))
+
+    cache = PaymentRequirementsCache()
+    async with x402HttpxClient(
+        account=account,
+        transport=MockTransport(handler),
+        requirements_cache=cache,
+    ) as client:
+        response = await client.get("https://example.com/paid")
+        assert response.status_code == 200
+        assert len(seen_requests) == 2
+
+        # Requirements are now known, so the next call is paid up front
+        response = await client.get("https://example.com/paid")
+        assert response.status_code == 200
+        assert len(seen_requests) == 3
+        assert "x-payment" in seen_requests[2]
+
+        # Signing failures on the preemptive path surface as PaymentError
+        with patch.object(
+            x402Client, "acreate_payment_header", side_effect=RuntimeError("boom")
+        ):
+            with pytest.raises(PaymentError, match="boom"):
+                await client.get("https://example.com/paid")
+        assert len(seen_requests) == 3
+
+
+async def test_requirements_cache_falls_back_on_mismatch(account, payment_requirements):
+    payment_response = x402PaymentRequiredResponse(
+        x402_version=1,
+        accepts=[payment_requirements],
+        error="Payment Required",
+    )
+    stale_requirements = payment_requirements.model_copy(
+        update={"pay_to": "0x1111111111111111111111111111111111111111"}
+    )
+    payments = []
+
+    def handler(request):
+        if "X-Payment" in request.headers:
+            payment = decode_payment(request.headers["X-Payment"])
+            payments.append(payment["payload"]["authorization"]["to"])
+            if payments[-1] == payment_requirements.pay_to:
+                return Response(200, json={"message": "paid"})
+        return Response(402, json=payment_response.model_dump(by_alias=True))
+
+    cache = PaymentRequirementsCache()
+    cache.store("GET", "https://example.com/paid", 1, [stale_requirements])
+    async with x402HttpxClient(
+        account=account,
+        transport=MockTransport(handler),
+        requirements_cache=cache,
+    ) as client:
+        response = await client.get("https://example.com/paid")
+
+    assert response.status_code == 200
+    assert payments == [stale_requirements.pay_to, payment_requirements.pay_to]
+    assert cache.get("GET", "https://example.com/paid").accepts == [
+        payment_requirements
+    ]
+
+
+async def test_on_response_sends_compact_payment(account, payment_requirements):
+    payment_response = x402PaymentRequiredResponse(
+        x402_version=1,
+        accepts=[payment_requirements],
+        error="Payment Required",
+    )
+    payment_headers = []
+
+    def handler(request):
+        if "X-Payment" in request.headers:
+            payment_headers.append(request.headers["X-Payment"])
+            return Response(200, json={"message": "paid"})
+        return Response(
+            402,
+            json=payment_response.model_dump(by_alias=True),
+            headers={"X-PAYMENT-ENCODINGS": "compact, json"},
+        )
+
+    async with x402HttpxClient(
+        account=account, transport=MockTransport(handler)
+    ) as client:
+        response = await client.get("https://example.com/paid")
+
+    assert response.status_code == 200
+    assert payment_headers[0].startswith("c1.")
+    payment = decode_payment(payment_headers[0])
+    assert payment["payload"]["authorization"]["from"] == account.address
+
+
+async def test_metrics_time_payment_phases(account, payment_requirements):
+    payment_response = x402PaymentRequiredResponse(
+        x402_version=1,
+        accepts=[payment_requirements],
+        error="Payment Required",
+    )
+
+    def handler(request):
+        if "X-Payment" in request.headers:
+            return Response(200, json={"message": "paid"})
+        return Response(402, json=payment_response.model_dump(by_alias=True))
+
+    metrics = InMemoryMetrics()
+    async with x402HttpxClient(
+        account=account, transport=MockTransport(handler), metrics=metrics
+    ) as client:
+        assert (await client.get("https://example.com/paid")).status_code == 200
+
+    for phase in CLIENT_PHASES:
+        assert metrics.histogram("client", phase).count == 1
+    assert metrics.counter("client", "paid") == 1
+
+
+async def test_metrics_time_preemptive_payments(account, payment_requirements):
+    payment_response = x402PaymentRequiredResponse(
+        x402_version=1,
+        accepts=[payment_requirements],
+        error="Payment Required",
+    )
+
+    def handler(request):
+        if "X-Payment" in request.headers:
+            return Response(200, json={"message": "paid"})
+        return Response(402, json=payment_response.model_dump(by_alias=True))
+
+    metrics = InMemoryMetrics()
+    async with x402HttpxClient(
+        account=account,
+        transport=MockTransport(handler),
+        requirements_cache=PaymentRequirementsCache(),
+        metrics=metrics,
+    ) as client:
+        assert (await client.get("https://example.com/paid")).status_code == 200
+        assert (await client.get("https://example.com/paid")).status_code == 200
+
+    assert metrics.counter("client", "paid") == 1
+    assert metrics.counter("client", "preemptive_paid") == 1
+    assert metrics.histogram("client", "payment_required").count == 1
+    assert metrics.histogram("client", "sign").count == 2
+    assert metrics.histogram("client", "paid_request").count == 2
@@ -0,0 +1,119 @@
+import time
+
+import pytest
+from eth_account import Account
+from x402.clients.base import x402Client
+from x402.clients.presign import PresignedPaymentPool
+from x402.exact import decode_payment
+from x402.types import PaymentRequirements
+
+
+@pytest.fixture
+def account():
+    return Account.create()
+
+
+@pytest.fixture
+def payment_requirements():
+    return PaymentRequirements(
+        scheme="exact",
+        network="base-sepolia",
+        asset="0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+        pay_to="0x0000000000000000000000000000000000000000",
+        max_amount_required="10000",
+        resource="https://example.com",
+        description="test",
+        max_timeout_seconds=1000,
+        mime_type="text/plain",
+        output_schema=None,
+        extra={
+            "name": "USD Coin",
+            "version": "2",
+        },
+    )
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for condition"
+        time.sleep(0.01)
+
+
+def test_pool_serves_presigned_headers(account, payment_requirements):
+    pool = PresignedPaymentPool(size=3)
+    client = x402Client(account, presigned_pool=pool)
+    try:
+        # The first payment is signed inline and makes the requirements hot
+        first = client.create_payment_header(payment_requirements, 1)
+        assert pool.stats().misses == 1
+        wait_for(lambda: pool.stats().pooled == 3)
+
+        headers = [
+            client.create_payment_header(payment_requirements, 1) for _ in range(3)
+        ]
+        stats = pool.stats()
+        assert stats.hits == 3
+        assert stats.hit_rate == 0.75
+
+        nonces = {
+            decode_payment(header)["payload"]["authorization"]["nonce"]
+            for header in [first, *headers]
+        }
+        assert len(nonces) == 4
+        for header in headers:
+            auth = decode_payment(header)["payload"]["authorization"]
+            assert auth["from"] == account.address
+            assert auth["to"] == payment_requirements.pay_to
+            assert int(auth["validBefore"]) > time.time() + pool.min_validity_seconds
+    finally:
+        pool.close()
+
+
+def test_pool_keys_on_signed_fields(payment_requirements):
+    key = PresignedPaymentPool.key(payment_requirements, 1)
+    other_resource = payment_requirements.model_copy(
+        update={"resource": "https://x.com"}
+    )
+    assert PresignedPaymentPool.key(other_resource, 1) == key
+
+    other_amount = payment_requirements.model_copy(update={"max_amount_required": "1"})
+    assert PresignedPaymentPool.key(other_amount, 1) != key
+    assert PresignedPaymentPool.key(payment_requirements, 2) != key
+
+
+def test_pool_evicts_headers_close_to_expiry(payment_requirements, monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr("x402.clients.presign.time.time", lambda: now[0])
+    pool = PresignedPaymentPool(size=2, min_validity_seconds=15)
+    pool.bind(lambda requirements, version: "header")
+    try:
+        assert pool.pop(payment_requirements, 1) is None
+        wait_for(lambda: pool.stats().pooled == 2)
+
+        # Less than min_validity_seconds left before validBefore
+        now[0] += payment_requirements.max_timeout_seconds - 10
+        assert pool.pop(payment_requirements, 1) is None
+        stats = pool.stats()
+        assert stats.expired == 2
+        assert stats.expiry_waste == 1.0
+    finally:
+        pool.close()
+
+
+def test_pool_skips_short_lived_requirements(payment_requirements):
+    pool = PresignedPaymentPool(min_validity_seconds=15)
+    pool.bind(lambda requirements, version: "header")
+    short_lived = payment_requirements.model_copy(update={"max_timeout_seconds": 10})
+    try:
+        assert pool.pop(short_lived, 1) is None
+        assert pool._worker is None
+    finally:
+        pool.close()
+
+
+def test_pool_can_only_bind_one_client(account):
+    pool = PresignedPaymentPool()
+    x402Client(account, presigned_pool=pool)
+    with pytest.raises(ValueError):
+        x402Client(account, presigned_pool=pool)
@@ -0,0 +1,229 @@
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from eth_account import Account
+from x402.clients.base import Signer, x402Client
+from x402.clients.remote_signer import (
+    RemoteSignerError,
+    SigningDaemon,
+    UnixSocketSigner,
+)
+from x402.exact import decode_payment, recover_authorization_signer
+from x402.types import PaymentRequirements
+
+
+@pytest.fixture
+def account():
+    return Account.create()
+
+
+@pytest.fixture
+def payment_requirements():
+    return PaymentRequirements(
+        scheme="exact",
+        network="base-sepolia",
+        asset="0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+        pay_to="0x0000000000000000000000000000000000000000",
+        max_amount_required="10000",
+        resource="https://example.com",
+        description="test",
+        max_timeout_seconds=1000,
+        mime_type="text/plain",
+        output_schema=None,
+        extra={
+            "name": "USD Coin",
+            "version": "2",
+        },
+    )
+
+
+@pytest.fixture
+def daemon(tmp_path, account):
+    daemon = SigningDaemon(str(tmp_path / "signer.sock"), account)
+    daemon.start()
+    yield daemon
+    daemon.close()
+
+
+@pytest.fixture
+def signer(daemon):
+    signer = UnixSocketSigner(daemon.path, max_batch=16)
+    yield signer
+    signer.close()
+
+
+def test_signer_signs_digests(signer, account):
+    assert isinstance(signer, Signer)
+    assert signer.address == account.address
+
+    digest = secrets.token_bytes(32)
+    assert signer.sign_hash(digest) == account.unsafe_sign_hash(digest).signature
+
+    with pytest.raises(ValueError):
+        signer.sign_hash(b"\x00" * 31)
+
+
+def test_client_pays_with_remote_signer(signer, account, payment_requirements):
+    client = x402Client(signer)
+    header = client.create_payment_header(payment_requirements, 1)
+
+    payload = decode_payment(header)["payload"]
+    assert payload["authorization"]["from"] == account.address
+    signer_address = recover_authorization_signer(
+        payment_requirements, payload["authorization"], payload["signature"]
+    )
+    assert signer_address == account.address
+
+
+def test_signer_batches_concurrent_requests(signer, account):
+    digests = [secrets.token_bytes(32) for _ in range(200)]
+    futures = [signer.sign_hash_future(digest) for digest in digests]
+    signatures = [future.result(5) for future in futures]
+
+    assert signatures == [account.unsafe_sign_hash(d).signature for d in digests]
+
+    stats = signer.stats()
+    assert stats.requests == 200
+    assert stats.batches < 200
+    assert stats.mean_batch_size > 1
+    assert stats.queue_depth == 0
+    assert stats.in_flight == 0
+    assert 0 < stats.latency_p50 <= stats.latency_p99
+
+
+def test_signer_from_many_threads(signer, account):
+    digests = [secrets.token_bytes(32) for _ in range(64)]
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        signatures = list(executor.map(signer.sign_hash, digests))
+    assert signatures == [account.unsafe_sign_hash(d).signature for d in digests]
+
+
+def test_signer_errors(daemon, tmp_path):
+    with pytest.raises(RemoteSignerError):
+        UnixSocketSigner(str(tmp_path / "missing.sock"))
+
+    signer = UnixSocketSigner(daemon.path)
+    signer.sign_hash(secrets.token_bytes(32))
+    signer.close()
+    with pytest.raises(RemoteSignerError):
+        signer.sign_hash(secrets.token_bytes(32))
+
+
+def test_daemon_reports_errors(daemon):
+    assert daemon.handle_request({"id": 1, "method": "unknown"})["error"]
+    assert daemon.handle_request({"id": 2, "method": "sign", "digests": ["zz"]})[
+        "error"
+    ]
+
+
+class StalledDaemon(SigningDaemon):
+    """Daemon that holds sign requests until released."""
+
+    def __init__(self, path, account):
+        super().__init__(path, account)
+        self.release = threading.Event()
+
+    def handle_request(self, request):
+        if request.get("method") == "sign":
+            self.release.wait(5)
+        return super().handle_request(request)
+
+
+class ShortDaemon(SigningDaemon):
+    """Daemon that drops the last signature of every batch."""
+
+    def handle_request(self, request):
+        response = super().handle_request(request)
+        if "signatures" in response:
+            response["signatures"] = response["signatures"][:-1]
+        return response
+
+
+class OddDaemon(SigningDaemon):
+    """Daemon answering sign requests with a well-formed but unexpected line."""
+
+    def __init__(self, path, account, answer):
+        super().__init__(path, account)
+        self.answer = answer
+
+    def handle_request(self, request):
+        if request.get("method") == "sign":
+            return self.answer(request)
+        return super().handle_request(request)
+
+
+@pytest.mark.parametrize(
+    "answer",
+    [
+        lambda request: [request["id"]],
+        lambda request: None,
+        lambda request: 7,
+        lambda request: {"id": [request["id"]]},
+        lambda request: {"id": request["id"], "signatures": [7]},
+    ],
+)
+def test_signer_fails_on_unexpected_responses(tmp_path, answer):
+    daemon = OddDaemon(str(tmp_path / "odd.sock"), Account.create(), answer)
+    daemon.start()
+    signer = UnixSocketSigner(daemon.path, timeout=5)
+    try:
+        for _ in range(2):
+            # Fails at once instead of waiting for the timeout, also after
+            # reconnecting
+            start = time.monotonic()
+            with pytest.raises(RemoteSignerError, match="connection failed"):
+                signer.sign_hash(secrets.token_bytes(32))
+            assert time.monotonic() - start < 2
+        assert signer.stats().in_flight == 0
+    finally:
+        signer.close()
+        daemon.close()
+
+
+def test_signer_timeout(tmp_path, account):
+    daemon = StalledDaemon(str(tmp_path / "stalled.sock"), account)
+    daemon.start()
+    signer = UnixSocketSigner(daemon.path, timeout=0.2)
+    try:
+        with pytest.raises(RemoteSignerError, match="did not answer"):
+            signer.sign_hash(secrets.token_bytes(32))
+        stats = signer.stats()
+        assert stats.in_flight == 0
+        assert stats.errors == 1
+
+        # The late answer is dropped and the connection stays usable
+        daemon.release.set()
+        digest = secrets.token_bytes(32)
+        assert signer.sign_hash(digest) == account.unsafe_sign_hash(digest).signature
+    finally:
+        daemon.release.set()
+        signer.close()
+        daemon.close()
+
+
+def test_signer_rejects_missing_signatures(tmp_path):
+    daemon = ShortDaemon(str(tmp_path / "short.sock"), Account.create())
+    daemon.start()
+    signer = UnixSocketSigner(daemon.path, timeout=5)
+    try:
+        futures = [signer.sign_hash_future(secrets.token_bytes(32)) for _ in range(8)]
+        for future in futures:
+            with pytest.raises(RemoteSignerError, match="signatures for"):
+                future.result(5)
+        assert signer.stats().in_flight == 0
+    finally:
+        signer.close()
+        daemon.close()
+
+
+def test_signer_unreachable_after_start(daemon):
+    signer = UnixSocketSigner(daemon.path, timeout=5)
+    daemon.close()
+    try:
+        with pytest.raises(RemoteSignerError):
+            signer.sign_hash(secrets.token_bytes(32))
+    finally:
+        signer.close()
@@ -12,6 +12,8 @@ from x402.clients.requests import (
 from x402.clients.base import (
     PaymentError,
 )
+from x402.clients.cache import PaymentRequirementsCache
+from x402.metrics import CLIENT_PHASES, InMemoryMetrics
 from x402.types import PaymentRequirements, x402PaymentRequiredResponse
 
 
@@ -192,7 +194,7 @@ def test_adapter_payment_flow(adapter, payment_requirements):
             [payment_requirements]
         )
         adapter.client.create_payment_header.assert_called_once_with(
-            payment_requirements, 1
+            payment_requirements, 1, "json"
         )
 
         # Verify the retry request was made with correct headers
@@ -308,3 +310,113 @@ def test_x402_requests(account):
         adapter.client.select_payment_requirements
         != adapter.client.__class__.select_payment_requirements
     )
+
+
+def test_adapter_requirements_cache(account, payment_requirements):
+    payment_response = x402PaymentRequiredResponse(
+        x402_version=1,
+        accepts=[payment_requirements],
+        error="Payment Required",
+    )
+    cache = PaymentRequirementsCache()
+    adapter = x402_http_adapter(account, requirements_cache=cache)
+    sent_headers = []
+
+    def mock_send_impl(req, **kwargs):
+        sent_headers.append(dict(req.headers))
+        response = Response()
+        if "X-Payment" in req.headers:
+            response.status_code = 200
+            response._content = b"success"
+        else:
+            response.status_code = 402
+            response._content = json.dumps(
+                payment_response.model_dump(by_alias=True)
+            ).encode()
+        return response
+
+    with patch("requests.adapters.HTTPAdapter.send", side_effect=mock_send_impl):
+        request = PreparedRequest()
+        request.prepare("GET", "https://example.com/paid")
+        assert adapter.send(request).status_code == 200
+        assert len(sent_headers) == 2
+
+        # The second call is paid on the first attempt
+        request = PreparedRequest()
+        request.prepare("GET", "https://example.com/paid")
+        assert adapter.send(request).status_code == 200
+        assert len(sent_headers) == 3
+        assert "X-Payment" in sent_headers[2]
+
+        # Signing failures on the preemptive path surface as PaymentError
+        with patch.object(
+            adapter.client, "create_payment_header", side_effect=RuntimeError("boom")
+        ):
+            request = PreparedRequest()
+            request.prepare("GET", "https://example.com/paid")
+            with pytest.raises(PaymentError, match="boom"):
+                adapter.send(request)
+        assert len(sent_headers) == 3
+
+
+def test_adapter_metrics(account, payment_requirements):
+    payment_response = x402PaymentRequiredResponse(
+        x402_version=1,
+        accepts=[payment_requirements],
+        error="Payment Required",
+    )
+    metrics = InMemoryMetrics()
+    adapter = x402_http_adapter(account, metrics=metrics)
+
+    def mock_send_impl(req, **kwargs):
+        response = Response()
+        response.status_code = 402
+        response._content = json.dumps(
+            payment_response.model_dump(by_alias=True)
+        ).encode()
+        return response
+
+    with patch("requests.adapters.HTTPAdapter.send", side_effect=mock_send_impl):
+        request = PreparedRequest()
+        request.prepare("GET", "https://example.com/paid")
+        assert adapter.send(request).status_code == 402
+
+    for phase in CLIENT_PHASES:
+        assert metrics.histogram("client", phase).count == 1
+    assert metrics.counter("client", "rejected") == 1
+
+
+def test_adapter_metrics_preemptive_payment(account, payment_requirements):
+    payment_response = x402PaymentRequiredResponse(
+        x402_version=1,
+        accepts=[payment_requirements],
+        error="Payment Required",
+    )
+    metrics = InMemoryMetrics()
+    adapter = x402_http_adapter(
+        account, requirements_cache=PaymentRequirementsCache(), metrics=metrics
+    )
+
+    def mock_send_impl(req, **kwargs):
+        response = Response()
+        if "X-Payment" in req.headers:
+            response.status_code = 200
+            response._content = b"success"
+        else:
+            response.status_code = 402
+            response._content = json.dumps(
+                payment_response.model_dump(by_alias=True)
+            ).encode()
+        return response
+
+    with patch("requests.adapters.HTTPAdapter.send", side_effect=mock_send_impl):
+        for _ in range(2):
+            request = PreparedRequest()
+            request.prepare("GET", "https://example.com/paid")
+            assert adapter.send(request).status_code == 200
+
+    assert metrics.counter("client", "paid") == 1
+    assert metrics.counter("client", "preemptive_paid") == 1
+    assert metrics.histogram("client", "payment_required").count == 1
+    assert metrics.histogram("client", "sign").count == 2
+    assert metrics.histogram("client", "paid_request").count == 2
@@ -0,0 +1,172 @@
+import pytest
+from eth_account import Account
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+from x402.clients.base import decode_x_payment_response, x402Client
+from x402.events import EventBus
+from x402.facilitator import FacilitatorClient
+from x402.fastapi.dependencies import PaidRoute, paid
+from x402.metrics import SERVER_PHASES, InMemoryMetrics
+from x402.types import PaymentRequirements, VerifyResponse
+
+PAY_TO = "0x1111111111111111111111111111111111111111"
+
+
+@pytest.fixture
+def facilitator(monkeypatch):
+    calls = []
+    settle_result = {"success": True, "transaction": "0x12", "network": "base-sepolia"}
+
+    async def post(self, endpoint, payment, payment_requirements):
+        calls.append(endpoint)
+        if endpoint == "verify":
+            return {"isValid": True, "payer": payment.authorization.from_}
+        return settle_result
+
+    monkeypatch.setattr(FacilitatorClient, "_post", post)
+    return calls, settle_result
+
+
+def create_router(**options):
+    router = APIRouter(route_class=PaidRoute)
+
+    @router.get("/weather", dependencies=[Depends(paid("$0.01", PAY_TO, **options))])
+    async def weather(request: Request):
+        assert isinstance(request.state.payment_details, PaymentRequirements)
+        return {"payer": request.state.verify_response.payer}
+
+    @router.get("/forecast/{day}")
+    async def forecast(
+        day: int, verified: VerifyResponse = Depends(paid("$0.05", PAY_TO))
+    ):
+        if day > 7:
+            raise HTTPException(404)
+        return {"day": day, "payer": verified.payer}
+
+    @router.get("/free")
+    async def free():
+        return {"free": True}
+
+    return router
+
+
+def create_app(**options):
+    app = FastAPI()
+    app.include_router(create_router(**options))
+    return app
+
+
+def pay(client, path, account):
+    response = client.get(path)
+    assert response.status_code == 402
+    requirements = PaymentRequirements(**response.json()["accepts"][0])
+    header = x402Client(account).create_payment_header(requirements, 1)
+    return client.get(path, headers={"X-PAYMENT": header})
+
+
+def test_paid_route(facilitator):
+    calls, _ = facilitator
+    account = Account.create()
+    client = TestClient(create_app())
+
+    response = client.get("/weather")
+    assert response.status_code == 402
+    body = response.json()
+    assert body["error"] == "No X-PAYMENT header provided"
+    assert body["accepts"][0]["resource"] == "http://testserver/weather"
+    assert body["accepts"][0]["maxAmountRequired"] == "10000"
+
+    response = pay(client, "/weather", account)
+    assert response.status_code == 200
+    assert response.json() == {"payer": account.address}
+    assert calls == ["verify", "settle"]
+    settlement = decode_x_payment_response(response.headers["X-PAYMENT-RESPONSE"])
+    assert settlement["transaction"] == "0x12"
+
+    response = pay(client, "/forecast/1", account)
+    assert response.json() == {"day": 1, "payer": account.address}
+
+
+def test_unpaid_routes_untouched(facilitator):
+    router = create_router()
+    app = FastAPI()
+    app.include_router(router)
+    assert TestClient(app).get("/free").json() == {"free": True}
+    free = next(route for route in router.routes if route.path == "/free")
+    assert free.payment_dependency is None
+    assert facilitator[0] == []
+
+
+def test_rejected_payments(facilitator):
+    calls, settle_result = facilitator
+    account = Account.create()
+    client = TestClient(create_app())
+
+    response = client.get("/weather", headers={"X-PAYMENT": "not base64"})
+    assert response.status_code == 402
+    assert response.json()["error"].startswith("Invalid payment header format")
+
+    # Failed handlers do not settle
+    response = pay(client, "/forecast/9", account)
+    assert response.status_code == 404
+    assert calls == ["verify"]
+
+    settle_result.update(success=False, errorReason="insufficient_funds")
+    response = pay(client, "/weather", account)
+    assert response.status_code == 402
+    assert response.json()["error"] == "Settle failed: insufficient_funds"
+
+
+def test_metrics_events_and_server_timing(facilitator):
+    metrics = InMemoryMetrics()
+    events = EventBus()
+    received = []
+    events.subscribe(received.append)
+    client = TestClient(create_app(metrics=metrics, events=events, server_timing=True))
+
+    response = pay(client, "/weather", Account.create())
+    phases = [
+        entry.split(";")[0] for entry in response.headers["Server-Timing"].split(", ")
+    ]
+    assert phases == [f"x402-{phase}" for phase in SERVER_PHASES]
+    assert metrics.counter("server", "payment_required") == 1
+    assert metrics.counter("server", "settled") == 1
+    assert events.flush(timeout=5)
+    assert [event.type for event in received] == [
+        "payment_required",
+        "verified",
+        "settled",
+    ]
+    events.close()
+
+
+def test_openapi_advertises_accepts():
+    schema = TestClient(create_app()).get("/openapi.json").json()
+    operation = schema["paths"]["/weather"]["get"]
+    assert operation["x-x402-accepts"][0]["maxAmountRequired"] == "10000"
+    assert operation["x-x402-accepts"][0]["payTo"] == PAY_TO
+    example = operation["responses"]["402"]["content"]["application/json"]["example"]
+    assert example["accepts"] == operation["x-x402-accepts"]
+    assert {"name": "X-PAYMENT", "in": "header"}.items() <= operation["parameters"][
+        0
+    ].items()
+    forecast = schema["paths"]["/forecast/{day}"]["get"]
+    assert forecast["x-x402-accepts"][0]["maxAmountRequired"] == "50000"
+    assert "402" not in schema["paths"]["/free"]["get"]["responses"]
+
+
+def test_requires_paid_route():
+    app = FastAPI()
+
+    @app.get("/weather", dependencies=[Depends(paid("$0.01", PAY_TO))])
+    async def weather():
+        return {}
+
+    with pytest.raises(RuntimeError, match="PaidRoute"):
+        TestClient(app).get("/weather")
+
+    router = APIRouter(
+        route_class=PaidRoute, dependencies=[Depends(paid("$1", PAY_TO))]
+    )
+    with pytest.raises(ValueError, match="more than one"):
+        router.get("/twice", dependencies=[Depends(paid("$2", PAY_TO))])(weather)
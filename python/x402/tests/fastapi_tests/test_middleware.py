@@ -1,6 +1,16 @@
-from fastapi import FastAPI, Request
+from eth_account import Account
+from fastapi import FastAPI, Request, Response
 from fastapi.testclient import TestClient
+from x402.aggregates import PaymentAggregates
+from x402.clients.base import decode_x_payment_response, x402Client
+from x402.events import EventBus
+from x402.exact import decode_payment
+from x402.facilitator import FacilitatorClient
+from x402.fastapi.aggregates import aggregates_endpoint
 from x402.fastapi.middleware import require_payment
+from x402.metrics import SERVER_PHASES, InMemoryMetrics
+from x402.sharedcache import PaymentCache
+from x402.types import PaymentRequirements, VerifyResponse
 
 
 async def test_endpoint():
@@ -25,6 +35,46 @@ def test_middleware_invalid_payment():
     assert response.status_code == 402
     assert "accepts" in response.json()
     assert "Invalid payment header format:" in response.json()["error"]
+    assert response.headers["X-PAYMENT-ENCODINGS"] == "compact, json"
+
+    response = client.get("/test", headers={"X-PAYMENT": "c1.invalid"})
+    assert response.status_code == 402
+    assert "Invalid compact payment" in response.json()["error"]
+
+
+def test_middleware_payment_required_resource():
+    app_with_middleware = FastAPI()
+    app_with_middleware.get("/test")(test_endpoint)
+    app_with_middleware.get("/fixed")(test_endpoint)
+    app_with_middleware.middleware("http")(
+        require_payment(
+            price="$1.00",
+            pay_to_address="0x1111111111111111111111111111111111111111",
+            path="/test",
+            network="base-sepolia",
+        )
+    )
+    app_with_middleware.middleware("http")(
+        require_payment(
+            price="$1.00",
+            pay_to_address="0x1111111111111111111111111111111111111111",
+            path="/fixed",
+            network="base-sepolia",
+            resource="https://api.example.com/fixed",
+        )
+    )
+
+    client = TestClient(app_with_middleware)
+    response = client.get("/test?city=paris")
+    assert response.status_code == 402
+    assert response.headers["content-type"] == "application/json"
+    accept = response.json()["accepts"][0]
+    assert accept["resource"] == "http://testserver/test?city=paris"
+    assert accept["maxAmountRequired"] == "1000000"
+
+    response = client.get("/fixed?city=paris")
+    assert response.status_code == 402
+    assert response.json()["accepts"][0]["resource"] == "https://api.example.com/fixed"
 
 
 def test_app_middleware_path_matching():
@@ -141,6 +191,17 @@ def test_path_matching():
     assert not path_is_match(["/exact", "/api/*", "regex:^/users/\\d+$"], "/other")
 
 
+def test_compile_path():
+    from x402.path import compile_path, path_is_match
+
+    patterns = ["/exact", "/api/*", "regex:^/users/\\d+$"]
+    match = compile_path(patterns)
+    for request_path in ("/exact", "/api/posts", "/users/123", "/other", "/exact/"):
+        assert match(request_path) == path_is_match(patterns, request_path)
+    assert compile_path("/api/*/profile")("/api/user/profile")
+    assert not compile_path("/test")("/test/123")
+
+
 def test_abusive_url_paths():
     """Test various abusive and edge-case URL paths that could bypass security"""
     from x402.path import path_is_match
@@ -314,3 +375,251 @@ def test_abusive_url_paths():
             assert path_is_match(regex_pattern, "/api/anything")
             assert path_is_match(regex_pattern, "/admin/panel")
             assert not path_is_match(regex_pattern, "/other/path")
+
+
+def test_middleware_paid_request(monkeypatch):
+    account = Account.create()
+    calls = []
+
+    async def post(self, endpoint, payment, payment_requirements):
+        calls.append((endpoint, payment.to_dict(), payment_requirements.to_dict()))
+        if endpoint == "verify":
+            return {"isValid": True, "payer": account.address}
+        return {"success": True, "transaction": "0x12", "network": "base-sepolia"}
+
+    monkeypatch.setattr(FacilitatorClient, "_post", post)
+
+    app = FastAPI()
+
+    @app.get("/test")
+    async def paid_endpoint(request: Request):
+        assert isinstance(request.state.payment_details, PaymentRequirements)
+        assert isinstance(request.state.verify_response, VerifyResponse)
+        return {"payer": request.state.verify_response.payer}
+
+    app.middleware("http")(
+        require_payment(
+            price="$0.01",
+            pay_to_address="0x1111111111111111111111111111111111111111",
+            network="base-sepolia",
+        )
+    )
+    client = TestClient(app)
+
+    response = client.get("/test")
+    assert response.status_code == 402
+    requirements = response.json()["accepts"][0]
+
+    payment_header = x402Client(account).create_payment_header(
+        PaymentRequirements(**requirements), 1
+    )
+    response = client.get("/test", headers={"X-PAYMENT": payment_header})
+
+    assert response.status_code == 200
+    assert response.json() == {"payer": account.address}
+    assert [endpoint for endpoint, _, _ in calls] == ["verify", "settle"]
+    assert calls[0][1] == decode_payment(payment_header)
+    assert calls[0][2] == requirements
+    assert decode_x_payment_response(response.headers["X-PAYMENT-RESPONSE"]) == {
+        "success": True,
+        "errorReason": None,
+        "transaction": "0x12",
+        "network": "base-sepolia",
+        "payer": None,
+    }
+
+
+def test_middleware_metrics_and_server_timing(monkeypatch):
+    account = Account.create()
+
+    async def post(self, endpoint, payment, payment_requirements):
+        if endpoint == "verify":
+            return {"isValid": True, "payer": account.address}
+        return {"success": True, "transaction": "0x12", "network": "base-sepolia"}
+
+    monkeypatch.setattr(FacilitatorClient, "_post", post)
+
+    metrics = InMemoryMetrics()
+    app = FastAPI()
+    app.get("/test")(test_endpoint)
+    app.middleware("http")(
+        require_payment(
+            price="$0.01",
+            pay_to_address="0x1111111111111111111111111111111111111111",
+            network="base-sepolia",
+            metrics=metrics,
+            server_timing=True,
+        )
+    )
+    client = TestClient(app)
+
+    response = client.get("/test")
+    assert response.status_code == 402
+    assert response.headers["Server-Timing"].startswith("x402-match;dur=")
+
+    requirements = PaymentRequirements(**response.json()["accepts"][0])
+    payment_header = x402Client(account).create_payment_header(requirements, 1)
+    response = client.get("/test", headers={"X-PAYMENT": payment_header})
+    assert response.status_code == 200
+    phases = [
+        entry.split(";")[0] for entry in response.headers["Server-Timing"].split(", ")
+    ]
+    assert phases == [f"x402-{phase}" for phase in SERVER_PHASES]
+
+    assert metrics.counter("server", "payment_required") == 1
+    assert metrics.counter("server", "settled") == 1
+    assert metrics.histogram("server", "match").count == 2
+    assert metrics.histogram("server", "settle").count == 1
+
+
+def test_middleware_emits_events(monkeypatch, caplog):
+    account = Account.create()
+
+    async def post(self, endpoint, payment, payment_requirements):
+        if endpoint == "verify":
+            return {"isValid": True, "payer": account.address}
+        raise RuntimeError("facilitator unavailable")
+
+    monkeypatch.setattr(FacilitatorClient, "_post", post)
+
+    events = EventBus()
+    received = []
+    events.subscribe(received.append)
+    app = FastAPI()
+    app.get("/test")(test_endpoint)
+    app.middleware("http")(
+        require_payment(
+            price="$0.01",
+            pay_to_address="0x1111111111111111111111111111111111111111",
+            network="base-sepolia",
+            events=events,
+        )
+    )
+    client = TestClient(app)
+
+    response = client.get("/test")
+    requirements = PaymentRequirements(**response.json()["accepts"][0])
+    payment_header = x402Client(account).create_payment_header(requirements, 1)
+    response = client.get("/test", headers={"X-PAYMENT": payment_header})
+    assert response.status_code == 402
+    assert response.json()["error"] == "Settle failed"
+    assert "Settle failed" in caplog.text
+
+    assert events.flush(timeout=5)
+    assert [event.type for event in received] == [
+        "payment_required",
+        "verified",
+        "settle_failed",
+    ]
+    assert received[1].payer == account.address
+    assert received[1].requirements.max_amount_required == "10000"
+    assert received[2].error == "facilitator unavailable"
+    events.close()
+
+
+def test_aggregates_endpoint():
+    aggregates = PaymentAggregates()
+    aggregates.add("/test", "0xA", "base-sepolia", "0xasset", 1000)
+    app = FastAPI()
+    app.get("/x402/aggregates")(aggregates_endpoint(aggregates))
+    client = TestClient(app)
+
+    response = client.get("/x402/aggregates?dimension=network")
+    assert response.status_code == 200
+    assert response.json()["totals"]["base-sepolia"]["amounts"] == {"0xasset": "1000"}
+    assert client.get("/x402/aggregates?dimension=x").status_code == 400
+    assert client.post("/x402/aggregates").status_code == 405
+
+
+def test_payment_cache_shared_between_workers(monkeypatch, tmp_path):
+    account = Account.create()
+    calls = []
+    handler_status = [500]
+
+    async def post(self, endpoint, payment, payment_requirements):
+        calls.append(endpoint)
+        if endpoint == "verify":
+            return {"isValid": True, "payer": account.address}
+        return {"success": True, "transaction": "0x12", "network": "base-sepolia"}
+
+    monkeypatch.setattr(FacilitatorClient, "_post", post)
+
+    def worker():
+        app = FastAPI()
+
+        @app.get("/test")
+        async def endpoint():
+            return Response(status_code=handler_status[0])
+
+        app.middleware("http")(
+            require_payment(
+                price="$0.01",
+                pay_to_address="0x1111111111111111111111111111111111111111",
+                network="base-sepolia",
+                payment_cache=PaymentCache(tmp_path / "cache", slots=1024),
+            )
+        )
+        return TestClient(app)
+
+    worker1, worker2 = worker(), worker()
+    requirements = PaymentRequirements(**worker1.get("/test").json()["accepts"][0])
+    headers = {"X-PAYMENT": x402Client(account).create_payment_header(requirements, 1)}
+
+    # The handler fails, so the payment is not settled and can be retried
+    assert worker1.get("/test", headers=headers).status_code == 500
+    assert calls == ["verify"]
+
+    # The retry on another worker reuses the verify result
+    handler_status[0] = 200
+    assert worker2.get("/test", headers=headers).status_code == 200
+    assert calls == ["verify", "settle"]
+
+    # Replaying the settled payment is rejected without calling the facilitator
+    response = worker1.get("/test", headers=headers)
+    assert response.status_code == 402
+    assert response.json()["error"] == "Payment already used"
+    assert calls == ["verify", "settle"]
+
+
+def test_handler_error_releases_payment(monkeypatch, tmp_path):
+    account = Account.create()
+    calls = []
+    fail = [True]
+
+    async def post(self, endpoint, payment, payment_requirements):
+        calls.append(endpoint)
+        if endpoint == "verify":
+            return {"isValid": True, "payer": account.address}
+        return {"success": True, "transaction": "0x12", "network": "base-sepolia"}
+
+    monkeypatch.setattr(FacilitatorClient, "_post", post)
+
+    metrics = InMemoryMetrics()
+    app = FastAPI()
+
+    @app.get("/test")
+    async def endpoint():
+        if fail[0]:
+            raise RuntimeError("handler failed")
+        return {"ok": True}
+
+    app.middleware("http")(
+        require_payment(
+            price="$0.01",
+            pay_to_address="0x1111111111111111111111111111111111111111",
+            network="base-sepolia",
+            metrics=metrics,
+            payment_cache=PaymentCache(tmp_path / "cache", slots=1024),
+        )
+    )
+    client = TestClient(app, raise_server_exceptions=False)
+
+    requirements = PaymentRequirements(**client.get("/test").json()["accepts"][0])
+    headers = {"X-PAYMENT": x402Client(account).create_payment_header(requirements, 1)}
+    assert client.get("/test", headers=headers).status_code == 500
+    assert metrics.counter("server", "not_settled") == 1
+
+    # The nonce was released, so the payment can be retried
+    fail[0] = False
+    assert client.get("/test", headers=headers).status_code == 200
+    assert calls == ["verify", "settle"]
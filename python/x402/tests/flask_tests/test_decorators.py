@@ -0,0 +1,137 @@
+import pytest
+from eth_account import Account
+from flask import Flask, abort, g
+from x402.clients.base import decode_x_payment_response, x402Client
+from x402.events import EventBus
+from x402.facilitator import FacilitatorClient
+from x402.flask.decorators import x402_paid
+from x402.metrics import SERVER_PHASES, InMemoryMetrics
+from x402.testing.facilitator import MockFacilitatorServer
+from x402.types import PaymentRequirements, VerifyResponse
+
+PAY_TO = "0x1111111111111111111111111111111111111111"
+
+
+@pytest.fixture
+def facilitator(monkeypatch):
+    calls = []
+    settle_result = {"success": True, "transaction": "0x12", "network": "base-sepolia"}
+
+    async def post(self, endpoint, payment, payment_requirements):
+        calls.append(endpoint)
+        if endpoint == "verify":
+            return {"isValid": True, "payer": payment.authorization.from_}
+        return settle_result
+
+    monkeypatch.setattr(FacilitatorClient, "_post", post)
+    return calls, settle_result
+
+
+def create_app(**options):
+    app = Flask(__name__)
+
+    @app.route("/weather")
+    @x402_paid(price="$0.01", pay_to_address=PAY_TO, **options)
+    def weather():
+        assert isinstance(g.payment_details, PaymentRequirements)
+        assert isinstance(g.verify_response, VerifyResponse)
+        return {"payer": g.verify_response.payer}
+
+    @app.route("/forecast/<int:day>")
+    @x402_paid(price="$0.05", pay_to_address=PAY_TO, **options)
+    def forecast(day):
+        if day > 7:
+            abort(404)
+        return {"day": day}
+
+    @app.route("/free")
+    def free():
+        return {"free": True}
+
+    return app
+
+
+def pay(client, path, account):
+    resp = client.get(path)
+    assert resp.status_code == 402
+    requirements = PaymentRequirements(**resp.json["accepts"][0])
+    header = x402Client(account).create_payment_header(requirements, 1)
+    return client.get(path, headers={"X-PAYMENT": header})
+
+
+def test_paid_view(facilitator):
+    calls, _ = facilitator
+    account = Account.create()
+    with create_app().test_client() as client:
+        resp = client.get("/weather")
+        assert resp.status_code == 402
+        assert resp.json["error"] == "No X-PAYMENT header provided"
+        assert resp.json["accepts"][0]["resource"] == "http://localhost/weather"
+
+        resp = pay(client, "/weather", account)
+        assert resp.status_code == 200
+        assert resp.json == {"payer": account.address}
+        settlement = decode_x_payment_response(resp.headers["X-PAYMENT-RESPONSE"])
+        assert settlement["transaction"] == "0x12"
+        assert calls == ["verify", "settle"]
+
+        assert pay(client, "/forecast/3", account).json == {"day": 3}
+
+
+def test_unpaid_views_untouched(facilitator):
+    app = create_app()
+    with app.test_client() as client:
+        assert client.get("/free").json == {"free": True}
+    assert not hasattr(app.view_functions["free"], "x402_gate")
+    assert facilitator[0] == []
+
+
+def test_rejected_payments(facilitator):
+    calls, settle_result = facilitator
+    account = Account.create()
+    with create_app().test_client() as client:
+        resp = client.get("/weather", headers={"X-PAYMENT": "not base64"})
+        assert resp.status_code == 402
+        assert resp.json["error"].startswith("Invalid payment header format")
+
+        # Failed views do not settle
+        assert pay(client, "/forecast/9", account).status_code == 404
+        assert calls == ["verify"]
+
+        settle_result.update(success=False, errorReason="insufficient_funds")
+        resp = pay(client, "/weather", account)
+        assert resp.status_code == 402
+        assert resp.json["error"] == "Settle failed: insufficient_funds"
+
+
+def test_metrics_events_and_server_timing(facilitator):
+    metrics = InMemoryMetrics()
+    events = EventBus()
+    received = []
+    events.subscribe(received.append)
+    app = create_app(metrics=metrics, events=events, server_timing=True)
+    with app.test_client() as client:
+        resp = pay(client, "/weather", Account.create())
+    phases = [
+        entry.split(";")[0] for entry in resp.headers["Server-Timing"].split(", ")
+    ]
+    assert phases == [f"x402-{phase}" for phase in SERVER_PHASES]
+    assert metrics.counter("server", "settled") == 1
+    assert events.flush(timeout=5)
+    assert [event.type for event in received] == [
+        "payment_required",
+        "verified",
+        "settled",
+    ]
+    events.close()
+
+
+def test_with_mock_facilitator():
+    account = Account.create()
+    with MockFacilitatorServer() as server:
+        app = create_app(facilitator_config={"url": server.url})
+        with app.test_client() as client:
+            for _ in range(3):
+                resp = pay(client, "/weather", account)
+                assert resp.status_code == 200
+                assert resp.json == {"payer": account.address}
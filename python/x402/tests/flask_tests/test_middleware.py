@@ -1,5 +1,14 @@
+from eth_account import Account
 from flask import Flask, g
+from x402.aggregates import PaymentAggregates
+from x402.clients.base import decode_x_payment_response, x402Client
+from x402.events import EventBus
+from x402.facilitator import FacilitatorClient
+from x402.flask.aggregates import aggregates_view
 from x402.flask.middleware import PaymentMiddleware
+from x402.metrics import SERVER_PHASES, InMemoryMetrics
+from x402.sharedcache import PaymentCache
+from x402.types import PaymentRequirements, VerifyResponse
 
 
 def create_app_with_middleware(configs):
@@ -35,6 +44,7 @@ def test_payment_required_for_protected_route():
         assert resp.status_code == 402
         assert "accepts" in resp.json
         assert resp.json["error"].startswith("No X-PAYMENT header provided")
+        assert resp.headers["X-PAYMENT-ENCODINGS"] == "compact, json"
 
 
 def test_unprotected_route():
@@ -148,3 +158,218 @@ def test_payment_details_in_g():
     with app.test_client() as client:
         resp = client.get("/protected")
         assert resp.status_code == 402
+
+
+def test_paid_request_sets_payment_details_in_g(monkeypatch):
+    account = Account.create()
+
+    async def post(self, endpoint, payment, payment_requirements):
+        if endpoint == "verify":
+            return {"isValid": True, "payer": account.address}
+        return {"success": True, "transaction": "0x12", "network": "base-sepolia"}
+
+    monkeypatch.setattr(FacilitatorClient, "_post", post)
+
+    app = Flask(__name__)
+
+    @app.route("/protected")
+    def protected():
+        assert isinstance(g.payment_details, PaymentRequirements)
+        assert isinstance(g.verify_response, VerifyResponse)
+        return {"payer": g.verify_response.payer}
+
+    middleware = PaymentMiddleware(app)
+    middleware.add(
+        price="$0.01",
+        pay_to_address="0x1111111111111111111111111111111111111111",
+        path="/protected",
+        network="base-sepolia",
+    )
+    with app.test_client() as client:
+        resp = client.get("/protected")
+        assert resp.status_code == 402
+        requirements = PaymentRequirements(**resp.json["accepts"][0])
+
+        payment_header = x402Client(account).create_payment_header(requirements, 1)
+        resp = client.get("/protected", headers={"X-PAYMENT": payment_header})
+        assert resp.status_code == 200
+        assert resp.json == {"payer": account.address}
+        settlement = decode_x_payment_response(resp.headers["X-PAYMENT-RESPONSE"])
+        assert settlement["transaction"] == "0x12"
+
+
+def test_each_config_applied_once(monkeypatch):
+    account = Account.create()
+    calls = []
+
+    async def post(self, endpoint, payment, payment_requirements):
+        calls.append(endpoint)
+        if endpoint == "verify":
+            return {"isValid": True, "payer": account.address}
+        return {"success": True, "transaction": "0x12", "network": "base-sepolia"}
+
+    monkeypatch.setattr(FacilitatorClient, "_post", post)
+
+    app = create_app_with_middleware(
+        [
+            {
+                "price": "$0.01",
+                "pay_to_address": "0x1111111111111111111111111111111111111111",
+                "path": "/protected",
+                "network": "base-sepolia",
+            },
+            {
+                "price": "$0.02",
+                "pay_to_address": "0x1111111111111111111111111111111111111111",
+                "path": "/other",
+                "network": "base-sepolia",
+            },
+        ]
+    )
+    with app.test_client() as client:
+        resp = client.get("/protected")
+        requirements = PaymentRequirements(**resp.json["accepts"][0])
+        payment_header = x402Client(account).create_payment_header(requirements, 1)
+        resp = client.get("/protected", headers={"X-PAYMENT": payment_header})
+        assert resp.status_code == 200
+    assert calls == ["verify", "settle"]
+
+
+def test_metrics_and_server_timing(monkeypatch):
+    account = Account.create()
+
+    async def post(self, endpoint, payment, payment_requirements):
+        if endpoint == "verify":
+            return {"isValid": True, "payer": account.address}
+        return {"success": True, "transaction": "0x12", "network": "base-sepolia"}
+
+    monkeypatch.setattr(FacilitatorClient, "_post", post)
+
+    metrics = InMemoryMetrics()
+    app = create_app_with_middleware(
+        [
+            {
+                "price": "$0.01",
+                "pay_to_address": "0x1111111111111111111111111111111111111111",
+                "path": "/protected",
+                "network": "base-sepolia",
+                "metrics": metrics,
+                "server_timing": True,
+            }
+        ]
+    )
+    with app.test_client() as client:
+        resp = client.get("/protected")
+        assert resp.headers["Server-Timing"].startswith("x402-match;dur=")
+
+        requirements = PaymentRequirements(**resp.json["accepts"][0])
+        payment_header = x402Client(account).create_payment_header(requirements, 1)
+        resp = client.get("/protected", headers={"X-PAYMENT": payment_header})
+        assert resp.status_code == 200
+        phases = [
+            entry.split(";")[0] for entry in resp.headers["Server-Timing"].split(", ")
+        ]
+        assert phases == [f"x402-{phase}" for phase in SERVER_PHASES]
+
+        # Unprotected routes are not measured
+        client.get("/unprotected")
+
+    assert metrics.counter("server", "payment_required") == 1
+    assert metrics.counter("server", "settled") == 1
+    assert metrics.histogram("server", "match").count == 2
+
+
+def test_settle_failure_is_reported(monkeypatch, caplog, capsys):
+    account = Account.create()
+
+    async def post(self, endpoint, payment, payment_requirements):
+        if endpoint == "verify":
+            return {"isValid": True, "payer": account.address}
+        return {"success": False, "errorReason": "insufficient_funds"}
+
+    monkeypatch.setattr(FacilitatorClient, "_post", post)
+
+    events = EventBus()
+    received = []
+    events.subscribe(received.append)
+    app = create_app_with_middleware(
+        [
+            {
+                "price": "$0.01",
+                "pay_to_address": "0x1111111111111111111111111111111111111111",
+                "path": "/protected",
+                "network": "base-sepolia",
+                "events": events,
+            }
+        ]
+    )
+    with app.test_client() as client:
+        resp = client.get("/protected")
+        requirements = PaymentRequirements(**resp.json["accepts"][0])
+        payment_header = x402Client(account).create_payment_header(requirements, 1)
+        resp = client.get("/protected", headers={"X-PAYMENT": payment_header})
+        assert resp.status_code == 200
+        assert "X-PAYMENT-RESPONSE" not in resp.headers
+
+    assert "insufficient_funds" in caplog.text
+    assert capsys.readouterr().out == ""
+    assert events.flush(timeout=5)
+    assert [event.type for event in received] == [
+        "payment_required",
+        "verified",
+        "settle_failed",
+    ]
+    assert received[2].error == "insufficient_funds"
+    events.close()
+
+
+def test_aggregates_view():
+    aggregates = PaymentAggregates()
+    aggregates.add("/protected", "0xA", "base-sepolia", "0xasset", 1000)
+    app = Flask(__name__)
+    app.add_url_rule("/x402/aggregates", view_func=aggregates_view(aggregates))
+    with app.test_client() as client:
+        resp = client.get("/x402/aggregates?dimension=payer")
+        assert resp.status_code == 200
+        assert resp.json["totals"]["0xa"]["count"] == 1
+        assert client.get("/x402/aggregates?snapshot=1").json["buckets"]
+        assert client.get("/x402/aggregates?window=0").status_code == 400
+
+
+def test_payment_cache_rejects_replays(monkeypatch, tmp_path):
+    account = Account.create()
+    calls = []
+
+    async def post(self, endpoint, payment, payment_requirements):
+        calls.append(endpoint)
+        if endpoint == "verify":
+            return {"isValid": True, "payer": account.address}
+        return {"success": True, "transaction": "0x12", "network": "base-sepolia"}
+
+    monkeypatch.setattr(FacilitatorClient, "_post", post)
+
+    apps = [
+        create_app_with_middleware(
+            [
+                {
+                    "price": "$0.01",
+                    "pay_to_address": "0x1111111111111111111111111111111111111111",
+                    "path": "/protected",
+                    "network": "base-sepolia",
+                    "payment_cache": PaymentCache(tmp_path / "cache", slots=1024),
+                }
+            ]
+        )
+        for _ in range(2)
+    ]
+    with apps[0].test_client() as worker1, apps[1].test_client() as worker2:
+        resp = worker1.get("/protected")
+        requirements = PaymentRequirements(**resp.json["accepts"][0])
+        payment_header = x402Client(account).create_payment_header(requirements, 1)
+
+        resp = worker1.get("/protected", headers={"X-PAYMENT": payment_header})
+        assert resp.status_code == 200
+        resp = worker2.get("/protected", headers={"X-PAYMENT": payment_header})
+        assert resp.status_code == 402
+        assert resp.json["error"] == "Payment already used"
+        assert calls == ["verify", "settle"]
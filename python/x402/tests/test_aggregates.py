@@ -0,0 +1,135 @@
+import json
+
+import pytest
+from x402.aggregates import PaymentAggregates, query_params
+from x402.events import SETTLED, VERIFIED, EventBus, PaymentEvent
+from x402.wire import WirePaymentRequirements
+
+USDC = "0x036CbD53842c5426634e7929541eC2318f3dCF7e"
+NOW = 1_700_000_000.0
+
+
+def settle(
+    aggregates, route="/weather", payer="0xA", amount=1000, latency=0.01, at=NOW
+):
+    aggregates.add(route, payer, "base-sepolia", USDC, amount, latency, at)
+
+
+def test_totals_per_dimension():
+    aggregates = PaymentAggregates()
+    settle(aggregates, payer="0xA", amount=1000)
+    settle(aggregates, payer="0xa", amount=2000, route="/premium")
+    settle(aggregates, payer="0xB", amount=3000)
+
+    routes = aggregates.query("route", now=NOW)
+    assert routes["/weather"]["count"] == 2
+    assert routes["/weather"]["amounts"] == {USDC.lower(): "4000"}
+    assert routes["/premium"]["amounts"] == {USDC.lower(): "2000"}
+
+    payers = aggregates.query("payer", now=NOW)
+    assert {key: value["count"] for key, value in payers.items()} == {
+        "0xa": 2,
+        "0xb": 1,
+    }
+    assert aggregates.query("network", now=NOW)["base-sepolia"]["count"] == 3
+
+    with pytest.raises(ValueError):
+        aggregates.query("asset")
+
+
+def test_latency_percentiles():
+    aggregates = PaymentAggregates()
+    for i in range(100):
+        settle(aggregates, latency=0.001 * (i + 1))
+    totals = aggregates.query("route", now=NOW)["/weather"]
+    assert 50 <= totals["latency_p50_ms"] <= 55
+    assert 95 <= totals["latency_p95_ms"] <= 105
+
+
+def test_buckets_roll_over():
+    aggregates = PaymentAggregates(bucket_seconds=10, buckets=3)
+    settle(aggregates, at=NOW)
+    settle(aggregates, at=NOW + 10)
+    settle(aggregates, at=NOW + 20)
+    assert aggregates.query("route", now=NOW + 20)["/weather"]["count"] == 3
+    assert aggregates.query("route", window=10, now=NOW + 20)["/weather"]["count"] == 1
+    totals = aggregates.query("route", window=float("inf"), now=NOW + 20)
+    assert totals["/weather"]["count"] == 3
+
+    # The oldest bucket is reused
+    settle(aggregates, at=NOW + 30)
+    assert aggregates.query("route", now=NOW + 30)["/weather"]["count"] == 3
+    # Settlements older than the ring are dropped
+    settle(aggregates, at=NOW)
+    assert aggregates.query("route", now=NOW + 30)["/weather"]["count"] == 3
+    assert aggregates.query("route", now=NOW + 100) == {}
+
+
+def test_merge_snapshots():
+    worker1 = PaymentAggregates()
+    worker2 = PaymentAggregates()
+    settle(worker1, amount=1000, latency=0.01)
+    settle(worker2, amount=2**200, latency=0.2)
+    settle(worker2, payer="0xC", at=NOW - 60)
+
+    snapshots = [
+        json.loads(json.dumps(w.snapshot(now=NOW))) for w in (worker1, worker2)
+    ]
+    combined = PaymentAggregates.merged(snapshots)
+    totals = combined.query("route", now=NOW)["/weather"]
+    assert totals["count"] == 3
+    assert totals["amounts"] == {USDC.lower(): str(2000 + 2**200)}
+    assert totals["latency_p95_ms"] > 190
+    assert combined.query("payer", window=60, now=NOW).keys() == {"0xa"}
+
+    with pytest.raises(ValueError):
+        PaymentAggregates(bucket_seconds=30).merge(snapshots[0])
+
+
+def test_record_events():
+    requirements = WirePaymentRequirements(
+        scheme="exact",
+        network="base-sepolia",
+        max_amount_required="10000",
+        resource="",
+        description="",
+        mime_type="",
+        pay_to="0x0000000000000000000000000000000000000001",
+        max_timeout_seconds=60,
+        asset=USDC,
+    )
+    events = EventBus()
+    aggregates = PaymentAggregates(route=lambda url: url.rsplit("/", 1)[0] + "/{id}")
+    aggregates.subscribe(events)
+    events.emit(PaymentEvent(VERIFIED, "https://example.com/items/1"))
+    for i in range(3):
+        events.emit(
+            PaymentEvent(
+                SETTLED,
+                f"https://example.com/items/{i}",
+                requirements=requirements,
+                payer="0xA",
+                duration=0.05,
+            )
+        )
+    assert events.flush(timeout=5)
+    events.close()
+    totals = aggregates.query("route")
+    assert list(totals) == ["https://example.com/items/{id}"]
+    assert totals["https://example.com/items/{id}"]["amounts"] == {
+        USDC.lower(): "30000"
+    }
+
+
+def test_query_params():
+    aggregates = PaymentAggregates()
+    settle(aggregates, at=None)
+    status, body = query_params(aggregates, {"dimension": "payer", "window": "60"})
+    assert status == 200
+    assert body["totals"]["0xa"]["count"] == 1
+    assert query_params(aggregates, {"snapshot": "1"})[1]["bucket_seconds"] == 60
+    assert query_params(aggregates, {"dimension": "asset"})[0] == 400
+    assert query_params(aggregates, {"window": "-1"})[0] == 400
+    assert query_params(aggregates, {"window": "x"})[0] == 400
+    assert query_params(aggregates, {"window": "inf"})[0] == 400
+    assert query_params(aggregates, {"window": "nan"})[0] == 400
@@ -1,5 +1,15 @@
+import json
+
 import pytest
-from x402.encoding import safe_base64_encode, safe_base64_decode
+from x402 import encoding
+from x402.encoding import (
+    json_dumps,
+    json_loads,
+    parse_payment_encodings,
+    safe_base64_encode,
+    safe_base64_decode,
+)
+from x402.exact import decode_payment, encode_payment
 
 
 def test_safe_base64_encode():
@@ -79,3 +89,46 @@ def test_encode_decode_roundtrip():
         assert decoded == test_bytes.decode("utf-8"), (
             f"Roundtrip failed for bytes: {test_bytes}"
         )
+
+
+@pytest.fixture(params=["orjson", "json"])
+def json_backend(request, monkeypatch):
+    if request.param == "json":
+        monkeypatch.setattr(encoding, "orjson", None)
+    elif encoding.orjson is None:
+        pytest.skip("orjson is not installed")
+    return request.param
+
+
+def test_json_dumps_loads(json_backend):
+    data = {"x402Version": 1, "payload": {"signature": "0xabc", "value": "10000"}}
+    encoded = json_dumps(data)
+    assert (
+        encoded == b'{"x402Version":1,"payload":{"signature":"0xabc","value":"10000"}}'
+    )
+    assert json_loads(encoded) == data
+    assert json_loads(encoded.decode("utf-8")) == data
+
+    assert json_loads(json_dumps({"text": "hello 世界"})) == {"text": "hello 世界"}
+    assert json_dumps({"value": b"\x12\x34"}, default=bytes.hex) == b'{"value":"1234"}'
+    # uint256 values are beyond orjson's 64-bit integers
+    assert json_dumps({"value": 2**255}) == b'{"value":%d}' % 2**255
+
+    with pytest.raises(TypeError):
+        json_dumps({"value": object()})
+    with pytest.raises(ValueError):
+        json_loads(b"{invalid")
+
+
+def test_encode_decode_payment_backends(json_backend):
+    data = {"x402Version": 1, "scheme": "exact", "payload": {"signature": "0x12"}}
+    encoded = encode_payment(data)
+    assert decode_payment(encoded) == data
+    assert encoded == safe_base64_encode(json.dumps(data, separators=(",", ":")))
+
+
+def test_parse_payment_encodings():
+    assert parse_payment_encodings(None) == ("json",)
+    assert parse_payment_encodings("") == ("json",)
+    assert parse_payment_encodings("Compact, json") == ("compact", "json")
+    assert parse_payment_encodings(" json ,, ") == ("json",)
@@ -0,0 +1,181 @@
+import logging
+import os
+import threading
+
+import pytest
+from x402.events import (
+    SETTLE_FAILED,
+    SETTLED,
+    VERIFIED,
+    EventBus,
+    PaymentEvent,
+    log_event,
+)
+
+
+def test_delivers_events_in_order():
+    bus = EventBus()
+    received = []
+    bus.subscribe(received.append)
+    for i in range(100):
+        assert bus.emit(PaymentEvent(VERIFIED, f"https://example.com/{i}"))
+    assert bus.flush(timeout=5)
+    assert [event.resource for event in received] == [
+        f"https://example.com/{i}" for i in range(100)
+    ]
+    assert bus.stats() == {
+        "emitted": 100,
+        "delivered": 100,
+        "dropped": 0,
+        "subscriber_errors": 0,
+        "queued": 0,
+    }
+    bus.close()
+
+
+def test_subscribe_by_type_and_unsubscribe():
+    bus = EventBus()
+    settled = []
+    everything = []
+    unsubscribe = bus.subscribe(settled.append, types=[SETTLED])
+    bus.subscribe(everything.append)
+
+    bus.emit(PaymentEvent(VERIFIED, "r"))
+    bus.emit(PaymentEvent(SETTLED, "r", transaction="0x12"))
+    bus.flush(timeout=5)
+    assert [event.type for event in settled] == [SETTLED]
+    assert len(everything) == 2
+
+    unsubscribe()
+    bus.emit(PaymentEvent(SETTLED, "r"))
+    bus.flush(timeout=5)
+    assert len(settled) == 1
+    assert len(everything) == 3
+
+    with pytest.raises(ValueError):
+        bus.subscribe(print, types=["paid"])
+    bus.close()
+
+
+def test_drops_events_when_full(caplog):
+    bus = EventBus(max_queue=2)
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow(event):
+        started.set()
+        release.wait(5)
+
+    bus.subscribe(slow)
+    bus.emit(PaymentEvent(VERIFIED, "first"))
+    started.wait(5)
+
+    # The first event is still undelivered, so only one more fits
+    with caplog.at_level(logging.WARNING, logger="x402.events"):
+        results = [bus.emit(PaymentEvent(VERIFIED, str(i))) for i in range(5)]
+    assert results == [True, False, False, False, False]
+    assert bus.stats()["dropped"] == 4
+    assert bus.stats()["queued"] == 2
+    # Warnings about drops are rate limited
+    assert len(caplog.records) == 1
+    assert "1 events dropped" in caplog.records[0].getMessage()
+
+    release.set()
+    assert bus.flush(timeout=5)
+    assert bus.stats()["delivered"] == 2
+    bus.close()
+
+
+def test_queue_bound_includes_events_being_delivered():
+    bus = EventBus(max_queue=4)
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow(event):
+        started.set()
+        release.wait(5)
+
+    bus.subscribe(slow)
+    with bus._condition:
+        # Queue a full batch before the consumer thread can take any of it
+        assert all(bus.emit(PaymentEvent(VERIFIED, str(i))) for i in range(4))
+    started.wait(5)
+
+    assert not bus.emit(PaymentEvent(VERIFIED, "over"))
+    assert bus.stats()["queued"] == 4
+    release.set()
+    assert bus.flush(timeout=5)
+    assert bus.emit(PaymentEvent(VERIFIED, "after"))
+    assert bus.flush(timeout=5)
+    assert bus.stats()["delivered"] == 5
+    bus.close()
+
+
+def test_subscriber_errors_are_isolated(caplog):
+    bus = EventBus()
+    received = []
+
+    def broken(event):
+        raise RuntimeError("boom")
+
+    bus.subscribe(broken)
+    bus.subscribe(received.append)
+    with caplog.at_level(logging.ERROR, logger="x402.events"):
+        bus.emit(PaymentEvent(VERIFIED, "r"))
+        bus.flush(timeout=5)
+    assert len(received) == 1
+    assert bus.stats()["subscriber_errors"] == 1
+    assert "failed" in caplog.records[0].getMessage()
+    bus.close()
+
+
+def test_close_delivers_queued_events():
+    bus = EventBus()
+    received = []
+    bus.subscribe(received.append)
+    bus.emit(PaymentEvent(VERIFIED, "r"))
+    bus.close(timeout=5)
+    assert len(received) == 1
+    assert not bus.emit(PaymentEvent(VERIFIED, "r"))
+
+
+def test_no_thread_until_first_event():
+    bus = EventBus()
+    assert bus._thread is None
+    assert bus.flush(timeout=0)
+    bus.close()
+
+
+def test_log_event(caplog):
+    with caplog.at_level(logging.INFO, logger="x402.events"):
+        log_event(PaymentEvent(SETTLE_FAILED, "https://example.com", error="boom"))
+    assert caplog.records[0].levelno == logging.WARNING
+    assert "settle_failed https://example.com" in caplog.records[0].getMessage()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_forked_children_deliver_events():
+    bus = EventBus()
+    received = []
+    bus.subscribe(received.append)
+    assert bus.emit(PaymentEvent(VERIFIED, "parent"))
+    assert bus.flush(timeout=5)
+
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # Child: report the resources it received, then exit at once
+        try:
+            received.clear()
+            bus.emit(PaymentEvent(SETTLED, "child"))
+            bus.flush(timeout=5)
+            os.write(write_end, ",".join(e.resource for e in received).encode())
+        finally:
+            os._exit(0)
+    os.close(write_end)
+    with os.fdopen(read_end, "rb") as pipe:
+        output = pipe.read()
+    os.waitpid(pid, 0)
+    assert output == b"child"
+    assert [event.resource for event in received] == ["parent"]
+    bus.close()
@@ -1,14 +1,27 @@
+import gc
 import pytest
 import time
+import weakref
 import base64
+from concurrent.futures import ThreadPoolExecutor
 from eth_account import Account
+from eth_account.messages import _hash_eip191_message, encode_typed_data
 from hexbytes import HexBytes
+from x402 import exact
 from x402.exact import (
     create_nonce,
     prepare_payment_header,
     sign_payment_header,
     encode_payment,
     decode_payment,
+    get_domain_separator,
+    hash_transfer_with_authorization,
+    recover_authorization_signer,
+    sign_payment_headers,
+    create_signing_pool,
+    encode_payment_compact,
+    decode_payment_compact,
+    COMPACT_PAYMENT_PREFIX,
 )
 from x402.types import PaymentRequirements
 
@@ -104,6 +117,23 @@ def test_sign_payment_header(account, payment_requirements):
     assert int(auth["validBefore"]) > int(time.time())
 
 
+def test_prepared_keys_live_as_long_as_their_account(payment_requirements):
+    account = Account.create()
+    header = prepare_payment_header(account.address, 1, payment_requirements)
+    header["payload"]["authorization"]["nonce"] = header["payload"]["authorization"][
+        "nonce"
+    ].hex()
+    sign_payment_header(account, payment_requirements, header)
+    assert account in exact._loaded_keys
+
+    cached = len(exact._loaded_keys)
+    reference = weakref.ref(account)
+    del account
+    gc.collect()
+    assert reference() is None
+    assert len(exact._loaded_keys) == cached - 1
+
+
 def test_sign_payment_header_no_account(payment_requirements):
     unsigned_header = prepare_payment_header(
         "0x0000000000000000000000000000000000000000", 1, payment_requirements
@@ -196,3 +226,285 @@ def test_decode_payment():
     assert decoded["array"] == complex_data["array"]
     assert decoded["object"] == complex_data["object"]
     assert decoded["hex"] == "1234"  # Implementation returns hex without 0x prefix
+
+
+def sign_typed_data_reference(account, payment_requirements, auth, nonce_bytes):
+    """Sign with eth_account's generic typed data encoder."""
+    return account.sign_typed_data(
+        domain_data={
+            "name": payment_requirements.extra["name"],
+            "version": payment_requirements.extra["version"],
+            "chainId": 84532,
+            "verifyingContract": payment_requirements.asset,
+        },
+        message_types={
+            "TransferWithAuthorization": [
+                {"name": "from", "type": "address"},
+                {"name": "to", "type": "address"},
+                {"name": "value", "type": "uint256"},
+                {"name": "validAfter", "type": "uint256"},
+                {"name": "validBefore", "type": "uint256"},
+                {"name": "nonce", "type": "bytes32"},
+            ]
+        },
+        message_data={
+            "from": auth["from"],
+            "to": auth["to"],
+            "value": int(auth["value"]),
+            "validAfter": int(auth["validAfter"]),
+            "validBefore": int(auth["validBefore"]),
+            "nonce": nonce_bytes,
+        },
+    )
+
+
+@pytest.mark.parametrize(
+    "name,version,asset,value",
+    [
+        ("USD Coin", "2", "0x036CbD53842c5426634e7929541eC2318f3dCF7e", "10000"),
+        ("USDC", "1", "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913", "0"),
+        ("Token", "10", "0x5425890298aed601595a70ab815c96711a31bc65", str(2**256 - 1)),
+    ],
+)
+def test_sign_payment_header_matches_typed_data_signature(
+    account, payment_requirements, name, version, asset, value
+):
+    payment_requirements.extra = {"name": name, "version": version}
+    payment_requirements.asset = asset
+    payment_requirements.max_amount_required = value
+
+    unsigned_header = prepare_payment_header(account.address, 1, payment_requirements)
+    nonce = unsigned_header["payload"]["authorization"]["nonce"]
+    unsigned_header["payload"]["authorization"]["nonce"] = nonce.hex()
+    auth = dict(unsigned_header["payload"]["authorization"])
+
+    decoded = decode_payment(
+        sign_payment_header(account, payment_requirements, unsigned_header)
+    )
+    expected = sign_typed_data_reference(account, payment_requirements, auth, nonce)
+
+    assert bytes.fromhex(decoded["payload"]["signature"][2:]) == expected.signature
+
+
+def test_hash_transfer_with_authorization(account, payment_requirements):
+    nonce = create_nonce()
+    auth = {
+        "from": account.address,
+        "to": payment_requirements.pay_to,
+        "value": "10000",
+        "validAfter": "1700000000",
+        "validBefore": "1700000600",
+    }
+    domain_separator = get_domain_separator(
+        "USD Coin", "2", 84532, payment_requirements.asset
+    )
+    digest = hash_transfer_with_authorization(
+        domain_separator,
+        auth["from"],
+        auth["to"],
+        10000,
+        1700000000,
+        1700000600,
+        nonce,
+    )
+    signable = encode_typed_data(
+        full_message={
+            "types": {
+                "EIP712Domain": [
+                    {"name": "name", "type": "string"},
+                    {"name": "version", "type": "string"},
+                    {"name": "chainId", "type": "uint256"},
+                    {"name": "verifyingContract", "type": "address"},
+                ],
+                "TransferWithAuthorization": [
+                    {"name": "from", "type": "address"},
+                    {"name": "to", "type": "address"},
+                    {"name": "value", "type": "uint256"},
+                    {"name": "validAfter", "type": "uint256"},
+                    {"name": "validBefore", "type": "uint256"},
+                    {"name": "nonce", "type": "bytes32"},
+                ],
+            },
+            "primaryType": "TransferWithAuthorization",
+            "domain": {
+                "name": "USD Coin",
+                "version": "2",
+                "chainId": 84532,
+                "verifyingContract": payment_requirements.asset,
+            },
+            "message": {**auth, "nonce": nonce},
+        }
+    )
+    assert signable.header == domain_separator
+    assert digest == _hash_eip191_message(signable)
+
+    # Domain separators are cached per domain
+    assert (
+        get_domain_separator("USD Coin", "2", 84532, payment_requirements.asset)
+        is domain_separator
+    )
+
+
+def test_hash_transfer_with_authorization_invalid_fields(account):
+    domain_separator = get_domain_separator(
+        "USD Coin", "2", 84532, "0x036CbD53842c5426634e7929541eC2318f3dCF7e"
+    )
+    args = [domain_separator, account.address, account.address, 1, 0, 1, b"\x00" * 32]
+
+    with pytest.raises(ValueError):
+        hash_transfer_with_authorization(*args[:3], -1, *args[4:])
+    with pytest.raises(ValueError):
+        hash_transfer_with_authorization(*args[:3], 2**256, *args[4:])
+    with pytest.raises(ValueError):
+        hash_transfer_with_authorization(*args[:2], "0x1234", *args[3:])
+    with pytest.raises(ValueError):
+        hash_transfer_with_authorization(*args[:6], b"\x00" * 33)
+
+
+def test_recover_authorization_signer(account, payment_requirements):
+    unsigned_header = prepare_payment_header(account.address, 1, payment_requirements)
+    nonce = unsigned_header["payload"]["authorization"]["nonce"]
+    unsigned_header["payload"]["authorization"]["nonce"] = nonce.hex()
+
+    payload = decode_payment(
+        sign_payment_header(account, payment_requirements, unsigned_header)
+    )["payload"]
+    signer = recover_authorization_signer(
+        payment_requirements, payload["authorization"], payload["signature"]
+    )
+    assert signer == account.address
+
+    # Tampering with any signed field changes the recovered signer
+    payload["authorization"]["value"] = "1"
+    signer = recover_authorization_signer(
+        payment_requirements, payload["authorization"], payload["signature"]
+    )
+    assert signer != account.address
+
+
+def prepare_batch(account, payment_requirements, count):
+    items = []
+    for i in range(count):
+        requirements = payment_requirements.model_copy(
+            update={"max_amount_required": str(i + 1)}
+        )
+        header = prepare_payment_header(account.address, 1, requirements)
+        nonce = header["payload"]["authorization"]["nonce"]
+        header["payload"]["authorization"]["nonce"] = nonce.hex()
+        items.append((requirements, header))
+    return items
+
+
+def test_sign_payment_headers(account, payment_requirements):
+    items = prepare_batch(account, payment_requirements, 5)
+    # A malformed item fails on its own without aborting the batch
+    items[2][1]["payload"]["authorization"]["nonce"] = "not hex"
+
+    results = sign_payment_headers(account, items)
+
+    assert len(results) == 5
+    assert isinstance(results[2], ValueError)
+    for i in (0, 1, 3, 4):
+        decoded = decode_payment(results[i])
+        assert decoded["payload"]["authorization"]["value"] == str(i + 1)
+
+
+def test_sign_payment_headers_with_signing_pool(account, payment_requirements):
+    items = prepare_batch(account, payment_requirements, 20)
+    items[7][1]["payload"]["authorization"]["value"] = "not a number"
+
+    with create_signing_pool(account, processes=2) as executor:
+        results = sign_payment_headers(account, items, executor=executor, chunk_size=4)
+
+    assert len(results) == 20
+    assert isinstance(results[7], ValueError)
+    for i, result in enumerate(results):
+        if i == 7:
+            continue
+        payload = decode_payment(result)["payload"]
+        assert payload["authorization"]["value"] == str(i + 1)
+        signer = recover_authorization_signer(
+            items[i][0], payload["authorization"], payload["signature"]
+        )
+        assert signer == account.address
+
+
+def test_sign_payment_headers_rejects_other_pools(account, payment_requirements):
+    items = prepare_batch(account, payment_requirements, 2)
+
+    with create_signing_pool(Account.create(), processes=1) as executor:
+        with pytest.raises(ValueError, match="Signing pool signs for"):
+            sign_payment_headers(account, items, executor=executor)
+    with ThreadPoolExecutor(1) as executor:
+        with pytest.raises(ValueError, match="create_signing_pool"):
+            sign_payment_headers(account, items, executor=executor)
+
+
+def test_create_signing_pool_requires_private_key():
+    with pytest.raises(ValueError):
+        create_signing_pool(object())
+
+
+def test_compact_payment_roundtrip(account, payment_requirements):
+    unsigned_header = prepare_payment_header(account.address, 1, payment_requirements)
+    unsigned_header["payload"]["authorization"]["nonce"] = unsigned_header["payload"][
+        "authorization"
+    ]["nonce"].hex()
+    json_header = sign_payment_header(account, payment_requirements, unsigned_header)
+    payment = decode_payment(json_header)
+
+    compact_header = encode_payment(payment, "compact")
+    assert compact_header.startswith(COMPACT_PAYMENT_PREFIX)
+    assert len(compact_header) < len(json_header) / 2
+    assert decode_payment(compact_header) == payment
+    assert decode_payment_compact(compact_header) == payment
+
+    payload = decode_payment(compact_header)["payload"]
+    signer = recover_authorization_signer(
+        payment_requirements, payload["authorization"], payload["signature"]
+    )
+    assert signer == account.address
+
+
+def test_sign_payment_header_compact(account, payment_requirements):
+    unsigned_header = prepare_payment_header(account.address, 1, payment_requirements)
+    unsigned_header["payload"]["authorization"]["nonce"] = unsigned_header["payload"][
+        "authorization"
+    ]["nonce"].hex()
+    header = sign_payment_header(
+        account, payment_requirements, unsigned_header, "compact"
+    )
+    assert header.startswith(COMPACT_PAYMENT_PREFIX)
+    assert decode_payment(header)["payload"]["authorization"]["from"] == account.address
+
+
+def test_compact_payment_errors():
+    payment = {
+        "x402Version": 1,
+        "scheme": "exact",
+        "network": "base-sepolia",
+        "payload": {
+            "signature": "0x" + "11" * 65,
+            "authorization": {
+                "from": "0x" + "22" * 20,
+                "to": "0x" + "33" * 20,
+                "value": "0",
+                "validAfter": "0",
+                "validBefore": "1740672154",
+                "nonce": "0x" + "44" * 32,
+            },
+        },
+    }
+    encoded = encode_payment_compact(payment)
+    assert decode_payment(encoded)["payload"]["authorization"]["value"] == "0"
+
+    with pytest.raises(ValueError):
+        encode_payment_compact({**payment, "scheme": "upto"})
+    with pytest.raises(ValueError):
+        encode_payment_compact({**payment, "payload": {"signature": "0x00"}})
+    with pytest.raises(ValueError):
+        encode_payment(payment, "cbor")
+
+    for invalid in (encoded[:-4], encoded + "AAAA", "c1.!!!!", "c1."):
+        with pytest.raises(ValueError):
+            decode_payment(invalid)
@@ -0,0 +1,58 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from eth_account import Account
+from x402.clients.base import x402Client
+from x402.exact import decode_payment
+from x402.facilitator import PooledFacilitatorClient, pooled_facilitator
+from x402.testing.facilitator import MockFacilitatorServer
+from x402.types import PaymentRequirements
+from x402.wire import WirePaymentPayload, WirePaymentRequirements
+
+REQUIREMENTS = PaymentRequirements(
+    scheme="exact",
+    network="base-sepolia",
+    asset="0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+    pay_to="0x0000000000000000000000000000000000000001",
+    max_amount_required="10000",
+    resource="https://example.com",
+    description="test",
+    max_timeout_seconds=1000,
+    mime_type="application/json",
+    extra={"name": "USDC", "version": "2"},
+)
+
+
+def test_pooled_facilitator_is_shared():
+    first = pooled_facilitator({"url": "https://facilitator.example.com/"})
+    assert pooled_facilitator({"url": "https://facilitator.example.com/"}) is first
+    assert pooled_facilitator({"url": "https://other.example.com"}) is not first
+    assert isinstance(pooled_facilitator(), PooledFacilitatorClient)
+
+
+def test_pooled_client_reuses_connections():
+    header = x402Client(Account.create()).create_payment_header(REQUIREMENTS, 1)
+    payment = WirePaymentPayload.from_dict(decode_payment(header))
+    requirements = WirePaymentRequirements.from_model(REQUIREMENTS)
+
+    with MockFacilitatorServer() as server:
+        facilitator = PooledFacilitatorClient({"url": server.url})
+
+        def verify(_):
+            return facilitator.run(facilitator.verify_wire(payment, requirements))
+
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(verify, range(32)))
+        assert all(result.is_valid for result in results)
+
+        pool = facilitator._client[1]
+        assert facilitator._client[0] == os.getpid()
+        assert isinstance(pool, httpx.AsyncClient)
+        assert facilitator.run(facilitator.verify_wire(payment, requirements)).is_valid
+        assert facilitator._client[1] is pool
+
+        facilitator.close()
+        assert pool.is_closed
+        assert facilitator.run(facilitator.verify_wire(payment, requirements)).is_valid
+        facilitator.close()
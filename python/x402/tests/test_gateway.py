@@ -0,0 +1,294 @@
+import httpx
+import pytest
+from eth_account import Account
+from x402.clients.base import decode_x_payment_response, x402Client
+from x402.events import SETTLED, EventBus
+from x402.facilitator import FacilitatorClient
+from x402.gateway import Gateway
+from x402.metrics import InMemoryMetrics
+from x402.types import PaymentRequirements
+
+PAY_TO = "0x1111111111111111111111111111111111111111"
+
+
+@pytest.fixture
+def facilitator(monkeypatch):
+    calls = []
+    settle_result = {"success": True, "transaction": "0x12", "network": "base-sepolia"}
+
+    async def post(self, endpoint, payment, payment_requirements):
+        calls.append(endpoint)
+        if endpoint == "verify":
+            return {"isValid": True, "payer": payment.authorization.from_}
+        return settle_result
+
+    monkeypatch.setattr(FacilitatorClient, "_post", post)
+    return calls, settle_result
+
+
+class Upstream:
+    """Upstream served by an httpx.MockTransport, recording its requests."""
+
+    def __init__(self, status=200, chunks=(b"hello ", b"world"), error=None):
+        self.status = status
+        self.chunks = chunks
+        self.error = error
+        self.requests = []
+        self.bodies = []
+        self.transport = httpx.MockTransport(self.handle)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        if self.error is not None:
+            raise self.error
+        self.requests.append(request)
+        self.bodies.append(await request.aread())
+
+        async def stream():
+            for chunk in self.chunks:
+                yield chunk
+
+        return httpx.Response(
+            self.status,
+            headers={"Content-Type": "text/plain", "Connection": "close"},
+            content=stream(),
+        )
+
+
+def client(gateway: Gateway) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=gateway, client=("10.0.0.1", 1234)),
+        base_url="http://gateway.example.com",
+    )
+
+
+async def pay(http, path, account=None):
+    response = await http.get(path)
+    assert response.status_code == 402
+    requirements = PaymentRequirements(**response.json()["accepts"][0])
+    header = x402Client(account or Account.create()).create_payment_header(
+        requirements, 1
+    )
+    return await http.get(path, headers={"X-PAYMENT": header})
+
+
+async def test_proxies_free_routes():
+    upstream = Upstream()
+    gateway = Gateway(
+        {"/legacy/*": "http://legacy.internal:8080/base/"},
+        transport=upstream.transport,
+    )
+    async with client(gateway) as http:
+        response = await http.post(
+            "/legacy/items?q=a%20b",
+            content=b"payload",
+            headers={
+                "X-Custom": "1",
+                "X-Forwarded-For": "192.0.2.1",
+                "Connection": "keep-alive, X-Drop",
+                "X-Drop": "secret",
+            },
+        )
+        assert response.status_code == 200
+        assert response.text == "hello world"
+        assert response.headers["content-type"] == "text/plain"
+        assert "connection" not in response.headers
+
+        assert (await http.get("/other")).status_code == 404
+
+    request = upstream.requests[0]
+    assert request.method == "POST"
+    assert str(request.url) == "http://legacy.internal:8080/base/legacy/items?q=a%20b"
+    assert upstream.bodies[0] == b"payload"
+    assert request.headers["host"] == "legacy.internal:8080"
+    assert request.headers["x-custom"] == "1"
+    assert request.headers["x-forwarded-for"] == "192.0.2.1, 10.0.0.1"
+    assert request.headers["x-forwarded-host"] == "gateway.example.com"
+    assert request.headers["x-forwarded-proto"] == "http"
+    assert "x-drop" not in request.headers
+    assert len(upstream.requests) == 1
+
+
+async def test_paid_route(facilitator):
+    calls, _ = facilitator
+    upstream = Upstream()
+    metrics = InMemoryMetrics()
+    events = EventBus()
+    settled = []
+    events.subscribe(settled.append, [SETTLED])
+    gateway = Gateway(transport=upstream.transport, metrics=metrics, events=events)
+    gateway.add("/weather/*", "http://weather.internal", "$0.01", PAY_TO)
+
+    async with client(gateway) as http:
+        response = await http.get("/weather/today")
+        assert response.status_code == 402
+        body = response.json()
+        assert body["error"] == "No X-PAYMENT header provided"
+        assert body["accepts"][0]["resource"] == (
+            "http://gateway.example.com/weather/today"
+        )
+        assert body["accepts"][0]["maxAmountRequired"] == "10000"
+        assert upstream.requests == []
+
+        response = await pay(http, "/weather/today")
+    assert response.status_code == 200
+    assert response.text == "hello world"
+    assert decode_x_payment_response(response.headers["X-PAYMENT-RESPONSE"])["success"]
+    assert calls == ["verify", "settle"]
+    assert "x-payment" not in upstream.requests[0].headers
+    assert metrics.counter("server", "settled") == 1
+    assert events.flush(timeout=5)
+    assert settled[0].transaction == "0x12"
+    events.close()
+
+
+async def test_per_upstream_pricing(facilitator):
+    weather, maps = Upstream(), Upstream()
+
+    async def route(request):
+        if request.url.host == "maps.internal":
+            return await maps.handle(request)
+        return await weather.handle(request)
+
+    gateway = Gateway(transport=httpx.MockTransport(route))
+    gateway.add(["/weather", "/weather/*"], "http://weather.internal", "$0.01", PAY_TO)
+    gateway.add("regex:^/maps/\\d+$", "http://maps.internal", "$0.05", PAY_TO)
+    gateway.add("/*", "http://weather.internal")
+
+    async with client(gateway) as http:
+        response = await http.get("/weather")
+        assert response.json()["accepts"][0]["maxAmountRequired"] == "10000"
+        response = await http.get("/maps/7")
+        assert response.json()["accepts"][0]["maxAmountRequired"] == "50000"
+        assert (await http.get("/maps/x")).status_code == 200
+
+        assert (await pay(http, "/maps/7")).status_code == 200
+    assert len(maps.requests) == 1
+    assert len(weather.requests) == 1
+
+
+async def test_upstream_failure_is_not_settled(facilitator):
+    calls, settle_result = facilitator
+    upstream = Upstream(status=500)
+    gateway = Gateway(transport=upstream.transport)
+    gateway.add("/paid", "http://legacy.internal", "$0.01", PAY_TO)
+
+    async with client(gateway) as http:
+        response = await pay(http, "/paid")
+        assert response.status_code == 500
+        assert "X-PAYMENT-RESPONSE" not in response.headers
+        assert calls == ["verify"]
+
+        upstream.status = 200
+        settle_result.update(success=False, errorReason="insufficient_funds")
+        response = await pay(http, "/paid")
+        assert response.status_code == 402
+        assert response.json()["error"] == "Settle failed: insufficient_funds"
+    assert calls == ["verify", "verify", "settle"]
+
+
+@pytest.mark.parametrize(
+    "error, status",
+    [
+        (httpx.ConnectError("refused"), 502),
+        (httpx.ReadTimeout("slow"), 504),
+    ],
+)
+async def test_unreachable_upstream(facilitator, error, status):
+    calls, _ = facilitator
+    metrics = InMemoryMetrics()
+    gateway = Gateway(transport=Upstream(error=error).transport, metrics=metrics)
+    gateway.add("/paid", "http://legacy.internal", "$0.01", PAY_TO)
+
+    async with client(gateway) as http:
+        response = await pay(http, "/paid")
+    assert response.status_code == status
+    assert calls == ["verify"]
+    assert metrics.counter("server", "not_settled") == 1
+
+
+async def test_streams_response_chunks():
+    chunks = [b"x" * 1024 for _ in range(8)]
+    gateway = Gateway({"/*": "http://legacy.internal"})
+    gateway._upstream._options["transport"] = Upstream(chunks=chunks).transport
+
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/file",
+        "raw_path": b"/file",
+        "query_string": b"",
+        "headers": [(b"host", b"gateway")],
+        "client": ("127.0.0.1", 1),
+        "server": ("gateway", 80),
+    }
+    await gateway(scope, receive, send)
+    pooled = gateway._upstream.get()
+    await gateway(scope, receive, send)
+    assert gateway._upstream.get() is pooled
+
+    bodies = [message["body"] for message in messages[1:9]]
+    assert messages[0]["status"] == 200
+    assert bodies == chunks
+    assert messages[9] == {"type": "http.response.body", "body": b""}
+    await gateway.aclose()
+
+
+@pytest.mark.parametrize(
+    "raw_path, path",
+    [
+        (b"/public/../premium/data", "/public/../premium/data"),
+        (b"/public/%2e%2e/premium/data", "/public/../premium/data"),
+        (b"/public/%2E%2E%2Fpremium/data", "/public/../premium/data"),
+        (b"/premium/./data", "/premium/./data"),
+    ],
+)
+async def test_rejects_dot_segments(facilitator, raw_path, path):
+    calls, _ = facilitator
+    upstream = Upstream()
+    gateway = Gateway(transport=upstream.transport)
+    gateway.add("/premium/*", "http://legacy.internal", "$0.01", PAY_TO)
+    gateway.add("/public/*", "http://legacy.internal")
+
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": raw_path,
+        "query_string": b"",
+        "headers": [(b"host", b"gateway")],
+        "client": ("127.0.0.1", 1),
+        "server": ("gateway", 80),
+    }
+    await gateway(scope, receive, send)
+    assert messages[0]["status"] == 400
+    assert upstream.requests == []
+    assert calls == []
+
+
+def test_add_validates_routes():
+    gateway = Gateway()
+    with pytest.raises(ValueError, match="Invalid upstream"):
+        gateway.add("/*", "legacy.internal")
+    with pytest.raises(ValueError, match="pay_to_address"):
+        gateway.add("/*", "http://legacy.internal", "$0.01")
+    with pytest.raises(ValueError, match="Invalid price"):
+        gateway.add("/*", "http://legacy.internal", "free", PAY_TO)
+    assert gateway.routes == []
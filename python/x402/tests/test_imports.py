@@ -0,0 +1,86 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Cumulative `python -X importtime` budgets in milliseconds. They are several
+# times the measured cost so that slow CI machines pass, while an eager import
+# of eth_account (most of a second on its own) still fails them.
+IMPORT_BUDGETS_MS = {
+    "x402": 100,
+    "x402.encoding": 150,
+    "x402.clients": 100,
+    "x402.exact": 700,
+}
+
+# Heavy modules each entry point must not import
+FORBIDDEN_IMPORTS = {
+    "x402": ["eth_account", "eth_utils", "pydantic", "httpx", "requests", "fastapi"],
+    "x402.encoding": ["eth_account", "eth_utils", "pydantic", "httpx"],
+    "x402.clients": ["eth_account", "httpx", "requests"],
+    "x402.exact": ["eth_account", "httpx", "requests", "fastapi", "flask"],
+    "x402.clients.httpx": ["eth_account", "requests", "fastapi", "flask"],
+    "x402.clients.requests": ["eth_account", "httpx", "fastapi", "flask"],
+    "x402.clients.remote_signer": ["eth_account", "httpx", "requests", "fastapi"],
+    "x402.flask.middleware": ["eth_account", "requests", "fastapi"],
+    "x402.fastapi.middleware": ["eth_account", "requests", "flask"],
+}
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    return subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, env=env, check=True
+    )
+
+
+def import_time_ms(module: str) -> float:
+    """Return the cumulative import time of module in a fresh interpreter."""
+    stderr = run_python("-X", "importtime", "-c", f"import {module}").stderr
+    for line in stderr.splitlines():
+        _, _, cumulative, name = (
+            part.strip() for part in line.replace(":", "|").split("|")
+        )
+        if name == module:
+            return int(cumulative) / 1000
+    raise AssertionError(f"{module} not found in importtime output")
+
+
+@pytest.mark.parametrize("module,budget_ms", IMPORT_BUDGETS_MS.items())
+def test_import_time_budget(module, budget_ms):
+    # Best of three, as a single run is at the mercy of the disk cache
+    elapsed_ms = min(import_time_ms(module) for _ in range(3))
+    assert elapsed_ms < budget_ms, f"import {module} took {elapsed_ms:.0f}ms"
+
+
+@pytest.mark.parametrize("module,forbidden", FORBIDDEN_IMPORTS.items())
+def test_no_heavy_imports(module, forbidden):
+    code = f"import json, sys, {module}; print(json.dumps(sorted(sys.modules)))"
+    loaded = set(json.loads(run_python("-c", code).stdout))
+    assert not loaded & set(forbidden)
+
+
+def test_lazy_exports():
+    code = (
+        "import sys, x402.clients; "
+        "assert 'x402.clients.requests' not in sys.modules; "
+        "from x402.clients import x402HttpxClient, x402Client; "
+        "assert 'x402.clients.requests' not in sys.modules; "
+        "assert x402HttpxClient.__name__ == 'x402HttpxClient'; "
+        "import x402; assert x402.encoding.json_dumps({}) == b'{}'"
+    )
+    run_python("-c", code)
+
+
+def test_unknown_attributes():
+    import x402
+    import x402.clients
+
+    with pytest.raises(AttributeError):
+        x402.missing
+    with pytest.raises(AttributeError):
+        x402.clients.missing
+    assert set(x402.clients.__all__) <= set(dir(x402.clients))
+    assert sorted(x402.clients.__all__) == sorted(x402.clients._EXPORTS)
@@ -0,0 +1,181 @@
+import csv
+import dataclasses
+import os
+
+import pytest
+from x402.events import SETTLED, VERIFIED, EventBus, PaymentEvent
+from x402.journal import CSV_COLUMNS, SettlementJournal, SettlementRecord
+from x402.wire import WirePaymentRequirements
+
+
+def record(i, payer=None):
+    return SettlementRecord(
+        transaction=f"0x{i:064x}",
+        payer=payer or f"0x{i % 3:040x}",
+        amount=str(1000 * i),
+        asset="0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+        network="base-sepolia",
+        pay_to="0x0000000000000000000000000000000000000001",
+        resource=f"https://example.com/{i}",
+        timestamp=1700000000.0 + i,
+    )
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "settlements.x402j"
+
+
+def test_append_and_lookup(path):
+    with SettlementJournal(path) as journal:
+        for i in range(10):
+            assert journal.append(record(i))
+        assert len(journal) == 10
+        assert journal.by_transaction(f"0x{4:064X}") == record(4)
+        assert journal.by_transaction("0x1234") is None
+        assert [r.transaction for r in journal.by_payer(f"0x{1:040x}")] == [
+            record(i).transaction for i in (7, 4, 1)
+        ]
+        assert list(journal.by_payer("0xunknown")) == []
+        assert list(journal) == [record(i) for i in range(10)]
+
+        # Transactions are journaled once
+        assert not journal.append(record(4))
+        assert len(journal) == 10
+
+
+def test_settlements_without_transaction(path):
+    first = dataclasses.replace(record(1), transaction="")
+    second = dataclasses.replace(record(4), transaction="")
+    with SettlementJournal(path) as journal:
+        assert journal.append(first)
+        assert journal.append(second)
+        assert journal.append(record(7))
+        assert journal.by_transaction("") is None
+        assert list(journal.by_payer(first.payer)) == [record(7), second, first]
+    os.remove(path.with_name(path.name + ".idx"))
+
+    # The rebuilt index keeps them too
+    with SettlementJournal(path) as journal:
+        assert len(journal) == 3
+        assert list(journal.by_payer(first.payer)) == [record(7), second, first]
+
+
+def test_reopen_uses_index(path):
+    with SettlementJournal(path) as journal:
+        for i in range(5):
+            journal.append(record(i))
+    index_mtime = os.stat(path.with_name(path.name + ".idx")).st_mtime_ns
+
+    with SettlementJournal(path) as journal:
+        assert len(journal) == 5
+        assert journal.by_transaction(record(3).transaction) == record(3)
+        journal.append(record(5))
+        assert [r.amount for r in journal.by_payer(record(2).payer)] == ["5000", "2000"]
+    assert os.stat(path.with_name(path.name + ".idx")).st_mtime_ns >= index_mtime
+
+
+def test_index_grows(path):
+    with SettlementJournal(path) as journal:
+        for i in range(3000):
+            journal.append(record(i, payer=f"0x{i % 700:040x}"))
+        assert len(journal) == 3000
+        assert all(
+            journal.by_transaction(record(i).transaction).amount == str(1000 * i)
+            for i in range(0, 3000, 7)
+        )
+        assert len(list(journal.by_payer(f"0x{5:040x}"))) == 5
+
+
+def test_torn_tail_is_truncated(path):
+    with SettlementJournal(path) as journal:
+        for i in range(3):
+            journal.append(record(i))
+    size = os.path.getsize(path)
+    with open(path, "ab") as f:
+        f.write(b"\x40\x00\x00\x00partial")
+
+    with SettlementJournal(path) as journal:
+        assert os.path.getsize(path) == size
+        assert len(journal) == 3
+        journal.append(record(3))
+        assert list(journal)[-1] == record(3)
+
+
+def test_corrupt_record_and_missing_index(path):
+    with SettlementJournal(path) as journal:
+        for i in range(3):
+            journal.append(record(i))
+    # Flip a byte in the last record
+    with open(path, "r+b") as f:
+        f.seek(-6, os.SEEK_END)
+        byte = f.read(1)
+        f.seek(-6, os.SEEK_END)
+        f.write(bytes([byte[0] ^ 0xFF]))
+    os.remove(path.with_name(path.name + ".idx"))
+
+    with SettlementJournal(path) as journal:
+        assert len(journal) == 2
+        assert journal.by_transaction(record(2).transaction) is None
+        assert journal.by_transaction(record(1).transaction) == record(1)
+
+
+def test_not_a_journal(path):
+    path.write_bytes(b"something else")
+    with pytest.raises(ValueError):
+        SettlementJournal(path)
+
+
+def test_records_settled_events(path):
+    requirements = WirePaymentRequirements(
+        scheme="exact",
+        network="base-sepolia",
+        max_amount_required="10000",
+        resource="https://example.com/paid",
+        description="",
+        mime_type="",
+        pay_to="0x0000000000000000000000000000000000000001",
+        max_timeout_seconds=60,
+        asset="0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+    )
+    events = EventBus()
+    with SettlementJournal(path) as journal:
+        journal.subscribe(events)
+        events.emit(PaymentEvent(VERIFIED, "https://example.com/paid"))
+        events.emit(
+            PaymentEvent(
+                SETTLED,
+                "https://example.com/paid",
+                requirements=requirements,
+                payer="0xpayer",
+                transaction="0xabc",
+            )
+        )
+        assert events.flush(timeout=5)
+        events.close()
+        settlement = journal.by_transaction("0xabc")
+    assert settlement.amount == "10000"
+    assert settlement.payer == "0xpayer"
+    assert settlement.resource == "https://example.com/paid"
+
+
+def test_export_csv(path, tmp_path):
+    with SettlementJournal(path) as journal:
+        for i in range(3):
+            journal.append(record(i))
+        assert journal.export_csv(tmp_path / "out.csv") == 3
+    with open(tmp_path / "out.csv", newline="") as f:
+        rows = list(csv.reader(f))
+    assert tuple(rows[0]) == CSV_COLUMNS
+    assert rows[2][:3] == ["1700000001.0", record(1).transaction, record(1).payer]
+
+
+def test_export_parquet(path, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    with SettlementJournal(path) as journal:
+        for i in range(5):
+            journal.append(record(i))
+        assert journal.export_parquet(tmp_path / "out.parquet", batch_size=2) == 5
+    table = pq.read_table(tmp_path / "out.parquet")
+    assert table.num_rows == 5
+    assert table.column("amount").to_pylist() == [str(1000 * i) for i in range(5)]
@@ -0,0 +1,60 @@
+import time
+
+from x402.metrics import Histogram, InMemoryMetrics, MetricsHook, PhaseTimer
+
+
+def test_phase_timer_laps():
+    metrics = InMemoryMetrics()
+    timer = PhaseTimer(metrics, "server")
+    timer.lap("match")
+    time.sleep(0.01)
+    assert timer.lap("verify") >= 0.01
+    timer.finish("settled")
+
+    assert list(timer.durations) == ["match", "verify"]
+    assert metrics.histogram("server", "verify").count == 1
+    assert metrics.histogram("server", "settle") is None
+    assert metrics.counter("server", "settled") == 1
+
+    header = timer.server_timing()
+    assert header.startswith("x402-match;dur=")
+    assert ", x402-verify;dur=1" in header
+
+
+def test_phase_timer_without_hook():
+    timer = PhaseTimer(None, "client")
+    timer.lap("sign")
+    timer.finish("paid")
+    assert isinstance(timer.hook, MetricsHook)
+
+
+def test_histogram_buckets_are_inclusive():
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+    assert histogram.cumulative() == [(0.1, 2), (1.0, 3), (float("inf"), 4)]
+    assert histogram.count == 4
+    assert histogram.sum == 2.65
+
+
+def test_render_prometheus():
+    metrics = InMemoryMetrics(buckets=(0.01, 0.1))
+    metrics.observe("server", "verify", 0.05)
+    metrics.count("server", "settled")
+    metrics.count("server", "settled")
+
+    assert metrics.render().splitlines() == [
+        "# HELP x402_phase_duration_seconds Duration of x402 payment handling phases.",
+        "# TYPE x402_phase_duration_seconds histogram",
+        'x402_phase_duration_seconds_bucket{side="server",phase="verify",le="0.01"} 0',
+        'x402_phase_duration_seconds_bucket{side="server",phase="verify",le="0.1"} 1',
+        'x402_phase_duration_seconds_bucket{side="server",phase="verify",le="+Inf"} 1',
+        'x402_phase_duration_seconds_sum{side="server",phase="verify"} 0.05',
+        'x402_phase_duration_seconds_count{side="server",phase="verify"} 1',
+        "# HELP x402_payments_total Payments handled by outcome.",
+        "# TYPE x402_payments_total counter",
+        'x402_payments_total{side="server",outcome="settled"} 2',
+    ]
+
+    metrics.reset()
+    assert metrics.counter("server", "settled") == 0
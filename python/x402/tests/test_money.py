@@ -0,0 +1,113 @@
+from decimal import Decimal
+
+import pytest
+from x402.common import process_price_to_atomic_amount
+from x402.money import ROUNDING_MODES, parse_amount, parse_amounts
+
+
+@pytest.mark.parametrize(
+    "amount,decimals,expected",
+    [
+        ("$0.01", 6, 10000),
+        ("0.001", 6, 1000),
+        ("1", 6, 1000000),
+        ("$1.12", 6, 1120000),
+        (".5", 6, 500000),
+        ("5.", 6, 5000000),
+        (" 3.10 ", 6, 3100000),
+        ("0.000001", 6, 1),
+        ("1e-6", 6, 1),
+        ("2.5E3", 6, 2500000000),
+        ("123456789.123456789123456789", 18, 123456789123456789123456789),
+        ("0", 0, 0),
+        (3, 6, 3000000),
+        (0.1, 6, 100000),
+        (1e-06, 6, 1),
+    ],
+)
+def test_parse_amount(amount, decimals, expected):
+    assert parse_amount(amount, decimals) == expected
+
+
+@pytest.mark.parametrize(
+    "amount,rounding,expected",
+    [
+        ("0.0000005", "down", 0),
+        ("0.0000005", "up", 1),
+        ("0.0000005", "half_up", 1),
+        ("0.0000005", "half_even", 0),
+        ("0.0000015", "half_even", 2),
+        ("0.0000014", "half_up", 1),
+        ("0.00000151", "half_even", 2),
+        ("0.0000019", "down", 1),
+        ("0.0000011", "up", 2),
+        ("0.0000010", "exact", 1),
+    ],
+)
+def test_rounding(amount, rounding, expected):
+    assert parse_amount(amount, 6, rounding) == expected
+
+
+@pytest.mark.parametrize("rounding", sorted(ROUNDING_MODES - {"exact"}))
+def test_rounding_matches_decimal(rounding):
+    modes = {
+        "down": "ROUND_DOWN",
+        "up": "ROUND_UP",
+        "half_up": "ROUND_HALF_UP",
+        "half_even": "ROUND_HALF_EVEN",
+    }
+    for numerator in range(0, 2000, 7):
+        amount = f"0.{numerator:07d}"
+        expected = int(
+            (Decimal(amount) * 10**6).quantize(Decimal(1), rounding=modes[rounding])
+        )
+        assert parse_amount(amount, 6, rounding) == expected
+
+
+def test_precision_loss_is_rejected():
+    with pytest.raises(ValueError, match="more precision"):
+        parse_amount("$0.0000001", 6)
+    with pytest.raises(ValueError, match="more precision"):
+        parse_amount("1.5", 0)
+
+
+@pytest.mark.parametrize(
+    "amount",
+    ["", "$", ".", "-1", "1,000", "1.2.3", "abc", "$$1", "1e", "1e1000", "nan", -1],
+)
+def test_invalid_amounts(amount):
+    with pytest.raises(ValueError):
+        parse_amount(amount, 6)
+
+
+@pytest.mark.parametrize("amount", [True, None, b"1", float("inf")])
+def test_invalid_amount_types(amount):
+    with pytest.raises(ValueError):
+        parse_amount(amount, 6)
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError, match="decimals"):
+        parse_amount("1", -1)
+    with pytest.raises(ValueError, match="decimals"):
+        parse_amount("1", 256)
+    with pytest.raises(ValueError, match="rounding"):
+        parse_amount("1", 6, "nearest")
+
+
+def test_parse_amounts():
+    catalog = ["$0.01", "0.01", 2, 0.5, "$0.01", "1e-6"]
+    assert parse_amounts(catalog, 6) == [parse_amount(a, 6) for a in catalog]
+    assert parse_amounts(iter(["0.0000015"]), 6, "half_even") == [2]
+    assert parse_amounts([], 6) == []
+
+
+def test_parse_amounts_reports_index():
+    with pytest.raises(ValueError, match="index 2"):
+        parse_amounts(["1", "2", "0.0000001"], 6)
+
+
+def test_process_price_rejects_precision_loss():
+    assert process_price_to_atomic_amount("$0.000001", "base-sepolia")[0] == "1"
+    with pytest.raises(ValueError, match="more precision"):
+        process_price_to_atomic_amount("$0.0000001", "base-sepolia")
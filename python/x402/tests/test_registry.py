@@ -0,0 +1,209 @@
+import json
+
+import pytest
+from x402 import registry
+from x402.chains import (
+    KNOWN_TOKENS,
+    NETWORK_TO_ID,
+    get_chain_id,
+    get_token_decimals,
+    get_token_name,
+    get_token_version,
+)
+from x402.common import get_usdc_address, process_price_to_atomic_amount
+from x402.registry import BUILTIN_REGISTRY, TokenRegistry, get_registry
+from x402.types import PaymentRequirements
+from x402.wire import WirePaymentRequirements
+
+SEI_TESTNET_USDC = "0xeAcd10aaA6f362a94823df6BBC3C536841870772"
+SEI_CONFIG = {
+    "networks": {"sei-testnet": 1328},
+    "tokens": {
+        "1328": [
+            {
+                "human_name": "usdc",
+                "address": SEI_TESTNET_USDC,
+                "name": "USDC",
+                "decimals": 6,
+                "version": "2",
+            }
+        ]
+    },
+}
+
+
+@pytest.fixture
+def sei_registry(tmp_path):
+    path = tmp_path / "registry.json"
+    path.write_text(json.dumps(SEI_CONFIG))
+    previous = get_registry()
+    try:
+        yield registry.load_registry_file(path)
+    finally:
+        registry.set_registry(previous)
+
+
+def test_builtin_lookups():
+    assert get_chain_id("base-sepolia") == "84532"
+    assert get_chain_id("84532") == "84532"
+    assert get_usdc_address(84532) == "0x036CbD53842c5426634e7929541eC2318f3dCF7e"
+    assert get_usdc_address("8453") == "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913"
+    assert get_token_name("8453", "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913") == (
+        "USD Coin"
+    )
+    assert get_token_version("43114", "0xB97EF9Ef8734C71904D8002F8b6Bc66Dd9c48a6E") == (
+        "2"
+    )
+    assert (
+        get_token_decimals("43113", "0x5425890298aed601595a70AB815c96711a31Bc65") == 6
+    )
+
+
+def test_compatibility_tables():
+    assert NETWORK_TO_ID == {
+        "base-sepolia": "84532",
+        "base": "8453",
+        "avalanche-fuji": "43113",
+        "avalanche": "43114",
+    }
+    assert KNOWN_TOKENS["84532"][0]["address"] == (
+        "0x036CbD53842c5426634e7929541eC2318f3dCF7e"
+    )
+
+
+def test_addresses_match_in_any_case():
+    address = "0x036CbD53842c5426634e7929541eC2318f3dCF7e"
+    assert get_token_name("84532", address.lower()) == "USDC"
+    assert get_token_name(84532, address.upper().replace("0X", "0x")) == "USDC"
+
+
+def test_unknown_lookups():
+    with pytest.raises(ValueError, match="Unsupported network"):
+        get_chain_id("sei")
+    with pytest.raises(ValueError, match="Unsupported chain ID"):
+        get_usdc_address(1)
+    with pytest.raises(ValueError, match="Token not found"):
+        get_token_name("84532", "0x" + "00" * 20)
+    with pytest.raises(ValueError):
+        get_registry().network(1)
+
+
+def test_registry_round_trips():
+    builtin = TokenRegistry.from_dict(BUILTIN_REGISTRY)
+    assert builtin.to_dict() == BUILTIN_REGISTRY
+    assert builtin.network(8453) == "base"
+    assert [token.human_name for token in builtin.tokens(8453)] == ["usdc"]
+    assert builtin.tokens(1) == ()
+
+
+def test_registry_is_immutable():
+    builtin = get_registry()
+    extended = builtin.extend(SEI_CONFIG)
+    assert not builtin.has_network("sei-testnet")
+    assert extended.has_network("sei-testnet")
+    with pytest.raises(TypeError):
+        builtin.networks["sei-testnet"] = 1328
+    token = extended.token(1328, SEI_TESTNET_USDC)
+    with pytest.raises(AttributeError):
+        token.decimals = 18
+
+
+def test_extend_overrides_token_by_name():
+    address = "0x" + "ab" * 20
+    extended = get_registry().extend(
+        {
+            "tokens": {
+                "8453": [
+                    {
+                        "human_name": "USDC",
+                        "address": address,
+                        "name": "Other",
+                        "decimals": 6,
+                        "version": "1",
+                    }
+                ]
+            }
+        }
+    )
+    assert extended.token_by_name(8453, "usdc").address == address
+    # The replaced token can still be looked up by address
+    assert extended.token(8453, "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913").name == (
+        "USD Coin"
+    )
+    # and precedence survives further extension
+    assert extended.extend({}).token_by_name(8453, "usdc").address == address
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        [],
+        {"networks": []},
+        {"networks": {"sei": "mainnet"}},
+        {"networks": {"sei": 0}},
+        {"tokens": {"1328": {}}},
+        {"tokens": {"sei": []}},
+        {"tokens": {"1328": [{"address": SEI_TESTNET_USDC}]}},
+        {"tokens": {"1328": [{**SEI_CONFIG["tokens"]["1328"][0], "address": "0x1"}]}},
+        {"tokens": {"1328": [{**SEI_CONFIG["tokens"]["1328"][0], "decimals": "6"}]}},
+        {"tokens": {"1328": [{**SEI_CONFIG["tokens"]["1328"][0], "version": 2}]}},
+    ],
+)
+def test_invalid_config(config):
+    with pytest.raises(ValueError):
+        TokenRegistry.from_dict(config)
+
+
+def test_invalid_config_file(tmp_path):
+    path = tmp_path / "registry.json"
+    path.write_text("{")
+    with pytest.raises(ValueError, match="Invalid registry config file"):
+        TokenRegistry.from_file(path)
+
+
+def test_config_file_network(sei_registry):
+    assert get_registry() is sei_registry
+    assert get_chain_id("sei-testnet") == "1328"
+    assert process_price_to_atomic_amount("$0.01", "sei-testnet") == (
+        "10000",
+        SEI_TESTNET_USDC,
+        {"name": "USDC", "version": "2"},
+    )
+
+    requirements = PaymentRequirements(
+        scheme="exact",
+        network="sei-testnet",
+        asset=SEI_TESTNET_USDC,
+        pay_to="0x0000000000000000000000000000000000000000",
+        max_amount_required="10000",
+        resource="https://example.com",
+        description="test",
+        max_timeout_seconds=60,
+        mime_type="text/plain",
+    )
+    wire = WirePaymentRequirements.from_dict(requirements.model_dump(by_alias=True))
+    assert wire.network == "sei-testnet"
+
+
+def test_unregistered_network_is_rejected():
+    with pytest.raises(ValueError):
+        PaymentRequirements(
+            scheme="exact",
+            network="sei-testnet",
+            asset=SEI_TESTNET_USDC,
+            pay_to="0x0000000000000000000000000000000000000000",
+            max_amount_required="10000",
+            resource="https://example.com",
+            description="test",
+            max_timeout_seconds=60,
+            mime_type="text/plain",
+        )
+
+
+def test_registry_file_environment(tmp_path, monkeypatch):
+    path = tmp_path / "registry.json"
+    path.write_text(json.dumps(SEI_CONFIG))
+    monkeypatch.setenv(registry.REGISTRY_FILE_ENV, str(path))
+    monkeypatch.setattr(registry, "_registry", None)
+    assert get_registry().chain_id("sei-testnet") == 1328
+    assert get_registry().chain_id("base") == 8453
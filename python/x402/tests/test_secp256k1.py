@@ -0,0 +1,79 @@
+import secrets
+
+import pytest
+from eth_account import Account
+from x402 import secp256k1
+from x402.secp256k1 import (
+    CoincurveBackend,
+    EthKeysBackend,
+    load_backend,
+    public_key_to_address,
+)
+
+
+def available_backends():
+    backends = [
+        EthKeysBackend(),
+        EthKeysBackend("eth_keys.backends.NativeECCBackend"),
+    ]
+    try:
+        backends.append(CoincurveBackend())
+    except ImportError:
+        pass
+    return backends
+
+
+@pytest.fixture
+def account():
+    return Account.create()
+
+
+@pytest.mark.parametrize("backend", available_backends(), ids=lambda b: b.name)
+def test_backend_matches_eth_account(backend, account):
+    for _ in range(5):
+        digest = secrets.token_bytes(32)
+        expected = account.unsafe_sign_hash(digest).signature
+
+        signature = backend.sign_digest(bytes(account.key), digest)
+        assert signature == expected
+        key = backend.load_private_key(bytes(account.key))
+        assert backend.sign_digest(key, digest) == expected
+
+        public_key = backend.recover_public_key(digest, signature)
+        assert public_key_to_address(public_key) == account.address
+
+        # Recovery ids 0/1 are accepted as well as 27/28
+        raw = signature[:64] + bytes([signature[64] - 27])
+        assert backend.recover_public_key(digest, raw) == public_key
+
+
+@pytest.mark.parametrize("backend", available_backends(), ids=lambda b: b.name)
+def test_backend_rejects_malformed_input(backend, account):
+    with pytest.raises(ValueError):
+        backend.sign_digest(bytes(account.key), b"\x00" * 31)
+    with pytest.raises(ValueError):
+        backend.recover_public_key(b"\x00" * 32, b"\x00" * 64)
+    with pytest.raises(ValueError):
+        backend.recover_public_key(b"\x00" * 32, b"\x00" * 64 + b"\x05")
+
+
+def test_load_backend():
+    with pytest.raises(ValueError):
+        load_backend("unknown")
+    assert isinstance(load_backend("eth_keys"), EthKeysBackend)
+    assert load_backend().name in ("coincurve", "eth_keys")
+
+
+def test_backend_selection_from_environment(monkeypatch):
+    monkeypatch.setenv("X402_SECP256K1_BACKEND", "eth_keys")
+    secp256k1.set_backend(None)
+    try:
+        assert isinstance(secp256k1.get_backend(), EthKeysBackend)
+    finally:
+        secp256k1.set_backend(None)
+
+
+def test_recover_address(account):
+    digest = secrets.token_bytes(32)
+    signature = secp256k1.sign_digest(bytes(account.key), digest)
+    assert secp256k1.recover_address(digest, signature) == account.address
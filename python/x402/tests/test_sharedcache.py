@@ -0,0 +1,151 @@
+import multiprocessing
+
+import pytest
+from x402.sharedcache import PaymentCache, SharedCache
+from x402.wire import (
+    WireAuthorization,
+    WirePaymentPayload,
+    WirePaymentRequirements,
+    WireVerifyResponse,
+)
+
+NOW = 1_700_000_000.0
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "x402-cache"
+
+
+def test_get_set_add_delete(path):
+    with SharedCache(path, slots=1024, stripes=4) as cache:
+        assert cache.get(b"a") is None
+        cache.set(b"a", b"1", ttl=10)
+        assert cache.get(b"a") == b"1"
+        cache.set(b"a", b"22", ttl=10)
+        assert cache.get(b"a") == b"22"
+
+        assert not cache.add(b"a", b"3", ttl=10)
+        assert cache.add(b"b", b"3", ttl=10)
+        assert cache.get(b"b") == b"3"
+
+        assert cache.delete(b"a")
+        assert not cache.delete(b"a")
+        assert cache.get(b"a") is None
+        assert cache.stats() == {"hits": 3, "misses": 2, "evictions": 0}
+
+        cache.clear()
+        assert cache.get(b"b") is None
+
+        with pytest.raises(ValueError):
+            cache.set(b"c", bytes(97), ttl=10)
+
+
+def test_entries_expire(path):
+    with SharedCache(path, slots=1024, stripes=4) as cache:
+        cache.set(b"a", b"1", ttl=10, now=NOW)
+        assert cache.get(b"a", now=NOW + 9) == b"1"
+        assert cache.get(b"a", now=NOW + 10) is None
+        # An expired entry no longer blocks add
+        assert cache.add(b"a", b"2", ttl=10, now=NOW + 10)
+        assert cache.get(b"a", now=NOW + 11) == b"2"
+
+
+def test_full_table_evicts_earliest_expiry(path):
+    with SharedCache(path, slots=8, stripes=1) as cache:
+        for i in range(8):
+            cache.set(b"%d" % i, b"x", ttl=100 + i, now=NOW)
+        cache.set(b"new", b"y", ttl=100, now=NOW)
+        assert cache.stats()["evictions"] == 1
+        assert cache.get(b"0", now=NOW) is None
+        assert cache.get(b"new", now=NOW) == b"y"
+        assert all(cache.get(b"%d" % i, now=NOW) == b"x" for i in range(1, 8))
+
+
+def test_files_are_shared(path):
+    first = SharedCache(path, slots=1024, stripes=4)
+    second = SharedCache(path, slots=1024, stripes=4)
+    first.set(b"a", b"1", ttl=10)
+    assert second.get(b"a") == b"1"
+    assert not second.add(b"a", b"2", ttl=10)
+    first.close()
+    second.close()
+
+    with pytest.raises(ValueError):
+        SharedCache(path, slots=2048, stripes=4)
+
+
+def _claim_all(path, keys, queue):
+    with SharedCache(path, slots=4096, stripes=8) as cache:
+        queue.put([key for key in keys if cache.add(key, b"1", ttl=60)])
+
+
+def test_add_is_atomic_across_processes(path):
+    SharedCache(path, slots=4096, stripes=8).close()
+    keys = [b"key%d" % i for i in range(500)]
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    workers = [
+        context.Process(target=_claim_all, args=(path, keys, queue)) for _ in range(4)
+    ]
+    for worker in workers:
+        worker.start()
+    claimed = [key for _ in workers for key in queue.get(timeout=60)]
+    for worker in workers:
+        worker.join()
+    assert sorted(claimed) == sorted(keys)
+
+
+def payment(nonce="0x01", valid_before=NOW + 60):
+    return WirePaymentPayload(
+        x402_version=1,
+        scheme="exact",
+        network="base-sepolia",
+        signature="0xsig",
+        authorization=WireAuthorization(
+            from_="0xA",
+            to="0x0000000000000000000000000000000000000001",
+            value="10000",
+            valid_after="0",
+            valid_before=str(int(valid_before)),
+            nonce=nonce,
+        ),
+    )
+
+
+REQUIREMENTS = WirePaymentRequirements(
+    scheme="exact",
+    network="base-sepolia",
+    max_amount_required="10000",
+    resource="https://example.com/weather",
+    description="",
+    mime_type="",
+    pay_to="0x0000000000000000000000000000000000000001",
+    max_timeout_seconds=60,
+    asset="0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+)
+
+
+def test_payment_cache(path):
+    worker1 = PaymentCache(path, slots=1024)
+    worker2 = PaymentCache(path, slots=1024)
+
+    assert worker2.verify_result(payment(), REQUIREMENTS) is None
+    worker1.store_verify_result(
+        payment(), REQUIREMENTS, WireVerifyResponse(True, payer="0xA")
+    )
+    assert worker2.verify_result(payment(), REQUIREMENTS) == WireVerifyResponse(
+        True, payer="0xA"
+    )
+    assert worker2.verify_result(payment("0x02"), REQUIREMENTS) is None
+
+    assert worker1.claim(payment(), REQUIREMENTS)
+    assert not worker2.claim(payment(), REQUIREMENTS)
+    assert worker2.claim(payment("0x02"), REQUIREMENTS)
+    worker1.release(payment(), REQUIREMENTS)
+    assert worker2.claim(payment(), REQUIREMENTS)
+    worker2.settled(payment(), REQUIREMENTS)
+    assert not worker1.claim(payment(), REQUIREMENTS)
+
+    worker1.close()
+    worker2.close()
@@ -0,0 +1,111 @@
+import json
+
+import pytest
+from x402.templates import PaymentRequirementsTemplate
+from x402.types import PaymentRequirements
+from x402.wire import WirePaymentRequirements
+
+
+@pytest.fixture
+def payment_requirements():
+    return PaymentRequirements(
+        scheme="exact",
+        network="base-sepolia",
+        asset="0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+        pay_to="0x0000000000000000000000000000000000000000",
+        max_amount_required="10000",
+        resource="https://example.com",
+        description="test",
+        max_timeout_seconds=1000,
+        mime_type="text/plain",
+        output_schema={"type": "object"},
+        extra={"name": "USD Coin", "version": "2"},
+    )
+
+
+def test_payment_required_body_matches_models(payment_requirements):
+    template = PaymentRequirementsTemplate([payment_requirements])
+    body = json.loads(template.payment_required_body("https://example.com", "nope"))
+    assert body == {
+        "x402Version": 1,
+        "accepts": [payment_requirements.model_dump(by_alias=True)],
+        "error": "nope",
+    }
+
+
+def test_payment_required_body_fills_resource(payment_requirements):
+    other = payment_requirements.model_copy(update={"network": "base"})
+    template = PaymentRequirementsTemplate([payment_requirements, other])
+    resource = 'https://example.com/a?q="é"'
+    error = 'Invalid payment header format: "\x00"'
+    body = json.loads(template.payment_required_body(resource, error))
+    assert [accept["resource"] for accept in body["accepts"]] == [resource] * 2
+    assert [accept["network"] for accept in body["accepts"]] == ["base-sepolia", "base"]
+    assert body["error"] == error
+
+
+def test_select(payment_requirements):
+    other = payment_requirements.model_copy(update={"network": "base"})
+    duplicate = payment_requirements.model_copy(update={"description": "second"})
+    template = PaymentRequirementsTemplate([payment_requirements, other, duplicate])
+    assert template.select("exact", "base-sepolia") == 0
+    assert template.select("exact", "base") == 1
+    assert template.select("exact", "avalanche") is None
+    assert template.select("upto", "base") is None
+
+
+def test_requirements_are_shared_for_the_compiled_resource(payment_requirements):
+    template = PaymentRequirementsTemplate([payment_requirements])
+    requirements = template.requirements(0, "https://example.com")
+    assert requirements is template.requirements(0, "https://example.com")
+    assert requirements == WirePaymentRequirements.from_model(payment_requirements)
+
+
+def test_requirements_copy_on_write(payment_requirements):
+    template = PaymentRequirementsTemplate([payment_requirements])
+    requirements = template.requirements(0, "https://example.com/other")
+    assert requirements.resource == "https://example.com/other"
+    assert template.requirements(0, "https://example.com").resource == (
+        "https://example.com"
+    )
+    assert requirements.to_dict() == {
+        **payment_requirements.model_dump(by_alias=True),
+        "resource": "https://example.com/other",
+    }
+
+
+def test_model_returns_copies(payment_requirements):
+    template = PaymentRequirementsTemplate([payment_requirements])
+    model = template.model(0, "https://example.com")
+    assert model == payment_requirements
+    model.description = "changed"
+    assert template.model(0, "https://example.com").description == "test"
+    assert template.model(0, "https://example.com/b").resource == (
+        "https://example.com/b"
+    )
+
+
+def test_model_copies_nested_objects(payment_requirements):
+    payment_requirements.output_schema = {"input": {"method": "GET"}}
+    template = PaymentRequirementsTemplate([payment_requirements])
+    for resource in ("https://example.com", "https://example.com/b"):
+        model = template.model(0, resource)
+        model.extra["name"] = "changed"
+        model.output_schema["input"]["method"] = "POST"
+
+    payment_requirements.extra["version"] = "changed"
+    model = template.model(0, "https://example.com")
+    assert model.extra == {"name": "USD Coin", "version": "2"}
+    assert model.output_schema == {"input": {"method": "GET"}}
+    assert template.requirements(0, "https://example.com").extra == model.extra
+    assert json.loads(template.payment_required_body("https://example.com", ""))[
+        "accepts"
+    ][0]["extra"] == {"name": "USD Coin", "version": "2"}
+
+
+def test_requires_one_shared_resource(payment_requirements):
+    with pytest.raises(ValueError):
+        PaymentRequirementsTemplate([])
+    other = payment_requirements.model_copy(update={"resource": "https://other.com"})
+    with pytest.raises(ValueError):
+        PaymentRequirementsTemplate([payment_requirements, other])
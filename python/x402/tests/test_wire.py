@@ -0,0 +1,136 @@
+import json
+
+import pytest
+from x402.types import (
+    PaymentPayload,
+    PaymentRequirements,
+    SettleResponse,
+    VerifyResponse,
+)
+from x402.wire import (
+    WirePaymentPayload,
+    WirePaymentRequirements,
+    WireSettleResponse,
+    WireVerifyResponse,
+)
+
+
+@pytest.fixture
+def payment_requirements():
+    return PaymentRequirements(
+        scheme="exact",
+        network="base-sepolia",
+        asset="0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+        pay_to="0x0000000000000000000000000000000000000000",
+        max_amount_required="10000",
+        resource="https://example.com",
+        description="test",
+        max_timeout_seconds=1000,
+        mime_type="text/plain",
+        output_schema={"type": "object"},
+        extra={"name": "USD Coin", "version": "2"},
+    )
+
+
+@pytest.fixture
+def payment_payload():
+    return PaymentPayload(
+        x402_version=1,
+        scheme="exact",
+        network="base-sepolia",
+        payload={
+            "signature": "0x" + "11" * 65,
+            "authorization": {
+                "from": "0x857b06519E91e3A54538791bDbb0E22373e36b66",
+                "to": "0x209693Bc6afc0C5328bA36FaF03C514EF312287C",
+                "value": "10000",
+                "validAfter": "1740672089",
+                "validBefore": "1740672154",
+                "nonce": "0x" + "22" * 32,
+            },
+        },
+    )
+
+
+def test_payment_requirements_matches_model(payment_requirements):
+    data = payment_requirements.model_dump(by_alias=True)
+    wire = WirePaymentRequirements.from_dict(data)
+    assert wire.to_dict() == data
+    assert list(wire.to_dict()) == list(data)
+    assert WirePaymentRequirements.from_model(payment_requirements) == wire
+    assert wire.to_model() == payment_requirements
+
+
+def test_payment_requirements_from_model_copies_objects(payment_requirements):
+    requirements = WirePaymentRequirements.from_model(payment_requirements)
+    requirements.extra["name"] = "changed"
+    requirements.output_schema["type"] = "array"
+    assert payment_requirements.extra["name"] == "USD Coin"
+    assert payment_requirements.output_schema == {"type": "object"}
+
+
+def test_payment_payload_matches_model(payment_payload):
+    data = payment_payload.model_dump(by_alias=True)
+    wire = WirePaymentPayload.from_dict(data)
+    assert wire.to_dict() == data
+    assert wire.authorization.from_ == payment_payload.payload.authorization.from_
+    assert WirePaymentPayload.from_model(payment_payload) == wire
+    assert wire.to_model() == payment_payload
+
+
+def test_facilitator_responses_match_models():
+    verify = {"isValid": False, "invalidReason": "expired", "payer": "0xabc"}
+    assert WireVerifyResponse.from_dict(verify).to_model() == VerifyResponse(**verify)
+
+    settle = {"success": True, "transaction": "0x12", "network": "base"}
+    wire = WireSettleResponse.from_dict(settle)
+    assert wire.to_model() == SettleResponse(**settle)
+    # Compact JSON of to_dict is what SettleResponse.model_dump_json produces
+    assert (
+        json.dumps(wire.to_dict(), separators=(",", ":"))
+        == SettleResponse(**settle).model_dump_json()
+    )
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        {"network": "unknown"},
+        {"maxAmountRequired": "1.5"},
+        {"maxAmountRequired": 10000},
+        {"maxTimeoutSeconds": True},
+        {"payTo": None},
+        {"extra": "name"},
+    ],
+)
+def test_payment_requirements_validation(payment_requirements, change):
+    data = {**payment_requirements.model_dump(by_alias=True), **change}
+    with pytest.raises(ValueError):
+        WirePaymentRequirements.from_dict(data)
+
+
+def test_payment_payload_validation(payment_payload):
+    data = payment_payload.model_dump(by_alias=True)
+    for invalid in (
+        [],
+        {**data, "x402Version": "1"},
+        {**data, "payload": {"signature": "0x"}},
+        {**data, "payload": {**data["payload"], "authorization": []}},
+        {
+            **data,
+            "payload": {
+                **data["payload"],
+                "authorization": {
+                    **data["payload"]["authorization"],
+                    "value": "ten",
+                },
+            },
+        },
+    ):
+        with pytest.raises(ValueError):
+            WirePaymentPayload.from_dict(invalid)
+
+    with pytest.raises(ValueError):
+        WireVerifyResponse.from_dict({"isValid": "yes"})
+    with pytest.raises(ValueError):
+        WireSettleResponse.from_dict([])
@@ -0,0 +1,248 @@
+import random
+import time
+
+import httpx
+import pytest
+from eth_account import Account
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from x402.clients.base import x402Client
+from x402.exact import decode_payment
+from x402.facilitator import FacilitatorClient
+from x402.fastapi.middleware import require_payment
+from x402.testing.facilitator import (
+    Latency,
+    MockFacilitatorConfig,
+    MockFacilitatorServer,
+    _parse_args,
+    create_app,
+    verify_payment,
+)
+from x402.types import PaymentPayload, PaymentRequirements
+from x402.wire import WireVerifyResponse
+
+
+@pytest.fixture
+def account():
+    return Account.create()
+
+
+@pytest.fixture
+def payment_requirements():
+    return PaymentRequirements(
+        scheme="exact",
+        network="base-sepolia",
+        asset="0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+        pay_to="0x0000000000000000000000000000000000000001",
+        max_amount_required="10000",
+        resource="https://example.com",
+        description="test",
+        max_timeout_seconds=1000,
+        mime_type="text/plain",
+        extra={"name": "USDC", "version": "2"},
+    )
+
+
+@pytest.fixture
+def body(account, payment_requirements):
+    header = x402Client(account).create_payment_header(payment_requirements, 1)
+    return {
+        "x402Version": 1,
+        "paymentPayload": decode_payment(header),
+        "paymentRequirements": payment_requirements.model_dump(by_alias=True),
+    }
+
+
+def test_latency_parse():
+    assert Latency.parse("0") == Latency()
+    assert Latency.parse("fixed:10").sample(random.Random()) == 0.01
+    uniform = Latency.parse("uniform:5,20")
+    rng = random.Random(1)
+    assert all(0.005 <= uniform.sample(rng) <= 0.02 for _ in range(100))
+    assert Latency.parse("normal:20,5").sample(rng) >= 0
+    assert Latency.parse("lognormal:20,0.5").sample(rng) > 0
+    assert Latency.parse("exponential:20").sample(rng) >= 0
+    for spec in ("slow", "fixed", "uniform:5", "fixed:-1", "normal:x,1", "fixed:inf"):
+        with pytest.raises(ValueError):
+            Latency.parse(spec)
+
+
+def test_config_validation():
+    with pytest.raises(ValueError):
+        MockFacilitatorConfig(error_rate=1.5)
+    with pytest.raises(ValueError):
+        MockFacilitatorConfig(timeout_seconds=-1)
+
+
+def test_verify_and_settle(account, body):
+    client = TestClient(create_app())
+    response = client.post("/verify", json=body)
+    assert response.json() == {
+        "isValid": True,
+        "invalidReason": None,
+        "payer": account.address,
+    }
+
+    response = client.post("/settle", json=body)
+    settlement = response.json()
+    assert settlement["success"] is True
+    assert settlement["payer"] == account.address
+    assert len(settlement["transaction"]) == 66
+
+    # The nonce is spent
+    response = client.post("/settle", json=body)
+    assert response.json()["errorReason"] == "invalid_transaction_state"
+
+    assert client.get("/stats").json() == {
+        "verify.requests": 1,
+        "verify.valid": 1,
+        "settle.requests": 2,
+        "settle.success": 1,
+        "settle.failed": 1,
+    }
+    client.post("/reset")
+    assert client.post("/settle", json=body).json()["success"] is True
+
+
+@pytest.mark.parametrize(
+    "change,reason",
+    [
+        ({"to": "0x0000000000000000000000000000000000000002"}, "signature"),
+        ({"value": "1"}, "signature"),
+        ({"validBefore": "1"}, "signature"),
+    ],
+)
+def test_tampered_payment_is_invalid(body, change, reason):
+    body["paymentPayload"]["payload"]["authorization"].update(change)
+    response = TestClient(create_app()).post("/verify", json=body)
+    assert response.json()["invalidReason"] == f"invalid_exact_evm_payload_{reason}"
+
+
+@pytest.mark.parametrize(
+    "change,reason",
+    [
+        ({"payTo": "0x0000000000000000000000000000000000000002"}, "recipient_mismatch"),
+        ({"maxAmountRequired": "20000"}, "authorization_value"),
+        ({"extra": {"name": "USD Coin", "version": "2"}}, "signature"),
+    ],
+)
+def test_mismatched_requirements_are_invalid(body, change, reason):
+    body["paymentRequirements"].update(change)
+    response = TestClient(create_app()).post("/verify", json=body)
+    assert response.json()["invalidReason"] == f"invalid_exact_evm_payload_{reason}"
+
+
+def test_expired_payment_is_invalid(account, payment_requirements):
+    payment_requirements.max_timeout_seconds = 1
+    header = x402Client(account).create_payment_header(payment_requirements, 1)
+    payment = PaymentPayload(**decode_payment(header))
+    assert verify_payment(payment, payment_requirements) == (
+        "invalid_exact_evm_payload_authorization_valid_before"
+    )
+    assert (
+        verify_payment(payment, payment_requirements, now=int(time.time()) - 3600)
+        == "invalid_exact_evm_payload_authorization_valid_after"
+    )
+    assert (
+        verify_payment(payment, payment_requirements, verify_signatures=False) is None
+    )
+
+
+def test_wrong_network_and_malformed_request(body):
+    client = TestClient(create_app())
+    body["paymentRequirements"]["network"] = "base"
+    assert client.post("/verify", json=body).json()["invalidReason"] == (
+        "invalid_network"
+    )
+    response = client.post("/verify", json={"paymentPayload": {}})
+    assert response.status_code == 400
+    assert response.json()["invalidReason"] == "invalid_payload"
+
+
+def test_fault_injection(body):
+    client = TestClient(create_app(MockFacilitatorConfig(error_rate=1.0)))
+    assert client.post("/verify", json=body).status_code == 500
+
+    client = TestClient(
+        create_app(MockFacilitatorConfig(timeout_rate=1.0, timeout_seconds=0))
+    )
+    assert client.post("/settle", json=body).status_code == 504
+
+    client = TestClient(create_app(MockFacilitatorConfig(malformed_rate=1.0, seed=1)))
+    for _ in range(10):
+        response = client.post("/verify", json=body)
+        with pytest.raises(ValueError):
+            WireVerifyResponse.from_dict(response.json())
+    assert client.get("/stats").json()["verify.malformed"] == 10
+
+
+def test_slow_settle(body):
+    config = MockFacilitatorConfig(settle_latency=Latency.parse("fixed:200"))
+    client = TestClient(create_app(config))
+    start = time.perf_counter()
+    client.post("/verify", json=body)
+    assert time.perf_counter() - start < 0.2
+    start = time.perf_counter()
+    client.post("/settle", json=body)
+    assert time.perf_counter() - start >= 0.2
+
+
+def test_cli_arguments():
+    args = _parse_args(["--latency", "uniform:1,2", "--slow-settle", "--seed", "3"])
+    assert args.latency == Latency("uniform", (1.0, 2.0))
+    assert args.slow_settle and args.verify_signatures and args.seed == 3
+    assert _parse_args(["--no-verify-signatures"]).verify_signatures is False
+
+
+async def test_server_with_facilitator_client(body):
+    with MockFacilitatorServer() as server:
+        facilitator = FacilitatorClient({"url": server.url})
+        payment = PaymentPayload(**body["paymentPayload"])
+        requirements = PaymentRequirements(**body["paymentRequirements"])
+        assert (await facilitator.verify(payment, requirements)).is_valid
+        assert (await facilitator.settle(payment, requirements)).success
+        async with httpx.AsyncClient() as client:
+            stats = (await client.get(f"{server.url}/stats")).json()
+        assert stats["settle.success"] == 1
+
+
+async def test_server_rejects_invalid_payload_with_facilitator_client(body):
+    with MockFacilitatorServer() as server:
+        facilitator = FacilitatorClient({"url": server.url})
+        payment = PaymentPayload(**body["paymentPayload"])
+        requirements = PaymentRequirements(**body["paymentRequirements"])
+        # Passes client side validation but not the facilitator's
+        requirements.max_amount_required = "not a number"
+        verify_response = await facilitator.verify(payment, requirements)
+        assert not verify_response.is_valid
+        assert verify_response.invalid_reason == "invalid_payload"
+        assert verify_response.payer is None
+        settle_response = await facilitator.settle(payment, requirements)
+        assert not settle_response.success
+        assert settle_response.error_reason == "invalid_payload"
+
+
+def test_server_with_middleware(account):
+    with MockFacilitatorServer() as server:
+        app = FastAPI()
+
+        @app.get("/paid")
+        async def paid():
+            return {"message": "paid"}
+
+        app.middleware("http")(
+            require_payment(
+                price="$0.01",
+                pay_to_address="0x0000000000000000000000000000000000000001",
+                network="base-sepolia",
+                facilitator_config={"url": server.url},
+            )
+        )
+        client = TestClient(app)
+        response = client.get("/paid")
+        assert response.status_code == 402
+        requirements = PaymentRequirements(**response.json()["accepts"][0])
+        header = x402Client(account).create_payment_header(requirements, 1)
+        response = client.get("/paid", headers={"X-PAYMENT": header})
+        assert response.status_code == 200
+        assert "X-PAYMENT-RESPONSE" in response.headers